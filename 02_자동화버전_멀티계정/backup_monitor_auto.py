@@ -1,21 +1,24 @@
+import argparse
 import json
 import logging
+from concurrent.futures import ThreadPoolExecutor
 
-# YAML 모듈 자동 설치
+# PyYAML은 설치 단계(pip install -r ../requirements.txt)에서 준비합니다.
+# 없으면 JSON 설정 파일로만 동작합니다.
 try:
     import yaml
 except ImportError:
-    import subprocess
-    import sys
-    print("PyYAML 패키지를 설치 중입니다...")
-    subprocess.check_call([sys.executable, "-m", "pip", "install", "PyYAML>=6.0"])
-    import yaml
-    print("PyYAML 설치 완료!")
+    yaml = None
 from datetime import datetime, timezone, timedelta
 from azure.identity import InteractiveBrowserCredential
 from azure.mgmt.recoveryservices import RecoveryServicesClient
 from azure.mgmt.recoveryservicesbackup import RecoveryServicesBackupClient
 from azure.core.exceptions import AzureError
+from azure.core.pipeline.transport import RequestsTransport
+import requests
+
+# Azure Resource Manager 토큰 범위
+ARM_SCOPE = "https://management.azure.com/.default"
 
 # 로깅 설정
 logging.basicConfig(
@@ -29,8 +32,12 @@ logging.basicConfig(
 
 def load_accounts_config():
     """계정 설정 파일 로드"""
+    yaml_errors = (yaml.YAMLError,) if yaml else ()
     try:
-        # YAML 파일 먼저 시도
+        # YAML 파일 먼저 시도 (PyYAML 미설치 시 JSON 파일로 진행)
+        if yaml is None:
+            logging.warning("PyYAML 미설치: JSON 설정 파일을 사용합니다. (pip install -r ../requirements.txt)")
+            raise FileNotFoundError("PyYAML 미설치")
         with open('../계정설정_공통.yaml', 'r', encoding='utf-8') as f:
             return yaml.safe_load(f)
     except FileNotFoundError:
@@ -41,20 +48,54 @@ def load_accounts_config():
         except FileNotFoundError:
             logging.error("계정설정 파일을 찾을 수 없습니다.")
             return None
-    except (json.JSONDecodeError, yaml.YAMLError) as e:
+    except (json.JSONDecodeError, *yaml_errors) as e:
         logging.error(f"설정 파일 형식이 올바르지 않습니다: {e}")
         return None
 
-def get_backup_jobs(account_info):
-    """특정 계정의 백업 작업 조회"""
+def group_accounts_by_tenant(accounts):
+    """계정 목록을 테넌트 ID 기준으로 묶기 (설정 파일 순서 유지)"""
+    tenants = {}
+    for account in accounts:
+        tenants.setdefault(account['tenant_id'], []).append(account)
+    return tenants
+
+def warm_up_tenant(tenant_id):
+    """테넌트 인증 정보 생성 후 토큰을 미리 발급 (테넌트당 브라우저 로그인 1회)"""
+    credential = InteractiveBrowserCredential(tenant_id=tenant_id)
+    credential.get_token(ARM_SCOPE)
+    # 같은 테넌트의 모든 구독이 HTTP 연결 풀을 공유
+    transport = RequestsTransport(session=requests.Session(), session_owner=False)
+    return {'credential': credential, 'transport': transport}
+
+def prepare_tenant_sessions(tenant_ids):
+    """모든 테넌트의 토큰을 동시에 발급
+    
+    Returns:
+        {tenant_id: {'credential', 'transport'}} - 인증에 실패한 테넌트는 제외
+    """
+    sessions = {}
+    if not tenant_ids:
+        return sessions
+    with ThreadPoolExecutor(max_workers=len(tenant_ids)) as executor:
+        futures = {tenant_id: executor.submit(warm_up_tenant, tenant_id) for tenant_id in tenant_ids}
+        for tenant_id, future in futures.items():
+            try:
+                sessions[tenant_id] = future.result()
+                logging.info(f"테넌트 {tenant_id[:8]}... 인증 완료")
+            except Exception as e:
+                logging.error(f"테넌트 {tenant_id[:8]}... 인증 실패: {str(e)}")
+    return sessions
+
+def get_backup_jobs(account_info, tenant_session):
+    """특정 계정의 백업 작업 조회 (테넌트 공용 인증 정보/HTTP 연결 사용)"""
     try:
         print(f"\n=== {account_info['name']} 계정 처리 중... ===")
         
-        # 인증
-        credential = InteractiveBrowserCredential(tenant_id=account_info['tenant_id'])
+        credential = tenant_session['credential']
+        transport = tenant_session['transport']
         
         # Recovery Services Client 생성
-        recovery_client = RecoveryServicesClient(credential, account_info['subscription_id'])
+        recovery_client = RecoveryServicesClient(credential, account_info['subscription_id'], transport=transport)
         
         # Vault 목록 조회
         vaults = list(recovery_client.vaults.list_by_subscription_id())
@@ -64,7 +105,7 @@ def get_backup_jobs(account_info):
             return []
         
         # Backup Client 생성
-        backup_client = RecoveryServicesBackupClient(credential, account_info['subscription_id'])
+        backup_client = RecoveryServicesBackupClient(credential, account_info['subscription_id'], transport=transport)
         
         all_jobs = []
         KST = timezone(timedelta(hours=9))
@@ -157,8 +198,30 @@ def print_summary(all_jobs):
             status_icon = "✅" if job['status'] == 'Completed' else "❌"
             print(f"  {status_icon} {job['account_name']} | {job['vault_name']} | {job['start_time']}")
 
+def parse_args():
+    """명령행 옵션"""
+    parser = argparse.ArgumentParser(description="Azure 백업 모니터링 자동화 (멀티 계정)")
+    parser.add_argument('--profile', action='store_true',
+                        help="수집 1회를 샘플링 프로파일러 + tracemalloc 으로 측정해 profiles/ 폴더에 저장 "
+                             "(BACKUP_MONITOR_PROFILE=1 과 같음)")
+    return parser.parse_args()
+
 def main():
     """메인 실행 함수"""
+    from collector_profiler import profiling_enabled
+    args = parse_args()
+    
+    if not (args.profile or profiling_enabled()):
+        run_monitor()
+        return
+    
+    from collector_profiler import print_report, profile_run
+    with profile_run('auto') as report:
+        run_monitor()
+    print_report(report)
+
+def run_monitor():
+    """백업 작업 수집 및 요약 출력"""
     print("Azure 백업 모니터링 자동화 시스템")
     print("="*50)
     
@@ -173,13 +236,24 @@ def main():
         print("설정된 계정이 없습니다.")
         return
     
-    print(f"총 {len(accounts)}개 계정 처리 예정")
+    tenants = group_accounts_by_tenant(accounts)
+    print(f"총 {len(accounts)}개 계정 ({len(tenants)}개 테넌트) 처리 예정")
     
-    # 모든 계정 처리
+    # 테넌트별 로그인 (동시에 진행, 테넌트당 1회)
+    print(f"\n🔐 {len(tenants)}개 테넌트 로그인 중... (테넌트마다 브라우저 창이 한 번 열립니다)")
+    sessions = prepare_tenant_sessions(list(tenants))
+    
+    # 테넌트별로 공용 인증 정보를 사용해 구독 처리
     all_jobs = []
-    for account in accounts:
-        jobs = get_backup_jobs(account)
-        all_jobs.extend(jobs)
+    for tenant_id, tenant_accounts in tenants.items():
+        tenant_session = sessions.get(tenant_id)
+        if tenant_session is None:
+            skipped = ', '.join(acc['name'] for acc in tenant_accounts)
+            logging.error(f"테넌트 {tenant_id[:8]}... 인증 실패로 건너뜀: {skipped}")
+            continue
+        for account in tenant_accounts:
+            jobs = get_backup_jobs(account, tenant_session)
+            all_jobs.extend(jobs)
     
     # 결과 요약
     print_summary(all_jobs)
@@ -1,21 +1,29 @@
+import argparse
 import json
 import logging
+import math
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 
-# YAML 모듈 자동 설치
+# PyYAML은 설치 단계(pip install -r ../requirements.txt)에서 준비합니다.
+# 없으면 JSON 설정 파일로만 동작합니다.
 try:
     import yaml
 except ImportError:
-    import subprocess
-    import sys
-    print("PyYAML 패키지를 설치 중입니다...")
-    subprocess.check_call([sys.executable, "-m", "pip", "install", "PyYAML>=6.0"])
-    import yaml
-    print("PyYAML 설치 완료!")
+    yaml = None
 from datetime import datetime, timezone, timedelta
 from azure.identity import ClientSecretCredential
 from azure.mgmt.recoveryservices import RecoveryServicesClient
 from azure.mgmt.recoveryservicesbackup import RecoveryServicesBackupClient
 from azure.core.exceptions import AzureError
+from azure.core.pipeline.transport import RequestsTransport
+import requests
+
+# Azure Resource Manager 토큰 범위
+ARM_SCOPE = "https://management.azure.com/.default"
 
 # 로깅 설정
 logging.basicConfig(
@@ -29,8 +37,12 @@ logging.basicConfig(
 
 def load_accounts_config():
     """Service Principal 계정 설정 파일 로드"""
+    yaml_errors = (yaml.YAMLError,) if yaml else ()
     try:
-        # YAML 파일 먼저 시도
+        # YAML 파일 먼저 시도 (PyYAML 미설치 시 JSON 파일로 진행)
+        if yaml is None:
+            logging.warning("PyYAML 미설치: JSON 설정 파일을 사용합니다. (pip install -r ../requirements.txt)")
+            raise FileNotFoundError("PyYAML 미설치")
         with open('../계정설정_ServicePrincipal.yaml', 'r', encoding='utf-8') as f:
             return yaml.safe_load(f)
     except FileNotFoundError:
@@ -42,7 +54,7 @@ def load_accounts_config():
             logging.error("계정설정 파일을 찾을 수 없습니다.")
             print("❌ 설정 파일 없음: 계정설정_ServicePrincipal.yaml 또는 계정설정_서비스프린시팔.json 파일을 생성하고 Service Principal 정보를 입력하세요.")
             return None
-    except (json.JSONDecodeError, yaml.YAMLError) as e:
+    except (json.JSONDecodeError, *yaml_errors) as e:
         logging.error(f"설정 파일 형식이 올바르지 않습니다: {e}")
         print(f"❌ 설정 파일 오류: 형식을 확인하세요. {e}")
         return None
@@ -55,29 +67,61 @@ def validate_account_config(account_info):
             return False, f"'{field}' 값이 설정되지 않았습니다."
     return True, "OK"
 
-def get_backup_jobs(account_info):
-    """특정 계정의 백업 작업 조회 (Service Principal 인증)"""
+def tenant_key(account_info):
+    """같은 인증 정보를 공유할 수 있는 계정 묶음 키 (테넌트 + Service Principal)"""
+    return (account_info['tenant_id'], account_info['client_id'], account_info['client_secret'])
+
+def group_accounts_by_tenant(accounts):
+    """계정 목록을 테넌트(+Service Principal) 기준으로 묶기 (설정 파일 순서 유지)"""
+    tenants = {}
+    for account in accounts:
+        tenants.setdefault(tenant_key(account), []).append(account)
+    return tenants
+
+def warm_up_tenant(key):
+    """테넌트 인증 정보 생성 후 토큰을 미리 발급 (테넌트당 토큰 요청 1회)"""
+    tenant_id, client_id, client_secret = key
+    credential = ClientSecretCredential(
+        tenant_id=tenant_id,
+        client_id=client_id,
+        client_secret=client_secret
+    )
+    credential.get_token(ARM_SCOPE)
+    # 같은 테넌트의 모든 구독이 HTTP 연결 풀을 공유
+    transport = RequestsTransport(session=requests.Session(), session_owner=False)
+    return {'credential': credential, 'transport': transport}
+
+def prepare_tenant_sessions(keys):
+    """모든 테넌트의 토큰을 동시에 발급
+    
+    Returns:
+        ({key: {'credential', 'transport'}}, {key: 오류 메시지})
+    """
+    sessions = {}
+    errors = {}
+    if not keys:
+        return sessions, errors
+    with ThreadPoolExecutor(max_workers=len(keys)) as executor:
+        futures = {key: executor.submit(warm_up_tenant, key) for key in keys}
+        for key, future in futures.items():
+            try:
+                sessions[key] = future.result()
+                logging.info(f"테넌트 {key[0][:8]}... Service Principal 인증 완료")
+            except Exception as e:
+                errors[key] = str(e)
+                logging.error(f"테넌트 {key[0][:8]}... Service Principal 인증 실패: {str(e)}")
+    return sessions, errors
+
+def get_backup_jobs(account_info, tenant_session):
+    """특정 계정의 백업 작업 조회 (테넌트 공용 Service Principal 인증/HTTP 연결 사용)"""
     try:
         print(f"\n=== {account_info['name']} 계정 처리 중... ===")
         
-        # 설정 검증
-        is_valid, error_msg = validate_account_config(account_info)
-        if not is_valid:
-            logging.error(f"{account_info['name']}: 설정 오류 - {error_msg}")
-            print(f"  ❌ 설정 오류: {error_msg}")
-            return []
-        
-        # Service Principal 인증
-        credential = ClientSecretCredential(
-            tenant_id=account_info['tenant_id'],
-            client_id=account_info['client_id'],
-            client_secret=account_info['client_secret']
-        )
-        
-        print(f"  🔐 Service Principal 인증 중...")
+        credential = tenant_session['credential']
+        transport = tenant_session['transport']
         
         # Recovery Services Client 생성
-        recovery_client = RecoveryServicesClient(credential, account_info['subscription_id'])
+        recovery_client = RecoveryServicesClient(credential, account_info['subscription_id'], transport=transport)
         
         # Vault 목록 조회
         print(f"  📋 Recovery Services Vault 조회 중...")
@@ -91,7 +135,7 @@ def get_backup_jobs(account_info):
         print(f"  ✅ {len(vaults)}개 Vault 발견")
         
         # Backup Client 생성
-        backup_client = RecoveryServicesBackupClient(credential, account_info['subscription_id'])
+        backup_client = RecoveryServicesBackupClient(credential, account_info['subscription_id'], transport=transport)
         
         all_jobs = []
         KST = timezone(timedelta(hours=9))
@@ -143,6 +187,270 @@ def get_backup_jobs(account_info):
         print(f"  ❌ 처리 오류: {str(e)}")
         return []
 
+def collect_sequential(tenants, total_accounts):
+    """단일 프로세스 수집: 테넌트 토큰을 동시에 발급한 뒤 구독을 순서대로 처리"""
+    print(f"🔐 {len(tenants)}개 테넌트 Service Principal 인증 중...")
+    sessions, auth_errors = prepare_tenant_sessions(list(tenants))
+    
+    # 테넌트별로 공용 인증 정보를 사용해 구독 처리
+    all_jobs = []
+    successful_accounts = 0
+    i = 0
+    
+    for key, tenant_accounts in tenants.items():
+        tenant_session = sessions.get(key)
+        if tenant_session is None:
+            print(f"\n❌ 테넌트 {key[0][:8]}... 인증 실패: {auth_errors.get(key, '')}")
+            print(f"   Service Principal 정보를 확인하세요. 건너뜀: {', '.join(acc['name'] for acc in tenant_accounts)}")
+            i += len(tenant_accounts)
+            continue
+        
+        for account in tenant_accounts:
+            i += 1
+            print(f"\n[{i}/{total_accounts}]", end=" ")
+            jobs = get_backup_jobs(account, tenant_session)
+            if jobs is not None:  # 오류가 아닌 경우 (빈 리스트도 성공)
+                all_jobs.extend(jobs)
+                successful_accounts += 1
+    
+    return all_jobs, successful_accounts
+
+# 모든 워커가 대기 중인데 큐의 작업을 아무도 시작하지 않은 채 이 시간(초)이 지나면 작업을 다시 넣음
+IDLE_REQUEUE_SECONDS = 10
+# 워커당 작업(구독 묶음) 수 - 느린 묶음이 있어도 다른 워커가 나머지 묶음을 가져가도록 잘게 나눔
+TASKS_PER_WORKER = 4
+
+def shard_accounts(tenants, worker_count):
+    """테넌트별 계정을 구독 묶음 작업으로 나누기
+    
+    묶음에는 한 테넌트의 계정만 담아 워커가 묶음 안에서 테넌트 토큰을 재사용하고,
+    테넌트가 하나뿐이어도 여러 워커가 나눠 처리하도록 전체 계정 수 기준으로 크기를 정합니다.
+    
+    Returns:
+        [(테넌트 키, [계정, ...]), ...]
+    """
+    total_accounts = sum(len(tenant_accounts) for tenant_accounts in tenants.values())
+    chunk_size = max(1, math.ceil(total_accounts / (worker_count * TASKS_PER_WORKER)))
+    return [
+        (key, tenant_accounts[start:start + chunk_size])
+        for key, tenant_accounts in tenants.items()
+        for start in range(0, len(tenant_accounts), chunk_size)
+    ]
+
+def collector_worker(worker_id, task_queue, result_queue):
+    """수집 워커 프로세스
+    
+    작업 큐에서 구독 묶음 작업을 받아 처리하고, 계정 하나가 끝날 때마다 결과를 결과 큐로 보냅니다.
+    이 계정별 결과가 작업 중 생존 신호입니다 (계정 하나가 무응답 판정 시간보다 오래 걸리면 교체 대상).
+    테넌트 인증 정보/클라이언트는 워커가 직접 만들어 보관합니다 (프로세스 간 공유 없음).
+    """
+    # 콘솔 출력은 메인 프로세스가 담당 (워커 상세 내용은 로그 파일에 기록)
+    sys.stdout = open(os.devnull, 'w', encoding='utf-8')
+    result_queue.put(('ready', worker_id, os.getpid()))
+    
+    sessions = {}
+    while True:
+        task = task_queue.get()
+        if task is None:
+            break
+        task_id, key, accounts = task
+        result_queue.put(('start', worker_id, task_id))
+        
+        try:
+            if key not in sessions:
+                sessions[key] = warm_up_tenant(key)
+        except Exception as e:
+            logging.error(f"[워커 {worker_id}] 테넌트 {key[0][:8]}... 인증 실패: {str(e)}")
+            result_queue.put(('auth_error', worker_id, (task_id, str(e))))
+            continue
+        
+        for account in accounts:
+            jobs = get_backup_jobs(account, sessions[key])
+            result_queue.put(('jobs', worker_id, (task_id, account['name'], jobs)))
+        result_queue.put(('done', worker_id, task_id))
+
+def collect_sharded(tenants, worker_count, worker_timeout=120, max_task_attempts=2):
+    """다중 프로세스 수집: 테넌트별 구독 묶음 작업을 워커 풀에 분배
+    
+    - 작업 큐에서 비어 있는 워커가 다음 묶음을 가져가므로 느린 구독이 있어도 부하가 자동 분산됩니다
+      (테넌트가 하나여도 구독 묶음으로 나눠 병렬 처리).
+    - 계정별 결과는 받는 즉시 결과 저장소(all_jobs)에 반영되므로, 워커가 작업 도중 멈추거나 종료돼도
+      이미 끝난 계정의 결과는 남습니다.
+    - 작업 중인 워커가 종료되거나 worker_timeout 초 동안 다음 계정 결과를 보내지 않으면 묶음의 남은 계정만
+      다시 큐에 넣고 워커를 새로 띄웁니다 (묶음당 최대 max_task_attempts 회 시도).
+    
+    Returns:
+        (all_jobs, successful_accounts, health) - health 는 워커별 상태 딕셔너리
+    """
+    ctx = multiprocessing.get_context('spawn')
+    task_queue = ctx.Queue()
+    # 결과 큐는 put 이 바로 파이프에 기록되는 SimpleQueue 사용
+    # (워커가 갑자기 종료돼도 그 전에 보낸 시작/결과 메시지가 유실되지 않음)
+    result_queue = ctx.SimpleQueue()
+    
+    tasks = dict(enumerate(shard_accounts(tenants, worker_count)))
+    attempts = {task_id: 0 for task_id in tasks}
+    completed = {task_id: set() for task_id in tasks}  # task_id → 결과를 반영한 계정명
+    queued = set()      # 큐에 넣었지만 아직 워커가 시작하지 않은 task_id
+    
+    # 계정이 많은 묶음을 먼저 배치해 마지막에 큰 작업이 남지 않도록 함
+    for task_id in sorted(tasks, key=lambda t: len(tasks[t][1]), reverse=True):
+        attempts[task_id] += 1
+        queued.add(task_id)
+        task_queue.put((task_id, *tasks[task_id]))
+    
+    workers = {}
+    health = {}
+    in_flight = {}      # worker_id → task_id
+    finished = set()
+    all_jobs = []
+    successful_accounts = 0
+    restarts_left = worker_count
+    
+    def spawn_worker(replaces=None):
+        # 교체 워커도 새 번호를 받아, 종료된 워커가 늦게 보낸 메시지와 섞이지 않도록 함
+        worker_id = len(workers)
+        process = ctx.Process(target=collector_worker, args=(worker_id, task_queue, result_queue), daemon=True)
+        process.start()
+        workers[worker_id] = process
+        health[worker_id] = {
+            'pid': process.pid, 'status': '시작 중', 'tasks': 0, 'accounts': 0, 'jobs': 0,
+            'replaces': replaces, 'last_seen': time.time()
+        }
+    
+    def next_message(timeout=1.0):
+        deadline = time.time() + timeout
+        while result_queue.empty():
+            if time.time() >= deadline:
+                return None
+            time.sleep(0.05)
+        return result_queue.get()
+    
+    def remaining_accounts(task_id):
+        return [acc for acc in tasks[task_id][1] if acc['name'] not in completed[task_id]]
+    
+    def give_up(task_id, reason):
+        finished.add(task_id)
+        key = tasks[task_id][0]
+        names = ', '.join(acc['name'] for acc in remaining_accounts(task_id))
+        logging.error(f"테넌트 {key[0][:8]}... 구독 묶음 처리 실패 ({reason}): {names}")
+        print(f"\n❌ 테넌트 {key[0][:8]}... 구독 묶음 처리 실패 ({reason}). 건너뜀: {names}")
+    
+    def retry_or_give_up(task_id, reason):
+        remaining = remaining_accounts(task_id)
+        if not remaining:
+            finished.add(task_id)
+        elif attempts[task_id] < max_task_attempts:
+            attempts[task_id] += 1
+            queued.add(task_id)
+            # 워커가 멈출 때 처리 중이던 계정(남은 계정의 첫 번째)은 맨 뒤로 보내 나머지 계정을 먼저 처리
+            task_queue.put((task_id, tasks[task_id][0], remaining[1:] + remaining[:1]))
+            logging.warning(f"작업 {task_id} 남은 계정 {len(remaining)}개 재분배 ({reason})")
+        else:
+            give_up(task_id, reason)
+    
+    for _ in range(worker_count):
+        spawn_worker()
+    print(f"⚙️ {worker_count}개 워커 프로세스로 {len(tasks)}개 작업 분배 ({len(tenants)}개 테넌트)")
+    
+    while len(finished) < len(tasks):
+        message = next_message()
+        kind, worker_id, payload = message if message else (None, None, None)
+        
+        # 교체된 워커가 늦게 보낸 메시지는 무시
+        if kind is not None and health[worker_id]['status'] != '교체됨':
+            info = health[worker_id]
+            info['last_seen'] = time.time()
+            if kind == 'ready':
+                info['pid'] = payload
+                info['status'] = '대기'
+            elif kind == 'start':
+                queued.discard(payload)
+                in_flight[worker_id] = payload
+                info['status'] = f"테넌트 {tasks[payload][0][0][:8]}... 처리 중"
+            elif kind == 'jobs':
+                task_id, account_name, jobs = payload
+                if in_flight.get(worker_id) == task_id and account_name not in completed[task_id]:
+                    completed[task_id].add(account_name)
+                    all_jobs.extend(jobs)
+                    successful_accounts += 1
+                    info['accounts'] += 1
+                    info['jobs'] += len(jobs)
+                    print(f"  📥 [워커 {worker_id}] {account_name}: {len(jobs)}개 백업 작업")
+            elif kind == 'done':
+                if in_flight.pop(worker_id, None) == payload:
+                    finished.add(payload)
+                info['tasks'] += 1
+                info['status'] = '대기'
+            elif kind == 'auth_error':
+                task_id, error = payload
+                info['status'] = '대기'
+                if in_flight.pop(worker_id, None) == task_id and task_id not in finished:
+                    give_up(task_id, f"인증 실패: {error}")
+        
+        # 워커 상태 점검: 종료/무응답 워커의 작업 재분배 후 워커 교체
+        # (종료 판정은 결과 큐를 모두 비운 뒤에 해야 종료 직전에 보낸 메시지를 놓치지 않음)
+        now = time.time()
+        for worker_id, process in list(workers.items()):
+            info = health[worker_id]
+            if info['status'] in ('종료됨', '교체됨'):
+                continue
+            alive = process.is_alive() or not result_queue.empty()
+            # 대기 중인 워커는 메시지를 보내지 않으므로 작업 중인 워커만 무응답 판정
+            stalled = alive and worker_id in in_flight and now - info['last_seen'] > worker_timeout
+            if alive and not stalled:
+                continue
+            
+            reason = f"워커 {worker_id} 무응답 ({worker_timeout}초)" if stalled else f"워커 {worker_id} 비정상 종료 (exit {process.exitcode})"
+            logging.error(reason)
+            print(f"\n⚠️ {reason}")
+            if stalled:
+                process.terminate()
+            info['status'] = '교체됨'
+            
+            task_id = in_flight.pop(worker_id, None)
+            if task_id is not None and task_id not in finished:
+                retry_or_give_up(task_id, reason)
+            
+            if restarts_left > 0 and len(finished) < len(tasks):
+                restarts_left -= 1
+                spawn_worker(replaces=worker_id)
+        
+        if kind is None:
+            # 모든 워커가 대기 중인데 시작되지 않은 작업이 남아 있으면
+            # 큐에서 작업을 꺼낸 직후 종료된 워커가 있었던 것이므로 다시 넣음
+            idle = all(info['status'] in ('대기', '종료됨', '교체됨') for info in health.values())
+            if idle and not in_flight and queued and now - max(info['last_seen'] for info in health.values()) > IDLE_REQUEUE_SECONDS:
+                for task_id in list(queued):
+                    queued.discard(task_id)
+                    retry_or_give_up(task_id, "처리 워커 확인 불가")
+            
+            # 살아있는 워커가 없으면 남은 작업은 실패 처리
+            if not any(process.is_alive() for process in workers.values()):
+                for task_id in tasks:
+                    if task_id not in finished:
+                        give_up(task_id, "사용 가능한 워커 없음")
+    
+    # 워커 종료
+    for _ in workers:
+        task_queue.put(None)
+    for worker_id, process in workers.items():
+        process.join(timeout=10)
+        if process.is_alive():
+            process.terminate()
+        if health[worker_id]['status'] != '교체됨':
+            health[worker_id]['status'] = '종료됨'
+    
+    return all_jobs, successful_accounts, health
+
+def print_worker_health(health):
+    """워커별 처리 현황 출력"""
+    print(f"\n⚙️ 워커 상태:")
+    for worker_id, info in sorted(health.items()):
+        replaced = f" | 워커 {info['replaces']} 대체" if info['replaces'] is not None else ""
+        print(f"  [워커 {worker_id}] PID {info['pid']} | {info['status']} | "
+              f"구독 묶음 {info['tasks']}개 | 계정 {info['accounts']}개 | 작업 {info['jobs']}개{replaced}")
+
 def print_summary(all_jobs):
     """결과 요약 출력"""
     print("\n" + "="*80)
@@ -203,8 +511,34 @@ def print_summary(all_jobs):
         else:
             print("  오늘 실행된 백업 작업이 없습니다.")
 
+def parse_args():
+    """명령행 옵션"""
+    parser = argparse.ArgumentParser(description="Azure 백업 모니터링 (Service Principal)")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="수집 워커 프로세스 수 (2 이상이면 테넌트 단위로 나눠 병렬 수집)")
+    parser.add_argument('--worker-timeout', type=int, default=120,
+                        help="워커 무응답 판정 시간(초) - 초과 시 작업 재분배 후 워커 교체")
+    parser.add_argument('--profile', action='store_true',
+                        help="수집 1회를 샘플링 프로파일러 + tracemalloc 으로 측정해 profiles/ 폴더에 저장 "
+                             "(BACKUP_MONITOR_PROFILE=1 과 같음, --workers 사용 시 워커 프로세스는 제외)")
+    return parser.parse_args()
+
 def main():
     """메인 실행 함수"""
+    from collector_profiler import profiling_enabled
+    args = parse_args()
+    
+    if not (args.profile or profiling_enabled()):
+        run_monitor(args)
+        return
+    
+    from collector_profiler import print_report, profile_run
+    with profile_run('sp') as report:
+        run_monitor(args)
+    print_report(report)
+
+def run_monitor(args):
+    """백업 작업 수집 및 요약 출력"""
     print("Azure 백업 모니터링 자동화 시스템 (Service Principal)")
     print("="*60)
     print("🔒 자동 인증 - 브라우저 팝업 없음")
@@ -221,18 +555,25 @@ def main():
         print("❌ 설정된 계정이 없습니다.")
         return
     
-    print(f"📋 총 {len(accounts)}개 계정 처리 예정")
+    # 설정 검증 (잘못된 계정은 인증 전에 제외)
+    valid_accounts = []
+    for account in accounts:
+        is_valid, error_msg = validate_account_config(account)
+        if is_valid:
+            valid_accounts.append(account)
+        else:
+            logging.error(f"{account.get('name', 'N/A')}: 설정 오류 - {error_msg}")
+            print(f"❌ {account.get('name', 'N/A')} 설정 오류: {error_msg}")
     
-    # 모든 계정 처리
-    all_jobs = []
-    successful_accounts = 0
+    tenants = group_accounts_by_tenant(valid_accounts)
+    print(f"📋 총 {len(accounts)}개 계정 ({len(tenants)}개 테넌트) 처리 예정")
     
-    for i, account in enumerate(accounts, 1):
-        print(f"\n[{i}/{len(accounts)}]", end=" ")
-        jobs = get_backup_jobs(account)
-        if jobs is not None:  # 오류가 아닌 경우 (빈 리스트도 성공)
-            all_jobs.extend(jobs)
-            successful_accounts += 1
+    if args.workers > 1 and len(valid_accounts) > 1:
+        worker_count = min(args.workers, len(valid_accounts))
+        all_jobs, successful_accounts, health = collect_sharded(tenants, worker_count, args.worker_timeout)
+        print_worker_health(health)
+    else:
+        all_jobs, successful_accounts = collect_sequential(tenants, len(valid_accounts))
     
     # 결과 요약
     print_summary(all_jobs)
@@ -0,0 +1,186 @@
+"""
+VM 백업 커버리지 (VM 인벤토리 × 보호 항목 해시 조인)
+
+Vault마다 보호 항목(backup_protected_items)을 한 번씩만 나열해 정규화한 VM 리소스 ID → 보호 항목
+해시 인덱스를 만들고, get_azure_vms 인벤토리의 VM마다 인덱스를 한 번 찾아 조인합니다
+(VM × 보호 항목 중첩 루프 없음). 결과는 VM마다
+- 미보호(UNPROTECTED): 어떤 Vault에도 보호 항목이 없음
+- 보호 중지(STOPPED): 보호 항목은 있지만 보호가 중지/일시 중지됨
+- 복구 지점 오래됨(STALE): 마지막 복구 지점이 STALE_RECOVERY_HOURS 보다 오래됨 (또는 없음)
+- 정상(PROTECTED)
+- 조회 불완전(UNKNOWN): 보호 항목 조회가 끝나지 않은 계정(일부 Vault 실패 / 마감 시간 초과)에서
+  보호 항목을 찾지 못함 (조회하지 못한 Vault에 있을 수 있으므로 미보호로 단정하지 않음)
+중 하나입니다.
+
+보호 항목 목록은 구독별로 메모리와 디스크(JSON)에 CACHE_TTL_SECONDS 동안 캐시해
+다음 조회(다른 세션 / 앱 재시작 포함)에서 Vault를 다시 나열하지 않습니다.
+"""
+import json
+import logging
+import os
+import threading
+import time
+
+DEFAULT_CACHE_DIR = 'cache'
+CACHE_TTL_SECONDS = 3600
+STALE_RECOVERY_HOURS = 36  # 일 1회 백업 + 여유
+PROTECTED_ITEM_FILTER = "backupManagementType eq 'AzureIaasVM' and itemType eq 'VM'"
+
+UNPROTECTED, STOPPED, STALE, PROTECTED = 'unprotected', 'stopped', 'stale', 'protected'
+UNKNOWN = 'unknown'
+STOPPED_STATES = ('ProtectionStopped', 'ProtectionPaused')
+
+logger = logging.getLogger(__name__)
+
+_subscriptions = {}  # 구독 ID(소문자) → {'fetched_at': epoch, 'records': [보호 항목 레코드]}
+_lock = threading.Lock()
+
+
+def normalize_resource_id(resource_id):
+    """대소문자 / 끝의 '/' 차이를 없앤 리소스 ID (조인 키)"""
+    return (resource_id or '').strip().rstrip('/').lower()
+
+
+def vm_resource_id(subscription_id, resource_group, vm_name):
+    return normalize_resource_id(
+        f"/subscriptions/{subscription_id}/resourceGroups/{resource_group}"
+        f"/providers/Microsoft.Compute/virtualMachines/{vm_name}"
+    )
+
+
+def enum_text(value):
+    """SDK 문자열 Enum → 값 문자열 (없으면 None)"""
+    return getattr(value, 'value', value) if value is not None else None
+
+
+def item_property(properties, attribute, rest_key):
+    """보호 항목 속성 (SDK 가 하위 형식 대신 기본 ProtectedItem 으로 역직렬화하면 원본 JSON 키로 조회)"""
+    value = getattr(properties, attribute, None)
+    if value is None and hasattr(properties, 'get'):
+        value = properties.get(rest_key)
+    return value
+
+
+def protected_item_record(item, vault_name):
+    """보호 항목(ProtectedItemResource) → 캐시용 레코드 (VM 리소스 ID 가 없으면 None)"""
+    properties = item.properties
+    vm_id = item_property(properties, 'virtual_machine_id', 'virtualMachineId') or properties.source_resource_id
+    if not vm_id:
+        return None
+    last_recovery_point = properties.last_recovery_point
+    return {
+        'vm_id': normalize_resource_id(vm_id),
+        'friendly_name': item_property(properties, 'friendly_name', 'friendlyName') or vm_id.rstrip('/').rsplit('/', 1)[-1],
+        'vault_name': vault_name,
+        'protection_state': enum_text(item_property(properties, 'protection_state', 'protectionState')) or 'N/A',
+        'last_backup_status': enum_text(item_property(properties, 'last_backup_status', 'lastBackupStatus')),
+        'last_recovery_epoch': int(last_recovery_point.timestamp()) if last_recovery_point else None
+    }
+
+
+def cache_path(subscription_id, cache_dir=DEFAULT_CACHE_DIR):
+    return os.path.join(cache_dir, f"protected_items_{subscription_id.lower()}.json")
+
+
+def read_cache(subscription_id, cache_dir):
+    try:
+        with open(cache_path(subscription_id, cache_dir), 'r', encoding='utf-8') as f:
+            entry = json.load(f)
+        return {'fetched_at': float(entry['fetched_at']), 'records': entry['records']}
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def write_cache(subscription_id, entry, cache_dir):
+    """임시 파일에 쓴 뒤 교체 (동시에 읽는 세션이 반쯤 쓰인 파일을 보지 않도록)"""
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        path = cache_path(subscription_id, cache_dir)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'subscription_id': subscription_id, **entry}, f, ensure_ascii=False)
+        os.replace(temp_path, path)
+    except OSError as e:
+        logger.warning(f"보호 항목 캐시 저장 실패 ({subscription_id}): {e}")
+
+
+def reset_protected_items_cache():
+    """메모리 캐시 비우기 (디스크 캐시는 유지)"""
+    with _lock:
+        _subscriptions.clear()
+
+
+def cached_protected_items(subscription_id, cache_dir=DEFAULT_CACHE_DIR, ttl=CACHE_TTL_SECONDS):
+    """구독의 캐시된 보호 항목 레코드와 조회 시각 (메모리 → 디스크, 만료/없음이면 (None, None))"""
+    key = subscription_id.lower()
+    now = time.time()
+    with _lock:
+        entry = _subscriptions.get(key) or read_cache(key, cache_dir)
+        if entry and now - entry['fetched_at'] < ttl:
+            _subscriptions[key] = entry
+            return entry['records'], entry['fetched_at']
+    return None, None
+
+
+def store_protected_items(subscription_id, records, cache_dir=DEFAULT_CACHE_DIR):
+    key = subscription_id.lower()
+    entry = {'fetched_at': time.time(), 'records': records}
+    with _lock:
+        _subscriptions[key] = entry
+        write_cache(key, entry, cache_dir)
+
+
+def build_protection_index(records):
+    """VM 리소스 ID → 보호 항목 레코드 (여러 Vault 에 있으면 복구 지점이 가장 최근인 것)"""
+    index = {}
+    for record in records:
+        current = index.get(record['vm_id'])
+        if current is None or (record['last_recovery_epoch'] or 0) > (current['last_recovery_epoch'] or 0):
+            index[record['vm_id']] = record
+    return index
+
+
+def coverage_status(record, now, stale_hours=STALE_RECOVERY_HOURS, complete=True):
+    """complete: 계정의 보호 항목을 모든 Vault에서 끝까지 조회했는지 (아니면 항목 없음 = UNKNOWN)"""
+    if record is None:
+        return UNPROTECTED if complete else UNKNOWN
+    if record['protection_state'] in STOPPED_STATES:
+        return STOPPED
+    last_epoch = record['last_recovery_epoch']
+    if last_epoch is None or now - last_epoch > stale_hours * 3600:
+        return STALE
+    return PROTECTED
+
+
+def join_coverage(vms, index, subscription_by_account, now=None, stale_hours=STALE_RECOVERY_HOURS,
+                  incomplete_accounts=()):
+    """VM 인벤토리 × 보호 항목 인덱스 조인 → VM별 커버리지 행
+
+    Args:
+        vms: get_azure_vms 결과 레코드 (account_name / resource_group / vm_name)
+        index: build_protection_index() 결과
+        subscription_by_account: 계정명 → 구독 ID (VM 리소스 ID 구성용)
+        incomplete_accounts: 보호 항목 조회가 끝나지 않은 계정명 (보호 항목이 없는 VM은 UNKNOWN)
+    """
+    now = now or time.time()
+    incomplete_accounts = set(incomplete_accounts)
+    rows = []
+    for vm in vms:
+        subscription_id = subscription_by_account.get(vm['account_name'])
+        if not subscription_id:
+            continue
+        record = index.get(vm_resource_id(subscription_id, vm['resource_group'], vm['vm_name']))
+        last_epoch = record['last_recovery_epoch'] if record else None
+        rows.append({
+            'account_name': vm['account_name'],
+            'vm_name': vm['vm_name'],
+            'resource_group': vm['resource_group'],
+            'power_state': vm.get('power_state'),
+            'coverage': coverage_status(record, now, stale_hours, vm['account_name'] not in incomplete_accounts),
+            'vault_name': record['vault_name'] if record else None,
+            'protection_state': record['protection_state'] if record else None,
+            'last_backup_status': record['last_backup_status'] if record else None,
+            'last_recovery_epoch': last_epoch,
+            'recovery_age_hours': (now - last_epoch) / 3600 if last_epoch is not None else None
+        })
+    return rows
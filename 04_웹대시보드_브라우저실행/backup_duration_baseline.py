@@ -0,0 +1,175 @@
+"""
+백업 소요 시간 기준선과 회귀 탐지
+
+보호 항목(Vault 안의 백업 대상)마다 최근 WINDOW_RUNS 회 완료된 백업 작업의 소요 시간(초)만 보관하고
+중앙값 / p90 을 기준선으로 유지합니다. 조회할 때마다 전체 이력을 다시 계산하지 않고
+- 새로 끝난 작업만 기준선에 더하며 (보호 항목별 마지막 반영 종료 시각 + 최근 작업 ID 로 중복 방지)
+- 더하기 전에 그 시점의 기준선과 비교한 판정(중앙값 대비 배수, 회귀 여부)을 작업 ID 로 남겨
+  같은 작업을 다시 조회해도 판정이 바뀌지 않습니다.
+
+회귀: 기준선 실행 수가 MIN_RUNS 이상이고, 소요 시간이 p90 을 넘으면서 중앙값의 REGRESSION_RATIO 배 이상,
+      중앙값보다 MIN_REGRESSION_SECONDS 이상 긴 작업 (짧은 작업의 작은 흔들림 제외)
+증가율: 기준선 창의 최근 절반 중앙값 / 이전 절반 중앙값 (백업 시간이 서서히 늘어나는지 확인)
+
+기준선은 JSON 파일(기본 cache/backup_durations.json) 하나에 저장됩니다.
+"""
+import json
+import logging
+import os
+import threading
+
+import numpy as np
+
+DEFAULT_BASELINE_PATH = os.path.join('cache', 'backup_durations.json')
+WINDOW_RUNS = 20
+MIN_RUNS = 5
+GROWTH_MIN_RUNS = 10
+REGRESSION_RATIO = 1.5
+MIN_REGRESSION_SECONDS = 600
+BASELINE_STATUSES = ('Completed', 'CompletedWithWarnings')
+BASELINE_OPERATIONS = ('Backup',)
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()  # 같은 프로세스의 세션들이 동시에 저장할 때 파일 병합 직렬화
+
+
+def baseline_key(account_name, vault_name, entity_name):
+    """'계정|Vault|보호 항목' 형식 키"""
+    return f"{account_name}|{vault_name}|{entity_name}"
+
+
+def baseline_duration(job):
+    """기준선에 반영할 작업의 소요 시간(초) - 완료된 백업 작업이 아니면 None"""
+    if job.get('status') not in BASELINE_STATUSES or not job.get('entity_name'):
+        return None
+    if job.get('operation') and job['operation'] not in BASELINE_OPERATIONS:
+        return None
+    duration = job.get('duration_seconds')
+    if duration is None or duration != duration or duration <= 0:  # None / NaN / 0
+        return None
+    return float(duration)
+
+
+def window_stats(durations):
+    """기준선 창의 {'runs', 'median', 'p90', 'growth'} (growth 는 실행 수가 부족하면 None)"""
+    values = np.asarray(durations, dtype=float)
+    stats = {
+        'runs': len(values),
+        'median': float(np.median(values)) if len(values) else None,
+        'p90': float(np.percentile(values, 90)) if len(values) else None,
+        'growth': None
+    }
+    if len(values) >= GROWTH_MIN_RUNS:
+        half = len(values) // 2
+        older = float(np.median(values[:half]))
+        if older > 0:
+            stats['growth'] = float(np.median(values[half:])) / older
+    return stats
+
+
+def judge(stats, duration):
+    """기준선(stats) 대비 소요 시간 판정 {'median', 'p90', 'ratio', 'regressed'}"""
+    if not stats['runs']:
+        return {'median': None, 'p90': None, 'ratio': None, 'regressed': False}
+    median, p90 = stats['median'], stats['p90']
+    ratio = duration / median if median else None
+    regressed = (
+        stats['runs'] >= MIN_RUNS
+        and duration > p90
+        and ratio is not None and ratio >= REGRESSION_RATIO
+        and duration - median >= MIN_REGRESSION_SECONDS
+    )
+    return {'median': median, 'p90': p90, 'ratio': ratio, 'regressed': bool(regressed)}
+
+
+class DurationBaselines:
+    """보호 항목별 소요 시간 기준선 저장소
+
+    entries: 키 → {'durations': [최근 소요 시간(초), 오래된 순], 'last_end': 마지막 반영 종료 epoch,
+                   'verdicts': {작업 ID: 판정}} (verdicts 도 최근 WINDOW_RUNS 개만)
+    """
+
+    def __init__(self, path=DEFAULT_BASELINE_PATH, window=WINDOW_RUNS):
+        self.path = path
+        self.window = window
+        self.entries = self._read()
+        self.dirty = False
+
+    def _read(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f).get('entries', {})
+        except (OSError, ValueError, AttributeError):
+            return {}
+
+    def observe(self, jobs):
+        """새로 끝난 작업을 기준선에 반영 (종료 시각 순)
+
+        Returns:
+            새로 반영한 작업 수
+        """
+        fresh = []
+        for job in jobs:
+            duration = baseline_duration(job)
+            if duration is not None and job.get('end_epoch') is not None:
+                fresh.append((int(job['end_epoch']), job, duration))
+        fresh.sort(key=lambda item: item[0])
+
+        absorbed = 0
+        for end_epoch, job, duration in fresh:
+            key = baseline_key(job['account_name'], job['vault_name'], job['entity_name'])
+            entry = self.entries.setdefault(key, {'durations': [], 'last_end': 0, 'verdicts': {}})
+            if end_epoch < entry['last_end'] or job['job_id'] in entry['verdicts']:
+                continue
+            entry['verdicts'][job['job_id']] = judge(window_stats(entry['durations']), duration)
+            entry['durations'] = (entry['durations'] + [duration])[-self.window:]
+            entry['last_end'] = end_epoch
+            for job_id in list(entry['verdicts'])[:-self.window]:
+                del entry['verdicts'][job_id]
+            absorbed += 1
+        self.dirty = self.dirty or absorbed > 0
+        return absorbed
+
+    def save(self):
+        """변경분을 파일에 병합 (다른 세션이 먼저 반영한 항목은 종료 시각이 더 최근인 쪽 유지)"""
+        if not self.dirty:
+            return
+        try:
+            with _lock:
+                stored = DurationBaselines(self.path, self.window).entries
+                for key, entry in self.entries.items():
+                    if entry['last_end'] >= stored.get(key, {}).get('last_end', 0):
+                        stored[key] = entry
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                temp_path = f"{self.path}.{os.getpid()}.tmp"
+                with open(temp_path, 'w', encoding='utf-8') as f:
+                    json.dump({'window': self.window, 'entries': stored}, f, ensure_ascii=False)
+                os.replace(temp_path, self.path)
+                self.entries = stored
+        except OSError as e:
+            logger.warning(f"백업 소요 시간 기준선 저장 실패: {e}")
+        self.dirty = False
+
+    def verdict(self, account_name, vault_name, entity_name, job_id):
+        """작업이 기준선에 반영될 때의 판정 (반영되지 않은 작업이면 None)"""
+        entry = self.entries.get(baseline_key(account_name, vault_name, entity_name))
+        return entry['verdicts'].get(job_id) if entry else None
+
+    def summary(self):
+        """보호 항목별 기준선 요약 [{'account_name', 'vault_name', 'entity_name', 'runs', 'median', 'p90',
+        'last', 'growth', 'regressions'}]"""
+        rows = []
+        for key, entry in self.entries.items():
+            account_name, vault_name, entity_name = key.split('|', 2)
+            rows.append({
+                'account_name': account_name,
+                'vault_name': vault_name,
+                'entity_name': entity_name,
+                **window_stats(entry['durations']),
+                'last': entry['durations'][-1] if entry['durations'] else None,
+                'regressions': sum(1 for verdict in entry['verdicts'].values() if verdict['regressed'])
+            })
+        return rows
@@ -0,0 +1,177 @@
+"""
+진행 중(InProgress) 백업 작업 라이브 테일
+
+야간 백업 시간대에 실행 중인 작업만 따라갑니다. 모든 Vault 의 작업 이력을 다시 읽는 대신
+- 추적 중인 작업은 job_details.get(작업 이름)으로 하나씩 조회하고
+  (진행률이 그대로면 조회 간격을 MIN → MAX_POLL_SECONDS 까지 늘리고, 바뀌면 다시 줄임)
+- 새로 시작된 작업은 Vault 마다 DISCOVERY_SECONDS 간격으로 직전 조회 이후의 좁은 시간 범위만
+  backup_jobs.list(filter=startTime/endTime) 로 찾습니다 (처음 한 번은 InProgress 상태만)
+- Vault 목록 / 발견 조회가 실패하면 그 계정 / Vault 만 재시도 간격을 DISCOVERY → MAX_RETRY_SECONDS 까지 늘립니다
+
+따라서 실행 중인 작업 50개를 따라가는 비용은 작은 호출 50번 + Vault 수만큼의 발견 조회입니다.
+LiveTail 은 상태와 스케줄만 보관하고, Azure 호출은 호출 측이 넘긴 클라이언트로 수행합니다.
+"""
+import time
+from datetime import datetime, timezone
+
+IN_PROGRESS = 'InProgress'
+
+MIN_POLL_SECONDS = 15
+MAX_POLL_SECONDS = 300
+BACKOFF_FACTOR = 1.5
+DISCOVERY_SECONDS = 60
+DISCOVERY_OVERLAP_SECONDS = 120  # 발견 조회 범위를 직전 범위와 겹쳐 경계의 작업 누락 방지
+SEED_HOURS = 24                  # 처음 발견 조회 범위 (InProgress 만)
+FINISHED_KEEP = 50
+MAX_RETRY_SECONDS = 900          # Vault 목록 / 발견 조회 실패 시 재시도 간격 상한
+
+
+def job_time_filter(start_epoch, end_epoch, status=None):
+    """Azure Backup 작업 목록 필터 (시간 형식: 'YYYY-MM-DD hh:mm:ss AM', UTC)"""
+    def text(epoch):
+        return datetime.fromtimestamp(epoch, timezone.utc).strftime('%Y-%m-%d %I:%M:%S %p')
+
+    parts = [f"startTime eq '{text(start_epoch)}'", f"endTime eq '{text(end_epoch)}'"]
+    if status:
+        parts.insert(0, f"status eq '{status}'")
+    return ' and '.join(parts)
+
+
+def job_progress(job):
+    """IaaS VM 백업 작업의 진행률(%) - 없으면 None"""
+    extended_info = getattr(job.properties, 'extended_info', None)
+    return getattr(extended_info, 'progress_percentage', None)
+
+
+class TrackedJob:
+    def __init__(self, account, job_info, progress=None, now=None):
+        self.account = account
+        self.info = job_info
+        self.progress = progress
+        self.interval = MIN_POLL_SECONDS
+        self.next_poll_at = (now or time.time()) + MIN_POLL_SECONDS
+        self.polls = 0
+
+    @property
+    def key(self):
+        return self.info['account_name'], self.info['vault_name'], self.info['job_id']
+
+    def update(self, job_info, progress, now=None):
+        """조회 결과 반영 후 다음 조회 시각 결정 (변화가 있으면 간격 초기화, 없으면 늘림)"""
+        now = now or time.time()
+        changed = progress != self.progress or job_info['status'] != self.info['status']
+        self.interval = MIN_POLL_SECONDS if changed else min(MAX_POLL_SECONDS, self.interval * BACKOFF_FACTOR)
+        self.info = job_info
+        self.progress = progress
+        self.polls += 1
+        self.next_poll_at = now + self.interval
+        return changed
+
+    def defer(self, now=None):
+        """조회 실패 시 간격을 늘려 다시 시도"""
+        self.interval = min(MAX_POLL_SECONDS, self.interval * BACKOFF_FACTOR)
+        self.next_poll_at = (now or time.time()) + self.interval
+
+
+class LiveTail:
+    """라이브 테일 상태 (세션 상태에 보관)"""
+
+    def __init__(self, account_names):
+        self.account_names = tuple(account_names)
+        self.vaults = {}             # 계정명 → [(vault_name, resource_group)] (처음 한 번만 조회)
+        self.jobs = {}               # (계정, Vault, 작업 ID) → TrackedJob
+        self.discovered_until = {}   # (계정, Vault) → 마지막 발견 조회 범위 끝 epoch
+        self.next_discovery_at = {}  # (계정, Vault) → 다음 발견 조회 epoch
+        self.next_listing_at = {}    # 계정명 → Vault 목록 재시도 epoch (조회 실패 시)
+        self.retry_interval = {}     # (계정, Vault 또는 None=Vault 목록) → 실패 후 재시도 간격(초)
+        self.finished = []           # 최근 끝난 작업 job_info (최신순)
+        self.changes = []            # 결과 테이블에 반영할 작업 job_info (새 작업 / 상태 변경)
+        self.calls = 0               # 누적 Azure API 호출 수
+        self.started_at = time.time()
+
+    def due_jobs(self, account_name, now=None):
+        now = now or time.time()
+        return [job for job in self.jobs.values()
+                if job.account['name'] == account_name and job.next_poll_at <= now]
+
+    def listing_due(self, account_name, now=None):
+        """Vault 목록을 아직 받지 못했고 재시도 시각이 된 계정인지"""
+        now = now or time.time()
+        return account_name not in self.vaults and self.next_listing_at.get(account_name, 0) <= now
+
+    def due_vaults(self, account_name, now=None):
+        now = now or time.time()
+        return [(vault_name, resource_group) for vault_name, resource_group in self.vaults.get(account_name, [])
+                if self.next_discovery_at.get((account_name, vault_name), 0) <= now]
+
+    def discovery_filter(self, account_name, vault_name, now=None):
+        """다음 발견 조회 필터와 범위 끝 epoch (처음에는 InProgress 상태만, 이후에는 좁은 시간 범위)"""
+        now = int(now or time.time())
+        since = self.discovered_until.get((account_name, vault_name))
+        if since is None:
+            return job_time_filter(now - SEED_HOURS * 3600, now, IN_PROGRESS), now
+        return job_time_filter(since - DISCOVERY_OVERLAP_SECONDS, now), now
+
+    def set_vaults(self, account_name, vaults):
+        self.vaults[account_name] = list(vaults)
+        self.next_listing_at.pop(account_name, None)
+        self.retry_interval.pop((account_name, None), None)
+
+    def defer_listing(self, account_name, now=None):
+        """Vault 목록 조회 실패 시 간격을 늘려 다시 시도"""
+        self.next_listing_at[account_name] = self._retry_at((account_name, None), now)
+
+    def mark_discovered(self, account_name, vault_name, until, now=None):
+        self.discovered_until[(account_name, vault_name)] = until
+        self.next_discovery_at[(account_name, vault_name)] = (now or time.time()) + DISCOVERY_SECONDS
+        self.retry_interval.pop((account_name, vault_name), None)
+
+    def defer_discovery(self, account_name, vault_name, now=None):
+        """발견 조회 실패 시 그 Vault 만 간격을 늘려 다시 시도 (범위 시작은 그대로 두어 놓친 구간도 다시 조회)"""
+        self.next_discovery_at[(account_name, vault_name)] = self._retry_at((account_name, vault_name), now)
+
+    def _retry_at(self, key, now=None):
+        interval = self.retry_interval.get(key)
+        interval = DISCOVERY_SECONDS if interval is None else min(MAX_RETRY_SECONDS, interval * BACKOFF_FACTOR)
+        self.retry_interval[key] = interval
+        return (now or time.time()) + interval
+
+    def observe(self, account, job_info, progress=None):
+        """발견 조회 / 개별 조회 결과 반영 → 변화가 있었으면 True"""
+        key = (job_info['account_name'], job_info['vault_name'], job_info['job_id'])
+        tracked = self.jobs.get(key)
+        if tracked is None:
+            if job_info['status'] != IN_PROGRESS:
+                if any(done['job_id'] == job_info['job_id'] for done in self.finished):
+                    return False
+                # 발견 조회 사이에 시작해서 끝난 작업
+                self._finish(job_info)
+                return True
+            self.jobs[key] = TrackedJob(account, job_info, progress)
+            self.changes.append(job_info)
+            return True
+
+        changed = tracked.update(job_info, progress)
+        if job_info['status'] != IN_PROGRESS:
+            del self.jobs[key]
+            self._finish(job_info)
+        return changed
+
+    def drop(self, key):
+        self.jobs.pop(key, None)
+
+    def _finish(self, job_info):
+        self.finished.insert(0, job_info)
+        del self.finished[FINISHED_KEEP:]
+        self.changes.append(job_info)
+
+    def take_changes(self):
+        changes, self.changes = self.changes, []
+        return changes
+
+    def next_event_in(self, now=None):
+        """다음 작업 조회 / 발견 조회까지 남은 초"""
+        now = now or time.time()
+        times = ([job.next_poll_at for job in self.jobs.values()] + list(self.next_discovery_at.values())
+                 + list(self.next_listing_at.values()))
+        return max(0.0, min(times) - now) if times else 0.0
@@ -1,28 +1,30 @@
 import streamlit as st
 import json
-import pandas as pd
+import os
+import time
+from datetime import datetime, timezone, timedelta
 
-# YAML 모듈 자동 설치
+# PyYAML은 설치 단계(pip install -r requirements_web.txt)에서 준비합니다.
+# 없으면 JSON 설정 파일로만 동작합니다.
 try:
     import yaml
 except ImportError:
-    import subprocess
-    import sys
-    st.warning("PyYAML 패키지를 설치 중입니다...")
-    subprocess.check_call([sys.executable, "-m", "pip", "install", "PyYAML>=6.0"])
-    import yaml
-    st.success("PyYAML 설치 완료! 페이지를 새로고침해주세요.")
-import plotly.express as px
-import plotly.graph_objects as go
-from datetime import datetime, timezone, timedelta
-from azure.identity import InteractiveBrowserCredential
-from azure.mgmt.recoveryservices import RecoveryServicesClient
-from azure.mgmt.recoveryservicesbackup import RecoveryServicesBackupClient
-from azure.mgmt.compute import ComputeManagementClient
-from azure.mgmt.monitor import MonitorManagementClient
-from azure.core.exceptions import AzureError
-import time
-import numpy as np
+    yaml = None
+
+# pandas / plotly / numpy / Azure SDK는 첫 화면 표시 속도를 위해
+# 실제로 사용하는 탭·수집 함수 안에서 지연 import 합니다.
+
+# 수집기 계측 (/metrics) - 표준 라이브러리만 사용하므로 바로 import
+from collector_metrics import (
+    DEFAULT_METRICS_PORT, metrics_policy, record_cache, start_metrics_server, timed_collection
+)
+from collector_tracing import finish_render, span, start_render, trace_run
+from collector_deadline import Deadline, DeadlineExceeded
+from collector_breaker import RESOURCE_GRAPH_SCOPE, CircuitBreakerBoard
+from collector_transport import shared_transport
+from collector_snapshot import latest_metric_values, latest_metric_values_by_dimension
+from vm_size_catalog import memory_used_percent, normalize_region, vm_size_spec
+from collector_profiler import profile_run, profiling_enabled
 
 # 페이지 설정
 st.set_page_config(
@@ -159,16 +161,41 @@ st.markdown("""
 
 # 전역 인증 관리자
 class AzureCredentialManager:
-    def __init__(self):
+    def __init__(self, client_kwargs=None, client_factories=None):
         self.credentials = {}
         self.clients = {}
+        # 모든 관리 클라이언트 생성 시 전달할 추가 옵션 (예: 벤치마크용 base_url)
+        self.client_kwargs = client_kwargs or {}
+        # API 계열(compute / monitor / recovery / backup / resourcegraph) → (tenant_id, subscription_id) 를 받아
+        # 클라이언트를 만드는 함수 (예: 테스트용 녹화 재생 클라이언트 주입)
+        self.client_factories = client_factories or {}
+    
+    def _inject(self, key, family, tenant_id, subscription_id=''):
+        """주입된 팩토리가 있으면 그것으로 클라이언트를 만들어 캐싱하고 True"""
+        factory = self.client_factories.get(family)
+        if factory is None:
+            return False
+        self.clients[key] = factory(tenant_id, subscription_id)
+        return True
+    
+    def _client_options(self, family, tenant_id, subscription_id=''):
+        """client_kwargs 에 공용 HTTP 전송(연결 풀)과 API 계열·테넌트·구독별 계측 정책(per_retry_policies)을 더한 클라이언트 옵션"""
+        options = dict(self.client_kwargs)
+        options.setdefault('transport', shared_transport())
+        options['per_retry_policies'] = list(options.get('per_retry_policies', [])) + [
+            metrics_policy(family, tenant_id, subscription_id)
+        ]
+        return options
     
     def get_credential(self, tenant_id):
         """테넌트별 인증 객체 캐싱"""
+        record_cache('credential', tenant_id in self.credentials)
         if tenant_id not in self.credentials:
+            from azure.identity import InteractiveBrowserCredential
             self.credentials[tenant_id] = InteractiveBrowserCredential(
                 tenant_id=tenant_id,
-                timeout=300  # 5분 타임아웃
+                timeout=300,  # 5분 타임아웃
+                transport=shared_transport()
             )
             st.info(f"🔐 {tenant_id[:8]}... 테넌트에 대한 새로운 인증을 생성합니다.")
         return self.credentials[tenant_id]
@@ -176,44 +203,77 @@ class AzureCredentialManager:
     def get_compute_client(self, tenant_id, subscription_id):
         """Compute 클라이언트 캐싱"""
         key = f"compute_{tenant_id}_{subscription_id}"
-        if key not in self.clients:
+        record_cache('client', key in self.clients)
+        if key not in self.clients and not self._inject(key, 'compute', tenant_id, subscription_id):
+            from azure.mgmt.compute import ComputeManagementClient
             credential = self.get_credential(tenant_id)
-            self.clients[key] = ComputeManagementClient(credential, subscription_id)
+            self.clients[key] = ComputeManagementClient(
+                credential, subscription_id, **self._client_options('compute', tenant_id, subscription_id)
+            )
         return self.clients[key]
     
     def get_monitor_client(self, tenant_id, subscription_id):
         """Monitor 클라이언트 캐싱"""
         key = f"monitor_{tenant_id}_{subscription_id}"
-        if key not in self.clients:
+        record_cache('client', key in self.clients)
+        if key not in self.clients and not self._inject(key, 'monitor', tenant_id, subscription_id):
+            from azure.mgmt.monitor import MonitorManagementClient
             credential = self.get_credential(tenant_id)
-            self.clients[key] = MonitorManagementClient(credential, subscription_id)
+            self.clients[key] = MonitorManagementClient(
+                credential, subscription_id, **self._client_options('monitor', tenant_id, subscription_id)
+            )
         return self.clients[key]
     
     def get_recovery_client(self, tenant_id, subscription_id):
         """Recovery Services 클라이언트 캐싱"""
         key = f"recovery_{tenant_id}_{subscription_id}"
-        if key not in self.clients:
+        record_cache('client', key in self.clients)
+        if key not in self.clients and not self._inject(key, 'recovery', tenant_id, subscription_id):
+            from azure.mgmt.recoveryservices import RecoveryServicesClient
             credential = self.get_credential(tenant_id)
-            self.clients[key] = RecoveryServicesClient(credential, subscription_id)
+            self.clients[key] = RecoveryServicesClient(
+                credential, subscription_id, **self._client_options('recovery', tenant_id, subscription_id)
+            )
         return self.clients[key]
     
     def get_backup_client(self, tenant_id, subscription_id):
         """Backup 클라이언트 캐싱"""
         key = f"backup_{tenant_id}_{subscription_id}"
-        if key not in self.clients:
+        record_cache('client', key in self.clients)
+        if key not in self.clients and not self._inject(key, 'backup', tenant_id, subscription_id):
+            from azure.mgmt.recoveryservicesbackup import RecoveryServicesBackupClient
+            credential = self.get_credential(tenant_id)
+            self.clients[key] = RecoveryServicesBackupClient(
+                credential, subscription_id, **self._client_options('backup', tenant_id, subscription_id)
+            )
+        return self.clients[key]
+
+    def get_resource_graph_client(self, tenant_id):
+        """Resource Graph 클라이언트 캐싱 (테넌트 단위, 여러 구독을 한 번에 조회)"""
+        key = f"resourcegraph_{tenant_id}"
+        record_cache('client', key in self.clients)
+        if key not in self.clients and not self._inject(key, 'resourcegraph', tenant_id):
+            from azure.mgmt.resourcegraph import ResourceGraphClient
             credential = self.get_credential(tenant_id)
-            self.clients[key] = RecoveryServicesBackupClient(credential, subscription_id)
+            self.clients[key] = ResourceGraphClient(credential, **self._client_options('resourcegraph', tenant_id))
         return self.clients[key]
 
 # 전역 인증 관리자 인스턴스
 if 'credential_manager' not in st.session_state:
     st.session_state.credential_manager = AzureCredentialManager()
 
+# 테넌트 / 구독별 회로 차단기 (인증·권한 오류가 반복되는 계정은 백오프 동안 건너뜀)
+if 'circuit_breakers' not in st.session_state:
+    st.session_state.circuit_breakers = CircuitBreakerBoard()
+
 @st.cache_data
 def load_accounts_config():
     """계정 설정 파일 로드 (캐시됨)"""
+    yaml_errors = (yaml.YAMLError,) if yaml else ()
     try:
-        # YAML 파일 먼저 시도
+        # YAML 파일 먼저 시도 (PyYAML 미설치 시 JSON 파일로 진행)
+        if yaml is None:
+            raise FileNotFoundError("PyYAML 미설치")
         with open('../계정설정_공통.yaml', 'r', encoding='utf-8') as f:
             return yaml.safe_load(f)
     except FileNotFoundError:
@@ -223,110 +283,411 @@ def load_accounts_config():
                 return json.load(f)
         except FileNotFoundError:
             st.error("❌ 계정설정_공통.yaml 또는 계정설정_공통.json 파일을 찾을 수 없습니다.")
+            if yaml is None:
+                st.error("💡 YAML 설정을 사용하려면 `pip install -r requirements_web.txt`로 PyYAML을 설치하세요.")
         return None
-    except (json.JSONDecodeError, yaml.YAMLError) as e:
+    except (json.JSONDecodeError, *yaml_errors) as e:
         st.error(f"❌ 설정 파일 형식이 올바르지 않습니다: {e}")
         return None
 
+# 스냅샷 메트릭 스키마: 수집기는 단위가 컬럼명에 포함된 float 값(없으면 None)을 저장하고,
+# 문자열 포맷은 화면 표시 시점에만 적용합니다.
+VM_METRIC_SCHEMA = {
+    'cpu_percent': {'label': 'CPU 사용률', 'unit': '%', 'format': '%.1f%%'},
+    'available_memory_gb': {'label': '사용 가능 메모리', 'unit': 'GB', 'format': '%.1f GB'},
+    'memory_percent': {'label': '메모리 사용률', 'unit': '%', 'format': '%.1f%%'},
+    'disk_read_mb_per_min': {'label': '디스크 읽기', 'unit': 'MB/min', 'format': '%.1f MB/min'},
+}
+
+# VM 크기 사양 컬럼 (VM 크기 카탈로그에서 채움)
+VM_SIZE_FORMATS = {'vcpus': '{:.0f}', 'memory_gb': '{:g}'}
+
+# VMSS 메트릭은 인스턴스별 값(instance_metrics, VM_METRIC_SCHEMA 컬럼)의 평균과 CPU 최고 인스턴스
+VMSS_METRIC_SCHEMA = {
+    'avg_cpu_percent': {'label': 'CPU 사용률', 'unit': '%', 'format': '%.1f%%'},
+    'max_cpu_percent': {'label': '최고 CPU', 'unit': '%', 'format': '%.1f%%'},
+    'avg_available_memory_gb': {'label': '사용 가능 메모리', 'unit': 'GB', 'format': '%.1f GB'},
+    'avg_memory_percent': {'label': '메모리 사용률', 'unit': '%', 'format': '%.1f%%'},
+    'avg_disk_read_mb_per_min': {'label': '디스크 읽기', 'unit': 'MB/min', 'format': '%.1f MB/min'},
+}
+
+VMSS_HOT_CPU_PERCENT = 80.0  # 인스턴스 핫스팟 기준 CPU 사용률(%)
+
+def metric_column_config(schema, labels=None):
+    """메트릭 스키마로 st.dataframe 숫자 컬럼 설정 생성 (표시 시점 포맷)"""
+    return {
+        column: st.column_config.NumberColumn(
+            (labels or {}).get(column, spec['label']),
+            format=spec['format'],
+            help=f"단위: {spec['unit']}"
+        )
+        for column, spec in schema.items()
+    }
+
+# 세션 보관용 압축 스키마: 반복되는 문자열은 category, 시간은 int64 epoch(초, UTC)로 저장하고
+# (소요 시간도 int64 초) 표시용 문자열(시작/종료 시간, 소요 시간)은 화면에 보이는 행에 대해서만 만듭니다.
+BACKUP_JOB_CATEGORY_COLUMNS = ['account_name', 'vault_name', 'entity_name', 'operation', 'status', 'resource_group']
+BACKUP_JOB_EPOCH_COLUMNS = ['start_epoch', 'end_epoch', 'duration_seconds']
+VM_CATEGORY_COLUMNS = ['account_name', 'resource_group', 'location', 'vm_size', 'power_state',
+                       'provisioning_state', 'os_type', 'private_ip', 'metric_note']
+VMSS_CATEGORY_COLUMNS = ['account_name', 'resource_group', 'location', 'vm_size', 'upgrade_policy',
+                         'provisioning_state', 'os_type', 'metric_note']
+
+def to_compact_frame(records, category_columns=(), epoch_columns=()):
+    """수집 결과(list of dict)를 세션 보관용 압축 DataFrame으로 변환"""
+    import pandas as pd
+    
+    df = pd.DataFrame.from_records(records)
+    for column in category_columns:
+        if column in df.columns:
+            df[column] = df[column].astype('category')
+    for column in epoch_columns:
+        if column in df.columns:
+            df[column] = df[column].astype('Int64')
+    return df
+
+def epoch_to_kst_text(epoch_series, fmt='%Y-%m-%d %H:%M:%S'):
+    """epoch(초) 컬럼을 KST 표시 문자열로 변환 (없으면 'N/A')"""
+    import pandas as pd
+    
+    KST = timezone(timedelta(hours=9))
+    times = pd.to_datetime(epoch_series.astype('float64'), unit='s', utc=True).dt.tz_convert(KST)
+    return times.dt.strftime(fmt).fillna('N/A')
+
+def kst_day_epoch_range(day=None):
+    """KST 기준 하루의 [시작, 끝) epoch(초) 범위"""
+    KST = timezone(timedelta(hours=9))
+    day = day or datetime.now(KST).date()
+    day_start = datetime(day.year, day.month, day.day, tzinfo=KST)
+    return int(day_start.timestamp()), int((day_start + timedelta(days=1)).timestamp())
+
+def format_backup_jobs(df):
+    """백업 작업 표시용 컬럼(시작/종료 시간, 소요 시간) 추가"""
+    import numpy as np
+    
+    display_df = df.copy()
+    display_df['start_time'] = epoch_to_kst_text(df['start_epoch'])
+    display_df['end_time'] = epoch_to_kst_text(df['end_epoch'])
+    
+    if 'duration_seconds' in df.columns:
+        duration_seconds = df['duration_seconds'].astype('float64')
+    else:
+        duration_seconds = (df['end_epoch'] - df['start_epoch']).astype('float64')
+    valid = duration_seconds.notna() & (duration_seconds > 0)
+    seconds = duration_seconds.where(valid, 0).astype('int64')
+    hours = (seconds // 3600).astype(str)
+    minutes = ((seconds % 3600) // 60).astype(str)
+    duration_text = np.where(seconds >= 3600, hours + '시간 ' + minutes + '분', minutes + '분')
+    display_df['duration'] = np.where(valid, duration_text, 'N/A')
+    return display_df
+
+def metric_styler_formats(schema):
+    """메트릭 스키마로 Styler.format 포맷터 생성 (스타일 적용 테이블용)"""
+    return {column: (lambda value, fmt=spec['format']: fmt % value) for column, spec in schema.items()}
+
+# 계정별 수집 마감 시간(초) / API 호출 1회 제한 시간(초, 재시도 포함)
+ACCOUNT_DEADLINE_SECONDS = {'vm': 300, 'vmss': 300, 'trends': 600, 'backup': 60}
+CALL_TIMEOUT_SECONDS = 30
+
+def display_partial_accounts(partial_accounts):
+    """마감 시간 초과로 부분 결과만 수집된 계정 안내"""
+    if partial_accounts:
+        st.warning("⏰ 마감 시간 초과로 일부만 수집된 계정이 있습니다 (부분 결과): " + ", ".join(
+            f"{name} - {reason}" for name, reason in partial_accounts.items()
+        ))
+
+def record_account_failure(account_info, error):
+    """인증/권한 오류면 계정 회로 차단기에 실패 기록 (회로가 열리면 안내)"""
+    breaker = st.session_state.circuit_breakers.record_failure(
+        account_info['tenant_id'], account_info['subscription_id'], error
+    )
+    if breaker and breaker.state == 'open':
+        st.warning(f"🔌 {account_info['name']}: 인증/권한 오류가 반복되어 {breaker.label} 회로를 열었습니다. "
+                   f"{breaker.retry_in():.0f}초 동안 호출 없이 마지막 정상 데이터를 표시합니다.")
+
+def record_account_success(account_info):
+    """계정 인증/목록 조회 성공 기록 (반개방 회로는 닫힘)"""
+    st.session_state.circuit_breakers.record_success(account_info['tenant_id'], account_info['subscription_id'])
+
+def remember_last_good(session_key, account, records, since=None):
+    """계정의 마지막 정상 조회 결과 보관 (회로 차단 중 stale 데이터로 표시)
+    
+    since 를 주면 그 이후 계정 인증/목록 조회가 성공한 경우에만 보관합니다.
+    """
+    if since is not None:
+        breaker = st.session_state.circuit_breakers.get(account['tenant_id'], account['subscription_id'])
+        if breaker.last_success_at < since:
+            return
+    st.session_state.setdefault('last_good', {})[(session_key, account['name'])] = {
+        'records': records,
+        'saved_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    }
+
+def last_good_records(session_key, account_name):
+    """보관된 마지막 정상 조회 결과 (없으면 빈 목록)"""
+    return st.session_state.get('last_good', {}).get((session_key, account_name), {}).get('records', [])
+
+def use_last_good(breaker, account, session_key, stale_accounts, progress_bar, status_text):
+    """회로가 열린 계정은 호출 없이 마지막 정상 데이터를 재사용"""
+    records = last_good_records(session_key, account['name'])
+    saved_at = st.session_state.get('last_good', {}).get((session_key, account['name']), {}).get('saved_at', 'N/A')
+    stale_accounts[account['name']] = (
+        f"{breaker.label} 회로 차단 중, {saved_at} 기준 데이터 {len(records)}개 "
+        f"({breaker.retry_in():.0f}초 후 재시도) - {breaker.last_error}"
+    )
+    progress_bar.progress(1.0)
+    status_text.text(f"🔌 {account['name']}: 회로 차단 중 - 마지막 정상 데이터 사용")
+    return records
+
+def display_stale_accounts(stale_accounts):
+    """회로 차단으로 건너뛰고 마지막 정상 데이터를 표시한 계정 안내"""
+    if stale_accounts:
+        st.warning("🔌 회로 차단 중인 계정은 마지막 정상 데이터(stale)를 표시합니다: " + ", ".join(
+            f"{name} - {note}" for name, note in stale_accounts.items()
+        ))
+
+def interval_to_minutes(interval):
+    """ISO 8601 수집 간격('PT1M', 'PT15M', 'PT1H', 'PT6H') → 분"""
+    import re
+    
+    match = re.fullmatch(r'PT(?:(\d+)H)?(?:(\d+)M)?', interval or '')
+    if not match or not any(match.groups()):
+        return 1
+    return int(match.group(1) or 0) * 60 + int(match.group(2) or 0)
+
+def add_trend_to_sketches(sketch_store, vm, vm_id, metric, points, weight):
+    """추이 포인트를 분위수 스케치 저장소에 반영 (계정 / 리전 / VM 크기 차원, 저장소가 없으면 건너뜀)"""
+    if not points or sketch_store is None:
+        return
+    sketch_store.add(
+        vm_id,
+        {'account': vm['account_name'], 'region': normalize_region(vm['location']), 'vm_size': vm['vm_size']},
+        metric,
+        [int(point['timestamp'].timestamp()) for point in points],
+        [point['value'] for point in points],
+        weight=weight
+    )
+
+# 메트릭 이력에 저장하는 추이 (디스크 읽기는 수집 간격의 합계라 분당 값으로 나눠 저장)
+HISTORY_TREND_KEYS = {'cpu': 'cpu_trend', 'memory': 'memory_trend', 'disk': 'disk_trend'}
+
+def metric_history_store(config=None):
+    """로컬 메트릭 이력 저장소 (설정 파일의 metric_history.directory / horizon_hours 로 변경 가능)"""
+    from metric_history import DEFAULT_HISTORY_DIR, MetricHistory
+    
+    settings = (config or {}).get('metric_history') or {}
+    horizons = {tier: float(hours) * 3600 for tier, hours in (settings.get('horizon_hours') or {}).items()}
+    return MetricHistory(settings.get('directory', DEFAULT_HISTORY_DIR), horizons)
+
+def add_trend_to_history(history, vm_id, metric, points, interval_minutes, fetch_span):
+    """추이 포인트를 메트릭 이력에 반영 (포인트가 없어도 수집한 범위는 기록, 저장소가 없으면 건너뜀)"""
+    if history is None:
+        return
+    scale = interval_minutes if metric == 'disk' else 1
+    history.add(
+        vm_id,
+        metric,
+        [int(point['timestamp'].timestamp()) for point in points],
+        [point['value'] / scale for point in points],
+        interval_minutes * 60,
+        fetch_span
+    )
+
+def trends_from_history(history, account_info, vm_list, interval, hours):
+    """저장된 메트릭 이력으로 VM 추이 구성 (기간 전체가 이력에 있는 VM만)
+    
+    이력 저장소가 기간과 수집 간격을 만족하는 가장 거친 단계(원본 / 5분 / 1시간)를 골라 답합니다.
+    
+    Returns:
+        (vm_trends, 이력으로 답할 수 없어 Azure에서 조회할 VM 목록, {VM 이름: 사용한 단계})
+    """
+    interval_minutes = interval_to_minutes(interval)
+    end = int(time.time())
+    vm_ids = {
+        vm['vm_name']: f"/subscriptions/{account_info['subscription_id']}/resourceGroups/{vm['resource_group']}/providers/Microsoft.Compute/virtualMachines/{vm['vm_name']}"
+        for vm in vm_list
+    }
+    results = history.query(
+        [(vm_id, metric) for vm_id in vm_ids.values() for metric in HISTORY_TREND_KEYS],
+        end - hours * 3600, end, interval_minutes * 60
+    )
+    
+    vm_trends = {}
+    remaining = []
+    tiers = {}
+    for vm in vm_list:
+        vm_results = {metric: results[(vm_ids[vm['vm_name']], metric)] for metric in HISTORY_TREND_KEYS}
+        if any(result is None for result in vm_results.values()):
+            remaining.append(vm)
+            continue
+        
+        vm_trend = {'account_name': vm['account_name'], 'resource_group': vm['resource_group']}
+        for metric, (series, tier) in vm_results.items():
+            scale = interval_minutes if metric == 'disk' else 1
+            vm_trend[HISTORY_TREND_KEYS[metric]] = [
+                {'timestamp': datetime.fromtimestamp(epoch, timezone.utc), 'value': value * scale}
+                for epoch, value in zip(series['t'].tolist(), series['mean'].tolist())
+            ]
+        vm_trends[vm['vm_name']] = vm_trend
+        tiers[vm['vm_name']] = tier
+    return vm_trends, remaining, tiers
+
 # Azure VM 모니터링 함수들
-def get_vm_24h_metrics(account_info, vm_list, progress_bar, status_text, interval="PT1M", hours=24):
-    """VM의 메트릭 추이 데이터 수집"""
+@timed_collection('get_vm_24h_metrics')
+def get_vm_24h_metrics(account_info, vm_list, progress_bar, status_text, interval="PT1M", hours=24,
+                       sketch_store=None, history=None, deadline=None):
+    """VM의 메트릭 추이 데이터 수집
+    
+    sketch_store(분위수 스케치) / history(로컬 메트릭 이력)를 넘긴 경우에만 수집한 포인트를 디스크에 저장합니다.
+    대시보드의 추이 수집 버튼만 저장소를 넘기고, 벤치마크 등 다른 호출은 아무것도 저장하지 않습니다.
+    
+    마감 시간이 지나면 그때까지 수집한 VM의 추이만 저장/반환하고 deadline.partial 로 알립니다.
+    """
+    deadline = deadline or Deadline(ACCOUNT_DEADLINE_SECONDS['trends'], CALL_TIMEOUT_SECONDS)
     try:
-        monitor_client = st.session_state.credential_manager.get_monitor_client(
-            account_info['tenant_id'], 
-            account_info['subscription_id']
-        )
+        with span('monitor client', 'auth'):
+            monitor_client = st.session_state.credential_manager.get_monitor_client(
+                account_info['tenant_id'], 
+                account_info['subscription_id']
+            )
         
         # 지정된 시간 전부터 현재까지
         end_time = datetime.utcnow()
         start_time = end_time - timedelta(hours=hours)
         
+        # 메모리 사용률 변환용 VM 크기 카탈로그 (리전당 1회 조회, 디스크 캐시)
+        compute_client = st.session_state.credential_manager.get_compute_client(
+            account_info['tenant_id'],
+            account_info['subscription_id']
+        )
+        
         vm_trends = {}
+        unknown_sizes = []  # 카탈로그에 크기가 없어 메모리 사용률을 계산하지 못한 VM
+        
+        # 분위수 스케치 포인트 가중치 = 수집 간격(분)
+        interval_minutes = interval_to_minutes(interval)
+        
+        # 로컬 메트릭 이력에는 수집 범위와 간격도 기록해 다음 추이 조회를 이력에서 답함
+        fetch_span = (int(start_time.replace(tzinfo=timezone.utc).timestamp()),
+                      int(end_time.replace(tzinfo=timezone.utc).timestamp()))
         
         for idx, vm in enumerate(vm_list):
             if vm['power_state'] != 'VM running':
                 continue
                 
             try:
-                progress = idx / len(vm_list) 
-                progress_bar.progress(progress)
-                status_text.text(f"📈 VM '{vm['vm_name']}' {hours}시간 추이 수집 중... ({idx+1}/{len(vm_list)})")
-                
-                vm_id = f"/subscriptions/{account_info['subscription_id']}/resourceGroups/{vm['resource_group']}/providers/Microsoft.Compute/virtualMachines/{vm['vm_name']}"
-                
-                # CPU 메트릭
-                cpu_metrics = monitor_client.metrics.list(
-                    resource_uri=vm_id,
-                    timespan=f"{start_time.isoformat()}/{end_time.isoformat()}",
-                    interval=interval,
-                    metricnames='Percentage CPU',
-                    aggregation='Average'
-                )
-                
-                cpu_data = []
-                if cpu_metrics.value and cpu_metrics.value[0].timeseries:
-                    for data_point in cpu_metrics.value[0].timeseries[0].data:
-                        if data_point.average is not None:
-                            cpu_data.append({
-                                'timestamp': data_point.time_stamp,
-                                'value': data_point.average
-                            })
-                
-                # 디스크 읽기 메트릭
-                disk_metrics = monitor_client.metrics.list(
-                    resource_uri=vm_id,
-                    timespan=f"{start_time.isoformat()}/{end_time.isoformat()}",
-                    interval=interval,
-                    metricnames='Disk Read Bytes',
-                    aggregation='Total'
-                )
-                
-                disk_data = []
-                if disk_metrics.value and disk_metrics.value[0].timeseries:
-                    for data_point in disk_metrics.value[0].timeseries[0].data:
-                        if data_point.total is not None:
-                            disk_data.append({
-                                'timestamp': data_point.time_stamp,
-                                'value': data_point.total / (1024**2)  # MB로 변환
-                            })
-                
-                # 메모리 메트릭
-                memory_metrics = monitor_client.metrics.list(
-                    resource_uri=vm_id,
-                    timespan=f"{start_time.isoformat()}/{end_time.isoformat()}",
-                    interval=interval,
-                    metricnames='Available Memory Bytes',
-                    aggregation='Average'
-                )
-                
-                memory_data = []
-                if memory_metrics.value and memory_metrics.value[0].timeseries:
-                    for data_point in memory_metrics.value[0].timeseries[0].data:
-                        if data_point.average is not None:
-                            # 사용 가능한 메모리를 사용률로 변환 (가정: 총 메모리 8GB = 8589934592 bytes)
-                            # 실제로는 VM 크기에 따라 다르지만 일단 8GB로 가정
-                            total_memory_gb = 8  # GB 단위
-                            total_memory_bytes = total_memory_gb * 1024**3
-                            used_memory_percent = ((total_memory_bytes - data_point.average) / total_memory_bytes) * 100
-                            memory_data.append({
-                                'timestamp': data_point.time_stamp,
-                                'value': max(0, min(100, used_memory_percent))  # 0-100% 범위 보장
-                            })
-                
-                vm_trends[vm['vm_name']] = {
-                    'cpu_trend': cpu_data,
-                    'disk_trend': disk_data,
-                    'memory_trend': memory_data,
-                    'account_name': vm['account_name'],
-                    'resource_group': vm['resource_group']
-                }
-                
-                time.sleep(0.2)  # API 레이트 리미트 방지
+                deadline.check(f"VM '{vm['vm_name']}' ({idx+1}/{len(vm_list)})")
+                with span(f"vm {vm['vm_name']}", 'metrics', resource_group=vm['resource_group']):
+                    progress = idx / len(vm_list) 
+                    progress_bar.progress(progress)
+                    status_text.text(f"📈 VM '{vm['vm_name']}' {hours}시간 추이 수집 중... ({idx+1}/{len(vm_list)})")
+                    
+                    vm_id = f"/subscriptions/{account_info['subscription_id']}/resourceGroups/{vm['resource_group']}/providers/Microsoft.Compute/virtualMachines/{vm['vm_name']}"
+                    
+                    # CPU 메트릭
+                    cpu_metrics = monitor_client.metrics.list(
+                        resource_uri=vm_id,
+                        timespan=f"{start_time.isoformat()}/{end_time.isoformat()}",
+                        interval=interval,
+                        metricnames='Percentage CPU',
+                        aggregation='Average',
+                        **deadline.call_options()
+                    )
+                    
+                    cpu_data = []
+                    if cpu_metrics.value and cpu_metrics.value[0].timeseries:
+                        for data_point in cpu_metrics.value[0].timeseries[0].data:
+                            if data_point.average is not None:
+                                cpu_data.append({
+                                    'timestamp': data_point.time_stamp,
+                                    'value': data_point.average
+                                })
+                    
+                    # 디스크 읽기 메트릭
+                    disk_metrics = monitor_client.metrics.list(
+                        resource_uri=vm_id,
+                        timespan=f"{start_time.isoformat()}/{end_time.isoformat()}",
+                        interval=interval,
+                        metricnames='Disk Read Bytes',
+                        aggregation='Total',
+                        **deadline.call_options()
+                    )
+                    
+                    disk_data = []
+                    if disk_metrics.value and disk_metrics.value[0].timeseries:
+                        for data_point in disk_metrics.value[0].timeseries[0].data:
+                            if data_point.total is not None:
+                                disk_data.append({
+                                    'timestamp': data_point.time_stamp,
+                                    'value': data_point.total / (1024**2)  # MB로 변환
+                                })
+                    
+                    # 메모리 메트릭 (사용률로 변환할 VM 크기를 먼저 찾고, 크기를 모르면 조회하지 않음)
+                    memory_data = []
+                    size_spec = vm_size_spec(compute_client, vm['location'], vm['vm_size'],
+                                             call_options=deadline.call_options('VM 크기 카탈로그'))
+                    if not size_spec:
+                        unknown_sizes.append(f"{vm['vm_name']} ({vm['vm_size']})")
+                        memory_metrics = None
+                    else:
+                        memory_metrics = monitor_client.metrics.list(
+                            resource_uri=vm_id,
+                            timespan=f"{start_time.isoformat()}/{end_time.isoformat()}",
+                            interval=interval,
+                            metricnames='Available Memory Bytes',
+                            aggregation='Average',
+                            **deadline.call_options()
+                        )
+                    if memory_metrics and memory_metrics.value and memory_metrics.value[0].timeseries:
+                        for data_point in memory_metrics.value[0].timeseries[0].data:
+                            if data_point.average is not None:
+                                # 사용 가능한 메모리를 VM 크기의 실제 메모리 기준 사용률로 변환
+                                memory_data.append({
+                                    'timestamp': data_point.time_stamp,
+                                    'value': memory_used_percent(data_point.average, size_spec['memory_gb'])
+                                })
+                    
+                    add_trend_to_sketches(sketch_store, vm, vm_id, 'cpu', cpu_data, interval_minutes)
+                    add_trend_to_sketches(sketch_store, vm, vm_id, 'memory', memory_data, interval_minutes)
+                    
+                    add_trend_to_history(history, vm_id, 'cpu', cpu_data, interval_minutes, fetch_span)
+                    add_trend_to_history(history, vm_id, 'disk', disk_data, interval_minutes, fetch_span)
+                    if size_spec:
+                        # 크기를 모르는 VM은 메모리 사용률이 비어 있으므로 수집 범위로 기록하지 않음
+                        add_trend_to_history(history, vm_id, 'memory', memory_data, interval_minutes, fetch_span)
+                    
+                    vm_trends[vm['vm_name']] = {
+                        'cpu_trend': cpu_data,
+                        'disk_trend': disk_data,
+                        'memory_trend': memory_data,
+                        'account_name': vm['account_name'],
+                        'resource_group': vm['resource_group']
+                    }
+                    
+                    time.sleep(0.2)  # API 레이트 리미트 방지
                 
+            except DeadlineExceeded:
+                # 수집을 마친 VM까지만 저장소에 반영하고 부분 결과로 반환
+                break
             except Exception as vm_error:
                 st.warning(f"⚠️ VM '{vm['vm_name']}' {hours}시간 메트릭 수집 실패: {str(vm_error)[:100]}...")
                 continue
         
+        if deadline.partial:
+            st.warning(f"⏰ {account_info['name']}: {deadline.reason} - {len(vm_trends)}개 VM 추이까지 부분 결과로 반환")
+        if unknown_sizes:
+            st.warning(f"⚠️ VM 크기 정보를 찾지 못해 메모리 사용률을 계산하지 않은 VM: {', '.join(unknown_sizes[:10])}")
+        
+        if sketch_store is not None:
+            # 보존 기간이 지난 1시간 구간은 하루 파일로 합치고 오래된 하루 파일 삭제
+            sketch_store.flush()
+            sketch_store.compact()
+        if history is not None:
+            # 원본 포인트 저장 후 완료된 구간을 5분 / 1시간 단계로 압축하고 보존 기간이 지난 파일 삭제
+            with span('metric history', 'store'):
+                history.flush()
+                history.compact()
+        
         progress_bar.progress(1.0)
         status_text.text(f"✅ {hours}시간 추이 데이터 수집 완료!")
         return vm_trends
@@ -335,143 +696,159 @@ def get_vm_24h_metrics(account_info, vm_list, progress_bar, status_text, interva
         st.error(f"🚨 메트릭 수집 오류: {str(e)}")
         return {}
 
-def get_azure_vms(account_info, progress_bar, status_text, collect_metrics=True):
-    """Azure VM 목록, 상태 및 메트릭 조회"""
+def sdk_enum_value(value):
+    """SDK 열거형(str Enum)의 실제 값 ('Standard_D2s_v3', 'Windows')
+    
+    Python 3.11 부터 str() 은 'OperatingSystemTypes.WINDOWS' 형식을 돌려주므로 value 를 사용합니다.
+    """
+    return str(getattr(value, 'value', value))
+
+def apply_vm_size(vm_info, compute_client, call_options=None):
+    """VM 크기 카탈로그에서 메모리(GB) / vCPU 수를 찾아 vm_info 에 기록 (없으면 None)"""
+    spec = vm_size_spec(compute_client, vm_info['location'], vm_info['vm_size'], call_options=call_options)
+    vm_info['vcpus'] = spec['vcpus'] if spec else None
+    vm_info['memory_gb'] = spec['memory_gb'] if spec else None
+    return vm_info
+
+def collect_vm_snapshot_metrics(monitor_client, vm_id, vm_info, call_options=None):
+    """실행 중인 VM의 최근 CPU/메모리/디스크 스냅샷 메트릭을 vm_info 에 기록
+    
+    call_options: 호출마다 넘길 Azure SDK 옵션 (예: Deadline.call_options() 의 timeout)
+    memory_gb(VM 크기 카탈로그)가 있으면 사용 가능 메모리를 사용률(%)로도 변환합니다.
+    메트릭 3종을 한 번에 조회하고 최근 5분 집계 값을 사용합니다 (collector_snapshot, 리소스별 5분 캐시).
+    """
+    metric_notes = []
+    metric_names = ['Percentage CPU', 'Disk Read Bytes']
+    # 사용 가능한 메모리 (Windows VM만)
+    is_windows = vm_info['os_type'].lower() == 'windows'
+    if is_windows:
+        metric_names.append('Available Memory Bytes')
+    else:
+        metric_notes.append('Linux 메모리 메트릭 제한')
+    
+    try:
+        values = latest_metric_values(monitor_client, vm_id, metric_names, call_options)
+    except Exception as metric_error:
+        metric_notes.append('메트릭 조회 오류')
+        values = {}
+    
+    if values.get('Percentage CPU') is not None:
+        vm_info['cpu_percent'] = values['Percentage CPU']
+    
+    available_bytes = values.get('Available Memory Bytes')
+    if available_bytes is not None:
+        vm_info['available_memory_gb'] = available_bytes / (1024**3)
+        if vm_info.get('memory_gb'):
+            vm_info['memory_percent'] = memory_used_percent(available_bytes, vm_info['memory_gb'])
+    
+    # 디스크 읽기 (Average = 분당 읽은 바이트 평균)
+    if values.get('Disk Read Bytes') is not None:
+        vm_info['disk_read_mb_per_min'] = values['Disk Read Bytes'] / (1024**2)
+    
+    vm_info['metric_note'] = ', '.join(metric_notes)
+    return vm_info
+
+@timed_collection('get_azure_vms')
+def get_azure_vms(account_info, progress_bar, status_text, collect_metrics=True, deadline=None):
+    """Azure VM 목록, 상태 및 메트릭 조회
+    
+    마감 시간이 지나면 그때까지 조회한 VM을 반환하고 deadline.partial 로 알립니다.
+    """
+    from azure.core.exceptions import AzureError
+    
+    deadline = deadline or Deadline(ACCOUNT_DEADLINE_SECONDS['vm'], CALL_TIMEOUT_SECONDS)
+    vms = []
+    
     try:
         status_text.text(f"🔐 {account_info['name']} Azure 인증 중...")
         progress_bar.progress(0.1)
         
         # Azure 클라이언트 생성 (캐시된 인증 사용)
-        compute_client = st.session_state.credential_manager.get_compute_client(
-            account_info['tenant_id'], 
-            account_info['subscription_id']
-        )
-        monitor_client = st.session_state.credential_manager.get_monitor_client(
-            account_info['tenant_id'], 
-            account_info['subscription_id']
-        ) if collect_metrics else None
+        with span('compute/monitor client', 'auth'):
+            compute_client = st.session_state.credential_manager.get_compute_client(
+                account_info['tenant_id'], 
+                account_info['subscription_id']
+            )
+            monitor_client = st.session_state.credential_manager.get_monitor_client(
+                account_info['tenant_id'], 
+                account_info['subscription_id']
+            ) if collect_metrics else None
         
         status_text.text(f"🖥️ {account_info['name']} VM 목록 조회 중...")
         progress_bar.progress(0.2)
         
         # VM 목록 조회
-        vm_list = list(compute_client.virtual_machines.list_all())
-        vms = []
+        with span('virtual_machines.list_all', 'list'):
+            vm_list = list(compute_client.virtual_machines.list_all(**deadline.call_options('VM 목록')))
+        record_account_success(account_info)
         KST = timezone(timedelta(hours=9))
         
         for idx, vm in enumerate(vm_list):
+            deadline.check(f"VM '{vm.name}' ({idx+1}/{len(vm_list)})")
             try:
-                # 진행률 업데이트
-                vm_progress = 0.2 + (0.6 * idx / len(vm_list))  # 20%에서 80%까지
-                progress_bar.progress(vm_progress)
-                status_text.text(f"🔍 VM '{vm.name}' 정보 수집 중... ({idx+1}/{len(vm_list)})")
-                
-                # VM 상세 정보 조회
-                vm_detail = compute_client.virtual_machines.get(
-                    vm.id.split('/')[4],  # resource_group
-                    vm.name,
-                    expand='instanceView'
-                )
-                
-                # VM 상태 추출
-                power_state = 'Unknown'
-                provisioning_state = 'Unknown'
-                
-                if vm_detail.instance_view and vm_detail.instance_view.statuses:
-                    for status in vm_detail.instance_view.statuses:
-                        if status.code.startswith('PowerState/'):
-                            power_state = status.display_status
-                        elif status.code.startswith('ProvisioningState/'):
-                            provisioning_state = status.display_status
-                
-                vm_info = {
-                    'account_name': account_info['name'],
-                    'vm_name': vm.name,
-                    'resource_group': vm.id.split('/')[4],
-                    'location': vm.location,
-                    'vm_size': vm_detail.hardware_profile.vm_size if vm_detail.hardware_profile else 'N/A',
-                    'power_state': power_state,
-                    'provisioning_state': provisioning_state,
-                    'private_ip': 'N/A',  # 간소화
-                    'os_type': str(vm_detail.storage_profile.os_disk.os_type) if vm_detail.storage_profile and vm_detail.storage_profile.os_disk and vm_detail.storage_profile.os_disk.os_type else 'N/A',
-                    'cpu_usage': 'N/A',
-                    'memory_usage': 'N/A',
-                    'disk_usage': 'N/A'
-                }
-                
-                # 메트릭 수집 (실행 중인 VM만)
-                if collect_metrics and monitor_client and power_state == 'VM running':
-                    try:
-                        status_text.text(f"📊 VM '{vm.name}' 메트릭 수집 중...")
-                        
-                        # 최근 5분간 메트릭 조회
-                        end_time = datetime.utcnow()
-                        start_time = end_time - timedelta(minutes=5)
-                        
-                        # CPU 사용률
+                with span(f"vm {vm.name}", 'resource'):
+                    # 진행률 업데이트
+                    vm_progress = 0.2 + (0.6 * idx / len(vm_list))  # 20%에서 80%까지
+                    progress_bar.progress(vm_progress)
+                    status_text.text(f"🔍 VM '{vm.name}' 정보 수집 중... ({idx+1}/{len(vm_list)})")
+                    
+                    # VM 상세 정보 조회
+                    with span('virtual_machines.get (instanceView)', 'detail'):
+                        vm_detail = compute_client.virtual_machines.get(
+                            vm.id.split('/')[4],  # resource_group
+                            vm.name,
+                            expand='instanceView',
+                            **deadline.call_options()
+                        )
+                    
+                    # VM 상태 추출
+                    power_state = 'Unknown'
+                    provisioning_state = 'Unknown'
+                    
+                    if vm_detail.instance_view and vm_detail.instance_view.statuses:
+                        for status in vm_detail.instance_view.statuses:
+                            if status.code.startswith('PowerState/'):
+                                power_state = status.display_status
+                            elif status.code.startswith('ProvisioningState/'):
+                                provisioning_state = status.display_status
+                    
+                    vm_info = {
+                        'account_name': account_info['name'],
+                        'vm_name': vm.name,
+                        'resource_group': vm.id.split('/')[4],
+                        'location': vm.location,
+                        'vm_size': sdk_enum_value(vm_detail.hardware_profile.vm_size) if vm_detail.hardware_profile else 'N/A',
+                        'power_state': power_state,
+                        'provisioning_state': provisioning_state,
+                        'private_ip': 'N/A',  # 간소화
+                        'os_type': sdk_enum_value(vm_detail.storage_profile.os_disk.os_type) if vm_detail.storage_profile and vm_detail.storage_profile.os_disk and vm_detail.storage_profile.os_disk.os_type else 'N/A',
+                        'vcpus': None,
+                        'memory_gb': None,
+                        'cpu_percent': None,
+                        'available_memory_gb': None,
+                        'memory_percent': None,
+                        'disk_read_mb_per_min': None,
+                        'metric_note': ''
+                    }
+                    apply_vm_size(vm_info, compute_client, deadline.call_options('VM 크기 카탈로그'))
+                    
+                    # 메트릭 수집 (실행 중인 VM만)
+                    if collect_metrics and monitor_client and power_state == 'VM running':
                         try:
-                            cpu_metrics = monitor_client.metrics.list(
-                                resource_uri=vm.id,
-                                timespan=f"{start_time.isoformat()}/{end_time.isoformat()}",
-                                interval='PT1M',
-                                metricnames='Percentage CPU',
-                                aggregation='Average'
-                            )
+                            status_text.text(f"📊 VM '{vm.name}' 메트릭 수집 중...")
                             
-                            if cpu_metrics.value and cpu_metrics.value[0].timeseries:
-                                cpu_data = cpu_metrics.value[0].timeseries[0].data
-                                if cpu_data:
-                                    vm_info['cpu_usage'] = f"{cpu_data[-1].average:.1f}%" if cpu_data[-1].average else 'N/A'
-                        except Exception as cpu_error:
-                            vm_info['cpu_usage'] = 'Error'
-                        
-                        # 사용 가능한 메모리 (Windows VM만)
-                        try:
-                            if vm_info['os_type'].lower() == 'windows':
-                                memory_metrics = monitor_client.metrics.list(
-                                    resource_uri=vm.id,
-                                    timespan=f"{start_time.isoformat()}/{end_time.isoformat()}",
-                                    interval='PT1M',
-                                    metricnames='Available Memory Bytes',
-                                    aggregation='Average'
-                                )
-                                
-                                if memory_metrics.value and memory_metrics.value[0].timeseries:
-                                    memory_data = memory_metrics.value[0].timeseries[0].data
-                                    if memory_data and memory_data[-1].average:
-                                        available_gb = memory_data[-1].average / (1024**3)
-                                        vm_info['memory_usage'] = f"{available_gb:.1f}GB 사용 가능"
-                            else:
-                                vm_info['memory_usage'] = 'Linux 메트릭 제한'
-                        except Exception as memory_error:
-                            vm_info['memory_usage'] = 'Error'
-                        
-                        # 디스크 읽기/쓰기 
-                        try:
-                            disk_read_metrics = monitor_client.metrics.list(
-                                resource_uri=vm.id,
-                                timespan=f"{start_time.isoformat()}/{end_time.isoformat()}",
-                                interval='PT1M',
-                                metricnames='Disk Read Bytes',
-                                aggregation='Total'
-                            )
+                            with span('snapshot metrics', 'metrics'):
+                                collect_vm_snapshot_metrics(monitor_client, vm.id, vm_info, deadline.call_options())
+                            time.sleep(0.1)  # API 호출 간격 조절
                             
-                            if disk_read_metrics.value and disk_read_metrics.value[0].timeseries:
-                                disk_data = disk_read_metrics.value[0].timeseries[0].data
-                                if disk_data and disk_data[-1].total:
-                                    disk_mb = disk_data[-1].total / (1024**2)
-                                    vm_info['disk_usage'] = f"{disk_mb:.1f}MB/min 읽기"
-                        except Exception as disk_error:
-                            vm_info['disk_usage'] = 'Error'
-                        
-                        time.sleep(0.1)  # API 호출 간격 조절
-                        
-                    except Exception as metric_error:
-                        st.warning(f"⚠️ VM '{vm.name}' 메트릭 수집 실패: {str(metric_error)[:100]}...")
-                        # 메트릭 수집 실패 시 기본값 유지
-                
-                vms.append(vm_info)
+                        except Exception as metric_error:
+                            st.warning(f"⚠️ VM '{vm.name}' 메트릭 수집 실패: {str(metric_error)[:100]}...")
+                            # 메트릭 수집 실패 시 기본값 유지
+                    
+                    vms.append(vm_info)
                 
+            except DeadlineExceeded:
+                raise
             except Exception as vm_error:
                 st.warning(f"⚠️ VM '{vm.name}' 정보 조회 실패: {str(vm_error)[:100]}...")
                 continue
@@ -480,8 +857,14 @@ def get_azure_vms(account_info, progress_bar, status_text, collect_metrics=True)
         metrics_note = " (메트릭 포함)" if collect_metrics else " (기본 정보만)"
         status_text.text(f"✅ {account_info['name']}: {len(vms)}개 Azure VM 조회 완료{metrics_note}")
         return vms
+    
+    except DeadlineExceeded:
+        progress_bar.progress(1.0)
+        status_text.text(f"⏰ {account_info['name']}: {deadline.reason} - {len(vms)}개 VM까지 부분 결과로 반환")
+        return vms
         
     except AzureError as e:
+        record_account_failure(account_info, e)
         error_msg = str(e)
         st.error(f"🚨 {account_info['name']} Azure VM 조회 오류")
         st.error(f"📋 오류 내용: {error_msg}")
@@ -498,120 +881,180 @@ def get_azure_vms(account_info, progress_bar, status_text, collect_metrics=True)
         st.error(f"🚨 {account_info['name']} 예상치 못한 오류 - {str(e)}")
         return []
 
-def get_azure_vmss(account_info, progress_bar, status_text, collect_metrics=True):
-    """Azure VMSS 목록, 상태 및 메트릭 조회"""
+def collect_vmss_snapshot_metrics(monitor_client, vmss_id, vmss_info, call_options=None):
+    """VMSS 인스턴스별 최근 스냅샷 메트릭을 vmss_info 에 기록
+    
+    VMSS 리소스에 VMName 차원 분할 조회 1회로 모든 인스턴스의 CPU/메모리/디스크를 받습니다
+    (인스턴스마다 호출하지 않음, collector_snapshot 리소스별 5분 캐시).
+    인스턴스별 값은 instance_metrics 에, 인스턴스 평균과 CPU 최고 인스턴스는 VMSS 컬럼에 기록합니다.
+    """
+    metric_notes = []
+    metric_names = ['Percentage CPU', 'Disk Read Bytes']
+    # 사용 가능한 메모리 (Windows만)
+    if vmss_info['os_type'].lower() == 'windows':
+        metric_names.append('Available Memory Bytes')
+    else:
+        metric_notes.append('Linux 메모리 메트릭 제한')
+    
+    try:
+        by_instance = latest_metric_values_by_dimension(monitor_client, vmss_id, metric_names, 'VMName', call_options)
+    except Exception as metric_error:
+        metric_notes.append('메트릭 조회 오류')
+        by_instance = {}
+    
+    instance_metrics = []
+    for instance_name, values in sorted(by_instance.items()):
+        instance = {
+            'instance_name': instance_name,
+            'cpu_percent': values.get('Percentage CPU'),
+            'available_memory_gb': None,
+            'memory_percent': None,
+            'disk_read_mb_per_min': None
+        }
+        available_bytes = values.get('Available Memory Bytes')
+        if available_bytes is not None:
+            instance['available_memory_gb'] = available_bytes / (1024**3)
+            if vmss_info.get('memory_gb'):
+                instance['memory_percent'] = memory_used_percent(available_bytes, vmss_info['memory_gb'])
+        # 디스크 읽기 (Average = 분당 읽은 바이트 평균)
+        if values.get('Disk Read Bytes') is not None:
+            instance['disk_read_mb_per_min'] = values['Disk Read Bytes'] / (1024**2)
+        instance_metrics.append(instance)
+    
+    def instance_mean(column):
+        present = [instance[column] for instance in instance_metrics if instance[column] is not None]
+        return sum(present) / len(present) if present else None
+    
+    vmss_info['instance_metrics'] = instance_metrics
+    vmss_info['avg_cpu_percent'] = instance_mean('cpu_percent')
+    vmss_info['avg_available_memory_gb'] = instance_mean('available_memory_gb')
+    vmss_info['avg_memory_percent'] = instance_mean('memory_percent')
+    vmss_info['avg_disk_read_mb_per_min'] = instance_mean('disk_read_mb_per_min')
+    
+    cpu_instances = [instance for instance in instance_metrics if instance['cpu_percent'] is not None]
+    if cpu_instances:
+        hottest = max(cpu_instances, key=lambda instance: instance['cpu_percent'])
+        vmss_info['max_cpu_percent'] = hottest['cpu_percent']
+        vmss_info['hottest_instance'] = hottest['instance_name']
+    
+    vmss_info['metric_note'] = ', '.join(metric_notes)
+    return vmss_info
+
+@timed_collection('get_azure_vmss')
+def get_azure_vmss(account_info, progress_bar, status_text, collect_metrics=True, deadline=None):
+    """Azure VMSS 목록, 상태 및 메트릭 조회
+    
+    마감 시간이 지나면 그때까지 조회한 VMSS를 반환하고 deadline.partial 로 알립니다.
+    """
+    from azure.core.exceptions import AzureError
+    
+    deadline = deadline or Deadline(ACCOUNT_DEADLINE_SECONDS['vmss'], CALL_TIMEOUT_SECONDS)
+    vmss_data = []
+    
     try:
         status_text.text(f"🔐 {account_info['name']} VMSS Azure 인증 중...")
         progress_bar.progress(0.1)
         
         # Azure 클라이언트 생성 (캐시된 인증 사용)
-        compute_client = st.session_state.credential_manager.get_compute_client(
-            account_info['tenant_id'], 
-            account_info['subscription_id']
-        )
-        monitor_client = st.session_state.credential_manager.get_monitor_client(
-            account_info['tenant_id'], 
-            account_info['subscription_id']
-        ) if collect_metrics else None
+        with span('compute/monitor client', 'auth'):
+            compute_client = st.session_state.credential_manager.get_compute_client(
+                account_info['tenant_id'], 
+                account_info['subscription_id']
+            )
+            monitor_client = st.session_state.credential_manager.get_monitor_client(
+                account_info['tenant_id'], 
+                account_info['subscription_id']
+            ) if collect_metrics else None
         
         status_text.text(f"⚖️ {account_info['name']} VMSS 목록 조회 중...")
         progress_bar.progress(0.2)
         
         # VMSS 목록 조회
-        vmss_list = list(compute_client.virtual_machine_scale_sets.list_all())
-        vmss_data = []
+        with span('virtual_machine_scale_sets.list_all', 'list'):
+            vmss_list = list(compute_client.virtual_machine_scale_sets.list_all(**deadline.call_options('VMSS 목록')))
+        record_account_success(account_info)
         KST = timezone(timedelta(hours=9))
         
         for idx, vmss in enumerate(vmss_list):
+            deadline.check(f"VMSS '{vmss.name}' ({idx+1}/{len(vmss_list)})")
             try:
-                # 진행률 업데이트
-                vmss_progress = 0.2 + (0.6 * idx / len(vmss_list)) if vmss_list else 1.0
-                progress_bar.progress(vmss_progress)
-                status_text.text(f"🔍 VMSS '{vmss.name}' 정보 수집 중... ({idx+1}/{len(vmss_list)})")
-                
-                # VMSS 상세 정보 조회
-                resource_group = vmss.id.split('/')[4]
-                vmss_detail = compute_client.virtual_machine_scale_sets.get(resource_group, vmss.name)
-                
-                # VMSS 인스턴스 목록 조회
-                instances = list(compute_client.virtual_machine_scale_set_vms.list(resource_group, vmss.name))
-                
-                # 인스턴스 상태 집계
-                instance_states = {}
-                running_instances = 0
-                total_instances = len(instances)
-                
-                for instance in instances:
-                    instance_view = compute_client.virtual_machine_scale_set_vms.get_instance_view(
-                        resource_group, vmss.name, instance.instance_id
-                    )
-                    
-                    power_state = 'Unknown'
-                    if instance_view.statuses:
-                        for status in instance_view.statuses:
-                            if status.code.startswith('PowerState/'):
-                                power_state = status.display_status
-                                break
+                with span(f"vmss {vmss.name}", 'resource'):
+                    # 진행률 업데이트
+                    vmss_progress = 0.2 + (0.6 * idx / len(vmss_list)) if vmss_list else 1.0
+                    progress_bar.progress(vmss_progress)
+                    status_text.text(f"🔍 VMSS '{vmss.name}' 정보 수집 중... ({idx+1}/{len(vmss_list)})")
                     
-                    instance_states[instance.instance_id] = power_state
-                    if power_state == 'VM running':
-                        running_instances += 1
-                
-                # 평균 메트릭 계산 (실행 중인 인스턴스만)
-                avg_cpu = 'N/A'
-                avg_memory = 'N/A'
-                avg_disk = 'N/A'
-                
-                if collect_metrics and monitor_client and running_instances > 0:
-                    try:
-                        status_text.text(f"📊 VMSS '{vmss.name}' 메트릭 수집 중...")
+                    with span('scale set / instance views', 'detail'):
+                        # VMSS 상세 정보 조회
+                        resource_group = vmss.id.split('/')[4]
+                        vmss_detail = compute_client.virtual_machine_scale_sets.get(resource_group, vmss.name, **deadline.call_options())
                         
-                        # 최근 5분간 메트릭 조회
-                        end_time = datetime.utcnow()
-                        start_time = end_time - timedelta(minutes=5)
+                        # VMSS 인스턴스 목록 조회
+                        instances = list(compute_client.virtual_machine_scale_set_vms.list(resource_group, vmss.name, **deadline.call_options()))
                         
-                        # VMSS 전체 CPU 사용률 평균
-                        cpu_metrics = monitor_client.metrics.list(
-                            resource_uri=vmss.id,
-                            timespan=f"{start_time.isoformat()}/{end_time.isoformat()}",
-                            interval='PT1M',
-                            metricnames='Percentage CPU',
-                            aggregation='Average'
-                        )
+                        # 인스턴스 상태 집계
+                        instance_states = {}
+                        running_instances = 0
+                        total_instances = len(instances)
                         
-                        if cpu_metrics.value and cpu_metrics.value[0].timeseries:
-                            cpu_data = cpu_metrics.value[0].timeseries[0].data
-                            if cpu_data and cpu_data[-1].average is not None:
-                                avg_cpu = f"{cpu_data[-1].average:.1f}%"
-                    except Exception as metric_error:
-                        avg_cpu = 'Error'
-                
-                vmss_info = {
-                    'account_name': account_info['name'],
-                    'vmss_name': vmss.name,
-                    'resource_group': resource_group,
-                    'location': vmss.location,
-                    'vm_size': vmss_detail.sku.name if vmss_detail.sku else 'N/A',
-                    'capacity': vmss_detail.sku.capacity if vmss_detail.sku else 0,
-                    'total_instances': total_instances,
-                    'running_instances': running_instances,
-                    'stopped_instances': total_instances - running_instances,
-                    'upgrade_policy': vmss_detail.upgrade_policy.mode if vmss_detail.upgrade_policy else 'N/A',
-                    'provisioning_state': vmss_detail.provisioning_state or 'Unknown',
-                    'os_type': str(vmss_detail.virtual_machine_profile.storage_profile.os_disk.os_type) if (
-                        vmss_detail.virtual_machine_profile and 
-                        vmss_detail.virtual_machine_profile.storage_profile and 
-                        vmss_detail.virtual_machine_profile.storage_profile.os_disk and
-                        vmss_detail.virtual_machine_profile.storage_profile.os_disk.os_type
-                    ) else 'N/A',
-                    'avg_cpu_usage': avg_cpu,
-                    'avg_memory_usage': avg_memory,
-                    'avg_disk_usage': avg_disk,
-                    'instance_states': instance_states
-                }
-                
-                vmss_data.append(vmss_info)
+                        for instance in instances:
+                            instance_view = compute_client.virtual_machine_scale_set_vms.get_instance_view(
+                                resource_group, vmss.name, instance.instance_id, **deadline.call_options()
+                            )
+                            
+                            power_state = 'Unknown'
+                            if instance_view.statuses:
+                                for status in instance_view.statuses:
+                                    if status.code.startswith('PowerState/'):
+                                        power_state = status.display_status
+                                        break
+                            
+                            instance_states[instance.instance_id] = power_state
+                            if power_state == 'VM running':
+                                running_instances += 1
+                    
+                    vmss_info = {
+                        'account_name': account_info['name'],
+                        'vmss_name': vmss.name,
+                        'resource_group': resource_group,
+                        'location': vmss.location,
+                        'vm_size': vmss_detail.sku.name if vmss_detail.sku else 'N/A',
+                        'capacity': vmss_detail.sku.capacity if vmss_detail.sku else 0,
+                        'total_instances': total_instances,
+                        'running_instances': running_instances,
+                        'stopped_instances': total_instances - running_instances,
+                        'upgrade_policy': vmss_detail.upgrade_policy.mode if vmss_detail.upgrade_policy else 'N/A',
+                        'provisioning_state': vmss_detail.provisioning_state or 'Unknown',
+                        'os_type': sdk_enum_value(vmss_detail.virtual_machine_profile.storage_profile.os_disk.os_type) if (
+                            vmss_detail.virtual_machine_profile and 
+                            vmss_detail.virtual_machine_profile.storage_profile and 
+                            vmss_detail.virtual_machine_profile.storage_profile.os_disk and
+                            vmss_detail.virtual_machine_profile.storage_profile.os_disk.os_type
+                        ) else 'N/A',
+                        'vcpus': None,
+                        'memory_gb': None,
+                        'avg_cpu_percent': None,
+                        'max_cpu_percent': None,
+                        'hottest_instance': None,
+                        'avg_available_memory_gb': None,
+                        'avg_memory_percent': None,
+                        'avg_disk_read_mb_per_min': None,
+                        'metric_note': '',
+                        'instance_states': instance_states,
+                        'instance_metrics': []
+                    }
+                    apply_vm_size(vmss_info, compute_client, deadline.call_options('VM 크기 카탈로그'))
+                    
+                    # 평균 메트릭 계산 (실행 중인 인스턴스만)
+                    if collect_metrics and monitor_client and running_instances > 0:
+                        status_text.text(f"📊 VMSS '{vmss.name}' 메트릭 수집 중...")
+                        with span('snapshot metrics', 'metrics'):
+                            collect_vmss_snapshot_metrics(monitor_client, vmss.id, vmss_info, deadline.call_options())
+                    
+                    vmss_data.append(vmss_info)
                 
+            except DeadlineExceeded:
+                raise
             except Exception as vmss_error:
                 st.warning(f"⚠️ VMSS '{vmss.name}' 정보 조회 실패: {str(vmss_error)[:100]}...")
                 continue
@@ -620,8 +1063,14 @@ def get_azure_vmss(account_info, progress_bar, status_text, collect_metrics=True
         metrics_note = " (메트릭 포함)" if collect_metrics else " (기본 정보만)"
         status_text.text(f"✅ {account_info['name']}: {len(vmss_data)}개 VMSS 조회 완료{metrics_note}")
         return vmss_data
+    
+    except DeadlineExceeded:
+        progress_bar.progress(1.0)
+        status_text.text(f"⏰ {account_info['name']}: {deadline.reason} - {len(vmss_data)}개 VMSS까지 부분 결과로 반환")
+        return vmss_data
         
     except AzureError as e:
+        record_account_failure(account_info, e)
         error_msg = str(e)
         st.error(f"🚨 {account_info['name']} Azure VMSS 조회 오류")
         st.error(f"📋 오류 내용: {error_msg}")
@@ -638,34 +1087,301 @@ def get_azure_vmss(account_info, progress_bar, status_text, collect_metrics=True
         st.error(f"🚨 {account_info['name']} VMSS 예상치 못한 오류 - {str(e)}")
         return []
 
-def get_backup_jobs(account_info, progress_bar, status_text):
-    """특정 계정의 백업 작업 조회 (개선된 오류 처리 및 타임아웃)"""
-    import threading
-    import queue
+# 인벤토리 조회 방식
+INVENTORY_MODES = ["Compute API (구독별)", "Resource Graph (일괄)"]
+
+def group_accounts_by_tenant(accounts):
+    """계정 목록을 테넌트 ID 기준으로 묶기 (입력 순서 유지)"""
+    tenants = {}
+    for account in accounts:
+        tenants.setdefault(account['tenant_id'], []).append(account)
+    return tenants
+
+@timed_collection('get_inventory_resource_graph')
+def get_inventory_resource_graph(accounts, resource_kind, progress_bar, status_text, collect_metrics=True,
+                                 deadline=None, partial_accounts=None):
+    """Resource Graph 로 여러 계정의 VM 또는 VMSS 인벤토리를 일괄 조회
+    
+    테넌트별로 구독을 묶어 페이지 단위 KQL 쿼리를 실행하고, get_azure_vms /
+    get_azure_vmss 와 같은 형식의 딕셔너리 목록을 반환합니다.
+    스냅샷 메트릭은 기존과 같이 Monitor API로 수집합니다.
+    마감 시간(기본: 계정별 마감 시간 × 계정 수)이 지나면 그때까지 조회한 리소스를 반환하고
+    deadline.partial 로 알립니다.
+    
+    Args:
+        resource_kind: 'vm' 또는 'vmss'
+        partial_accounts: 부분 결과가 된 계정명 → 사유를 기록할 딕셔너리
+    """
+    from azure.core.exceptions import AzureError
+    from resource_graph import (
+        VM_INVENTORY_QUERY, VMSS_INVENTORY_QUERY, VMSS_INSTANCE_QUERY,
+        query_resource_graph, vm_info_from_row, vmss_info_from_row
+    )
+    
+    deadline = deadline or Deadline(ACCOUNT_DEADLINE_SECONDS[resource_kind] * len(accounts), CALL_TIMEOUT_SECONDS)
+    partial_accounts = {} if partial_accounts is None else partial_accounts
+    tenants = group_accounts_by_tenant(accounts)
     
-    def fetch_data():
-        """별도 스레드에서 데이터 조회"""
+    collected = []  # (info, account, resource_id)
+    stale = []  # 회로 차단으로 건너뛴 테넌트의 마지막 정상 데이터
+    session_key = 'azure_vmss' if resource_kind == 'vmss' else 'azure_vms'
+    for t_idx, (tenant_id, tenant_accounts) in enumerate(tenants.items()):
+        account_by_subscription = {acc['subscription_id'].lower(): acc for acc in tenant_accounts}
+        subscriptions = list(account_by_subscription)
+        
+        breaker = st.session_state.circuit_breakers.blocking(tenant_id, RESOURCE_GRAPH_SCOPE)
+        if breaker:
+            tenant_stale = [record for acc in tenant_accounts for record in last_good_records(session_key, acc['name'])]
+            stale.extend(tenant_stale)
+            st.warning(f"🔌 {breaker.label} 회로 차단 중 - 호출 없이 마지막 정상 데이터 {len(tenant_stale)}개 사용 "
+                       f"({breaker.retry_in():.0f}초 후 재시도) - {breaker.last_error}")
+            progress_bar.progress(0.3 * (t_idx + 1) / len(tenants))
+            continue
+        
         try:
-            # Recovery Services Client 생성 (캐시된 인증 사용)
-            recovery_client = st.session_state.credential_manager.get_recovery_client(
-                account_info['tenant_id'], 
-                account_info['subscription_id']
-            )
-            
-            # Vault 목록 조회 (타임아웃 적용)
-            import signal
-            def timeout_handler(signum, frame):
-                raise TimeoutError("Vault 조회 시간 초과")
-            
+            deadline.check(f"테넌트 {tenant_id[:8]}... ({t_idx+1}/{len(tenants)})")
+            tenant_collected = []
+            with span(f"tenant {tenant_id[:8]}", 'tenant', subscriptions=len(subscriptions)):
+                status_text.text(f"🌐 테넌트 {tenant_id[:8]}... Resource Graph 조회 중 ({len(subscriptions)}개 구독)")
+                client = st.session_state.credential_manager.get_resource_graph_client(tenant_id)
+                
+                # VM 크기 사양은 리전별 카탈로그에서 (테넌트 첫 구독의 Compute 클라이언트로 조회)
+                compute_client = st.session_state.credential_manager.get_compute_client(
+                    tenant_id, tenant_accounts[0]['subscription_id']
+                )
+                
+                if resource_kind == 'vmss':
+                    with span('VMSS_INVENTORY_QUERY', 'list'):
+                        rows, page_count = query_resource_graph(client, subscriptions, VMSS_INVENTORY_QUERY, deadline=deadline)
+                    with span('VMSS_INSTANCE_QUERY', 'list'):
+                        instance_rows, instance_pages = query_resource_graph(
+                            client, subscriptions, VMSS_INSTANCE_QUERY, deadline=deadline
+                        )
+                    page_count += instance_pages
+                    
+                    instances_by_vmss = {}
+                    for instance in instance_rows:
+                        instances_by_vmss.setdefault(instance['vmssId'].lower(), []).append(instance)
+                    
+                    for row in rows:
+                        account = account_by_subscription.get(row['subscriptionId'].lower())
+                        if account:
+                            info = apply_vm_size(
+                                vmss_info_from_row(row, account['name'], instances_by_vmss.get(row['id'].lower(), [])),
+                                compute_client, deadline.call_options('VM 크기 카탈로그')
+                            )
+                            tenant_collected.append((info, account, row['id']))
+                else:
+                    with span('VM_INVENTORY_QUERY', 'list'):
+                        rows, page_count = query_resource_graph(client, subscriptions, VM_INVENTORY_QUERY, deadline=deadline)
+                    for row in rows:
+                        account = account_by_subscription.get(row['subscriptionId'].lower())
+                        if account:
+                            info = apply_vm_size(vm_info_from_row(row, account['name']), compute_client,
+                                                 deadline.call_options('VM 크기 카탈로그'))
+                            tenant_collected.append((info, account, row['id']))
+                
+                status_text.text(f"✅ 테넌트 {tenant_id[:8]}...: {len(rows)}개 리소스 ({page_count}회 호출)")
+            collected.extend(tenant_collected)
+            st.session_state.circuit_breakers.record_success(tenant_id, RESOURCE_GRAPH_SCOPE)
+            for acc in tenant_accounts:
+                remember_last_good(session_key, acc, [info for info, account, _ in tenant_collected if account is acc])
+        
+        except DeadlineExceeded:
+            # 조회를 마치지 못한 테넌트부터는 부분 결과
+            partial_accounts.update({acc['name']: deadline.reason for accs in list(tenants.values())[t_idx:] for acc in accs})
+            break
+        except AzureError as e:
+            st.session_state.circuit_breakers.record_failure(tenant_id, RESOURCE_GRAPH_SCOPE, e)
+            error_msg = str(e)
+            st.error(f"🚨 테넌트 {tenant_id[:8]}... Resource Graph 조회 오류")
+            st.error(f"📋 오류 내용: {error_msg}")
+            if "forbidden" in error_msg.lower() or "unauthorized" in error_msg.lower():
+                st.error("💡 해결방법: 대상 구독에 대한 Reader 권한을 확인하세요.")
+            else:
+                st.error("💡 해결방법: 1) Azure 로그인 재시도 2) 권한 확인 3) 네트워크 연결 확인")
+        except Exception as e:
+            st.error(f"🚨 테넌트 {tenant_id[:8]}... Resource Graph 예상치 못한 오류 - {str(e)}")
+        
+        progress_bar.progress(0.3 * (t_idx + 1) / len(tenants))
+    
+    # 스냅샷 메트릭 (실행 중인 리소스만)
+    if collect_metrics:
+        for idx, (info, account, resource_id) in enumerate(collected):
+            progress_bar.progress(0.3 + 0.7 * idx / len(collected))
             try:
-                # 비동기 방식으로 처리
-                vaults = list(recovery_client.vaults.list_by_subscription_id())
-                return {"success": True, "vaults": vaults}
-            except Exception as e:
-                return {"success": False, "error": str(e)}
+                deadline.check(f"'{resource_id.split('/')[-1]}' 메트릭 ({idx+1}/{len(collected)})")
+                with span(resource_id.split('/')[-1], 'metrics'):
+                    monitor_client = st.session_state.credential_manager.get_monitor_client(
+                        account['tenant_id'],
+                        account['subscription_id']
+                    )
+                    if resource_kind == 'vmss':
+                        if info['running_instances'] > 0:
+                            status_text.text(f"📊 VMSS '{info['vmss_name']}' 메트릭 수집 중... ({idx+1}/{len(collected)})")
+                            collect_vmss_snapshot_metrics(monitor_client, resource_id, info, deadline.call_options())
+                    elif info['power_state'] == 'VM running':
+                        status_text.text(f"📊 VM '{info['vm_name']}' 메트릭 수집 중... ({idx+1}/{len(collected)})")
+                        collect_vm_snapshot_metrics(monitor_client, resource_id, info, deadline.call_options())
+            except DeadlineExceeded:
+                # 메트릭을 받지 못한 리소스의 계정은 부분 결과
+                partial_accounts.update({acc['name']: deadline.reason for _, acc, _ in collected[idx:]})
+                break
+            except Exception as metric_error:
+                st.warning(f"⚠️ '{resource_id.split('/')[-1]}' 메트릭 수집 실패: {str(metric_error)[:100]}...")
+    
+    progress_bar.progress(1.0)
+    if deadline.partial:
+        status_text.text(f"⏰ Resource Graph: {deadline.reason} - {len(collected)}개 리소스까지 부분 결과로 반환")
+    else:
+        metrics_note = " (메트릭 포함)" if collect_metrics else " (기본 정보만)"
+        status_text.text(f"✅ Resource Graph: {len(collected)}개 리소스 조회 완료{metrics_note}")
+    return [info for info, _, _ in collected] + stale
+
+def display_resource_graph_run(selected_configs, resource_kind, collect_metrics, partial_accounts):
+    """Resource Graph 일괄 조회 진행상황 표시 및 실행"""
+    label = "VMSS" if resource_kind == 'vmss' else "Azure VM"
+    tenant_count = len({acc['tenant_id'] for acc in selected_configs})
+    
+    with st.expander(f"🌐 Resource Graph 일괄 조회 ({len(selected_configs)}개 계정 / {tenant_count}개 테넌트)", expanded=True):
+        progress_bar = st.progress(0)
+        status_text = st.empty()
+        
+        start_time = time.time()
+        deadline = Deadline(ACCOUNT_DEADLINE_SECONDS[resource_kind] * len(selected_configs), CALL_TIMEOUT_SECONDS)
+        results = get_inventory_resource_graph(selected_configs, resource_kind, progress_bar, status_text, collect_metrics,
+                                               deadline=deadline, partial_accounts=partial_accounts)
+        elapsed_time = time.time() - start_time
+        
+        if deadline.partial:
+            st.warning(f"⏰ 부분 결과: {len(results)}개 {label}만 조회됨 - {deadline.reason} ({elapsed_time:.1f}초 소요)")
+        elif results:
+            st.success(f"✅ {len(results)}개 {label} 조회 완료 ({elapsed_time:.1f}초 소요)")
+        else:
+            st.info(f"ℹ️ {label} 없음 ({elapsed_time:.1f}초 소요)")
+    return results
+
+# 백업 조회 방식 / Resource Graph 조회 범위
+BACKUP_QUERY_MODES = ["Vault 순회 (계정별)", "Resource Graph (일괄)"]
+BACKUP_WINDOW_HOURS = {"최근 12시간": 12, "최근 24시간": 24, "최근 3일": 72, "최근 7일": 168}
+BACKUP_JOB_STATUSES = ["Completed", "Failed", "CompletedWithWarnings", "InProgress", "Cancelled"]
+
+@timed_collection('get_backup_jobs_resource_graph')
+def get_backup_jobs_resource_graph(accounts, progress_bar, status_text, hours=24, statuses=None,
+                                   deadline=None, partial_accounts=None):
+    """Resource Graph 로 여러 계정의 백업 작업을 일괄 조회
+    
+    Vault 목록 → Vault별 작업 목록 순회 대신 RecoveryServicesResources 테이블을
+    테넌트당 한 번(페이지 단위) 조회합니다. 반환 형식은 get_backup_jobs 와 같습니다.
+    마감 시간(기본: 계정별 마감 시간 × 계정 수)이 지나면 조회를 마친 테넌트의 작업만 반환하고
+    deadline.partial 로 알립니다.
+    
+    Args:
+        hours: 최근 N시간 이내에 시작된 작업만 조회
+        statuses: 조회할 상태 목록 (None 이면 전체)
+        partial_accounts: 부분 결과가 된 계정명 → 사유를 기록할 딕셔너리
+    """
+    from azure.core.exceptions import AzureError
+    from resource_graph import backup_job_query, query_resource_graph, backup_job_from_row
+    
+    deadline = deadline or Deadline(ACCOUNT_DEADLINE_SECONDS['backup'] * len(accounts), CALL_TIMEOUT_SECONDS)
+    partial_accounts = {} if partial_accounts is None else partial_accounts
+    query = backup_job_query(hours, statuses)
+    tenants = group_accounts_by_tenant(accounts)
+    
+    all_jobs = []
+    for t_idx, (tenant_id, tenant_accounts) in enumerate(tenants.items()):
+        account_by_subscription = {acc['subscription_id'].lower(): acc for acc in tenant_accounts}
+        
+        breaker = st.session_state.circuit_breakers.blocking(tenant_id, RESOURCE_GRAPH_SCOPE)
+        if breaker:
+            tenant_stale = [record for acc in tenant_accounts for record in last_good_records('backup_jobs', acc['name'])]
+            all_jobs.extend(tenant_stale)
+            st.warning(f"🔌 {breaker.label} 회로 차단 중 - 호출 없이 마지막 정상 데이터 {len(tenant_stale)}개 사용 "
+                       f"({breaker.retry_in():.0f}초 후 재시도) - {breaker.last_error}")
+            progress_bar.progress((t_idx + 1) / len(tenants))
+            continue
+        
+        try:
+            deadline.check(f"테넌트 {tenant_id[:8]}... ({t_idx+1}/{len(tenants)})")
+            with span(f"tenant {tenant_id[:8]}", 'tenant', subscriptions=len(account_by_subscription)):
+                status_text.text(f"🌐 테넌트 {tenant_id[:8]}... 백업 작업 조회 중 ({len(account_by_subscription)}개 구독)")
+                client = st.session_state.credential_manager.get_resource_graph_client(tenant_id)
+                with span('backup_jobs query', 'list'):
+                    rows, page_count = query_resource_graph(client, list(account_by_subscription), query, deadline=deadline)
                 
+                for row in rows:
+                    account = account_by_subscription.get(row['subscriptionId'].lower())
+                    if account:
+                        all_jobs.append(backup_job_from_row(row, account['name']))
+                
+                status_text.text(f"✅ 테넌트 {tenant_id[:8]}...: {len(rows)}개 백업 작업 ({page_count}회 호출)")
+            st.session_state.circuit_breakers.record_success(tenant_id, RESOURCE_GRAPH_SCOPE)
+            for acc in tenant_accounts:
+                remember_last_good('backup_jobs', acc, [job for job in all_jobs if job['account_name'] == acc['name']])
+        
+        except DeadlineExceeded:
+            # 조회를 마치지 못한 테넌트부터는 부분 결과
+            partial_accounts.update({acc['name']: deadline.reason for accs in list(tenants.values())[t_idx:] for acc in accs})
+            status_text.text(f"⏰ Resource Graph: {deadline.reason} - {len(all_jobs)}개 백업 작업까지 부분 결과로 반환")
+            break
+        except AzureError as e:
+            st.session_state.circuit_breakers.record_failure(tenant_id, RESOURCE_GRAPH_SCOPE, e)
+            error_msg = str(e)
+            st.error(f"🚨 테넌트 {tenant_id[:8]}... Resource Graph 백업 조회 오류")
+            st.error(f"📋 오류 내용: {error_msg}")
+            if "forbidden" in error_msg.lower() or "unauthorized" in error_msg.lower():
+                st.error("💡 해결방법: 대상 구독에 대한 Reader 권한을 확인하세요.")
+            else:
+                st.error("💡 해결방법: 1) Azure 로그인 재시도 2) 권한 확인 3) 네트워크 연결 확인")
         except Exception as e:
-            return {"success": False, "error": str(e)}
+            st.error(f"🚨 테넌트 {tenant_id[:8]}... Resource Graph 예상치 못한 오류 - {str(e)}")
+        
+        progress_bar.progress((t_idx + 1) / len(tenants))
+    
+    return all_jobs
+
+def backup_job_info(job, account_name, vault_name, resource_group):
+    """백업 작업(JobResource) → 결과 레코드
+    
+    시간은 epoch(초)로만 저장하고 표시 문자열/소요 시간은 화면에서 계산합니다.
+    """
+    start_utc = job.properties.start_time
+    end_utc = job.properties.end_time
+    start_epoch = int(start_utc.timestamp()) if start_utc else None
+    end_epoch = int(end_utc.timestamp()) if end_utc else None
+    return {
+        'account_name': account_name,
+        'vault_name': vault_name,
+        'entity_name': job.properties.entity_friendly_name,
+        'operation': job.properties.operation,
+        'job_id': job.name,
+        'status': job.properties.status,
+        'start_epoch': start_epoch,
+        'end_epoch': end_epoch,
+        'duration_seconds': end_epoch - start_epoch if start_epoch is not None and end_epoch is not None else None,
+        'resource_group': resource_group
+    }
+
+def update_duration_baselines(jobs):
+    """끝난 백업 작업을 보호 항목별 소요 시간 기준선에 반영 (backup_duration_baseline, 새 작업만)"""
+    from backup_duration_baseline import DurationBaselines
+    
+    baselines = DurationBaselines()
+    if baselines.observe(jobs):
+        baselines.save()
+
+@timed_collection('get_backup_jobs')
+def get_backup_jobs(account_info, progress_bar, status_text, deadline=None):
+    """특정 계정의 백업 작업 조회 (계정 마감 시간 / 호출별 제한 시간 적용)
+    
+    마감 시간이 지나면 남은 Vault는 건너뛰고 그때까지 조회한 작업을 반환합니다.
+    호출 측은 deadline.partial 로 부분 결과 여부를 확인합니다.
+    """
+    from azure.core.exceptions import AzureError
+    
+    deadline = deadline or Deadline(ACCOUNT_DEADLINE_SECONDS['backup'], CALL_TIMEOUT_SECONDS)
+    all_jobs = []
     
     try:
         status_text.text(f"🔐 {account_info['name']} 인증 중...")
@@ -673,19 +1389,18 @@ def get_backup_jobs(account_info, progress_bar, status_text):
         time.sleep(0.5)  # UI 업데이트를 위한 짧은 대기
         
         status_text.text(f"📋 {account_info['name']} Recovery Services Vault 조회 중...")
-        status_text.text(f"⏱️ 최대 60초까지 소요될 수 있습니다...")
+        status_text.text(f"⏱️ 최대 {deadline.seconds}초까지 소요될 수 있습니다...")
         progress_bar.progress(0.2)
         
-        # 타임아웃을 적용한 데이터 조회
         start_time = time.time()
-        max_wait_time = 60  # 60초 타임아웃
         
         try:
             # 클라이언트 생성 (캐시된 인증 사용)
-            recovery_client = st.session_state.credential_manager.get_recovery_client(
-                account_info['tenant_id'], 
-                account_info['subscription_id']
-            )
+            with span('recovery client', 'auth'):
+                recovery_client = st.session_state.credential_manager.get_recovery_client(
+                    account_info['tenant_id'], 
+                    account_info['subscription_id']
+                )
             
             # 진행상황 업데이트
             progress_bar.progress(0.4)
@@ -694,10 +1409,15 @@ def get_backup_jobs(account_info, progress_bar, status_text):
             # Vault 목록 조회
             vaults = []
             try:
-                vaults = list(recovery_client.vaults.list_by_subscription_id())
+                with span('vaults.list_by_subscription_id', 'list'):
+                    vaults = list(recovery_client.vaults.list_by_subscription_id(**deadline.call_options('Vault 목록')))
+                record_account_success(account_info)
                 elapsed_time = time.time() - start_time
                 status_text.text(f"✅ Vault 조회 완료 ({elapsed_time:.1f}초 소요)")
+            except DeadlineExceeded:
+                raise
             except Exception as vault_error:
+                record_account_failure(account_info, vault_error)
                 status_text.text(f"❌ Vault 조회 실패: {str(vault_error)}")
                 st.error(f"🚨 {account_info['name']}: Vault 조회 실패")
                 st.error(f"📋 오류 내용: {str(vault_error)}")
@@ -713,65 +1433,41 @@ def get_backup_jobs(account_info, progress_bar, status_text):
             status_text.text(f"🔍 {account_info['name']}: {len(vaults)}개 Vault에서 백업 작업 조회 중...")
             
             # Backup Client 생성 (캐시된 인증 사용)
-            backup_client = st.session_state.credential_manager.get_backup_client(
-                account_info['tenant_id'], 
-                account_info['subscription_id']
-            )
-            
-            all_jobs = []
-            KST = timezone(timedelta(hours=9))
+            with span('backup client', 'auth'):
+                backup_client = st.session_state.credential_manager.get_backup_client(
+                    account_info['tenant_id'], 
+                    account_info['subscription_id']
+                )
             
             for i, vault in enumerate(vaults):
                 vault_name = vault.name
                 resource_group = vault.id.split('/')[4]
+                deadline.check(f"Vault '{vault_name}' ({i+1}/{len(vaults)})")
                 
                 try:
-                    status_text.text(f"📊 Vault '{vault_name}' 백업 작업 조회 중... ({i+1}/{len(vaults)})")
-                    
-                    # 백업 작업 조회
-                    jobs = backup_client.backup_jobs.list(vault_name, resource_group)
-                    
-                    vault_job_count = 0
-                    for job in jobs:
-                        start_utc = job.properties.start_time
-                        end_utc = job.properties.end_time
-                        start_kst = start_utc.astimezone(KST) if start_utc else None
-                        end_kst = end_utc.astimezone(KST) if end_utc else None
+                    with span(f"vault {vault_name}", 'resource', resource_group=resource_group):
+                        status_text.text(f"📊 Vault '{vault_name}' 백업 작업 조회 중... ({i+1}/{len(vaults)})")
                         
-                        # 소요 시간 계산
-                        duration = None
-                        if start_kst and end_kst:
-                            duration_seconds = (end_kst - start_kst).total_seconds()
-                            if duration_seconds > 0:
-                                hours = int(duration_seconds // 3600)
-                                minutes = int((duration_seconds % 3600) // 60)
-                                if hours > 0:
-                                    duration = f"{hours}시간 {minutes}분"
-                                else:
-                                    duration = f"{minutes}분"
+                        with span('backup_jobs.list', 'list'):
+                            # 백업 작업 조회 (페이지마다 호출 제한 시간 적용, 항목마다 마감 확인)
+                            jobs = backup_client.backup_jobs.list(vault_name, resource_group, **deadline.call_options())
+                            
+                            vault_job_count = 0
+                            for job in jobs:
+                                if deadline.expired:
+                                    deadline.check(f"Vault '{vault_name}' 작업 목록")
+                                all_jobs.append(backup_job_info(job, account_info['name'], vault_name, resource_group))
+                                vault_job_count += 1
                         
-                        job_info = {
-                            'account_name': account_info['name'],
-                            'vault_name': vault_name,
-                            'job_id': job.name,
-                            'status': job.properties.status,
-                            'start_time': start_kst.strftime('%Y-%m-%d %H:%M:%S') if start_kst else 'N/A',
-                            'end_time': end_kst.strftime('%Y-%m-%d %H:%M:%S') if end_kst else 'N/A',
-                            'duration': duration if duration else 'N/A',
-                            'start_time_raw': start_kst,
-                            'end_time_raw': end_kst,
-                            'resource_group': resource_group
-                        }
-                        all_jobs.append(job_info)
-                        vault_job_count += 1
-                    
-                    # 진행률 업데이트
-                    progress = 0.6 + (0.3 * (i + 1) / len(vaults))
-                    progress_bar.progress(progress)
-                    
-                    status_text.text(f"✅ Vault '{vault_name}': {vault_job_count}개 작업 발견")
-                    time.sleep(0.2)  # UI 업데이트를 위한 짧은 대기
+                        # 진행률 업데이트
+                        progress = 0.6 + (0.3 * (i + 1) / len(vaults))
+                        progress_bar.progress(progress)
+                        
+                        status_text.text(f"✅ Vault '{vault_name}': {vault_job_count}개 작업 발견")
+                        time.sleep(0.2)  # UI 업데이트를 위한 짧은 대기
                         
+                except DeadlineExceeded:
+                    raise
                 except Exception as vault_error:
                     st.warning(f"⚠️ Vault '{vault_name}' 조회 실패: {str(vault_error)}")
                     continue
@@ -781,12 +1477,13 @@ def get_backup_jobs(account_info, progress_bar, status_text):
             status_text.text(f"🎉 {account_info['name']}: {len(all_jobs)}개 백업 작업 조회 완료! ({total_time:.1f}초 소요)")
             return all_jobs
             
-        except TimeoutError:
-            st.error(f"⏰ {account_info['name']}: 조회 시간 초과 (60초)")
-            st.error("💡 네트워크가 느리거나 Vault가 많을 수 있습니다. 잠시 후 다시 시도해주세요.")
-            return []
+        except DeadlineExceeded:
+            progress_bar.progress(1.0)
+            status_text.text(f"⏰ {account_info['name']}: {deadline.reason} - {len(all_jobs)}개 작업까지 부분 결과로 반환")
+            return all_jobs
         
     except AzureError as e:
+        record_account_failure(account_info, e)
         error_msg = str(e)
         st.error(f"🚨 {account_info['name']} Azure 인증/권한 오류")
         st.error(f"📋 오류 내용: {error_msg}")
@@ -807,8 +1504,633 @@ def get_backup_jobs(account_info, progress_bar, status_text):
         st.error("💡 해결방법: 페이지를 새로고침하거나 잠시 후 다시 시도해주세요.")
         return []
 
+def get_protected_items(account_info, force_refresh=False, deadline=None):
+    """계정(구독)의 VM 보호 항목 목록 (Vault마다 backup_protected_items 1회 나열, 구독별 캐시)
+    
+    모든 Vault를 끝까지 조회한 경우에만 캐시합니다 (일부 Vault 실패 / 마감 시간 초과 결과를 캐시하면
+    다음 조회에서도 그 Vault의 VM이 미보호로 보이므로).
+    
+    Returns:
+        (보호 항목 레코드 목록 - 조회 실패 시 None, 조회 시각 epoch,
+         모든 Vault를 끝까지 조회했는지 - False면 목록에 없는 VM을 미보호로 단정할 수 없음)
+    """
+    from azure.core.exceptions import AzureError
+    from backup_coverage import (PROTECTED_ITEM_FILTER, cached_protected_items, protected_item_record,
+                                 store_protected_items)
+    
+    if not force_refresh:
+        records, fetched_at = cached_protected_items(account_info['subscription_id'])
+        if records is not None:
+            return records, fetched_at, True
+    
+    deadline = deadline or Deadline(ACCOUNT_DEADLINE_SECONDS['backup'], CALL_TIMEOUT_SECONDS)
+    records = []
+    complete = True
+    try:
+        with span('recovery/backup client', 'auth'):
+            recovery_client = st.session_state.credential_manager.get_recovery_client(
+                account_info['tenant_id'],
+                account_info['subscription_id']
+            )
+            backup_client = st.session_state.credential_manager.get_backup_client(
+                account_info['tenant_id'],
+                account_info['subscription_id']
+            )
+        
+        with span('vaults.list_by_subscription_id', 'list'):
+            vaults = list(recovery_client.vaults.list_by_subscription_id(**deadline.call_options('Vault 목록')))
+        record_account_success(account_info)
+        
+        for vault in vaults:
+            resource_group = vault.id.split('/')[4]
+            deadline.check(f"Vault '{vault.name}' 보호 항목")
+            try:
+                with span(f"backup_protected_items {vault.name}", 'list'):
+                    items = backup_client.backup_protected_items.list(
+                        vault.name, resource_group, filter=PROTECTED_ITEM_FILTER, **deadline.call_options()
+                    )
+                    for item in items:
+                        record = protected_item_record(item, vault.name)
+                        if record:
+                            records.append(record)
+            except DeadlineExceeded:
+                raise
+            except Exception as vault_error:
+                complete = False
+                st.warning(f"⚠️ Vault '{vault.name}' 보호 항목 조회 실패: {str(vault_error)[:100]}...")
+    
+    except DeadlineExceeded:
+        st.warning(f"⏰ {account_info['name']}: {deadline.reason} - 보호 항목 {len(records)}개까지만 조회됨")
+        return records, time.time(), False
+    except AzureError as e:
+        record_account_failure(account_info, e)
+        error_msg = str(e)
+        st.error(f"🚨 {account_info['name']} 보호 항목 조회 오류")
+        st.error(f"📋 오류 내용: {error_msg}")
+        if "forbidden" in error_msg.lower() or "unauthorized" in error_msg.lower():
+            st.error("💡 해결방법: Recovery Services Vault에 대한 Backup Reader 권한을 확인하세요.")
+        else:
+            st.error("💡 해결방법: 1) Azure 로그인 재시도 2) 권한 확인 3) 네트워크 연결 확인")
+        return None, None, False
+    
+    if complete:
+        store_protected_items(account_info['subscription_id'], records)
+    return records, time.time(), complete
+
+def trend_to_arrays(points):
+    """추이 데이터(list of {'timestamp', 'value'})를 시간순 numpy 배열로 변환"""
+    import numpy as np
+    import pandas as pd
+    
+    if not points:
+        return np.array([], dtype='datetime64[ns]'), np.array([], dtype=float)
+    
+    timestamps = pd.to_datetime([p['timestamp'] for p in points], utc=True).tz_convert(None).values
+    values = np.array([p['value'] for p in points], dtype=float)
+    order = np.argsort(timestamps, kind='stable')
+    return timestamps[order], values[order]
+
+def downsample_min_max(timestamps, values, max_points):
+    """구간별 최소/최대값만 남기는 서버 측 다운샘플링 (스파이크 보존)"""
+    import numpy as np
+    
+    n = len(values)
+    if max_points <= 0 or n <= max_points:
+        return timestamps, values
+    
+    # 구간당 최소/최대 2개 포인트
+    bucket_size = int(np.ceil(n / max(1, max_points // 2)))
+    n_buckets = int(np.ceil(n / bucket_size))
+    padded = np.full(n_buckets * bucket_size, np.nan)
+    padded[:n] = values
+    buckets = padded.reshape(n_buckets, bucket_size)
+    
+    # NaN은 최소/최대 후보에서 제외 (값이 모두 NaN인 구간은 첫 포인트를 남겨 차트의 끊김 유지)
+    valid = ~np.isnan(buckets)
+    offsets = np.arange(n_buckets) * bucket_size
+    min_idx = offsets + np.argmin(np.where(valid, buckets, np.inf), axis=1)
+    max_idx = offsets + np.argmax(np.where(valid, buckets, -np.inf), axis=1)
+    keep = np.unique(np.concatenate([min_idx, max_idx]))
+    return timestamps[keep], values[keep]
+
+def create_fleet_overlay_chart(vm_trends, period_text, interval_text, max_points_per_vm=300, highlight_top=5):
+    """여러 VM의 CPU/메모리/디스크 추이를 하나의 WebGL(Scattergl) 차트로 생성
+    
+    메트릭마다 전체 VM을 NaN 구분자로 이어붙인 배경 트레이스 1개와,
+    피크 기준 상위 VM 트레이스를 강조 표시합니다.
+    """
+    import numpy as np
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+    
+    metrics = [
+        ('cpu_trend', '💻 CPU 사용률 (%)', '#d62728'),
+        ('memory_trend', '🧠 메모리 사용률 (%)', '#1f77b4'),
+        ('disk_trend', '💾 디스크 읽기 (MB)', '#2ca02c'),
+    ]
+    highlight_colors = ['#e6194b', '#f58231', '#911eb4', '#4363d8', '#3cb44b',
+                        '#f032e6', '#9a6324', '#800000', '#008080', '#000075']
+    
+    fig = make_subplots(rows=len(metrics), cols=1, shared_xaxes=True,
+                        vertical_spacing=0.06,
+                        subplot_titles=[title for _, title, _ in metrics])
+    legend_shown = set()
+    
+    for row, (metric_key, title, base_color) in enumerate(metrics, start=1):
+        series = []
+        for vm_name, vm_trend in vm_trends.items():
+            timestamps, values = trend_to_arrays(vm_trend.get(metric_key))
+            # 값이 모두 NaN(수집 누락)인 VM은 피크를 정할 수 없으므로 제외
+            if len(values) == 0 or np.isnan(values).all():
+                continue
+            timestamps, values = downsample_min_max(timestamps, values, max_points_per_vm)
+            series.append((vm_name, timestamps, values, np.nanmax(values)))
+        
+        if not series:
+            continue
+        
+        series.sort(key=lambda s: s[3], reverse=True)
+        hot_series = series[:highlight_top]
+        background = series[highlight_top:]
+        
+        if background:
+            # NaT/NaN 구분자로 이어붙여 VM 수와 무관하게 트레이스 1개로 렌더링
+            lengths = np.array([len(s[2]) + 1 for s in background])
+            x = np.concatenate([np.append(s[1], np.datetime64('NaT')) for s in background])
+            y = np.concatenate([np.append(s[2], np.nan) for s in background])
+            text = np.repeat([s[0] for s in background], lengths)
+            fig.add_trace(go.Scattergl(
+                x=x, y=y, text=text,
+                mode='lines',
+                line=dict(color=base_color, width=1),
+                opacity=0.35,
+                connectgaps=False,
+                name=f'기타 VM ({len(background)}개)',
+                legendgroup=f'background_{metric_key}',
+                hovertemplate='%{text}<br>%{x}<br>%{y:.1f}<extra></extra>'
+            ), row=row, col=1)
+        
+        for idx, (vm_name, timestamps, values, _) in enumerate(hot_series):
+            fig.add_trace(go.Scattergl(
+                x=timestamps, y=values,
+                mode='lines',
+                line=dict(color=highlight_colors[idx % len(highlight_colors)], width=2),
+                name=vm_name,
+                legendgroup=vm_name,
+                showlegend=vm_name not in legend_shown,
+                hovertemplate=f'{vm_name}<br>%{{x}}<br>%{{y:.1f}}<extra></extra>'
+            ), row=row, col=1)
+            legend_shown.add(vm_name)
+    
+    fig.update_layout(
+        title=f'📈 전체 VM {period_text} 추이 오버레이 ({interval_text} 간격, {len(vm_trends)}개 VM)',
+        height=900,
+        hovermode='closest'
+    )
+    return fig
+
+def display_fleet_trend_overlay(vm_trends, trends_config):
+    """전체 VM 추이 오버레이 화면"""
+    col1, col2 = st.columns(2)
+    with col1:
+        max_points_per_vm = st.slider(
+            "VM당 최대 포인트 수", min_value=50, max_value=1000, value=300, step=50,
+            help="서버에서 구간별 최소/최대값으로 다운샘플링해 브라우저 부하를 줄입니다.",
+            key="trend_overlay_max_points"
+        )
+    with col2:
+        highlight_top = st.number_input(
+            "강조할 상위 VM 수 (피크 기준)", min_value=0, max_value=10, value=5,
+            key="trend_overlay_highlight_top"
+        )
+    
+    fig = create_fleet_overlay_chart(
+        vm_trends,
+        trends_config['period'],
+        trends_config['interval'],
+        max_points_per_vm=max_points_per_vm,
+        highlight_top=int(highlight_top)
+    )
+    st.plotly_chart(fig, use_container_width=True)
+
+TREND_METRIC_KEYS = ('cpu_trend', 'memory_trend', 'disk_trend')
+
+def flatten_trends(vm_trends):
+    """VM별 추이 데이터를 메트릭별 평탄화 numpy 배열로 변환
+    
+    수집 직후 1회만 변환해 세션에 보관하고, 히트맵 등 전체 VM 분석은 이 배열로
+    벡터 연산합니다. 포인트별 datetime 변환 비용을 화면 갱신마다 반복하지 않습니다.
+    
+    Returns:
+        {metric_key: {'vm_names': [...], 'counts': int 배열, 'epoch_s': int64 배열, 'values': float 배열}}
+    """
+    import numpy as np
+    import pandas as pd
+    
+    flattened = {}
+    for metric_key in TREND_METRIC_KEYS:
+        vm_names = []
+        counts = []
+        flat_timestamps = []
+        flat_values = []
+        for vm_name, vm_trend in vm_trends.items():
+            points = vm_trend.get(metric_key) or []
+            if not points:
+                continue
+            vm_names.append(vm_name)
+            counts.append(len(points))
+            flat_timestamps.extend([p['timestamp'] for p in points])
+            flat_values.extend([p['value'] for p in points])
+        
+        epoch_s = (pd.to_datetime(flat_timestamps, utc=True).as_unit('s').asi8
+                   if flat_timestamps else np.array([], dtype=np.int64))
+        flattened[metric_key] = {
+            'vm_names': vm_names,
+            'counts': np.asarray(counts, dtype=np.int64),
+            'epoch_s': epoch_s,
+            'values': np.asarray(flat_values, dtype=float)
+        }
+    return flattened
+
+def get_trend_arrays():
+    """세션에 보관된 평탄화 추이 배열 조회 (없으면 생성)"""
+    if st.session_state.get('vm_trend_arrays') is None:
+        st.session_state['vm_trend_arrays'] = flatten_trends(st.session_state.get('vm_trends', {}))
+    return st.session_state['vm_trend_arrays']
+
+def build_trend_matrix(metric_arrays, bucket_minutes=15, aggregation='mean'):
+    """평탄화된 추이 배열을 공통 시간 격자의 밀집 행렬(VM × 시간 구간)로 변환
+    
+    VM별 루프 없이 (행, 구간) 평탄 인덱스에 대한 bincount / fmax.at 으로 집계합니다.
+    데이터가 없는 구간은 NaN 입니다.
+    
+    Returns:
+        (vm_names, bucket_times, matrix) - matrix.shape == (len(vm_names), len(bucket_times))
+    """
+    import numpy as np
+    
+    vm_names = metric_arrays['vm_names']
+    if not vm_names:
+        return [], np.array([], dtype='datetime64[s]'), np.empty((0, 0))
+    
+    epoch_s = metric_arrays['epoch_s']
+    values = metric_arrays['values']
+    rows = np.repeat(np.arange(len(vm_names)), metric_arrays['counts'])
+    
+    bucket_seconds = int(bucket_minutes) * 60
+    grid_start = (epoch_s.min() // bucket_seconds) * bucket_seconds
+    cols = (epoch_s - grid_start) // bucket_seconds
+    n_buckets = int(cols.max()) + 1
+    size = len(vm_names) * n_buckets
+    flat_index = rows * n_buckets + cols
+    
+    if aggregation == 'max':
+        matrix = np.full(size, np.nan)
+        np.fmax.at(matrix, flat_index, values)
+    else:
+        sums = np.bincount(flat_index, weights=values, minlength=size)
+        hits = np.bincount(flat_index, minlength=size)
+        matrix = np.full(size, np.nan)
+        np.divide(sums, hits, out=matrix, where=hits > 0)
+    
+    bucket_times = (grid_start + np.arange(n_buckets) * bucket_seconds).astype('datetime64[s]')
+    return vm_names, bucket_times, matrix.reshape(len(vm_names), n_buckets)
+
+def sort_matrix_rows(vm_names, matrix, sort_by='peak'):
+    """행(VM)을 피크 또는 평균 기준 내림차순 정렬"""
+    import numpy as np
+    
+    if matrix.size == 0:
+        return vm_names, matrix
+    
+    filled = np.where(np.isnan(matrix), -np.inf, matrix)
+    if sort_by == 'mean':
+        hits = (~np.isnan(matrix)).sum(axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            scores = np.where(hits > 0, np.nansum(matrix, axis=1) / hits, -np.inf)
+    else:
+        scores = filled.max(axis=1)
+    order = np.argsort(-scores, kind='stable')
+    return [vm_names[i] for i in order], matrix[order]
+
+def create_fleet_heatmap_chart(vm_names, bucket_times, matrix, title, colorbar_title):
+    """VM × 시간 밀집 행렬을 하나의 go.Heatmap 으로 렌더링"""
+    import plotly.graph_objects as go
+    
+    fig = go.Figure(go.Heatmap(
+        z=matrix,
+        x=bucket_times,
+        y=vm_names,
+        colorscale='YlOrRd',
+        colorbar=dict(title=colorbar_title),
+        hoverongaps=False,
+        hovertemplate='%{y}<br>%{x}<br>%{z:.1f}<extra></extra>'
+    ))
+    fig.update_layout(
+        title=title,
+        height=min(2000, max(400, 18 * len(vm_names) + 150)),
+        yaxis=dict(autorange='reversed')
+    )
+    return fig
+
+def display_fleet_trend_heatmap(trends_config):
+    """전체 VM 히트맵(VM × 시간) 화면"""
+    metric_options = {
+        "CPU 사용률 (%)": ('cpu_trend', 'CPU %'),
+        "메모리 사용률 (%)": ('memory_trend', '메모리 %'),
+        "디스크 읽기 (MB)": ('disk_trend', 'MB'),
+    }
+    bucket_options = {"5분": 5, "15분": 15, "30분": 30, "1시간": 60, "6시간": 360}
+    
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        selected_metric = st.selectbox("메트릭", list(metric_options.keys()), key="trend_heatmap_metric")
+    with col2:
+        selected_bucket = st.selectbox("집계 구간", list(bucket_options.keys()), index=1, key="trend_heatmap_bucket")
+    with col3:
+        aggregation = st.selectbox("구간 집계", ["평균", "최대"], key="trend_heatmap_aggregation")
+    with col4:
+        sort_by = st.selectbox("정렬 기준", ["피크", "평균"], key="trend_heatmap_sort")
+    
+    metric_key, colorbar_title = metric_options[selected_metric]
+    vm_names, bucket_times, matrix = build_trend_matrix(
+        get_trend_arrays()[metric_key],
+        bucket_minutes=bucket_options[selected_bucket],
+        aggregation='max' if aggregation == "최대" else 'mean'
+    )
+    
+    if not vm_names:
+        st.info(f"{selected_metric} 추이 데이터가 없습니다.")
+        return
+    
+    vm_names, matrix = sort_matrix_rows(vm_names, matrix, sort_by='mean' if sort_by == "평균" else 'peak')
+    
+    # VM이 1대면 슬라이더 범위(min == max)를 만들 수 없으므로 그대로 표시
+    max_rows = len(vm_names)
+    if len(vm_names) > 1:
+        max_rows = st.slider(
+            "표시할 VM 수 (정렬 상위)", min_value=1, max_value=len(vm_names),
+            value=min(len(vm_names), 100), key="trend_heatmap_rows"
+        )
+    
+    fig = create_fleet_heatmap_chart(
+        vm_names[:max_rows],
+        bucket_times,
+        matrix[:max_rows],
+        title=f'🔥 전체 VM {selected_metric} 히트맵 - {trends_config["period"]} ({selected_bucket} {aggregation})',
+        colorbar_title=colorbar_title
+    )
+    st.plotly_chart(fig, use_container_width=True)
+
+TREND_METRIC_LABELS = {
+    'cpu_trend': 'CPU 사용률 (%)',
+    'memory_trend': '메모리 사용률 (%)',
+    'disk_trend': '디스크 읽기 (MB)',
+}
+
+def detect_fleet_anomalies(trend_arrays, bucket_minutes=15, window=16, z_threshold=3.0, sustain=3):
+    """전체 VM 추이에서 급증 / 임계값 지속 구간 탐지 (메트릭마다 VM × 시간 행렬 1회 연산)
+    
+    Returns:
+        (events, ranking) - 이상 구간 DataFrame 과 VM 순위 DataFrame
+        (VM 순위: 총 이상 시간 → 최대 z-score 순)
+    """
+    import numpy as np
+    import pandas as pd
+    from trend_anomaly import METRIC_RULES, SPIKE, detect_anomalies
+    
+    frames = []
+    for metric_key in TREND_METRIC_KEYS:
+        vm_names, bucket_times, matrix = build_trend_matrix(
+            trend_arrays[metric_key], bucket_minutes=bucket_minutes, aggregation='mean'
+        )
+        if not vm_names:
+            continue
+        rules = METRIC_RULES[metric_key]
+        found = detect_anomalies(matrix, window=window, z_threshold=z_threshold,
+                                 level=rules['level'], sustain=sustain, min_std=rules['min_std'])
+        if len(found['rows']) == 0:
+            continue
+        bucket_epochs = bucket_times.astype('int64')
+        # 임계값이 없는 메트릭(디스크)은 급증만 탐지되므로 지속 라벨에 임계값을 넣지 않음
+        sustained_label = f"임계값({rules['level']:g}) 지속" if rules['level'] is not None else "임계값 지속"
+        frames.append(pd.DataFrame({
+            'vm_name': np.asarray(vm_names, dtype=object)[found['rows']],
+            'metric': TREND_METRIC_LABELS[metric_key],
+            'kind': np.where(found['kinds'] == SPIKE, '급증 (z-score)', sustained_label),
+            'start_epoch': bucket_epochs[found['starts']],
+            'end_epoch': bucket_epochs[found['ends'] - 1] + bucket_minutes * 60,
+            'duration_minutes': (found['ends'] - found['starts']) * bucket_minutes,
+            'peak': found['peaks'],
+            'max_z': found['max_z'],
+            'baseline': found['baselines']
+        }))
+    
+    if not frames:
+        return pd.DataFrame(), pd.DataFrame()
+    
+    events = pd.concat(frames, ignore_index=True)
+    ranking = events.groupby('vm_name', sort=False).agg(
+        anomaly_count=('kind', 'size'),
+        anomaly_minutes=('duration_minutes', 'sum'),
+        max_z=('max_z', 'max'),
+        metrics=('metric', lambda metrics: ', '.join(sorted(set(metrics)))),
+        last_end_epoch=('end_epoch', 'max')
+    ).reset_index()
+    ranking = ranking.sort_values(['anomaly_minutes', 'max_z'], ascending=False, na_position='last', kind='stable')
+    ranking.insert(0, 'rank', np.arange(1, len(ranking) + 1))
+    
+    rank_of = dict(zip(ranking['vm_name'], ranking['rank']))
+    events['rank'] = events['vm_name'].map(rank_of)
+    events = events.sort_values(['rank', 'start_epoch'], kind='stable').reset_index(drop=True)
+    return events, ranking.reset_index(drop=True)
+
+def display_trend_anomalies(trends_config):
+    """추이 섹션 상단의 전체 VM 이상 탐지 결과 (순위 + 이상 구간)"""
+    bucket_options = {"5분": 5, "15분": 15, "30분": 30, "1시간": 60}
+    
+    with st.expander("🚨 전체 VM 이상 탐지", expanded=True):
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            selected_bucket = st.selectbox("분석 구간", list(bucket_options.keys()), index=1, key="anomaly_bucket")
+        with col2:
+            window = st.number_input("기준선 구간 수", min_value=4, max_value=96, value=16,
+                                     help="직전 N개 구간의 평균/표준편차를 기준선으로 사용합니다.",
+                                     key="anomaly_window")
+        with col3:
+            z_threshold = st.number_input("z-score 임계값", min_value=1.0, max_value=10.0, value=3.0, step=0.5,
+                                          key="anomaly_z_threshold")
+        with col4:
+            sustain = st.number_input("지속 구간 수 (임계값 초과)", min_value=1, max_value=48, value=3,
+                                      help="CPU/메모리 90% 이상이 N개 구간 연속이면 이상으로 표시합니다.",
+                                      key="anomaly_sustain")
+        
+        bucket_minutes = bucket_options[selected_bucket]
+        started = time.perf_counter()
+        events, ranking = detect_fleet_anomalies(
+            get_trend_arrays(), bucket_minutes=bucket_minutes,
+            window=int(window), z_threshold=float(z_threshold), sustain=int(sustain)
+        )
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        st.caption(f"⏱️ {len(st.session_state.get('vm_trends', {}))}개 VM 분석 {elapsed_ms:.0f}ms "
+                   f"({trends_config['period']}, {selected_bucket} 구간)")
+        
+        if events.empty:
+            st.success("✅ 이상 구간이 없습니다.")
+            return
+        
+        st.warning(f"⚠️ 이상 VM {len(ranking)}개, 이상 구간 {len(events)}개")
+        
+        ranking_df = ranking.copy()
+        ranking_df['last_end'] = epoch_to_kst_text(ranking_df['last_end_epoch'], '%m-%d %H:%M')
+        st.dataframe(
+            ranking_df[['rank', 'vm_name', 'anomaly_count', 'anomaly_minutes', 'max_z', 'metrics', 'last_end']],
+            column_config={
+                'rank': st.column_config.NumberColumn("순위"),
+                'vm_name': "VM 이름",
+                'anomaly_count': st.column_config.NumberColumn("이상 구간 수"),
+                'anomaly_minutes': st.column_config.NumberColumn("총 이상 시간", format="%d분"),
+                'max_z': st.column_config.NumberColumn("최대 z-score", format="%.1f"),
+                'metrics': "메트릭",
+                'last_end': "최근 종료 (KST)"
+            },
+            hide_index=True,
+            use_container_width=True
+        )
+        
+        events_df = events.copy()
+        events_df['start_time'] = epoch_to_kst_text(events_df['start_epoch'], '%m-%d %H:%M')
+        events_df['end_time'] = epoch_to_kst_text(events_df['end_epoch'], '%m-%d %H:%M')
+        st.markdown("**이상 구간**")
+        st.dataframe(
+            events_df[['rank', 'vm_name', 'metric', 'kind', 'start_time', 'end_time',
+                       'duration_minutes', 'peak', 'baseline', 'max_z']],
+            column_config={
+                'rank': st.column_config.NumberColumn("순위"),
+                'vm_name': "VM 이름",
+                'metric': "메트릭",
+                'kind': "유형",
+                'start_time': "시작 (KST)",
+                'end_time': "종료 (KST)",
+                'duration_minutes': st.column_config.NumberColumn("지속 시간", format="%d분"),
+                'peak': st.column_config.NumberColumn("최대값", format="%.1f"),
+                'baseline': st.column_config.NumberColumn("기준선", format="%.1f"),
+                'max_z': st.column_config.NumberColumn("최대 z-score", format="%.1f")
+            },
+            hide_index=True,
+            use_container_width=True
+        )
+
+FLEET_PERCENTILE_GROUPS = {
+    "전체": (),
+    "계정": ('account',),
+    "리전": ('region',),
+    "VM 크기": ('vm_size',),
+    "계정 + 리전 + VM 크기": ('account', 'region', 'vm_size'),
+}
+FLEET_PERCENTILE_PERIODS = {"최근 24시간": 24, "최근 7일": 24 * 7, "최근 30일": 24 * 30, "저장된 전체 기간": None}
+
+def fleet_percentiles(sketch_store, group_by, hours=None):
+    """구간 스케치를 병합해 그룹별 CPU / 메모리 p50·p95·p99 계산 (원본 포인트 재조회 없음)
+    
+    두 메트릭을 구간 파일 한 번 순회로 병합하며, 새로 저장된 파일이 없으면 캐시된 병합 결과를 사용합니다.
+    """
+    import pandas as pd
+    from quantile_sketch import QUANTILES
+    
+    since = time.time() - hours * 3600 if hours else None
+    rows = {}
+    merged = sketch_store.merged_metrics(('cpu', 'memory'), group_by=group_by, since=since)
+    for metric, groups in merged.items():
+        for group, sketch in groups.items():
+            row = rows.setdefault(group, dict(zip(group_by, group)))
+            for q in QUANTILES:
+                row[f"{metric}_p{round(q * 100)}"] = sketch.quantile(q)
+            row[f"{metric}_hours"] = sketch.count / 60
+    return pd.DataFrame(list(rows.values()))
+
+def display_fleet_percentiles():
+    """저장된 분위수 스케치로 전체 VM CPU / 메모리 백분위 표시"""
+    from quantile_sketch import SketchStore
+    
+    sketch_store = SketchStore()
+    if not sketch_store.bucket_starts():
+        return
+    
+    st.markdown("---")
+    st.subheader("📐 전체 VM 백분위 (분위수 스케치)")
+    col1, col2 = st.columns(2)
+    with col1:
+        selected_group = st.selectbox("그룹 기준", list(FLEET_PERCENTILE_GROUPS.keys()), key="fleet_percentile_group")
+    with col2:
+        selected_period = st.selectbox("기간", list(FLEET_PERCENTILE_PERIODS.keys()), key="fleet_percentile_period")
+    
+    group_by = FLEET_PERCENTILE_GROUPS[selected_group]
+    percentile_df = fleet_percentiles(sketch_store, group_by, FLEET_PERCENTILE_PERIODS[selected_period])
+    if percentile_df.empty:
+        st.info(f"{selected_period} 동안 수집된 추이 데이터가 없습니다.")
+        return
+    
+    st.caption("24시간 추이 수집 때마다 시간 구간별 스케치에 누적되며, 백분위는 상대 오차 1% 이내입니다. "
+               "포인트는 수집 간격(분)만큼 가중합니다.")
+    percent_columns = {
+        f"{metric}_p{percentile}": st.column_config.NumberColumn(f"{label} p{percentile}", format="%.1f%%")
+        for metric, label in (('cpu', 'CPU'), ('memory', '메모리'))
+        for percentile in (50, 95, 99)
+    }
+    columns = list(group_by) + [column for column in percent_columns if column in percentile_df.columns]
+    columns += [column for column in ('cpu_hours', 'memory_hours') if column in percentile_df.columns]
+    st.dataframe(
+        percentile_df.reindex(columns=columns).sort_values('cpu_p95' if 'cpu_p95' in columns else columns[-1], ascending=False),
+        column_config={
+            'account': "계정",
+            'region': "리전",
+            'vm_size': "VM 크기",
+            **percent_columns,
+            'cpu_hours': st.column_config.NumberColumn("CPU 데이터 (VM·시간)", format="%.0f"),
+            'memory_hours': st.column_config.NumberColumn("메모리 데이터 (VM·시간)", format="%.0f")
+        },
+        hide_index=True,
+        use_container_width=True
+    )
+
+METRIC_HISTORY_TIER_LABELS = {'raw': "원본", '5m': "5분", '1h': "1시간"}
+
+def display_metric_history_status(history):
+    """메트릭 이력 단계별 저장 현황과 수동 압축"""
+    import pandas as pd
+    
+    with st.expander("💾 메트릭 이력 저장 현황", expanded=False):
+        summary_df = pd.DataFrame(history.summary())
+        if not summary_df['files'].any():
+            st.info("💡 아직 저장된 메트릭 이력이 없습니다. 추이 데이터를 수집하면 자동으로 저장됩니다.")
+            return
+        
+        st.caption("추이 수집 때마다 원본 포인트를 저장하고 완료된 구간을 5분 / 1시간 단계(min / max / 평균 / 개수)로 압축합니다. "
+                   "보존 기간이 지난 파일은 상위 단계로 압축된 뒤에만 삭제됩니다.")
+        summary_df['tier'] = summary_df['tier'].map(METRIC_HISTORY_TIER_LABELS)
+        st.dataframe(
+            summary_df,
+            column_config={
+                'tier': "단계",
+                'files': st.column_config.NumberColumn("일 파일", format="%d"),
+                'size_mb': st.column_config.NumberColumn("크기", format="%.2f MB"),
+                'oldest': "가장 오래된 날 (UTC)",
+                'newest': "가장 최근 날 (UTC)",
+                'horizon_days': st.column_config.NumberColumn("보존 기간", format="%.0f일")
+            },
+            hide_index=True,
+            use_container_width=True
+        )
+        if st.button("🗜️ 지금 압축", key="metric_history_compact"):
+            result = history.compact()
+            st.success(f"✅ 5분 구간 {result.get('5m', 0)}개, 1시간 구간 {result.get('1h', 0)}개를 새로 만들고 "
+                       f"보존 기간이 지난 파일 {result.get('removed_files', 0)}개를 삭제했습니다.")
+
 def create_summary_charts(df):
     """요약 차트 생성"""
+    import plotly.express as px
+    
     if df.empty:
         st.info("📊 표시할 데이터가 없습니다.")
         return
@@ -817,7 +2139,7 @@ def create_summary_charts(df):
     
     with col1:
         # 계정별 백업 작업 수
-        account_counts = df.groupby('account_name').size().reset_index(name='count')
+        account_counts = df.groupby('account_name', observed=True).size().reset_index(name='count')
         fig1 = px.bar(
             account_counts, 
             x='account_name', 
@@ -833,6 +2155,7 @@ def create_summary_charts(df):
         # 상태별 백업 작업 분포
         status_counts = df['status'].value_counts().reset_index()
         status_counts.columns = ['status', 'count']
+        status_counts = status_counts[status_counts['count'] > 0]
         
         colors = {'Completed': '#28a745', 'Failed': '#dc3545', 'InProgress': '#ffc107'}
         fig2 = px.pie(
@@ -867,10 +2190,345 @@ def display_metrics(df):
         st.metric("실패한 작업", failed_jobs)
     
     with col4:
-        today = datetime.now().date()
-        today_jobs = len(df[df['start_time_raw'].dt.date == today]) if 'start_time_raw' in df.columns else 0
+        day_start, day_end = kst_day_epoch_range()
+        today_jobs = int(((df['start_epoch'] >= day_start) & (df['start_epoch'] < day_end)).fillna(False).sum())
         st.metric("오늘 실행", today_jobs)
 
+def display_backup_duration_regressions(df):
+    """보호 항목별 소요 시간 기준선 대비 회귀 작업과 기준선 요약 (증가율 높은 순)"""
+    import pandas as pd
+    from backup_duration_baseline import DurationBaselines, WINDOW_RUNS, REGRESSION_RATIO
+    
+    if 'entity_name' not in df.columns or df.empty:
+        return
+    
+    baselines = DurationBaselines()
+    finished = df[df['duration_seconds'].notna() & df['entity_name'].notna()]
+    regressions = []
+    for job in finished[['account_name', 'vault_name', 'entity_name', 'job_id', 'start_epoch', 'duration_seconds']].to_dict('records'):
+        verdict = baselines.verdict(job['account_name'], job['vault_name'], job['entity_name'], job['job_id'])
+        if verdict and verdict['regressed']:
+            regressions.append({
+                'account_name': job['account_name'],
+                'vault_name': job['vault_name'],
+                'entity_name': job['entity_name'],
+                'start_epoch': job['start_epoch'],
+                'duration_minutes': job['duration_seconds'] / 60,
+                'median_minutes': verdict['median'] / 60,
+                'p90_minutes': verdict['p90'] / 60,
+                'ratio': verdict['ratio']
+            })
+    
+    def minutes_column(label):
+        return st.column_config.NumberColumn(label, format="%.0f분")
+    
+    st.subheader("🐢 백업 소요 시간 회귀")
+    if regressions:
+        regressions_df = pd.DataFrame(regressions).sort_values('ratio', ascending=False)
+        regressions_df.insert(3, 'start_time', epoch_to_kst_text(regressions_df.pop('start_epoch')))
+        st.warning(f"⚠️ 기준선 대비 {REGRESSION_RATIO:g}배 이상 오래 걸린 백업 작업 {len(regressions_df)}개")
+        st.dataframe(
+            regressions_df,
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                'account_name': "계정명",
+                'vault_name': "Vault명",
+                'entity_name': "보호 항목",
+                'start_time': "시작 시간",
+                'duration_minutes': minutes_column("소요 시간"),
+                'median_minutes': minutes_column("기준 중앙값"),
+                'p90_minutes': minutes_column("기준 p90"),
+                'ratio': st.column_config.NumberColumn("중앙값 대비", format="%.1f배")
+            }
+        )
+    else:
+        st.caption(f"보호 항목별 기준선(최근 {WINDOW_RUNS}회 중앙값 / p90) 대비 회귀한 작업이 없습니다.")
+    
+    accounts = set(df['account_name'].astype(str))
+    summary = [row for row in baselines.summary() if row['account_name'] in accounts]
+    if summary:
+        with st.expander(f"📏 보호 항목별 소요 시간 기준선 ({len(summary)}개)"):
+            summary_df = pd.DataFrame(summary).sort_values(['growth', 'regressions'], ascending=False, na_position='last')
+            for column in ['median', 'p90', 'last']:
+                summary_df[column] = summary_df[column] / 60
+            st.dataframe(
+                summary_df,
+                use_container_width=True,
+                hide_index=True,
+                column_config={
+                    'account_name': "계정명",
+                    'vault_name': "Vault명",
+                    'entity_name': "보호 항목",
+                    'runs': st.column_config.NumberColumn("실행 수", help=f"최근 {WINDOW_RUNS}회까지"),
+                    'median': minutes_column("중앙값"),
+                    'p90': minutes_column("p90"),
+                    'last': minutes_column("최근"),
+                    'growth': st.column_config.NumberColumn(
+                        "증가율", format="%.2f배", help="기준선 최근 절반 중앙값 / 이전 절반 중앙값 (1보다 크면 백업 시간 증가 추세)"
+                    ),
+                    'regressions': st.column_config.NumberColumn("회귀 작업 수")
+                }
+            )
+
+def display_backup_coverage(accounts, selected_accounts):
+    """VM 백업 커버리지 - VM 인벤토리와 보호 항목을 조인해 계정별 미보호 VM / 오래된 복구 지점 표시"""
+    import pandas as pd
+    from backup_coverage import (CACHE_TTL_SECONDS, PROTECTED, STALE, STALE_RECOVERY_HOURS, STOPPED, UNKNOWN,
+                                 UNPROTECTED, build_protection_index, join_coverage)
+    
+    labels = {PROTECTED: "✅ 정상", STALE: "⚠️ 복구 지점 오래됨", STOPPED: "⏸️ 보호 중지", UNPROTECTED: "❌ 미보호",
+              UNKNOWN: "❓ 조회 불완전"}
+    
+    st.markdown("---")
+    st.subheader("🛡️ VM 백업 커버리지")
+    
+    vms_df = st.session_state.get('azure_vms')
+    if vms_df is None or vms_df.empty:
+        st.info("💡 VM 모니터링 탭에서 VM 목록을 먼저 조회하면 백업되지 않은 VM을 확인할 수 있습니다.")
+        return
+    
+    col1, col2, col3 = st.columns([1, 1, 1])
+    with col1:
+        running_only = st.checkbox("▶️ 실행 중인 VM만", value=True, key="coverage_running_only")
+    with col2:
+        force_refresh = st.checkbox(
+            "🔁 보호 항목 새로 조회",
+            value=False,
+            help=f"끄면 {CACHE_TTL_SECONDS // 60}분 이내에 조회한 보호 항목 목록을 다시 사용합니다.",
+            key="coverage_force_refresh"
+        )
+    with col3:
+        check_coverage = st.button("🛡️ 백업 커버리지 확인", key="coverage_button")
+    
+    if check_coverage:
+        inventory_accounts = set(vms_df['account_name'].astype(str))
+        target_accounts = [acc for acc in accounts if acc['name'] in selected_accounts and acc['name'] in inventory_accounts]
+        if not target_accounts:
+            st.warning("⚠️ 선택한 계정의 VM 조회 결과가 없습니다.")
+            return
+        
+        records = []
+        fetched = {}
+        incomplete = []
+        with st.spinner("🔍 Vault별 보호 항목 조회 중..."):
+            for account in target_accounts:
+                account_records, fetched_at, complete = get_protected_items(account, force_refresh)
+                if account_records is not None:
+                    records.extend(account_records)
+                    fetched[account['name']] = fetched_at
+                    if not complete:
+                        incomplete.append(account['name'])
+        
+        # VM 리소스 ID 해시 인덱스로 조인 (VM마다 조회 1회)
+        index = build_protection_index(records)
+        vms = vms_df[vms_df['account_name'].isin(list(fetched))].to_dict('records')
+        subscription_by_account = {acc['name']: acc['subscription_id'] for acc in target_accounts}
+        st.session_state['backup_coverage'] = pd.DataFrame(
+            join_coverage(vms, index, subscription_by_account, incomplete_accounts=incomplete)
+        )
+        st.session_state['backup_coverage_fetched'] = fetched
+        st.session_state['backup_coverage_incomplete'] = incomplete
+    
+    coverage_df = st.session_state.get('backup_coverage')
+    if coverage_df is None:
+        return
+    if coverage_df.empty:
+        st.info("📊 커버리지를 계산할 VM이 없습니다.")
+        return
+    
+    KST = timezone(timedelta(hours=9))
+    fetched = st.session_state.get('backup_coverage_fetched', {})
+    st.caption("🕐 보호 항목 조회 시각: " + ", ".join(
+        f"{name} {datetime.fromtimestamp(fetched_at, KST).strftime('%H:%M:%S')}" for name, fetched_at in fetched.items()
+    ))
+    incomplete = st.session_state.get('backup_coverage_incomplete', [])
+    if incomplete:
+        st.warning(f"⚠️ {', '.join(incomplete)}: 일부 Vault의 보호 항목을 조회하지 못해 보호 항목이 없는 VM을 "
+                   f"'{labels[UNKNOWN]}'으로 표시합니다 (미보호 VM / 커버리지에서 제외)")
+        st.info("💡 해결방법: 🔁 보호 항목 새로 조회를 켜고 다시 확인하세요.")
+    
+    if running_only:
+        coverage_df = coverage_df[coverage_df['power_state'] == 'VM running']
+        if coverage_df.empty:
+            st.info("📊 실행 중인 VM이 없습니다.")
+            return
+    
+    # 계정별 요약
+    summary = pd.crosstab(coverage_df['account_name'], coverage_df['coverage']).reindex(
+        columns=[PROTECTED, STALE, STOPPED, UNPROTECTED, UNKNOWN], fill_value=0
+    )
+    summary['total'] = summary.sum(axis=1)
+    # 커버리지는 보호 여부를 확인한 VM 기준 (조회 불완전 VM 제외)
+    known = summary['total'] - summary[UNKNOWN]
+    summary['coverage_percent'] = ((known - summary[UNPROTECTED]) / known.where(known > 0)) * 100
+    
+    total_vms = int(summary['total'].sum())
+    unknown_count = int(summary[UNKNOWN].sum())
+    unprotected_count = int(summary[UNPROTECTED].sum())
+    attention_count = int(summary[STALE].sum() + summary[STOPPED].sum())
+    known_vms = total_vms - unknown_count
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("대상 VM", total_vms)
+    with col2:
+        coverage_text = f"{(known_vms - unprotected_count) / known_vms * 100:.1f}%" if known_vms else "-"
+        st.metric("백업 커버리지", coverage_text)
+    with col3:
+        st.metric("미보호 VM", unprotected_count, delta=f"조회 불완전 {unknown_count}대" if unknown_count else None,
+                  delta_color="off")
+    with col4:
+        st.metric("복구 지점 확인 필요", attention_count)
+    
+    st.dataframe(
+        summary.reset_index().rename(columns={'account_name': '계정명', 'total': '전체', **labels}),
+        use_container_width=True,
+        hide_index=True,
+        column_config={'coverage_percent': st.column_config.NumberColumn("커버리지", format="%.1f%%")}
+    )
+    
+    unprotected = coverage_df[coverage_df['coverage'] == UNPROTECTED]
+    if not unprotected.empty:
+        st.error(f"🚨 백업되지 않은 VM {len(unprotected)}개")
+        st.dataframe(
+            unprotected[['account_name', 'vm_name', 'resource_group', 'power_state']],
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                'account_name': "계정명",
+                'vm_name': "VM 이름",
+                'resource_group': "리소스 그룹",
+                'power_state': "전원 상태"
+            }
+        )
+    
+    attention = coverage_df[coverage_df['coverage'].isin([STALE, STOPPED])].sort_values(
+        'recovery_age_hours', ascending=False, na_position='first'
+    )
+    if not attention.empty:
+        st.warning(f"⚠️ 마지막 복구 지점이 {STALE_RECOVERY_HOURS}시간보다 오래되었거나 보호가 중지된 VM {len(attention)}개")
+        attention = attention.assign(
+            coverage=attention['coverage'].map(labels),
+            last_recovery_time=epoch_to_kst_text(attention['last_recovery_epoch'])
+        )
+        st.dataframe(
+            attention[['account_name', 'vm_name', 'coverage', 'vault_name', 'protection_state',
+                       'last_backup_status', 'last_recovery_time', 'recovery_age_hours']],
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                'account_name': "계정명",
+                'vm_name': "VM 이름",
+                'coverage': "상태",
+                'vault_name': "Vault명",
+                'protection_state': "보호 상태",
+                'last_backup_status': "마지막 백업 결과",
+                'last_recovery_time': "마지막 복구 지점",
+                'recovery_age_hours': st.column_config.NumberColumn("경과 시간", format="%.0f시간")
+            }
+        )
+    
+    if unprotected.empty and attention.empty and not unknown_count:
+        st.success("✅ 모든 VM이 백업되고 있으며 최근 복구 지점이 있습니다.")
+
+# 수집 실행 추적 (waterfall)
+TRACE_RUN_LABELS = {
+    'vm_inventory': "VM 조회",
+    'vm_trends': "VM 추이 수집",
+    'vmss_inventory': "VMSS 조회",
+    'backup_jobs': "백업 조회"
+}
+TRACE_STAGE_COLORS = {
+    'run': '#4c566a', 'account': '#5e81ac', 'tenant': '#5e81ac', 'resource': '#88c0d0',
+    'auth': '#b48ead', 'list': '#a3be8c', 'detail': '#ebcb8b', 'metrics': '#d08770',
+    'store': '#8fbcbb', 'render': '#bf616a'
+}
+
+def create_trace_waterfall_chart(rows):
+    """span 행 목록을 가로 막대 waterfall 로 렌더링 (단계별 색상, 임계 경로는 테두리 강조)"""
+    import plotly.graph_objects as go
+    
+    fig = go.Figure()
+    for stage, color in TRACE_STAGE_COLORS.items():
+        indexes = [i for i, row in enumerate(rows) if row['stage'] == stage]
+        if not indexes:
+            continue
+        fig.add_trace(go.Bar(
+            name=stage,
+            orientation='h',
+            y=indexes,
+            x=[rows[i]['duration'] for i in indexes],
+            base=[rows[i]['offset'] for i in indexes],
+            marker=dict(
+                color=color,
+                line=dict(
+                    color=['#000000' if rows[i]['critical'] else color for i in indexes],
+                    width=[2 if rows[i]['critical'] else 0 for i in indexes]
+                )
+            ),
+            customdata=[[rows[i]['name'], rows[i]['error'] or '-'] for i in indexes],
+            hovertemplate='%{customdata[0]}<br>시작 +%{base:.2f}s / %{x:.2f}s<br>오류: %{customdata[1]}<extra></extra>'
+        ))
+    fig.update_layout(
+        barmode='overlay',
+        height=min(2000, max(300, 20 * len(rows) + 120)),
+        xaxis=dict(title='실행 시작 후 경과 (초)'),
+        yaxis=dict(
+            autorange='reversed',
+            tickmode='array',
+            tickvals=list(range(len(rows))),
+            ticktext=[f"{'· ' * row['depth']}{row['name']}" for row in rows]
+        ),
+        legend=dict(orientation='h', y=1.02, yanchor='bottom')
+    )
+    return fig
+
+def display_last_run(*run_keys):
+    """세션에 보관된 마지막 수집 실행의 span 트리를 waterfall 로 표시"""
+    runs = st.session_state.get('trace_runs', {})
+    available = [key for key in run_keys if key in runs]
+    if not available:
+        return
+    
+    import pandas as pd
+    from collector_tracing import critical_path, stage_totals, waterfall_rows
+    
+    with st.expander("⏱️ 마지막 실행 추적 (waterfall)", expanded=False):
+        run_key = available[0]
+        if len(available) > 1:
+            run_key = st.radio(
+                "실행 선택",
+                available,
+                format_func=lambda key: TRACE_RUN_LABELS.get(key, key),
+                horizontal=True,
+                key=f"trace_run_select_{run_keys[0]}"
+            )
+        run = runs[run_key]
+        rows, hidden_count = waterfall_rows(run, max_rows=150)
+        path = critical_path(run)
+        
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("총 소요 시간", f"{run.duration:.1f}초")
+        with col2:
+            st.metric("span 수", f"{len(rows) + hidden_count:,}")
+        with col3:
+            error_count = sum(1 for row in rows if row['error'])
+            st.metric("오류 span", error_count)
+        
+        if len(path) > 1:
+            st.caption("🔥 임계 경로: " + " → ".join(f"{node.name} ({node.duration:.1f}초)" for node in path[1:]))
+        st.plotly_chart(create_trace_waterfall_chart(rows), use_container_width=True)
+        if hidden_count:
+            st.caption(f"ℹ️ 짧은 span {hidden_count:,}개는 차트에서 생략했습니다.")
+        
+        totals = stage_totals(run)
+        if totals:
+            st.dataframe(pd.DataFrame([
+                {'단계': stage, '합계 시간(초)': round(seconds, 2)}
+                for stage, seconds in sorted(totals.items(), key=lambda item: -item[1])
+            ]), use_container_width=True, hide_index=True)
+
 def display_vm_monitoring():
     """Azure VM 및 VMSS 모니터링 화면"""
     
@@ -885,6 +2543,10 @@ def display_vm_monitoring():
 
 def display_vm_instances():
     """Azure VM 인스턴스 모니터링"""
+    import numpy as np
+    import pandas as pd
+    import plotly.express as px
+    
     st.subheader("🖥️ Azure Virtual Machine 모니터링")
     
     # 설정 파일 로드
@@ -922,6 +2584,14 @@ def display_vm_instances():
     if collect_metrics:
         st.info("💡 메트릭 수집은 실행 중인 VM에 대해서만 진행됩니다.")
     
+    inventory_mode = st.radio(
+        "🔎 조회 방식",
+        INVENTORY_MODES,
+        horizontal=True,
+        help="Resource Graph는 선택한 모든 구독의 VM 목록과 전원 상태를 테넌트당 페이지 쿼리 몇 번으로 가져옵니다.",
+        key="vm_inventory_mode"
+    )
+    
     # VM 조회 버튼
     if st.button("🚀 Azure VM 상태 조회", type="primary"):
         if not selected_accounts:
@@ -939,53 +2609,80 @@ def display_vm_instances():
         overall_status = st.empty()
         
         all_vms = []
+        partial_accounts = {}  # 계정명 → 부분 결과 사유
+        stale_accounts = {}  # 계정명 → 회로 차단(stale 데이터) 안내
         total_accounts = len(selected_configs)
         
-        for i, account in enumerate(selected_configs):
-            # 계정별 섹션
-            with st.expander(f"☁️ [{i+1}/{total_accounts}] {account['name']}", expanded=True):
-                
-                # 개별 계정 진행상황
-                progress_bar = st.progress(0)
-                status_text = st.empty()
-                
-                # 계정 정보 표시
-                col1, col2 = st.columns(2)
-                with col1:
-                    st.write(f"**구독 ID:** {account['subscription_id'][:8]}...")
-                with col2:
-                    st.write(f"**테넌트 ID:** {account['tenant_id'][:8]}...")
-                
-                # 작업 시작 시간 기록
-                start_time = time.time()
-                
-                vms = get_azure_vms(account, progress_bar, status_text, collect_metrics)
-                all_vms.extend(vms)
-                
-                # 작업 완료 시간 계산
-                elapsed_time = time.time() - start_time
-                
-                # 결과 요약 표시
-                if vms:
-                    st.success(f"✅ {len(vms)}개 Azure VM 조회 완료 ({elapsed_time:.1f}초 소요)")
-                else:
-                    st.info(f"ℹ️ Azure VM 없음 ({elapsed_time:.1f}초 소요)")
-            
-            # 전체 진행률 업데이트
-            overall_progress_value = (i + 1) / total_accounts
-            overall_progress.progress(overall_progress_value)
-            overall_status.text(f"🔄 {i+1}/{total_accounts} 계정 처리 완료 ({(overall_progress_value*100):.1f}%)")
-            
-            time.sleep(0.3)  # UI 업데이트를 위한 대기
+        with trace_run('vm_inventory', expect_render=True, mode=inventory_mode, accounts=total_accounts) as run:
+            if inventory_mode == INVENTORY_MODES[1]:
+                # 테넌트별 Resource Graph 일괄 조회
+                all_vms = display_resource_graph_run(selected_configs, 'vm', collect_metrics, partial_accounts)
+                overall_progress.progress(1.0)
+                overall_status.text(f"🔄 {total_accounts}/{total_accounts} 계정 처리 완료 (100.0%)")
+            else:
+                for i, account in enumerate(selected_configs):
+                    # 계정별 섹션
+                    with st.expander(f"☁️ [{i+1}/{total_accounts}] {account['name']}", expanded=True):
+                        
+                        # 개별 계정 진행상황
+                        progress_bar = st.progress(0)
+                        status_text = st.empty()
+                        
+                        # 계정 정보 표시
+                        col1, col2 = st.columns(2)
+                        with col1:
+                            st.write(f"**구독 ID:** {account['subscription_id'][:8]}...")
+                        with col2:
+                            st.write(f"**테넌트 ID:** {account['tenant_id'][:8]}...")
+                        
+                        # 작업 시작 시간 기록
+                        start_time = time.time()
+                        
+                        deadline = Deadline(ACCOUNT_DEADLINE_SECONDS['vm'], CALL_TIMEOUT_SECONDS)
+                        breaker = st.session_state.circuit_breakers.blocking(account['tenant_id'], account['subscription_id'])
+                        if not breaker:
+                            with span(account['name'], 'account', subscription=account['subscription_id']):
+                                vms = get_azure_vms(account, progress_bar, status_text, collect_metrics, deadline=deadline)
+                            remember_last_good('azure_vms', account, vms, since=start_time)
+                            # 이번 실패로 회로가 열렸으면 마지막 정상 데이터로 대체
+                            breaker = st.session_state.circuit_breakers.opened(account['tenant_id'], account['subscription_id'])
+                        if breaker:
+                            vms = use_last_good(breaker, account, 'azure_vms', stale_accounts, progress_bar, status_text)
+                        all_vms.extend(vms)
+                        
+                        # 작업 완료 시간 계산
+                        elapsed_time = time.time() - start_time
+                        
+                        # 결과 요약 표시
+                        if breaker:
+                            st.warning(f"🔌 마지막 정상 데이터 표시 (stale) - {stale_accounts[account['name']]}")
+                        elif deadline.partial:
+                            partial_accounts[account['name']] = deadline.reason
+                            st.warning(f"⏰ 부분 결과: {len(vms)}개 Azure VM만 조회됨 - {deadline.reason} ({elapsed_time:.1f}초 소요)")
+                        elif vms:
+                            st.success(f"✅ {len(vms)}개 Azure VM 조회 완료 ({elapsed_time:.1f}초 소요)")
+                        else:
+                            st.info(f"ℹ️ Azure VM 없음 ({elapsed_time:.1f}초 소요)")
+                    
+                    # 전체 진행률 업데이트
+                    overall_progress_value = (i + 1) / total_accounts
+                    overall_progress.progress(overall_progress_value)
+                    overall_status.text(f"🔄 {i+1}/{total_accounts} 계정 처리 완료 ({(overall_progress_value*100):.1f}%)")
+                    
+                    time.sleep(0.3)  # UI 업데이트를 위한 대기
+        st.session_state.setdefault('trace_runs', {})['vm_inventory'] = run
         
         # 결과 저장 (세션 상태)
-        st.session_state['azure_vms'] = all_vms
+        st.session_state['azure_vms'] = to_compact_frame(all_vms, VM_CATEGORY_COLUMNS)
         st.session_state['vm_last_update'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        st.session_state['vm_partial_accounts'] = partial_accounts
+        st.session_state['vm_stale_accounts'] = stale_accounts
         
         st.success(f"✅ 총 {len(all_vms)}개 Azure VM을 조회했습니다!")
         
     
     # VM 결과 표시
+    render = start_render(st.session_state.get('trace_runs', {}).get('vm_inventory'))
     if 'azure_vms' in st.session_state:
         st.markdown("---")
         
@@ -995,12 +2692,14 @@ def display_vm_instances():
             st.subheader("🖥️ Azure VM 모니터링 결과")
         with col2:
             st.caption(f"🕐 마지막 업데이트: {st.session_state.get('vm_last_update', 'N/A')}")
+        display_partial_accounts(st.session_state.get('vm_partial_accounts', {}))
+        display_stale_accounts(st.session_state.get('vm_stale_accounts', {}))
         
-        vms_data = st.session_state['azure_vms']
+        vms_df = st.session_state['azure_vms']
         
-        if vms_data:
-            # DataFrame 생성
-            df = pd.DataFrame(vms_data)
+        if not vms_df.empty:
+            # 세션에 보관된 압축 DataFrame을 그대로 사용
+            df = vms_df
             
             # 주요 지표
             col1, col2, col3, col4 = st.columns(4)
@@ -1018,7 +2717,7 @@ def display_vm_instances():
             with col4:
                 if collect_metrics:
                     # 메트릭이 수집된 VM 수 계산
-                    metrics_collected = len([vm for vm in df.to_dict('records') if vm.get('cpu_usage') != 'N/A'])
+                    metrics_collected = int(df[list(VM_METRIC_SCHEMA)].notna().any(axis=1).sum())
                     st.metric("메트릭 수집됨", f"{metrics_collected}개 VM")
                 else:
                     st.metric("메트릭 수집", "비활성화됨")
@@ -1030,7 +2729,7 @@ def display_vm_instances():
             
             with col1:
                 # 계정별 VM 수
-                account_counts = df.groupby('account_name').size().reset_index(name='count')
+                account_counts = df.groupby('account_name', observed=True).size().reset_index(name='count')
                 fig1 = px.bar(
                     account_counts, 
                     x='account_name', 
@@ -1046,6 +2745,7 @@ def display_vm_instances():
                 # 상태별 VM 분포
                 state_counts = df['power_state'].value_counts().reset_index()
                 state_counts.columns = ['power_state', 'count']
+                state_counts = state_counts[state_counts['count'] > 0]
                 
                 colors = {'VM running': '#28a745', 'VM stopped': '#dc3545', 'VM deallocated': '#6c757d'}
                 fig2 = px.pie(
@@ -1100,49 +2800,105 @@ def display_vm_instances():
                     index=2  # 기본값: 15분
                 )
             
+            # 로컬 메트릭 이력 (원본 → 5분 → 1시간 단계, 기간 / 간격에 맞는 가장 거친 단계에서 조회)
+            history = metric_history_store(config)
+            use_history = st.checkbox(
+                "💾 저장된 메트릭 이력 우선 사용",
+                value=True,
+                help="이전에 수집한 추이로 기간 전체를 같은 간격 이하로 답할 수 있는 VM은 Azure를 다시 조회하지 않습니다.",
+                key="trend_use_history"
+            )
+            display_metric_history_status(history)
+            
             # 24시간 메트릭 수집 버튼
             if st.button("🔄 24시간 추이 데이터 수집", key="collect_24h_metrics_main"):
                 with st.spinner(f"{selected_period} 메트릭 데이터를 {selected_interval} 간격으로 수집하는 중..."):
                     progress_bar = st.progress(0)
                     status_text = st.empty()
                     
-                    all_trends = {}
-                    for account in selected_accounts:
-                        account_info = next(acc for acc in accounts if acc['name'] == account)
-                        running_vms = [vm for vm in df.to_dict('records') if vm['account_name'] == account and vm['power_state'] == 'VM running']
-                        
-                        if running_vms:
-                            try:
-                                trends = get_vm_24h_metrics(
-                                    account_info, 
-                                    running_vms, 
-                                    progress_bar, 
-                                    status_text,
-                                    interval=interval_options[selected_interval],
-                                    hours=period_options[selected_period]
-                                )
-                                all_trends.update(trends)
-                            except Exception as e:
-                                st.warning(f"❌ {account} 계정의 메트릭 수집 실패: {str(e)}")
+                    # 전체 VM 백분위용 분위수 스케치 (수집한 추이를 구간 스케치에 누적)
+                    from quantile_sketch import SketchStore
+                    sketch_store = SketchStore()
+                    
+                    with trace_run('vm_trends', period=selected_period, interval=selected_interval) as run:
+                        all_trends = {}
+                        history_tiers = {}
+                        for account in selected_accounts:
+                            account_info = next(acc for acc in accounts if acc['name'] == account)
+                            running_vms = [vm for vm in df.to_dict('records') if vm['account_name'] == account and vm['power_state'] == 'VM running']
+                            
+                            if running_vms:
+                                try:
+                                    with span(account, 'account'):
+                                        if use_history:
+                                            with span('metric history', 'store'):
+                                                trends, running_vms, tiers = trends_from_history(
+                                                    history,
+                                                    account_info,
+                                                    running_vms,
+                                                    interval_options[selected_interval],
+                                                    period_options[selected_period]
+                                                )
+                                            all_trends.update(trends)
+                                            history_tiers.update(tiers)
+                                        if running_vms:
+                                            trends = get_vm_24h_metrics(
+                                                account_info, 
+                                                running_vms, 
+                                                progress_bar, 
+                                                status_text,
+                                                interval=interval_options[selected_interval],
+                                                hours=period_options[selected_period],
+                                                sketch_store=sketch_store,
+                                                history=history
+                                            )
+                                            all_trends.update(trends)
+                                except Exception as e:
+                                    st.warning(f"❌ {account} 계정의 메트릭 수집 실패: {str(e)}")
+                    st.session_state.setdefault('trace_runs', {})['vm_trends'] = run
                     
                     progress_bar.progress(1.0)
                     status_text.text("✅ 메트릭 수집 완료!")
                     
                     # 세션에 설정 정보와 함께 저장
                     st.session_state['vm_trends'] = all_trends
+                    st.session_state['vm_trend_arrays'] = flatten_trends(all_trends)
                     st.session_state['trends_config'] = {
                         'interval': selected_interval,
-                        'period': selected_period
+                        'period': selected_period,
+                        'history_tiers': history_tiers
                     }
             
             # 저장된 24시간 추이 데이터가 있으면 차트 표시
             if 'vm_trends' in st.session_state and st.session_state['vm_trends']:
                 config = st.session_state.get('trends_config', {'interval': '15분', 'period': '24시간'})
                 st.success(f"📊 {len(st.session_state['vm_trends'])}개 VM의 {config['period']} 추이 데이터를 표시합니다. ({config['interval']} 간격)")
+                history_tiers = config.get('history_tiers') or {}
+                if history_tiers:
+                    tier_counts = pd.Series(list(history_tiers.values())).value_counts()
+                    st.caption("💾 저장된 이력에서 조회한 VM: " + ", ".join(
+                        f"{METRIC_HISTORY_TIER_LABELS.get(tier, tier)} {count}개" for tier, count in tier_counts.items()
+                    ) + f" / Azure 조회 {len(st.session_state['vm_trends']) - len(history_tiers)}개")
+                
+                display_trend_anomalies(config)
+                
+                trend_view = st.radio(
+                    "보기 방식",
+                    ["단일 VM 상세", "전체 VM 오버레이 (WebGL)", "전체 VM 히트맵"],
+                    horizontal=True,
+                    key="trend_view_mode"
+                )
                 
-                # VM 선택
-                vm_names = list(st.session_state['vm_trends'].keys())
-                selected_vm = st.selectbox("분석할 VM 선택:", vm_names, key="trend_vm_select_main")
+                if trend_view == "전체 VM 오버레이 (WebGL)":
+                    display_fleet_trend_overlay(st.session_state['vm_trends'], config)
+                    selected_vm = None
+                elif trend_view == "전체 VM 히트맵":
+                    display_fleet_trend_heatmap(config)
+                    selected_vm = None
+                else:
+                    # VM 선택
+                    vm_names = list(st.session_state['vm_trends'].keys())
+                    selected_vm = st.selectbox("분석할 VM 선택:", vm_names, key="trend_vm_select_main")
                 
                 if selected_vm and selected_vm in st.session_state['vm_trends']:
                     vm_trend = st.session_state['vm_trends'][selected_vm]
@@ -1202,7 +2958,7 @@ def display_vm_instances():
                                 x='timestamp',
                                 y='value',
                                 title=f'💾 {selected_vm} - 디스크 읽기 {period_text} 추이 ({interval_text} 간격)',
-                                labels={'value': 'Bytes', 'timestamp': '시간'}
+                                labels={'value': 'MB', 'timestamp': '시간'}
                             )
                             fig_disk_trend.update_layout(height=400)
                             st.plotly_chart(fig_disk_trend, use_container_width=True)
@@ -1236,85 +2992,43 @@ def display_vm_instances():
             else:
                 st.info("💡 24시간 추이 분석을 위해 위의 '24시간 추이 데이터 수집' 버튼을 클릭하세요.")
             
+            display_fleet_percentiles()
+            
             # 메트릭 차트 (메트릭 수집이 활성화된 경우에만 표시)
             if collect_metrics:
                 st.markdown("---")
                 st.subheader("📊 VM 성능 메트릭")
                 
-                # 메트릭이 수집된 VM들만 필터링
-                metrics_df = df[df['cpu_usage'] != 'N/A'].copy()
+                # 메트릭이 수집된 VM들만 필터링 (수집기가 저장한 숫자 컬럼 그대로 사용)
+                metrics_df = df[df[list(VM_METRIC_SCHEMA)].notna().any(axis=1)]
                 
                 if not metrics_df.empty:
-                    col1, col2, col3 = st.columns(3)
-                    
-                    with col1:
-                        # CPU 사용률 차트
-                        try:
-                            metrics_df['cpu_numeric'] = pd.to_numeric(metrics_df['cpu_usage'].str.replace('%', ''), errors='coerce')
-                            cpu_chart_df = metrics_df.dropna(subset=['cpu_numeric'])
-                            
-                            if not cpu_chart_df.empty:
-                                fig_cpu = px.bar(
-                                    cpu_chart_df.head(10),  # 상위 10개만 표시
-                                    x='vm_name',
-                                    y='cpu_numeric',
-                                    title='💻 CPU 사용률 (%)',
-                                    color='cpu_numeric',
-                                    color_continuous_scale='Reds'
-                                )
-                                fig_cpu.update_xaxes(tickangle=45)
-                                fig_cpu.update_layout(showlegend=False, height=400)
-                                st.plotly_chart(fig_cpu, use_container_width=True)
-                            else:
-                                st.info("CPU 데이터를 처리할 수 없습니다.")
-                        except Exception as e:
-                            st.warning(f"CPU 차트 생성 오류: {str(e)}")
-                    
-                    with col2:
-                        # 메모리 사용률 차트  
-                        try:
-                            metrics_df['memory_numeric'] = pd.to_numeric(metrics_df['memory_usage'].str.replace('%', ''), errors='coerce')
-                            memory_chart_df = metrics_df.dropna(subset=['memory_numeric'])
-                            
-                            if not memory_chart_df.empty:
-                                fig_memory = px.bar(
-                                    memory_chart_df.head(10),
-                                    x='vm_name',
-                                    y='memory_numeric', 
-                                    title='🧠 메모리 사용률 (%)',
-                                    color='memory_numeric',
-                                    color_continuous_scale='Blues'
-                                )
-                                fig_memory.update_xaxes(tickangle=45)
-                                fig_memory.update_layout(showlegend=False, height=400)
-                                st.plotly_chart(fig_memory, use_container_width=True)
-                            else:
-                                st.info("메모리 데이터를 처리할 수 없습니다.")
-                        except Exception as e:
-                            st.warning(f"메모리 차트 생성 오류: {str(e)}")
+                    metric_charts = [
+                        ('cpu_percent', '💻 CPU 사용률 (%)', 'Reds'),
+                        ('memory_percent', '🧠 메모리 사용률 (%)', 'Blues'),
+                        ('disk_read_mb_per_min', '💾 디스크 읽기 (MB/min)', 'Greens'),
+                    ]
                     
-                    with col3:
-                        # 디스크 사용률 차트
-                        try:
-                            metrics_df['disk_numeric'] = pd.to_numeric(metrics_df['disk_usage'].str.replace('MB/s', '').str.replace('GB/s', ''), errors='coerce')
-                            disk_chart_df = metrics_df.dropna(subset=['disk_numeric'])
+                    for column, (metric_column, chart_title, color_scale) in zip(st.columns(3), metric_charts):
+                        with column:
+                            chart_df = metrics_df.dropna(subset=[metric_column])
+                            label = VM_METRIC_SCHEMA[metric_column]['label']
                             
-                            if not disk_chart_df.empty:
-                                fig_disk = px.bar(
-                                    disk_chart_df.head(10),
+                            if not chart_df.empty:
+                                fig = px.bar(
+                                    chart_df.nlargest(10, metric_column),  # 상위 10개만 표시
                                     x='vm_name',
-                                    y='disk_numeric',
-                                    title='💾 디스크 I/O (MB/s)',
-                                    color='disk_numeric',
-                                    color_continuous_scale='Greens'
+                                    y=metric_column,
+                                    title=chart_title,
+                                    color=metric_column,
+                                    color_continuous_scale=color_scale,
+                                    labels={metric_column: f"{label} ({VM_METRIC_SCHEMA[metric_column]['unit']})"}
                                 )
-                                fig_disk.update_xaxes(tickangle=45)
-                                fig_disk.update_layout(showlegend=False, height=400)
-                                st.plotly_chart(fig_disk, use_container_width=True)
+                                fig.update_xaxes(tickangle=45)
+                                fig.update_layout(showlegend=False, height=400)
+                                st.plotly_chart(fig, use_container_width=True)
                             else:
-                                st.info("디스크 데이터를 처리할 수 없습니다.")
-                        except Exception as e:
-                            st.warning(f"디스크 차트 생성 오류: {str(e)}")
+                                st.info(f"{label} 데이터가 없습니다.")
                 else:
                     st.info("📊 메트릭을 수집할 수 있는 VM이 없습니다. (실행 중인 VM만 메트릭 수집 가능)")
             
@@ -1328,15 +3042,15 @@ def display_vm_instances():
             with col1:
                 state_filter = st.multiselect(
                     "상태 필터",
-                    df['power_state'].unique(),
-                    default=df['power_state'].unique(),
+                    df['power_state'].unique().tolist(),
+                    default=df['power_state'].unique().tolist(),
                     key="vm_state_filter"
                 )
             with col2:
                 account_filter = st.multiselect(
                     "계정 필터",
-                    df['account_name'].unique(),
-                    default=df['account_name'].unique(),
+                    df['account_name'].unique().tolist(),
+                    default=df['account_name'].unique().tolist(),
                     key="vm_account_filter"
                 )
             
@@ -1369,15 +3083,17 @@ def display_vm_instances():
             # 테이블 표시 (메트릭 포함)
             if collect_metrics:
                 display_columns = ['account_name', 'vm_name', 'resource_group', 'power_state', 'vm_size', 
-                                 'cpu_usage', 'memory_usage', 'disk_usage', 'location', 'os_type']
+                                 *VM_SIZE_FORMATS, *VM_METRIC_SCHEMA, 'metric_note', 'location', 'os_type']
             else:
                 display_columns = ['account_name', 'vm_name', 'resource_group', 'power_state', 'vm_size', 
-                                 'location', 'os_type', 'private_ip']
+                                 *VM_SIZE_FORMATS, 'location', 'os_type', 'private_ip']
             
             # 인덱스를 1부터 시작하도록 설정
             display_df = filtered_df[display_columns].copy()
             display_df.index = range(1, len(display_df) + 1)
-            styled_df = display_df.style.apply(highlight_vm_status, axis=1)
+            styled_df = display_df.style.apply(highlight_vm_status, axis=1).format(VM_SIZE_FORMATS, na_rep='N/A')
+            if collect_metrics:
+                styled_df = styled_df.format(metric_styler_formats(VM_METRIC_SCHEMA), na_rep='N/A')
             
             st.dataframe(
                 styled_df,
@@ -1388,9 +3104,10 @@ def display_vm_instances():
                     "resource_group": "리소스 그룹",
                     "power_state": "전원 상태",
                     "vm_size": "VM 크기",
-                    "cpu_usage": "CPU 사용률",
-                    "memory_usage": "메모리",
-                    "disk_usage": "디스크 I/O",
+                    "vcpus": "vCPU",
+                    "memory_gb": "메모리 (GB)",
+                    **metric_column_config(VM_METRIC_SCHEMA),
+                    "metric_note": "메트릭 비고",
                     "location": "위치",
                     "os_type": "OS 종류",
                     "private_ip": "프라이빗 IP"
@@ -1427,9 +3144,45 @@ def display_vm_instances():
                 for acc in accounts
             ])
             st.dataframe(account_df, use_container_width=True)
+    
+    finish_render(render)
+    display_last_run('vm_inventory', 'vm_trends')
+
+def display_vmss_instance_metrics(vmss_df):
+    """VMSS 인스턴스별 메트릭 (CPU 높은 순) - 스케일 셋 평균에 가려지는 핫스팟 인스턴스 확인"""
+    import pandas as pd
+    
+    rows = [
+        {'vmss_name': vmss['vmss_name'], **instance}
+        for vmss in vmss_df[['vmss_name', 'instance_metrics']].to_dict('records')
+        for instance in (vmss['instance_metrics'] if isinstance(vmss['instance_metrics'], list) else [])
+    ]
+    if not rows:
+        return
+    
+    instances_df = pd.DataFrame(rows).sort_values('cpu_percent', ascending=False, na_position='last')
+    hot_count = int((instances_df['cpu_percent'] >= VMSS_HOT_CPU_PERCENT).sum())
+    
+    st.markdown("---")
+    st.subheader(f"🔥 인스턴스별 메트릭 ({len(instances_df)}개)")
+    if hot_count:
+        st.warning(f"⚠️ CPU {VMSS_HOT_CPU_PERCENT:.0f}% 이상 인스턴스 {hot_count}개")
+    else:
+        st.caption(f"CPU {VMSS_HOT_CPU_PERCENT:.0f}% 이상 인스턴스가 없습니다.")
+    
+    st.dataframe(
+        instances_df.rename(columns={'vmss_name': 'VMSS 이름', 'instance_name': '인스턴스'}),
+        use_container_width=True,
+        hide_index=True,
+        column_config=metric_column_config(VM_METRIC_SCHEMA),
+        height=min(400, 38 + 35 * len(instances_df))
+    )
 
 def display_vmss_instances():
     """Azure VMSS 인스턴스 모니터링"""
+    import pandas as pd
+    import plotly.express as px
+    
     st.subheader("⚖️ Azure VM Scale Set 모니터링")
     
     # 설정 파일 로드
@@ -1459,7 +3212,7 @@ def display_vmss_instances():
     with col_option1:
         collect_metrics = st.checkbox("📊 실시간 메트릭 수집", 
                                      value=True, 
-                                     help="VMSS의 현재 CPU 사용률을 수집합니다.",
+                                     help="VMSS 인스턴스별 CPU / 메모리 / 디스크 메트릭을 수집합니다 (VMSS당 1회 조회).",
                                      key="vmss_metrics")
     
     with col_option2:
@@ -1468,6 +3221,14 @@ def display_vmss_instances():
     if collect_metrics:
         st.info("💡 메트릭 수집은 실행 중인 VMSS 인스턴스에 대해서만 진행됩니다.")
     
+    inventory_mode = st.radio(
+        "🔎 조회 방식",
+        INVENTORY_MODES,
+        horizontal=True,
+        help="Resource Graph는 선택한 모든 구독의 VMSS 목록과 전원 상태를 테넌트당 페이지 쿼리 몇 번으로 가져옵니다.",
+        key="vmss_inventory_mode"
+    )
+    
     # VMSS 조회 버튼
     if st.button("🚀 Azure VMSS 상태 조회", type="primary"):
         if not selected_accounts:
@@ -1485,52 +3246,79 @@ def display_vmss_instances():
         overall_status = st.empty()
         
         all_vmss = []
+        partial_accounts = {}  # 계정명 → 부분 결과 사유
+        stale_accounts = {}  # 계정명 → 회로 차단(stale 데이터) 안내
         total_accounts = len(selected_configs)
         
-        for i, account in enumerate(selected_configs):
-            # 계정별 섹션
-            with st.expander(f"☁️ [{i+1}/{total_accounts}] {account['name']}", expanded=True):
-                
-                # 개별 계정 진행상황
-                progress_bar = st.progress(0)
-                status_text = st.empty()
-                
-                # 계정 정보 표시
-                col1, col2 = st.columns(2)
-                with col1:
-                    st.write(f"**구독 ID:** {account['subscription_id'][:8]}...")
-                with col2:
-                    st.write(f"**테넌트 ID:** {account['tenant_id'][:8]}...")
-                
-                # 작업 시작 시간 기록
-                start_time = time.time()
-                
-                vmss_data = get_azure_vmss(account, progress_bar, status_text, collect_metrics)
-                all_vmss.extend(vmss_data)
-                
-                # 작업 완료 시간 계산
-                elapsed_time = time.time() - start_time
-                
-                # 결과 요약 표시
-                if vmss_data:
-                    st.success(f"✅ {len(vmss_data)}개 VMSS 조회 완료 ({elapsed_time:.1f}초 소요)")
-                else:
-                    st.info(f"ℹ️ Azure VMSS 없음 ({elapsed_time:.1f}초 소요)")
-            
-            # 전체 진행률 업데이트
-            overall_progress_value = (i + 1) / total_accounts
-            overall_progress.progress(overall_progress_value)
-            overall_status.text(f"🔄 {i+1}/{total_accounts} 계정 처리 완료 ({(overall_progress_value*100):.1f}%)")
-            
-            time.sleep(0.3)  # UI 업데이트를 위한 대기
+        with trace_run('vmss_inventory', expect_render=True, mode=inventory_mode, accounts=total_accounts) as run:
+            if inventory_mode == INVENTORY_MODES[1]:
+                # 테넌트별 Resource Graph 일괄 조회
+                all_vmss = display_resource_graph_run(selected_configs, 'vmss', collect_metrics, partial_accounts)
+                overall_progress.progress(1.0)
+                overall_status.text(f"🔄 {total_accounts}/{total_accounts} 계정 처리 완료 (100.0%)")
+            else:
+                for i, account in enumerate(selected_configs):
+                    # 계정별 섹션
+                    with st.expander(f"☁️ [{i+1}/{total_accounts}] {account['name']}", expanded=True):
+                        
+                        # 개별 계정 진행상황
+                        progress_bar = st.progress(0)
+                        status_text = st.empty()
+                        
+                        # 계정 정보 표시
+                        col1, col2 = st.columns(2)
+                        with col1:
+                            st.write(f"**구독 ID:** {account['subscription_id'][:8]}...")
+                        with col2:
+                            st.write(f"**테넌트 ID:** {account['tenant_id'][:8]}...")
+                        
+                        # 작업 시작 시간 기록
+                        start_time = time.time()
+                        
+                        deadline = Deadline(ACCOUNT_DEADLINE_SECONDS['vmss'], CALL_TIMEOUT_SECONDS)
+                        breaker = st.session_state.circuit_breakers.blocking(account['tenant_id'], account['subscription_id'])
+                        if not breaker:
+                            with span(account['name'], 'account', subscription=account['subscription_id']):
+                                vmss_data = get_azure_vmss(account, progress_bar, status_text, collect_metrics, deadline=deadline)
+                            remember_last_good('azure_vmss', account, vmss_data, since=start_time)
+                            # 이번 실패로 회로가 열렸으면 마지막 정상 데이터로 대체
+                            breaker = st.session_state.circuit_breakers.opened(account['tenant_id'], account['subscription_id'])
+                        if breaker:
+                            vmss_data = use_last_good(breaker, account, 'azure_vmss', stale_accounts, progress_bar, status_text)
+                        all_vmss.extend(vmss_data)
+                        
+                        # 작업 완료 시간 계산
+                        elapsed_time = time.time() - start_time
+                        
+                        # 결과 요약 표시
+                        if breaker:
+                            st.warning(f"🔌 마지막 정상 데이터 표시 (stale) - {stale_accounts[account['name']]}")
+                        elif deadline.partial:
+                            partial_accounts[account['name']] = deadline.reason
+                            st.warning(f"⏰ 부분 결과: {len(vmss_data)}개 VMSS만 조회됨 - {deadline.reason} ({elapsed_time:.1f}초 소요)")
+                        elif vmss_data:
+                            st.success(f"✅ {len(vmss_data)}개 VMSS 조회 완료 ({elapsed_time:.1f}초 소요)")
+                        else:
+                            st.info(f"ℹ️ Azure VMSS 없음 ({elapsed_time:.1f}초 소요)")
+                    
+                    # 전체 진행률 업데이트
+                    overall_progress_value = (i + 1) / total_accounts
+                    overall_progress.progress(overall_progress_value)
+                    overall_status.text(f"🔄 {i+1}/{total_accounts} 계정 처리 완료 ({(overall_progress_value*100):.1f}%)")
+                    
+                    time.sleep(0.3)  # UI 업데이트를 위한 대기
+        st.session_state.setdefault('trace_runs', {})['vmss_inventory'] = run
         
         # 결과 저장 (세션 상태)
-        st.session_state['azure_vmss'] = all_vmss
+        st.session_state['azure_vmss'] = to_compact_frame(all_vmss, VMSS_CATEGORY_COLUMNS)
         st.session_state['vmss_last_update'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        st.session_state['vmss_partial_accounts'] = partial_accounts
+        st.session_state['vmss_stale_accounts'] = stale_accounts
         
         st.success(f"✅ 총 {len(all_vmss)}개 Azure VMSS를 조회했습니다!")
     
     # VMSS 결과 표시
+    render = start_render(st.session_state.get('trace_runs', {}).get('vmss_inventory'))
     if 'azure_vmss' in st.session_state:
         st.markdown("---")
         
@@ -1540,12 +3328,14 @@ def display_vmss_instances():
             st.subheader("⚖️ Azure VMSS 모니터링 결과")
         with col2:
             st.caption(f"🕐 마지막 업데이트: {st.session_state.get('vmss_last_update', 'N/A')}")
+        display_partial_accounts(st.session_state.get('vmss_partial_accounts', {}))
+        display_stale_accounts(st.session_state.get('vmss_stale_accounts', {}))
         
-        vmss_data = st.session_state['azure_vmss']
+        vmss_df = st.session_state['azure_vmss']
         
-        if vmss_data:
-            # DataFrame 생성
-            df = pd.DataFrame(vmss_data)
+        if not vmss_df.empty:
+            # 세션에 보관된 압축 DataFrame을 그대로 사용
+            df = vmss_df
             
             # 주요 지표
             col1, col2, col3, col4 = st.columns(4)
@@ -1571,7 +3361,7 @@ def display_vmss_instances():
             
             with col1:
                 # 계정별 VMSS 수
-                account_counts = df.groupby('account_name').size().reset_index(name='count')
+                account_counts = df.groupby('account_name', observed=True).size().reset_index(name='count')
                 fig1 = px.bar(
                     account_counts, 
                     x='account_name', 
@@ -1607,14 +3397,14 @@ def display_vmss_instances():
             with col1:
                 account_filter = st.selectbox(
                     "계정 필터",
-                    ['전체'] + list(df['account_name'].unique()),
+                    ['전체'] + df['account_name'].unique().tolist(),
                     key="vmss_account_filter"
                 )
             
             with col2:
                 location_filter = st.selectbox(
                     "위치 필터",
-                    ['전체'] + list(df['location'].unique()),
+                    ['전체'] + df['location'].unique().tolist(),
                     key="vmss_location_filter"
                 )
             
@@ -1645,7 +3435,8 @@ def display_vmss_instances():
             display_columns = [
                 'account_name', 'vmss_name', 'resource_group', 'location', 
                 'vm_size', 'total_instances', 'running_instances', 'stopped_instances',
-                'avg_cpu_usage', 'upgrade_policy', 'provisioning_state', 'os_type'
+                'avg_cpu_percent', 'max_cpu_percent', 'hottest_instance', 'avg_available_memory_gb',
+                'avg_memory_percent', 'avg_disk_read_mb_per_min', 'upgrade_policy', 'provisioning_state', 'os_type'
             ]
             
             # 컬럼이 존재하는 것만 선택
@@ -1662,7 +3453,12 @@ def display_vmss_instances():
                 'total_instances': '총 인스턴스',
                 'running_instances': '실행 중',
                 'stopped_instances': '중지됨',
-                'avg_cpu_usage': 'CPU 사용률',
+                'avg_cpu_percent': 'CPU 사용률',
+                'max_cpu_percent': '최고 CPU',
+                'hottest_instance': '최고 CPU 인스턴스',
+                'avg_available_memory_gb': '사용 가능 메모리',
+                'avg_memory_percent': '메모리 사용률',
+                'avg_disk_read_mb_per_min': '디스크 읽기',
                 'upgrade_policy': '업그레이드 정책',
                 'provisioning_state': '프로비저닝 상태',
                 'os_type': 'OS 종류'
@@ -1675,7 +3471,9 @@ def display_vmss_instances():
                 column_config={
                     "계정명": st.column_config.TextColumn("계정명", width="medium"),
                     "VMSS 이름": st.column_config.TextColumn("VMSS 이름", width="medium"),
-                    "CPU 사용률": st.column_config.TextColumn("CPU 사용률", width="small"),
+                    **metric_column_config(
+                        {column_mapping[column]: spec for column, spec in VMSS_METRIC_SCHEMA.items()}
+                    ),
                     "총 인스턴스": st.column_config.NumberColumn("총 인스턴스", width="small"),
                     "실행 중": st.column_config.NumberColumn("실행 중", width="small"),
                     "중지됨": st.column_config.NumberColumn("중지됨", width="small")
@@ -1683,9 +3481,12 @@ def display_vmss_instances():
                 height=400
             )
             
+            if 'instance_metrics' in filtered_df.columns:
+                display_vmss_instance_metrics(filtered_df)
+            
             # 데이터 다운로드
             st.markdown("---")
-            csv = filtered_df.to_csv(index=False)
+            csv = filtered_df.drop(columns=['instance_metrics'], errors='ignore').to_csv(index=False)
             st.download_button(
                 label="📥 VMSS CSV 다운로드",
                 data=csv,
@@ -1712,11 +3513,76 @@ def display_vmss_instances():
                 for acc in accounts
             ])
             st.dataframe(account_df, use_container_width=True)
+    
+    finish_render(render)
+    display_last_run('vmss_inventory')
+
+PROFILE_OUTPUT_DIR = 'profiles'
+
+def display_profile_report(report):
+    """사이드바에 프로파일 결과 요약 표시"""
+    import pandas as pd
+    
+    st.sidebar.success(f"🧪 프로파일 저장 ({report['seconds']:.1f}초, 샘플 {report['samples']}개)")
+    st.sidebar.caption(f"🔥 Flame graph: `{report['folded_path']}`")
+    st.sidebar.caption(f"📄 보고서: `{report['report_path']}`")
+    
+    st.sidebar.markdown("**⏱️ 자기 시간 상위 함수**")
+    st.sidebar.dataframe(pd.DataFrame(
+        [{'함수': label, '샘플': count} for label, count in report['top_functions'][:10]]
+    ), hide_index=True)
+    st.sidebar.markdown("**💾 메모리 할당 상위 위치**")
+    st.sidebar.dataframe(pd.DataFrame([
+        {'위치': os.path.basename(item['location']), 'KB': round(item['size_kb'], 1), '개수': item['count']}
+        for item in report['top_allocations'][:10]
+    ]), hide_index=True)
+
+def display_circuit_status():
+    """사이드바에 열린 회로 차단기 표시 (수동 초기화 가능)"""
+    breakers = st.session_state.circuit_breakers.open_breakers()
+    if not breakers:
+        return
+    
+    st.sidebar.markdown("**🔌 회로 차단 중**")
+    for breaker in breakers:
+        if breaker.state == 'half_open':
+            state = "반개방 - 시험 호출 중" if breaker.probing else "반개방 - 다음 조회에서 재시도"
+        else:
+            state = f"{breaker.retry_in():.0f}초 후 재시도"
+        st.sidebar.caption(f"{breaker.label}: {state} - {breaker.last_error[:80]}")
+    if st.sidebar.button("🔄 회로 차단 초기화", key="reset_circuit_breakers", help="인증/권한 문제를 해결했다면 백오프를 기다리지 않고 바로 다시 조회합니다."):
+        st.session_state.circuit_breakers.reset()
+        st.rerun()
 
 def main():
-    """메인 애플리케이션"""
+    """메인 애플리케이션 (프로파일링 모드면 이번 실행 전체를 프로파일링)"""
+    profile_enabled = st.sidebar.checkbox(
+        "🧪 프로파일링 모드",
+        value=profiling_enabled(),
+        key="profile_mode",
+        help="켜져 있는 동안 화면 실행(조회 버튼을 누른 경우 수집 포함)마다 샘플링 프로파일과 "
+             f"메모리 할당 상위 위치를 {PROFILE_OUTPUT_DIR}/ 폴더에 저장합니다. "
+             "BACKUP_MONITOR_PROFILE=1 로 기본값을 켤 수 있습니다."
+    )
+    if not profile_enabled:
+        display_dashboard()
+        return
+    
+    with profile_run('web', output_dir=PROFILE_OUTPUT_DIR) as report:
+        display_dashboard()
+    display_profile_report(report)
+
+def display_dashboard():
+    """대시보드 본문"""
     st.title("☁️ 클라우드 인프라 모니터링 대시보드")
     st.markdown("Azure 백업 및 VM 통합 모니터링")
+    
+    # 수집기 계측 /metrics 서버 (세션과 무관하게 프로세스당 1회 시작)
+    metrics_port = int(os.environ.get('BACKUP_MONITOR_METRICS_PORT', DEFAULT_METRICS_PORT))
+    metrics_url = start_metrics_server(metrics_port)
+    if metrics_url:
+        st.caption(f"📈 수집기 메트릭: {metrics_url}")
+    display_circuit_status()
     st.markdown("---")
     
     # 탭 생성
@@ -1728,8 +3594,193 @@ def main():
     with tab2:
         display_azure_backup_monitoring()
 
+# 라이브 테일 화면 갱신 간격(초) / 한 번 갱신할 때 쓸 수 있는 시간(초, API 호출 1회 제한 10초)
+LIVE_TAIL_TICK_SECONDS = 5
+LIVE_TAIL_TICK_BUDGET_SECONDS = 20
+
+def live_tail_tick(tail, account_configs):
+    """조회 시각이 된 작업 / Vault 만 조회해 라이브 테일 상태 갱신
+    
+    - 계정마다 Vault 목록은 처음 한 번만 조회 (실패하면 간격을 늘려 재시도)
+    - 새 작업 발견: Vault 별 좁은 시간 범위 backup_jobs.list (실패한 Vault 만 간격을 늘려 재시도)
+    - 추적 중인 작업: job_details.get 개별 조회 (적응형 간격, 발견 조회가 실패해도 계속)
+    갱신 시간이 다 되면 남은 작업은 다음 갱신에서 조회합니다.
+    """
+    from azure.core.exceptions import AzureError, ResourceNotFoundError
+    from backup_live_tail import job_progress
+    
+    deadline = Deadline(LIVE_TAIL_TICK_BUDGET_SECONDS, call_timeout=10)
+    try:
+        for account in account_configs:
+            if st.session_state.circuit_breakers.blocking(account['tenant_id'], account['subscription_id']):
+                continue
+            due_jobs = tail.due_jobs(account['name'])
+            due_vaults = tail.due_vaults(account['name'])
+            if not tail.listing_due(account['name']) and not due_jobs and not due_vaults:
+                continue
+            
+            if tail.listing_due(account['name']):
+                try:
+                    recovery_client = st.session_state.credential_manager.get_recovery_client(
+                        account['tenant_id'], account['subscription_id']
+                    )
+                    vaults = recovery_client.vaults.list_by_subscription_id(**deadline.call_options('Vault 목록'))
+                    tail.set_vaults(account['name'], [(vault.name, vault.id.split('/')[4]) for vault in vaults])
+                    tail.calls += 1
+                    record_account_success(account)
+                    due_vaults = tail.due_vaults(account['name'])
+                except DeadlineExceeded:
+                    raise
+                except AzureError as e:
+                    tail.calls += 1
+                    tail.defer_listing(account['name'])
+                    record_account_failure(account, e)
+                    st.warning(f"⚠️ {account['name']} 라이브 테일 Vault 목록 조회 실패: {str(e).strip().splitlines()[0][:150]}")
+                    continue  # Vault 목록이 없으면 추적 중인 작업도 없음
+            
+            backup_client = st.session_state.credential_manager.get_backup_client(
+                account['tenant_id'], account['subscription_id']
+            )
+            for vault_name, resource_group in due_vaults:
+                job_filter, until = tail.discovery_filter(account['name'], vault_name)
+                try:
+                    jobs = backup_client.backup_jobs.list(
+                        vault_name, resource_group, filter=job_filter, **deadline.call_options(f"Vault '{vault_name}' 발견 조회")
+                    )
+                    for job in jobs:
+                        tail.observe(account, backup_job_info(job, account['name'], vault_name, resource_group), job_progress(job))
+                    tail.calls += 1
+                    tail.mark_discovered(account['name'], vault_name, until)
+                except DeadlineExceeded:
+                    raise
+                except AzureError as e:
+                    tail.calls += 1
+                    tail.defer_discovery(account['name'], vault_name)
+                    record_account_failure(account, e)
+                    st.warning(f"⚠️ {account['name']} / {vault_name} 라이브 테일 발견 조회 실패: "
+                               f"{str(e).strip().splitlines()[0][:150]}")
+            if st.session_state.circuit_breakers.opened(account['tenant_id'], account['subscription_id']):
+                continue  # 인증/권한 오류로 회로가 열리면 작업 조회도 멈춤
+            
+            for tracked in due_jobs:
+                if tracked.key not in tail.jobs:
+                    continue  # 이번 발견 조회에서 이미 끝난 작업
+                account_name, vault_name, job_id = tracked.key
+                resource_group = tracked.info['resource_group']
+                try:
+                    job = backup_client.job_details.get(
+                        vault_name, resource_group, job_id, **deadline.call_options(f"작업 '{job_id[:8]}' 조회")
+                    )
+                    tail.calls += 1
+                    tail.observe(account, backup_job_info(job, account_name, vault_name, resource_group), job_progress(job))
+                except DeadlineExceeded:
+                    raise
+                except ResourceNotFoundError:
+                    tail.calls += 1
+                    tail.drop(tracked.key)
+                except AzureError as e:
+                    tail.calls += 1
+                    record_account_failure(account, e)
+                    tracked.defer()
+    except DeadlineExceeded:
+        pass  # 남은 조회는 다음 갱신에서
+
+def apply_live_tail_changes(changes):
+    """라이브 테일에서 바뀐 작업(새 작업 / 종료)을 결과 테이블(세션 압축 DataFrame)에 반영"""
+    jobs_df = st.session_state.get('backup_jobs')
+    if jobs_df is None or not changes:
+        return False
+    
+    records = jobs_df.to_dict('records')
+    index = {(record['account_name'], record['vault_name'], record['job_id']): i for i, record in enumerate(records)}
+    for job_info in changes:
+        key = (job_info['account_name'], job_info['vault_name'], job_info['job_id'])
+        if key in index:
+            records[index[key]].update(status=job_info['status'], end_epoch=job_info['end_epoch'],
+                                       duration_seconds=job_info.get('duration_seconds'))
+        else:
+            index[key] = len(records)
+            records.append(job_info)
+    st.session_state['backup_jobs'] = to_compact_frame(records, BACKUP_JOB_CATEGORY_COLUMNS, BACKUP_JOB_EPOCH_COLUMNS)
+    st.session_state['last_update'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S') + " (라이브 테일)"
+    update_duration_baselines(changes)
+    return True
+
+@st.fragment(run_every=LIVE_TAIL_TICK_SECONDS)
+def display_backup_live_tail(account_configs):
+    """진행 중 백업 작업 라이브 테일 (이 영역만 주기적으로 다시 실행, 화면 전체를 막지 않음)"""
+    import pandas as pd
+    from backup_live_tail import LiveTail
+    
+    account_names = tuple(account['name'] for account in account_configs)
+    tail = st.session_state.get('backup_live_tail')
+    if tail is None or tail.account_names != account_names:
+        tail = st.session_state['backup_live_tail'] = LiveTail(account_names)
+    
+    live_tail_tick(tail, account_configs)
+    
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("진행 중", f"{len(tail.jobs)}개")
+    with col2:
+        st.metric("최근 종료", f"{len(tail.finished)}개")
+    with col3:
+        st.metric("누적 API 호출", f"{tail.calls}회")
+    with col4:
+        st.metric("다음 조회", f"{tail.next_event_in():.0f}초 후")
+    
+    now = time.time()
+    if tail.jobs:
+        running_df = pd.DataFrame([{
+            **tracked.info,
+            'progress': tracked.progress,
+            'elapsed_minutes': (now - tracked.info['start_epoch']) / 60 if tracked.info['start_epoch'] else None,
+            'next_poll': max(0.0, tracked.next_poll_at - now),
+            'interval': tracked.interval
+        } for tracked in tail.jobs.values()]).sort_values('start_epoch')
+        running_df['start_time'] = epoch_to_kst_text(running_df['start_epoch'])
+        st.dataframe(
+            running_df[['account_name', 'vault_name', 'job_id', 'start_time', 'elapsed_minutes', 'progress', 'next_poll', 'interval']],
+            column_config={
+                'account_name': "계정",
+                'vault_name': "Vault",
+                'job_id': "작업 ID",
+                'start_time': "시작 (KST)",
+                'elapsed_minutes': st.column_config.NumberColumn("경과", format="%.0f분"),
+                'progress': st.column_config.ProgressColumn("진행률", min_value=0, max_value=100, format="%.0f%%"),
+                'next_poll': st.column_config.NumberColumn("다음 조회", format="%.0f초 후"),
+                'interval': st.column_config.NumberColumn("조회 간격", format="%.0f초")
+            },
+            hide_index=True,
+            use_container_width=True
+        )
+    elif tail.vaults:
+        st.info("ℹ️ 진행 중인 백업 작업이 없습니다.")
+    
+    if tail.finished:
+        finished_df = pd.DataFrame(tail.finished)
+        finished_df['end_time'] = epoch_to_kst_text(finished_df['end_epoch'])
+        st.markdown("**최근 종료된 작업**")
+        st.dataframe(
+            finished_df[['account_name', 'vault_name', 'job_id', 'status', 'end_time']],
+            column_config={
+                'account_name': "계정",
+                'vault_name': "Vault",
+                'job_id': "작업 ID",
+                'status': "상태",
+                'end_time': "종료 (KST)"
+            },
+            hide_index=True,
+            use_container_width=True
+        )
+    
+    # 새 작업 / 종료된 작업이 있으면 결과 테이블에 반영하고 화면 전체를 다시 그림
+    if apply_live_tail_changes(tail.take_changes()):
+        st.rerun()
+
 def display_azure_backup_monitoring():
     """Azure 백업 모니터링 화면"""
+    import pandas as pd
     
     # 설정 파일 로드
     config = load_accounts_config()
@@ -1757,9 +3808,51 @@ def display_azure_backup_monitoring():
         time.sleep(30)
         st.rerun()
     
+    # 진행 중 작업 라이브 테일 (전체 재조회 없이 InProgress 작업만 추적)
+    live_tail = st.checkbox(
+        "📡 진행 중 작업 라이브 테일",
+        value=False,
+        help="InProgress 작업만 개별 조회로 따라가고, 새로 시작된 작업은 좁은 시간 범위 조회로 찾습니다.",
+        key="backup_live_tail_enabled"
+    )
+    if live_tail:
+        live_tail_accounts = [acc for acc in accounts if acc['name'] in selected_accounts]
+        if live_tail_accounts:
+            with st.expander("📡 라이브 테일 - 진행 중 백업 작업", expanded=True):
+                display_backup_live_tail(live_tail_accounts)
+        else:
+            st.warning("⚠️ 최소 하나의 계정을 선택해주세요.")
+    
     # 오늘 백업만 표시 설정
     today_only = st.checkbox("📅 오늘 백업만 표시", value=True, help="체크하면 오늘 실행된 백업 작업만 표시됩니다")
     
+    # 조회 방식 설정
+    backup_query_mode = st.radio(
+        "🔎 조회 방식",
+        BACKUP_QUERY_MODES,
+        horizontal=True,
+        help="Resource Graph는 Vault를 순회하지 않고 선택한 모든 구독의 백업 작업을 테넌트당 한 번에 조회합니다.",
+        key="backup_query_mode"
+    )
+    
+    if backup_query_mode == BACKUP_QUERY_MODES[1]:
+        col_window, col_status = st.columns([1, 2])
+        with col_window:
+            window_label = st.selectbox(
+                "⏱️ 조회 범위",
+                list(BACKUP_WINDOW_HOURS.keys()),
+                index=1,
+                key="backup_rg_window"
+            )
+        with col_status:
+            status_scope = st.multiselect(
+                "📌 조회할 상태",
+                BACKUP_JOB_STATUSES,
+                default=BACKUP_JOB_STATUSES,
+                help="예: 'Failed'만 선택하면 밤사이 실패한 백업만 빠르게 확인합니다.",
+                key="backup_rg_statuses"
+            )
+    
     # 실행 버튼
     if st.button("🚀 백업 상태 조회", type="primary"):
         if not selected_accounts:
@@ -1781,60 +3874,107 @@ def display_azure_backup_monitoring():
             st.markdown("### 📊 실시간 진행 상황")
             
             all_jobs = []
+            partial_accounts = {}  # 계정명 → 부분 결과 사유
+            stale_accounts = {}  # 계정명 → 회로 차단(stale 데이터) 안내
             total_accounts = len(selected_account_configs)
             
-            for i, account in enumerate(selected_account_configs):
-                # 계정별 섹션
-                with st.expander(f"🏢 [{i+1}/{total_accounts}] {account['name']}", expanded=True):
-                    
-                    # 개별 계정 진행상황
-                    progress_bar = st.progress(0)
-                    status_text = st.empty()
-                    
-                    # 계정 정보 표시
-                    col1, col2 = st.columns(2)
-                    with col1:
-                        st.write(f"**구독 ID:** {account['subscription_id'][:8]}...")
-                    with col2:
-                        st.write(f"**테넌트 ID:** {account['tenant_id'][:8]}...")
-                    
-                    # 작업 시작 시간 기록
-                    start_time = time.time()
-                    
-                    jobs = get_backup_jobs(account, progress_bar, status_text)
-                    all_jobs.extend(jobs)
-                    
-                    # 작업 완료 시간 계산
-                    elapsed_time = time.time() - start_time
+            with trace_run('backup_jobs', expect_render=True, mode=backup_query_mode, accounts=total_accounts) as run:
+                if backup_query_mode == BACKUP_QUERY_MODES[1]:
+                    # 테넌트별 Resource Graph 일괄 조회
+                    hours = BACKUP_WINDOW_HOURS[window_label]
+                    statuses = status_scope if 0 < len(status_scope) < len(BACKUP_JOB_STATUSES) else None
+                    tenant_count = len(group_accounts_by_tenant(selected_account_configs))
+                    with st.expander(f"🌐 Resource Graph 일괄 조회 ({total_accounts}개 계정 / {tenant_count}개 테넌트, {window_label})", expanded=True):
+                        progress_bar = st.progress(0)
+                        status_text = st.empty()
+                        
+                        start_time = time.time()
+                        deadline = Deadline(ACCOUNT_DEADLINE_SECONDS['backup'] * total_accounts, CALL_TIMEOUT_SECONDS)
+                        all_jobs = get_backup_jobs_resource_graph(selected_account_configs, progress_bar, status_text, hours, statuses,
+                                                                  deadline=deadline, partial_accounts=partial_accounts)
+                        elapsed_time = time.time() - start_time
+                        
+                        if deadline.partial:
+                            st.warning(f"⏰ 부분 결과: {len(all_jobs)}개 백업 작업만 조회됨 - {deadline.reason} ({elapsed_time:.1f}초 소요)")
+                        elif all_jobs:
+                            st.success(f"✅ {len(all_jobs)}개 백업 작업 조회 완료 ({elapsed_time:.1f}초 소요)")
+                        else:
+                            st.info(f"ℹ️ 백업 작업 없음 ({elapsed_time:.1f}초 소요)")
                     
-                    # 결과 요약 표시
-                    if jobs:
-                        st.success(f"✅ {len(jobs)}개 백업 작업 조회 완료 ({elapsed_time:.1f}초 소요)")
-                    else:
-                        st.info(f"ℹ️ 백업 작업 없음 ({elapsed_time:.1f}초 소요)")
-                
-                # 전체 진행률 업데이트
-                overall_progress_value = (i + 1) / total_accounts
-                overall_progress.progress(overall_progress_value)
-                overall_status.text(f"🔄 {i+1}/{total_accounts} 계정 처리 완료 ({(overall_progress_value*100):.1f}%)")
-                
-                time.sleep(0.3)  # UI 업데이트를 위한 대기
+                    overall_progress.progress(1.0)
+                    overall_status.text(f"🔄 {total_accounts}/{total_accounts} 계정 처리 완료 (100.0%)")
+                else:
+                    for i, account in enumerate(selected_account_configs):
+                        # 계정별 섹션
+                        with st.expander(f"🏢 [{i+1}/{total_accounts}] {account['name']}", expanded=True):
+                            
+                            # 개별 계정 진행상황
+                            progress_bar = st.progress(0)
+                            status_text = st.empty()
+                            
+                            # 계정 정보 표시
+                            col1, col2 = st.columns(2)
+                            with col1:
+                                st.write(f"**구독 ID:** {account['subscription_id'][:8]}...")
+                            with col2:
+                                st.write(f"**테넌트 ID:** {account['tenant_id'][:8]}...")
+                            
+                            # 작업 시작 시간 기록
+                            start_time = time.time()
+                            
+                            deadline = Deadline(ACCOUNT_DEADLINE_SECONDS['backup'], CALL_TIMEOUT_SECONDS)
+                            breaker = st.session_state.circuit_breakers.blocking(account['tenant_id'], account['subscription_id'])
+                            if not breaker:
+                                with span(account['name'], 'account', subscription=account['subscription_id']):
+                                    jobs = get_backup_jobs(account, progress_bar, status_text, deadline=deadline)
+                                remember_last_good('backup_jobs', account, jobs, since=start_time)
+                                # 이번 실패로 회로가 열렸으면 마지막 정상 데이터로 대체
+                                breaker = st.session_state.circuit_breakers.opened(account['tenant_id'], account['subscription_id'])
+                            if breaker:
+                                jobs = use_last_good(breaker, account, 'backup_jobs', stale_accounts, progress_bar, status_text)
+                            all_jobs.extend(jobs)
+                            
+                            # 작업 완료 시간 계산
+                            elapsed_time = time.time() - start_time
+                            
+                            # 결과 요약 표시
+                            if breaker:
+                                st.warning(f"🔌 마지막 정상 데이터 표시 (stale) - {stale_accounts[account['name']]}")
+                            elif deadline.partial:
+                                partial_accounts[account['name']] = deadline.reason
+                                st.warning(f"⏰ 부분 결과: {len(jobs)}개 백업 작업만 조회됨 - {deadline.reason} ({elapsed_time:.1f}초 소요)")
+                            elif jobs:
+                                st.success(f"✅ {len(jobs)}개 백업 작업 조회 완료 ({elapsed_time:.1f}초 소요)")
+                            else:
+                                st.info(f"ℹ️ 백업 작업 없음 ({elapsed_time:.1f}초 소요)")
+                        
+                        # 전체 진행률 업데이트
+                        overall_progress_value = (i + 1) / total_accounts
+                        overall_progress.progress(overall_progress_value)
+                        overall_status.text(f"🔄 {i+1}/{total_accounts} 계정 처리 완료 ({(overall_progress_value*100):.1f}%)")
+                        
+                        time.sleep(0.3)  # UI 업데이트를 위한 대기
+            st.session_state.setdefault('trace_runs', {})['backup_jobs'] = run
         
-        # 결과 저장 (세션 상태)
-        st.session_state['backup_jobs'] = all_jobs
+        # 결과 저장 (세션 상태, 압축 DataFrame)
+        st.session_state['backup_jobs'] = to_compact_frame(all_jobs, BACKUP_JOB_CATEGORY_COLUMNS, BACKUP_JOB_EPOCH_COLUMNS)
+        update_duration_baselines(all_jobs)
         st.session_state['today_only'] = today_only
         st.session_state['last_update'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        st.session_state['backup_partial_accounts'] = partial_accounts
+        st.session_state['backup_stale_accounts'] = stale_accounts
         
         # 오늘 백업 필터링을 위한 카운트
         if today_only:
-            today = datetime.now().date()
-            today_jobs = [job for job in all_jobs if job.get('start_time_raw') and 
-                         (isinstance(job['start_time_raw'], datetime) and job['start_time_raw'].date() == today)]
+            day_start, day_end = kst_day_epoch_range()
+            today_jobs = [job for job in all_jobs if job.get('start_epoch') is not None and 
+                         day_start <= job['start_epoch'] < day_end]
             st.success(f"✅ 총 {len(all_jobs)}개 백업 작업 조회 완료! (오늘 실행: {len(today_jobs)}개)")
         else:
             st.success(f"✅ 총 {len(all_jobs)}개 백업 작업을 조회했습니다!")
     
     # 결과 표시
+    render = start_render(st.session_state.get('trace_runs', {}).get('backup_jobs'))
     if 'backup_jobs' in st.session_state:
         st.markdown("---")
         
@@ -1844,8 +3984,10 @@ def display_azure_backup_monitoring():
             st.subheader("📊 백업 모니터링 결과")
         with col2:
             st.caption(f"🕐 마지막 업데이트: {st.session_state.get('last_update', 'N/A')}")
+        display_partial_accounts(st.session_state.get('backup_partial_accounts', {}))
+        display_stale_accounts(st.session_state.get('backup_stale_accounts', {}))
         
-        jobs_data = st.session_state['backup_jobs']
+        jobs_df = st.session_state['backup_jobs']
         
         # 결과 페이지에서도 오늘 백업만 표시 옵션 제공
         col_filter1, col_filter2 = st.columns([2, 1])
@@ -1855,18 +3997,15 @@ def display_azure_backup_monitoring():
                                         key="result_today_filter",
                                         help="체크하면 오늘 실행된 백업만 표시됩니다")
         
-        if jobs_data:
-            # DataFrame 생성
-            df = pd.DataFrame(jobs_data)
-            
-            # start_time_raw가 문자열인 경우 datetime으로 변환
-            if 'start_time_raw' in df.columns:
-                df['start_time_raw'] = pd.to_datetime(df['start_time_raw'], errors='coerce')
+        if not jobs_df.empty:
+            # 세션에 보관된 압축 DataFrame을 그대로 사용
+            df = jobs_df
             
-            # 오늘 백업만 표시 필터링
-            if show_today_only and 'start_time_raw' in df.columns:
-                today = datetime.now().date()
-                df = df[df['start_time_raw'].dt.date == today]
+            # 오늘 백업만 표시 필터링 (KST 기준 epoch 범위 비교)
+            if show_today_only:
+                day_start, day_end = kst_day_epoch_range()
+                df = df[((df['start_epoch'] >= day_start) & (df['start_epoch'] < day_end)).fillna(False)]
+                today = datetime.fromtimestamp(day_start, timezone(timedelta(hours=9))).date()
                 
                 # 필터링 후 결과 안내
                 if len(df) == 0:
@@ -1893,15 +4032,15 @@ def display_azure_backup_monitoring():
             with col1:
                 status_filter = st.multiselect(
                     "상태 필터",
-                    df['status'].unique(),
-                    default=df['status'].unique(),
+                    df['status'].unique().tolist(),
+                    default=df['status'].unique().tolist(),
                     key="backup_status_filter"
                 )
             with col2:
                 account_filter = st.multiselect(
                     "계정 필터",
-                    df['account_name'].unique(),
-                    default=df['account_name'].unique(),
+                    df['account_name'].unique().tolist(),
+                    default=df['account_name'].unique().tolist(),
                     key="backup_account_filter"
                 )
             
@@ -1932,10 +4071,13 @@ def display_azure_backup_monitoring():
                     ] * len(row)
             
             # 테이블 표시 - 컬럼 확장
-            display_columns = ['account_name', 'vault_name', 'status', 'start_time', 'end_time', 'duration', 'resource_group']
+            display_columns = ['account_name', 'vault_name', 'entity_name', 'status', 'start_time', 'end_time', 'duration', 'resource_group']
             
-            # 데이터 정렬 (시작 시간 기준 내림차순)
-            filtered_df_sorted = filtered_df.sort_values('start_time', ascending=False, na_position='last')
+            # 데이터 정렬 (시작 시간 기준 내림차순) 후 표시용 컬럼 생성
+            filtered_df_sorted = format_backup_jobs(
+                filtered_df.sort_values('start_epoch', ascending=False, na_position='last')
+            )
+            display_columns = [column for column in display_columns if column in filtered_df_sorted.columns]
             
             # 인덱스를 1부터 시작하도록 설정
             display_df = filtered_df_sorted[display_columns].copy()
@@ -1948,6 +4090,7 @@ def display_azure_backup_monitoring():
                 column_config={
                     "account_name": "계정명",
                     "vault_name": "Vault명", 
+                    "entity_name": "보호 항목",
                     "status": "상태",
                     "start_time": "시작 시간",
                     "end_time": "종료 시간",
@@ -1968,6 +4111,7 @@ def display_azure_backup_monitoring():
                     column_config={
                         "account_name": "계정명",
                         "vault_name": "Vault명",
+                        "entity_name": "보호 항목",
                         "status": "상태",
                         "start_time": "시작 시간",
                         "end_time": "종료 시간",
@@ -1977,9 +4121,12 @@ def display_azure_backup_monitoring():
                     height=200
                 )
             
+            st.markdown("---")
+            display_backup_duration_regressions(filtered_df)
+            
             # 데이터 다운로드
             st.markdown("---")
-            csv = filtered_df.to_csv(index=False)
+            csv = filtered_df_sorted.to_csv(index=False)
             st.download_button(
                 label="📥 CSV 다운로드",
                 data=csv,
@@ -2006,6 +4153,11 @@ def display_azure_backup_monitoring():
                 for acc in accounts
             ])
             st.dataframe(account_df, use_container_width=True)
+    
+    display_backup_coverage(accounts, selected_accounts)
+    
+    finish_render(render)
+    display_last_run('backup_jobs')
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
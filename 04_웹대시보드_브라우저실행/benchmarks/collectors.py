@@ -0,0 +1,348 @@
+"""
+수집기 성능 벤치마크 (FakeARM 기반, Azure 연결 불필요)
+
+backup_monitor_web.py 의 수집 함수를 FakeARM 서버(benchmarks/fake_arm.py)에 연결해
+리소스 규모별 소요 시간과 API 호출 수를 측정하고 기록된 기준값(baselines)과 비교합니다.
+
+- 대상: get_azure_vms, get_azure_vmss, get_backup_jobs, get_vm_24h_metrics,
+        get_protected_items (보호 항목 나열 + VM 인벤토리 커버리지 조인)
+- 규모: 10 / 100 / 1,000 / 10,000 리소스 (--sizes 로 조정, 24시간 추이는 --full 일 때만 10,000)
+- 서버는 별도 프로세스에서 실행되어 수집기와 GIL을 나눠 쓰지 않습니다
+- 수집 함수 안의 UI 갱신용 time.sleep 은 기본적으로 건너뜁니다 (--keep-ui-sleeps 로 유지)
+- 측정마다 새 임시 디렉터리에서 실행해 cache/ sketches/ history/ 등 대시보드 저장소에 쓰지 않습니다
+- 시간은 여러 번 측정한 최소값으로 비교합니다 (--repeats, 한 번이 오래 걸리는 규모는 1회)
+
+사용법:
+    python benchmarks/collectors.py
+    python benchmarks/collectors.py --collectors get_azure_vms --sizes 10,100 --latency-ms 20
+    python benchmarks/collectors.py --update-baseline     # 기준값 갱신 (리뷰에 포함)
+"""
+import argparse
+import contextlib
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import sys
+import tempfile
+import time
+import types
+import urllib.request
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DASHBOARD_DIR = os.path.dirname(BENCH_DIR)
+BASELINE_PATH = os.path.join(BENCH_DIR, 'baselines', 'collectors.json')
+
+DEFAULT_SIZES = [10, 100, 1000, 10000]
+
+# 시간 측정 반복 (최소값 사용): 한 번이 REPEAT_BUDGET_SECONDS 를 넘으면 더 반복하지 않음
+DEFAULT_REPEATS = 3
+REPEAT_BUDGET_SECONDS = 10
+
+# 기준값 대비 이보다 작은 시간 증가는 비율과 관계없이 잡음으로 보고 회귀로 보지 않음
+MIN_REGRESSION_SECONDS = 0.25
+
+# 규모 상한 (--full 로 해제): 24시간 추이는 VM당 1,440개 데이터 포인트 x 3개 메트릭을
+# 역직렬화하므로 10,000대 측정에 한 시간 가까이 걸림
+SIZE_LIMITS = {'get_vm_24h_metrics': 1000}
+
+# 벤치마크용 가상 계정
+ACCOUNT = {
+    'name': 'Benchmark',
+    'tenant_id': '00000000-0000-0000-0000-000000000000',
+    'subscription_id': '11111111-1111-1111-1111-111111111111'
+}
+
+INSTANCES_PER_VMSS = 5
+JOBS_PER_VAULT = 500
+VMS_PER_VAULT = 500
+
+
+def fleet_settings(collector, size):
+    """수집기별 리소스 규모 → FakeFleet 설정"""
+    if collector == 'get_azure_vmss':
+        # size = 전체 인스턴스 수
+        return {'vmss': max(1, size // INSTANCES_PER_VMSS), 'instances_per_vmss': min(size, INSTANCES_PER_VMSS)}
+    if collector == 'get_backup_jobs':
+        # size = 전체 백업 작업 수
+        vaults = max(1, size // JOBS_PER_VAULT)
+        return {'vaults': vaults, 'jobs_per_vault': size // vaults}
+    if collector == 'get_protected_items':
+        # size = VM 수 (Vault마다 VMS_PER_VAULT 대씩 보호)
+        return {'vms': size, 'vaults': max(1, size // VMS_PER_VAULT)}
+    # get_azure_vms / get_vm_24h_metrics: size = VM 수
+    return {'vms': size}
+
+
+def serve_fake_arm(fleet_kwargs, url_queue):
+    """별도 프로세스에서 FakeARM 서버 실행"""
+    sys.path.insert(0, BENCH_DIR)
+    from fake_arm import FakeArmServer, FakeFleet
+    server = FakeArmServer(FakeFleet(**fleet_kwargs)).start()
+    url_queue.put(server.url)
+    server.thread.join()
+
+
+class FakeArmProcess:
+    """FakeARM 서버 프로세스 관리 + 요청 집계 조회"""
+
+    def __init__(self, fleet_kwargs):
+        ctx = multiprocessing.get_context('spawn')
+        url_queue = ctx.Queue()
+        self.process = ctx.Process(target=serve_fake_arm, args=(fleet_kwargs, url_queue), daemon=True)
+        self.process.start()
+        self.url = url_queue.get(timeout=30)
+
+    def call(self, path):
+        with urllib.request.urlopen(self.url + path, timeout=10) as response:
+            return json.loads(response.read())
+
+    def stats(self):
+        return self.call('/_fake/stats')
+
+    def reset(self):
+        self.call('/_fake/reset')
+
+    def stop(self):
+        self.process.terminate()
+        self.process.join(timeout=5)
+
+
+class NullProgress:
+    """st.progress / st.empty 대용"""
+
+    def progress(self, value):
+        pass
+
+    def text(self, value):
+        pass
+
+
+class StaticTokenCredential:
+    """FakeARM 용 인증 객체 (토큰 요청 없음)"""
+
+    def get_token(self, *scopes, **kwargs):
+        from azure.core.credentials import AccessToken
+        return AccessToken('fake-token', int(time.time()) + 3600)
+
+
+def load_dashboard(keep_ui_sleeps):
+    """대시보드 모듈 로드 (streamlit bare 모드)"""
+    sys.path.insert(0, DASHBOARD_DIR)
+    logging.getLogger('streamlit').setLevel(logging.ERROR)
+    import backup_monitor_web as app
+
+    if not keep_ui_sleeps:
+        # 수집 함수 안의 UI 갱신/호출 간격용 sleep 제외 (순수 수집 비용 측정)
+        app.time = types.SimpleNamespace(time=time.time, perf_counter=time.perf_counter, sleep=lambda seconds: None)
+    return app
+
+
+def make_credential_manager(app, base_url):
+    """FakeARM 주소로 클라이언트를 만드는 인증 관리자"""
+    from azure.core.pipeline.policies import SansIOHTTPPolicy
+
+    manager = app.AzureCredentialManager(client_kwargs={
+        'base_url': base_url,
+        # http 주소에는 Bearer 토큰 정책을 쓸 수 없으므로 인증 헤더 없이 호출
+        'authentication_policy': SansIOHTTPPolicy()
+    })
+    credential = StaticTokenCredential()
+    manager.get_credential = lambda tenant_id: credential
+    return manager
+
+
+def run_collector(app, collector, size, trend_interval, trend_hours):
+    """수집 함수 1회 실행 → 수집된 리소스 수"""
+    progress, status = NullProgress(), NullProgress()
+    if collector == 'get_azure_vms':
+        return len(app.get_azure_vms(ACCOUNT, progress, status, collect_metrics=True))
+    if collector == 'get_azure_vmss':
+        return sum(v['total_instances'] for v in app.get_azure_vmss(ACCOUNT, progress, status, collect_metrics=True))
+    if collector == 'get_backup_jobs':
+        return len(app.get_backup_jobs(ACCOUNT, progress, status))
+    if collector in ('get_vm_24h_metrics', 'get_protected_items'):
+        from fake_arm import LOCATION, VM_SIZES
+        # 대시보드가 넘기는 VM 목록(get_azure_vms 결과)과 같은 키
+        vm_list = [{
+            'account_name': ACCOUNT['name'],
+            'vm_name': f"vm-{i:05d}",
+            'resource_group': f"rg-{i % 10:02d}",
+            'location': LOCATION,
+            'vm_size': VM_SIZES[i % len(VM_SIZES)],
+            'power_state': 'VM running'
+        } for i in range(size)]
+    if collector == 'get_protected_items':
+        from backup_coverage import UNKNOWN, UNPROTECTED, build_protection_index, join_coverage
+        # 캐시를 쓰지 않고 매번 나열 비용까지 측정, 수집 수 = 보호 항목과 조인된 VM 수
+        records, _, complete = app.get_protected_items(ACCOUNT, force_refresh=True)
+        rows = join_coverage(vm_list, build_protection_index(records), {ACCOUNT['name']: ACCOUNT['subscription_id']},
+                             incomplete_accounts=() if complete else [ACCOUNT['name']])
+        return sum(1 for row in rows if row['coverage'] not in (UNPROTECTED, UNKNOWN))
+    if collector == 'get_vm_24h_metrics':
+        trends = app.get_vm_24h_metrics(ACCOUNT, vm_list, progress, status, interval=trend_interval, hours=trend_hours)
+        return len(trends)
+    raise ValueError(f"알 수 없는 수집기: {collector}")
+
+
+@contextlib.contextmanager
+def isolated_workdir():
+    """임시 작업 디렉터리에서 실행 (상대 경로 저장소 cache/ sketches/ history/ 가 여기에 생기고 끝나면 삭제)"""
+    previous = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix='collector-bench-') as workdir:
+        os.chdir(workdir)
+        try:
+            yield workdir
+        finally:
+            os.chdir(previous)
+
+
+def reset_collector_caches():
+    """프로세스 안의 수집기 캐시 비우기 (이전 측정의 조회 결과를 재사용하지 않고 항상 첫 조회 비용 측정)"""
+    from backup_coverage import reset_protected_items_cache
+    from collector_snapshot import reset_snapshot_cache
+    from vm_size_catalog import reset_catalog_cache
+    reset_snapshot_cache()
+    reset_catalog_cache()
+    reset_protected_items_cache()
+
+
+def benchmark(app, collector, size, server_settings, trend_interval, trend_hours, repeats=DEFAULT_REPEATS):
+    """FakeARM 서버를 띄우고 수집 함수 실행 시간과 요청 수 측정
+
+    repeats 회 측정한 최소 시간을 사용합니다 (한 번이 REPEAT_BUDGET_SECONDS 를 넘으면 그 1회만).
+    매 회 새 임시 디렉터리와 빈 캐시에서 실행합니다.
+    """
+    server = FakeArmProcess({**server_settings, **fleet_settings(collector, size)})
+    runs = []
+    try:
+        app.st.session_state.credential_manager = make_credential_manager(app, server.url)
+        for _ in range(max(1, repeats)):
+            with isolated_workdir():
+                reset_collector_caches()
+                server.reset()
+                started = time.perf_counter()
+                collected = run_collector(app, collector, size, trend_interval, trend_hours)
+                seconds = time.perf_counter() - started
+            runs.append((seconds, collected, server.stats()))
+            if seconds > REPEAT_BUDGET_SECONDS:
+                break
+    finally:
+        server.stop()
+    seconds, collected, stats = min(runs, key=lambda run: run[0])
+    return {
+        'seconds': round(seconds, 3),
+        'collected': collected,
+        'requests': stats['requests'],
+        'throttled': stats['throttled'],
+        'ms_per_resource': round(seconds * 1000 / max(size, 1), 3)
+    }
+
+
+def load_baseline():
+    if not os.path.exists(BASELINE_PATH):
+        return None
+    with open(BASELINE_PATH, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def compare(result, baseline_entry, tolerance):
+    """기준값 대비 회귀 여부 (API 호출 수는 정확히, 시간은 허용 비율과 MIN_REGRESSION_SECONDS 를 모두 넘을 때)"""
+    problems = []
+    if result['requests'] > baseline_entry['requests']:
+        problems.append(f"API 호출 {baseline_entry['requests']} → {result['requests']}")
+    slower = result['seconds'] - baseline_entry['seconds']
+    if result['seconds'] > baseline_entry['seconds'] * (1 + tolerance) and slower > MIN_REGRESSION_SECONDS:
+        problems.append(f"시간 {baseline_entry['seconds']:.2f}s → {result['seconds']:.2f}s")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="수집기 성능 벤치마크 (FakeARM)")
+    parser.add_argument('--collectors',
+                        default='get_azure_vms,get_azure_vmss,get_backup_jobs,get_vm_24h_metrics,get_protected_items',
+                        help="측정할 수집 함수 (쉼표 구분)")
+    parser.add_argument('--sizes', default=','.join(str(s) for s in DEFAULT_SIZES), help="리소스 규모 (쉼표 구분)")
+    parser.add_argument('--page-size', type=int, default=100, help="목록 응답 페이지 크기")
+    parser.add_argument('--latency-ms', type=float, default=0, help="요청당 지연(ms)")
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help="429 응답 비율")
+    parser.add_argument('--retry-after', type=int, default=1, help="429 응답의 Retry-After(초)")
+    parser.add_argument('--trend-interval', default='PT1M', help="get_vm_24h_metrics 수집 간격")
+    parser.add_argument('--trend-hours', type=int, default=24, help="get_vm_24h_metrics 수집 기간(시간)")
+    parser.add_argument('--full', action='store_true', help="SIZE_LIMITS 상한을 무시하고 모든 규모 측정")
+    parser.add_argument('--keep-ui-sleeps', action='store_true', help="수집 함수 안의 UI용 sleep 유지")
+    parser.add_argument('--repeats', type=int, default=DEFAULT_REPEATS, help="규모별 측정 반복 횟수 (최소 시간 사용)")
+    parser.add_argument('--tolerance', type=float, default=0.5, help="시간 회귀 허용 비율 (0.5 = 50%%)")
+    parser.add_argument('--update-baseline', action='store_true', help="측정 결과로 기준값 파일 갱신")
+    args = parser.parse_args()
+
+    collectors = [c.strip() for c in args.collectors.split(',') if c.strip()]
+    sizes = [int(s) for s in args.sizes.split(',') if s.strip()]
+    server_settings = {
+        'page_size': args.page_size,
+        'latency_ms': args.latency_ms,
+        'throttle_rate': args.throttle_rate,
+        'retry_after': args.retry_after
+    }
+    settings = {**server_settings, 'trend_interval': args.trend_interval, 'trend_hours': args.trend_hours,
+                'keep_ui_sleeps': args.keep_ui_sleeps}
+
+    app = load_dashboard(args.keep_ui_sleeps)
+    baseline = load_baseline()
+    comparable = baseline is not None and baseline.get('settings') == settings
+    if baseline is not None and not comparable:
+        print("⚠️ 기준값과 측정 설정이 달라 비교하지 않습니다.")
+
+    print(f"⏱️ 수집기 벤치마크 (FakeARM, 설정: {json.dumps(settings, ensure_ascii=False)})\n")
+    print(f"{'수집 함수':<22}{'규모':>8}{'시간(s)':>10}{'ms/리소스':>11}{'API 호출':>10}{'429':>6}  비교")
+
+    results = {}
+    regressions = []
+    for collector in collectors:
+        for size in sizes:
+            if not args.full and size > SIZE_LIMITS.get(collector, size):
+                print(f"{collector:<22}{size:>8}{'(건너뜀: --full 필요)':>22}")
+                continue
+            result = benchmark(app, collector, size, server_settings, args.trend_interval, args.trend_hours,
+                               repeats=args.repeats)
+            results.setdefault(collector, {})[str(size)] = result
+
+            verdict = ''
+            if comparable:
+                entry = baseline['results'].get(collector, {}).get(str(size))
+                if entry is None:
+                    verdict = '기준값 없음'
+                else:
+                    problems = compare(result, entry, args.tolerance)
+                    verdict = '❌ ' + ', '.join(problems) if problems else f"✅ (기준 {entry['seconds']:.2f}s)"
+                    if problems:
+                        regressions.append(f"{collector}@{size}: {', '.join(problems)}")
+
+            print(f"{collector:<22}{size:>8}{result['seconds']:>10.2f}{result['ms_per_resource']:>11.2f}"
+                  f"{result['requests']:>10}{result['throttled']:>6}  {verdict}")
+
+    if args.update_baseline:
+        merged = baseline if comparable else {'settings': settings, 'results': {}}
+        for collector, by_size in results.items():
+            merged['results'].setdefault(collector, {}).update(by_size)
+        merged['settings'] = settings
+        merged['environment'] = {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'recorded_at': time.strftime('%Y-%m-%d')
+        }
+        os.makedirs(os.path.dirname(BASELINE_PATH), exist_ok=True)
+        with open(BASELINE_PATH, 'w', encoding='utf-8') as f:
+            json.dump(merged, f, ensure_ascii=False, indent=2)
+        print(f"\n💾 기준값 저장: {os.path.relpath(BASELINE_PATH, DASHBOARD_DIR)}")
+
+    if regressions:
+        print("\n❌ 성능 회귀:")
+        for line in regressions:
+            print(f"  - {line}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,537 @@
+"""
+오프라인 Azure Resource Manager 대용 HTTP 서버
+
+수집 함수(get_azure_vms, get_azure_vmss, get_backup_jobs, get_vm_24h_metrics, get_protected_items)가 호출하는
+Compute / Recovery Services / Backup / Monitor REST 경로에 합성 응답을 돌려줍니다.
+운영 Azure 없이 수집기 성능을 측정하기 위한 용도입니다.
+
+- 규모: VM 수, VMSS 수 x 인스턴스 수, Vault 수 x Vault당 작업 수
+- 페이지: 목록 응답을 page_size 단위로 나누고 nextLink 로 이어줌
+- 지연: 요청마다 latency_ms 만큼 대기
+- 제한: throttle_rate 비율의 요청에 429 + Retry-After 응답 (결정적으로 N번째 요청마다)
+
+사용법 (단독 실행):
+    python benchmarks/fake_arm.py --vms 1000 --page-size 100 --latency-ms 20 --throttle-rate 0.01
+    # 출력된 주소를 base_url 로 SDK 클라이언트에 전달
+"""
+import argparse
+import json
+import re
+import socket
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+LOCATION = 'koreacentral'
+VM_SIZES = ['Standard_D2s_v3', 'Standard_D4s_v3', 'Standard_B2ms', 'Standard_E4s_v5']
+# Resource SKUs 응답용 사양 (vCPU, 메모리 GB)
+VM_SIZE_SPECS = {'Standard_D2s_v3': (2, 8), 'Standard_D4s_v3': (4, 16), 'Standard_B2ms': (2, 8), 'Standard_E4s_v5': (4, 32)}
+JOB_STATUSES = ['Completed', 'Completed', 'Completed', 'Failed', 'CompletedWithWarnings', 'InProgress']
+
+INTERVAL_MINUTES = {'PT1M': 1, 'PT5M': 5, 'PT15M': 15, 'PT30M': 30, 'PT1H': 60}
+
+# 경로 패턴 → (API 계열, 핸들러 이름)
+ROUTES = [
+    (re.compile(r'^/subscriptions/[^/]+/resourceGroups/[^/]+/providers/Microsoft\.Compute/'
+                r'(virtualMachines|virtualMachineScaleSets)/[^/]+(/virtualMachines/[^/]+)?'
+                r'/providers/Microsoft\.Insights/metrics$', re.I), 'monitor', 'metrics'),
+    (re.compile(r'^/subscriptions/(?P<sub>[^/]+)/providers/Microsoft\.Compute/virtualMachines$', re.I),
+     'compute', 'vm_list'),
+    (re.compile(r'^/subscriptions/(?P<sub>[^/]+)/resourceGroups/(?P<rg>[^/]+)/providers/Microsoft\.Compute/'
+                r'virtualMachines/(?P<name>[^/]+)$', re.I), 'compute', 'vm_get'),
+    (re.compile(r'^/subscriptions/(?P<sub>[^/]+)/providers/Microsoft\.Compute/virtualMachineScaleSets$', re.I),
+     'compute', 'vmss_list'),
+    (re.compile(r'^/subscriptions/(?P<sub>[^/]+)/resourceGroups/(?P<rg>[^/]+)/providers/Microsoft\.Compute/'
+                r'virtualMachineScaleSets/(?P<name>[^/]+)$', re.I), 'compute', 'vmss_get'),
+    (re.compile(r'^/subscriptions/(?P<sub>[^/]+)/resourceGroups/(?P<rg>[^/]+)/providers/Microsoft\.Compute/'
+                r'virtualMachineScaleSets/(?P<name>[^/]+)/virtualMachines$', re.I), 'compute', 'vmss_vm_list'),
+    (re.compile(r'^/subscriptions/(?P<sub>[^/]+)/resourceGroups/(?P<rg>[^/]+)/providers/Microsoft\.Compute/'
+                r'virtualMachineScaleSets/(?P<name>[^/]+)/virtualMachines/(?P<instance>[^/]+)/instanceView$', re.I),
+     'compute', 'vmss_instance_view'),
+    (re.compile(r'^/subscriptions/(?P<sub>[^/]+)/providers/Microsoft\.Compute/skus$', re.I), 'compute', 'sku_list'),
+    (re.compile(r'^/subscriptions/(?P<sub>[^/]+)/providers/Microsoft\.RecoveryServices/vaults$', re.I),
+     'recoveryservices', 'vault_list'),
+    (re.compile(r'^/subscriptions/(?P<sub>[^/]+)/resourceGroups/(?P<rg>[^/]+)/providers/Microsoft\.RecoveryServices/'
+                r'vaults/(?P<vault>[^/]+)/backupJobs$', re.I), 'backup', 'job_list'),
+    (re.compile(r'^/subscriptions/(?P<sub>[^/]+)/resourceGroups/(?P<rg>[^/]+)/providers/Microsoft\.RecoveryServices/'
+                r'vaults/(?P<vault>[^/]+)/backupJobs/(?P<job>[^/]+)$', re.I), 'backup', 'job_get'),
+    (re.compile(r'^/subscriptions/(?P<sub>[^/]+)/resourceGroups/(?P<rg>[^/]+)/providers/Microsoft\.RecoveryServices/'
+                r'vaults/(?P<vault>[^/]+)/backupProtectedItems$', re.I), 'backup', 'protected_item_list'),
+]
+
+# 백업 작업 목록 $filter 조건 (status / startTime / endTime eq '값')
+JOB_FILTER_PATTERN = re.compile(r"(\w+) eq '([^']*)'")
+JOB_FILTER_TIME_FORMAT = '%Y-%m-%d %I:%M:%S %p'
+
+# 메트릭 차원 분할 $filter (예: VMName eq '*') 와 VMSS 리소스 경로
+METRIC_SPLIT_PATTERN = re.compile(r"(\w+) eq '\*'")
+VMSS_METRICS_PATH = re.compile(r'/virtualMachineScaleSets/(?P<name>[^/]+)/providers/', re.I)
+
+
+class FakeFleet:
+    """합성 리소스 규모와 서버 동작 설정"""
+
+    def __init__(self, vms=10, vmss=0, instances_per_vmss=3, vaults=1, jobs_per_vault=10,
+                 page_size=100, latency_ms=0, throttle_rate=0.0, retry_after=1):
+        self.vms = vms
+        self.vmss = vmss
+        self.instances_per_vmss = instances_per_vmss
+        self.vaults = vaults
+        self.jobs_per_vault = jobs_per_vault
+        self.page_size = max(1, page_size)
+        self.latency_ms = latency_ms
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+
+    def to_dict(self):
+        return dict(self.__dict__)
+
+
+def vm_power_code(index):
+    """VM 4대 중 1대는 할당 해제 상태"""
+    return 'PowerState/deallocated' if index % 4 == 0 else 'PowerState/running'
+
+
+def os_type(index):
+    return 'Windows' if index % 2 else 'Linux'
+
+
+def iso(dt):
+    return dt.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def power_statuses(power_code):
+    display = 'VM ' + power_code.split('/')[1]
+    return [
+        {'code': 'ProvisioningState/succeeded', 'level': 'Info', 'displayStatus': 'Provisioning succeeded'},
+        {'code': power_code, 'level': 'Info', 'displayStatus': display}
+    ]
+
+
+class FakeArmState:
+    """요청 수/429 수 집계 (스레드 안전)"""
+
+    def __init__(self, fleet):
+        self.fleet = fleet
+        self.lock = threading.Lock()
+        self.request_count = 0
+        self.counts = {}
+        self.throttled = 0
+
+    def next_request(self, family):
+        """요청 번호 발급 및 429 여부 결정"""
+        with self.lock:
+            self.request_count += 1
+            self.counts[family] = self.counts.get(family, 0) + 1
+            throttle = False
+            if self.fleet.throttle_rate > 0:
+                every = max(1, round(1 / self.fleet.throttle_rate))
+                throttle = self.request_count % every == 0
+            if throttle:
+                self.throttled += 1
+            return throttle
+
+    def snapshot(self):
+        with self.lock:
+            return {'requests': self.request_count, 'throttled': self.throttled, 'by_family': dict(self.counts)}
+
+    def reset(self):
+        with self.lock:
+            self.request_count = 0
+            self.counts = {}
+            self.throttled = 0
+
+
+class FakeArmHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server_version = 'FakeARM/1.0'
+
+    def setup(self):
+        super().setup()
+        # 헤더/본문 분할 전송 시 Nagle + 지연 ACK 로 요청마다 ~40ms 가 추가되는 것을 방지
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def log_message(self, format, *args):
+        pass
+
+    @property
+    def state(self):
+        return self.server.state
+
+    @property
+    def fleet(self):
+        return self.server.state.fleet
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+
+        # 벤치마크용 집계 조회/초기화 (요청 수에 포함하지 않음)
+        if url.path == '/_fake/stats':
+            self.send_json(200, self.state.snapshot())
+            return
+        if url.path == '/_fake/reset':
+            self.state.reset()
+            self.send_json(200, {'reset': True})
+            return
+
+        for pattern, family, handler_name in ROUTES:
+            match = pattern.match(url.path)
+            if match:
+                break
+        else:
+            self.send_json(404, {'error': {'code': 'NotFound', 'message': f'fake ARM: {url.path}'}})
+            return
+
+        if self.fleet.latency_ms:
+            time.sleep(self.fleet.latency_ms / 1000)
+
+        if self.state.next_request(family):
+            self.send_json(429, {'error': {'code': 'TooManyRequests', 'message': 'fake throttling'}},
+                           headers={'Retry-After': str(self.fleet.retry_after)})
+            return
+
+        body = getattr(self, handler_name)(match.groupdict(), query, url)
+        self.send_json(200, body)
+
+    def send_json(self, status, body, headers=None):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.send_header('x-ms-request-id', str(self.state.request_count))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    # ---- 페이지 처리 ----
+
+    def page(self, items_count, make_item, query, url):
+        """목록 응답을 page_size 단위로 분할 (nextLink 에 $skiptoken=오프셋)"""
+        offset = int(query.get('$skiptoken', 0))
+        end = min(items_count, offset + self.fleet.page_size)
+        body = {'value': [make_item(i) for i in range(offset, end)]}
+        if end < items_count:
+            next_query = {k: v for k, v in query.items() if k != '$skiptoken'}
+            next_query['$skiptoken'] = end
+            body['nextLink'] = f"http://{self.headers['Host']}{url.path}?{urlencode(next_query)}"
+        return body
+
+    # ---- Compute ----
+
+    def vm_resource(self, sub, index, instance_view=False):
+        name = f"vm-{index:05d}"
+        rg = f"rg-{index % 10:02d}"
+        vm = {
+            'id': f"/subscriptions/{sub}/resourceGroups/{rg}/providers/Microsoft.Compute/virtualMachines/{name}",
+            'name': name,
+            'type': 'Microsoft.Compute/virtualMachines',
+            'location': LOCATION,
+            'properties': {
+                'hardwareProfile': {'vmSize': VM_SIZES[index % len(VM_SIZES)]},
+                'storageProfile': {'osDisk': {'osType': os_type(index), 'createOption': 'FromImage'}},
+                'provisioningState': 'Succeeded'
+            }
+        }
+        if instance_view:
+            vm['properties']['instanceView'] = {'statuses': power_statuses(vm_power_code(index))}
+        return vm
+
+    def vm_list(self, params, query, url):
+        return self.page(self.fleet.vms, lambda i: self.vm_resource(params['sub'], i), query, url)
+
+    def vm_get(self, params, query, url):
+        index = int(params['name'].rsplit('-', 1)[-1])
+        return self.vm_resource(params['sub'], index, instance_view='instanceView' in query.get('$expand', ''))
+
+    def vmss_resource(self, sub, index):
+        name = f"vmss-{index:04d}"
+        rg = f"rg-{index % 10:02d}"
+        return {
+            'id': f"/subscriptions/{sub}/resourceGroups/{rg}/providers/Microsoft.Compute/virtualMachineScaleSets/{name}",
+            'name': name,
+            'type': 'Microsoft.Compute/virtualMachineScaleSets',
+            'location': LOCATION,
+            'sku': {'name': VM_SIZES[index % len(VM_SIZES)], 'tier': 'Standard', 'capacity': self.fleet.instances_per_vmss},
+            'properties': {
+                'upgradePolicy': {'mode': 'Manual'},
+                'provisioningState': 'Succeeded',
+                'virtualMachineProfile': {
+                    'storageProfile': {'osDisk': {'osType': os_type(index), 'createOption': 'FromImage'}}
+                }
+            }
+        }
+
+    def sku_list(self, params, query, url):
+        return {'value': [{
+            'resourceType': 'virtualMachines',
+            'name': name,
+            'tier': 'Standard',
+            'size': name.split('_', 1)[1],
+            'locations': [LOCATION],
+            'capabilities': [{'name': 'vCPUs', 'value': str(vcpus)}, {'name': 'MemoryGB', 'value': str(memory_gb)}]
+        } for name, (vcpus, memory_gb) in VM_SIZE_SPECS.items()]}
+
+    def vmss_list(self, params, query, url):
+        return self.page(self.fleet.vmss, lambda i: self.vmss_resource(params['sub'], i), query, url)
+
+    def vmss_get(self, params, query, url):
+        index = int(params['name'].rsplit('-', 1)[-1])
+        return self.vmss_resource(params['sub'], index)
+
+    def vmss_vm_list(self, params, query, url):
+        base = (f"/subscriptions/{params['sub']}/resourceGroups/{params['rg']}/providers/"
+                f"Microsoft.Compute/virtualMachineScaleSets/{params['name']}/virtualMachines")
+
+        def make_instance(i):
+            return {
+                'id': f"{base}/{i}",
+                'name': f"{params['name']}_{i}",
+                'instanceId': str(i),
+                'type': 'Microsoft.Compute/virtualMachineScaleSets/virtualMachines',
+                'location': LOCATION,
+                'properties': {'provisioningState': 'Succeeded', 'latestModelApplied': True}
+            }
+
+        return self.page(self.fleet.instances_per_vmss, make_instance, query, url)
+
+    def vmss_instance_view(self, params, query, url):
+        # 인스턴스 0번만 중지 상태
+        code = 'PowerState/stopped' if params['instance'] == '0' else 'PowerState/running'
+        return {'platformUpdateDomain': 0, 'platformFaultDomain': 0, 'statuses': power_statuses(code)}
+
+    # ---- Recovery Services / Backup ----
+
+    def vault_list(self, params, query, url):
+        def make_vault(i):
+            name = f"vault-{i:03d}"
+            return {
+                'id': f"/subscriptions/{params['sub']}/resourceGroups/rg-backup/providers/Microsoft.RecoveryServices/vaults/{name}",
+                'name': name,
+                'type': 'Microsoft.RecoveryServices/vaults',
+                'location': LOCATION,
+                'sku': {'name': 'Standard'},
+                'properties': {'provisioningState': 'Succeeded'}
+            }
+
+        return self.page(self.fleet.vaults, make_vault, query, url)
+
+    def job_resource(self, params, index, now):
+        """작업 index 는 30분 간격으로 과거에 시작 (InProgress 작업은 종료 시간 없음)"""
+        base = (f"/subscriptions/{params['sub']}/resourceGroups/{params['rg']}/providers/"
+                f"Microsoft.RecoveryServices/vaults/{params['vault']}/backupJobs")
+        status = JOB_STATUSES[index % len(JOB_STATUSES)]
+        start = now - timedelta(minutes=30 * index)
+        job = {
+            'id': f"{base}/{index:08d}-0000-0000-0000-000000000000",
+            'name': f"{index:08d}-0000-0000-0000-000000000000",
+            'type': 'Microsoft.RecoveryServices/vaults/backupJobs',
+            'properties': {
+                'jobType': 'AzureIaaSVMJob',
+                'entityFriendlyName': f"vm-{index:05d}",
+                'backupManagementType': 'AzureIaasVM',
+                'operation': 'Backup',
+                'status': status,
+                'startTime': iso(start),
+                'duration': 'PT25M'
+            }
+        }
+        if status != 'InProgress':
+            job['properties']['endTime'] = iso(start + timedelta(minutes=25))
+        else:
+            job['properties']['extendedInfo'] = {'progressPercentage': float(index % 100)}
+        return job
+
+    def job_list(self, params, query, url):
+        now = datetime.now(timezone.utc).replace(microsecond=0)
+        indices = list(range(self.fleet.jobs_per_vault))
+        conditions = dict(JOB_FILTER_PATTERN.findall(query.get('$filter', '')))
+        if 'status' in conditions:
+            indices = [i for i in indices if JOB_STATUSES[i % len(JOB_STATUSES)] == conditions['status']]
+        if 'startTime' in conditions and 'endTime' in conditions:
+            window_start = datetime.strptime(conditions['startTime'], JOB_FILTER_TIME_FORMAT).replace(tzinfo=timezone.utc)
+            window_end = datetime.strptime(conditions['endTime'], JOB_FILTER_TIME_FORMAT).replace(tzinfo=timezone.utc)
+            indices = [i for i in indices if window_start <= now - timedelta(minutes=30 * i) <= window_end]
+        return self.page(len(indices), lambda n: self.job_resource(params, indices[n], now), query, url)
+
+    def job_get(self, params, query, url):
+        now = datetime.now(timezone.utc).replace(microsecond=0)
+        return self.job_resource(params, int(params['job'].split('-')[0]), now)
+
+    def protected_item_list(self, params, query, url):
+        """Vault 의 VM 보호 항목 (VM은 Vault 수로 나눠 배정, 5대 중 1대는 미보호,
+        7대 중 1대는 복구 지점이 3일 전, 11대 중 1대는 보호 중지 / VM ID 대소문자는 실제처럼 섞임)"""
+        vault_index = int(params['vault'].rsplit('-', 1)[-1])
+        indices = [i for i in range(self.fleet.vms) if i % self.fleet.vaults == vault_index and i % 5 != 0]
+        now = datetime.now(timezone.utc).replace(microsecond=0)
+        base = (f"/subscriptions/{params['sub']}/resourceGroups/{params['rg']}/providers/"
+                f"Microsoft.RecoveryServices/vaults/{params['vault']}/backupFabrics/Azure/protectionContainers")
+
+        def make_item(n):
+            index = indices[n]
+            name = f"vm-{index:05d}"
+            rg = f"rg-{index % 10:02d}"
+            vm_id = f"/subscriptions/{params['sub']}/resourcegroups/{rg.upper()}/providers/Microsoft.Compute/virtualMachines/{name}"
+            last_recovery = now - (timedelta(days=3) if index % 7 == 0 else timedelta(hours=6))
+            return {
+                'id': f"{base}/iaasvmcontainerv2;{rg};{name}/protectedItems/vm;iaasvmcontainerv2;{rg};{name}",
+                'name': f"VM;iaasvmcontainerv2;{rg};{name}",
+                'type': 'Microsoft.RecoveryServices/vaults/backupFabrics/protectionContainers/protectedItems',
+                'properties': {
+                    'protectedItemType': 'Microsoft.Compute/virtualMachines',
+                    'backupManagementType': 'AzureIaasVM',
+                    'workloadType': 'VM',
+                    'friendlyName': name,
+                    'virtualMachineId': vm_id,
+                    'sourceResourceId': vm_id,
+                    'protectionStatus': 'Healthy',
+                    'protectionState': 'ProtectionStopped' if index % 11 == 0 else 'Protected',
+                    'lastBackupStatus': 'Completed',
+                    'lastBackupTime': iso(last_recovery),
+                    'lastRecoveryPoint': iso(last_recovery)
+                }
+            }
+
+        return self.page(len(indices), make_item, query, url)
+
+    # ---- Monitor ----
+
+    def metrics(self, params, query, url):
+        """메트릭 조회 (metricnames 는 쉼표로 여러 개 지정 가능, 메트릭마다 value 항목 1개)
+
+        VMSS 리소스에 "VMName eq '*'" 필터를 주면 인스턴스마다 시계열 1개로 분할합니다 (top 개까지).
+        """
+        metric_names = [name.strip() for name in query.get('metricnames', 'Percentage CPU').split(',')]
+        interval = query.get('interval', 'PT1M')
+        step = timedelta(minutes=INTERVAL_MINUTES.get(interval, 1))
+        start_text, _, end_text = query.get('timespan', '').partition('/')
+        try:
+            start = datetime.fromisoformat(start_text.replace('Z', '+00:00')).replace(tzinfo=timezone.utc)
+            end = datetime.fromisoformat(end_text.replace('Z', '+00:00')).replace(tzinfo=timezone.utc)
+        except ValueError:
+            end = datetime.now(timezone.utc)
+            start = end - timedelta(minutes=5)
+
+        seed = sum(url.path.encode('utf-8')) % 50
+        # (차원 메타데이터, 시드) 목록 - 분할하지 않으면 차원 없는 시계열 1개
+        series_specs = [([], seed)]
+        split = METRIC_SPLIT_PATTERN.search(query.get('$filter', ''))
+        vmss = VMSS_METRICS_PATH.search(url.path)
+        if split and vmss:
+            count = min(self.fleet.instances_per_vmss, int(query.get('top', 10)))
+            series_specs = [
+                ([{'name': {'value': split.group(1), 'localizedValue': split.group(1)},
+                   'value': f"{vmss.group('name')}_{i}"}], (seed + 31 * i) % 100)
+                for i in range(count)
+            ]
+
+        value_entries = []
+        for metric_name in metric_names:
+            timeseries = []
+            for metadata, series_seed in series_specs:
+                points = []
+                cursor = start.replace(second=0, microsecond=0)
+                n = 0
+                while cursor < end:
+                    value = float((series_seed + n * 7) % 100)
+                    if metric_name == 'Available Memory Bytes':
+                        average = value / 100 * 4 * 1024**3
+                    elif metric_name == 'Disk Read Bytes':
+                        average = value * 1024 * 1024  # 1분 수집 단위의 평균 = 분당 바이트
+                    else:
+                        average = value
+                    points.append({'timeStamp': iso(cursor), 'average': average, 'total': value * 1024 * 1024})
+                    cursor += step
+                    n += 1
+                timeseries.append({'metadatavalues': metadata, 'data': points})
+            value_entries.append({
+                'id': f"{url.path}/{metric_name}",
+                'type': 'Microsoft.Insights/metrics',
+                'name': {'value': metric_name, 'localizedValue': metric_name},
+                'unit': 'Percent',
+                'timeseries': timeseries
+            })
+
+        return {
+            'cost': 0,
+            'timespan': query.get('timespan', ''),
+            'interval': interval,
+            'namespace': 'Microsoft.Compute/virtualMachines',
+            'resourceregion': LOCATION,
+            'value': value_entries
+        }
+
+
+class FakeArmServer:
+    """백그라운드 스레드에서 실행되는 FakeARM 서버
+
+    with FakeArmServer(FakeFleet(vms=100)) as server:
+        client = ComputeManagementClient(credential, 'sub', base_url=server.url, ...)
+    """
+
+    def __init__(self, fleet=None, host='127.0.0.1', port=0):
+        self.httpd = ThreadingHTTPServer((host, port), FakeArmHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.state = FakeArmState(fleet or FakeFleet())
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def state(self):
+        return self.httpd.state
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="오프라인 FakeARM 서버")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--vms', type=int, default=100)
+    parser.add_argument('--vmss', type=int, default=10)
+    parser.add_argument('--instances-per-vmss', type=int, default=3)
+    parser.add_argument('--vaults', type=int, default=2)
+    parser.add_argument('--jobs-per-vault', type=int, default=50)
+    parser.add_argument('--page-size', type=int, default=100)
+    parser.add_argument('--latency-ms', type=float, default=0)
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help="429 응답 비율 (0.01 = 100번째 요청마다)")
+    parser.add_argument('--retry-after', type=int, default=1, help="429 응답의 Retry-After(초)")
+    args = parser.parse_args()
+
+    fleet = FakeFleet(
+        vms=args.vms, vmss=args.vmss, instances_per_vmss=args.instances_per_vmss,
+        vaults=args.vaults, jobs_per_vault=args.jobs_per_vault, page_size=args.page_size,
+        latency_ms=args.latency_ms, throttle_rate=args.throttle_rate, retry_after=args.retry_after
+    )
+    server = FakeArmServer(fleet, port=args.port).start()
+    print(f"🧪 FakeARM 서버 실행 중: {server.url}")
+    print(f"   설정: {json.dumps(fleet.to_dict(), ensure_ascii=False)}")
+    try:
+        while True:
+            time.sleep(5)
+            print(f"   요청 현황: {server.state.snapshot()}")
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
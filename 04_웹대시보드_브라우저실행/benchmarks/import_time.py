@@ -0,0 +1,140 @@
+"""
+대시보드 콜드 스타트(import 시간) 벤치마크
+
+`python -X importtime` 출력을 파싱해 backup_monitor_web.py 모듈의 누적 import 시간과
+가장 무거운 하위 모듈 목록을 보여줍니다. streamlit 자체가 로드하는 모듈을 제외하고
+무거운 패키지(pandas, plotly, Azure SDK 등)가 첫 화면 표시 전에 로드되면 경고합니다.
+
+사용법:
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --repeat 5 --top 15 --max-ms 800
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+# 대시보드 폴더 (benchmarks/ 상위)
+DASHBOARD_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# import 시점에 로드되면 안 되는 무거운 패키지
+HEAVY_MODULES = [
+    'pandas',
+    'numpy',
+    'plotly.express',
+    'plotly.graph_objects',
+    'azure.identity',
+    'azure.mgmt.compute',
+    'azure.mgmt.monitor',
+    'azure.mgmt.recoveryservices',
+    'azure.mgmt.recoveryservicesbackup',
+    'azure.mgmt.resourcegraph',
+]
+
+IMPORTTIME_PATTERN = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$')
+
+
+def run_importtime(module):
+    """새 인터프리터에서 모듈을 import 하고 -X importtime 결과 파싱"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=DASHBOARD_DIR,
+        capture_output=True,
+        text=True,
+        encoding='utf-8',
+        errors='replace'
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"{module} import 실패:\n{result.stderr[-2000:]}")
+
+    entries = []
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_PATTERN.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            entries.append({
+                'module': name,
+                'self_us': int(self_us),
+                'cumulative_us': int(cumulative_us),
+                'depth': len(indent) // 2
+            })
+    return entries
+
+
+def split_target(entries, module):
+    """대상 모듈의 누적 시간과 직계 하위 모듈 목록 추출
+
+    -X importtime은 하위 모듈을 부모보다 먼저 출력하므로, 직전 최상위 항목 이후의
+    depth 1 항목이 대상 모듈의 직계 하위 모듈입니다.
+    """
+    children = []
+    for entry in entries:
+        if entry['depth'] == 0:
+            if entry['module'] == module:
+                return entry['cumulative_us'], children
+            children = []
+        elif entry['depth'] == 1:
+            children.append(entry)
+    return 0, []
+
+
+def summarize(module, repeat, top):
+    """여러 번 측정 후 중앙값 기준 요약"""
+    totals = []
+    last_entries = []
+    for _ in range(repeat):
+        entries = run_importtime(module)
+        total_us, children = split_target(entries, module)
+        totals.append(total_us)
+        last_entries = entries
+
+    heaviest = sorted(children, key=lambda e: e['cumulative_us'], reverse=True)[:top]
+
+    # streamlit이 자체적으로 로드하는 모듈은 대시보드 책임이 아니므로 제외
+    baseline = {e['module'] for e in run_importtime('streamlit')}
+    loaded = {e['module'] for e in last_entries}
+    heavy_loaded = [name for name in HEAVY_MODULES if name in loaded and name not in baseline]
+
+    return {
+        'median_ms': statistics.median(totals) / 1000,
+        'min_ms': min(totals) / 1000,
+        'max_ms': max(totals) / 1000,
+        'heaviest': heaviest,
+        'heavy_loaded': heavy_loaded
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="대시보드 import 시간 측정 (python -X importtime)")
+    parser.add_argument('--module', default='backup_monitor_web', help="측정할 모듈 이름")
+    parser.add_argument('--repeat', type=int, default=3, help="반복 측정 횟수 (중앙값 사용)")
+    parser.add_argument('--top', type=int, default=10, help="표시할 무거운 모듈 수")
+    parser.add_argument('--max-ms', type=float, default=None, help="초과 시 실패(exit 1)로 처리할 기준 시간(ms)")
+    args = parser.parse_args()
+
+    print(f"⏱️ '{args.module}' import 시간 측정 중... ({args.repeat}회)")
+    summary = summarize(args.module, args.repeat, args.top)
+
+    print(f"\n📊 누적 import 시간: 중앙값 {summary['median_ms']:.1f}ms "
+          f"(최소 {summary['min_ms']:.1f}ms / 최대 {summary['max_ms']:.1f}ms)")
+
+    print(f"\n🔍 가장 무거운 모듈 상위 {len(summary['heaviest'])}개:")
+    for entry in summary['heaviest']:
+        print(f"  {entry['cumulative_us'] / 1000:8.1f}ms  {entry['module']}")
+
+    if summary['heavy_loaded']:
+        print("\n⚠️ 첫 화면 전에 로드된 무거운 패키지 (지연 import 필요):")
+        for name in summary['heavy_loaded']:
+            print(f"  - {name}")
+    else:
+        print("\n✅ 무거운 패키지가 import 시점에 로드되지 않습니다.")
+
+    if args.max_ms is not None and summary['median_ms'] > args.max_ms:
+        print(f"\n❌ 기준 시간 초과: {summary['median_ms']:.1f}ms > {args.max_ms:.1f}ms")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,186 @@
+"""
+테넌트 / 구독별 회로 차단기 (인증·권한 오류가 반복되는 계정 건너뛰기)
+
+자격 증명이 깨졌거나 구독이 비활성화된 계정은 새로고침할 때마다 같은 실패와 타임아웃을
+반복합니다. 인증/권한 오류가 연속으로 FAILURE_THRESHOLD 번 나면 회로를 열고(open),
+열려 있는 동안은 호출 없이 건너뜁니다. 백오프 시간이 지나면 한 번만 다시 시도하는
+반개방(half-open) 상태가 되고, 성공하면 닫히며 실패하면 백오프를 두 배로 늘려 다시 엽니다.
+반개방 상태에서는 시험 호출(probe) 하나만 허용하고 그 결과가 기록될 때까지 다른 호출은 막습니다
+(결과 없이 끝난 시험 호출은 PROBE_TIMEOUT_SECONDS 뒤에 다음 호출이 이어받음).
+
+- 테넌트 키 (tenant_id, ''): 토큰 발급 자체가 실패한 경우 (테넌트의 모든 구독에 영향)
+- 구독 키 (tenant_id, subscription_id): 401/403, 구독 없음/비활성화 등 구독 단위 오류
+- Resource Graph 키 (tenant_id, RESOURCE_GRAPH_SCOPE): 테넌트 단위 일괄 조회의 권한 오류
+"""
+import threading
+import time
+
+FAILURE_THRESHOLD = 2
+BASE_BACKOFF_SECONDS = 60
+MAX_BACKOFF_SECONDS = 1800
+PROBE_TIMEOUT_SECONDS = 900  # 계정 수집 마감 시간(최대 600초)보다 길게
+
+CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+RESOURCE_GRAPH_SCOPE = 'resourcegraph'
+
+# 회로 차단 대상 ARM 오류 코드 (일시적 오류가 아니라 설정/권한 문제)
+AUTH_ERROR_CODES = (
+    'AuthenticationFailed', 'AuthorizationFailed', 'LinkedAuthorizationFailed',
+    'InvalidAuthenticationToken', 'InvalidAuthenticationTokenTenant', 'ExpiredAuthenticationToken',
+    'SubscriptionNotFound', 'SubscriptionDisabled', 'ReadOnlyDisabledSubscription', 'InvalidSubscriptionId'
+)
+
+
+def failure_scope(error):
+    """회로 차단 대상 오류면 'tenant' 또는 'subscription', 아니면 None"""
+    from azure.core.exceptions import ClientAuthenticationError
+
+    status = getattr(error, 'status_code', None)
+    if isinstance(error, ClientAuthenticationError) and status is None:
+        return 'tenant'  # 응답 없이 토큰 발급 단계에서 실패
+    if status in (401, 403):
+        return 'subscription'
+    code = getattr(getattr(error, 'error', None), 'code', None) or ''
+    text = f"{code} {error}"
+    if any(error_code in text for error_code in AUTH_ERROR_CODES):
+        return 'subscription'
+    return None
+
+
+class CircuitBreaker:
+    def __init__(self, key, failure_threshold=FAILURE_THRESHOLD,
+                 base_backoff=BASE_BACKOFF_SECONDS, max_backoff=MAX_BACKOFF_SECONDS,
+                 probe_timeout=PROBE_TIMEOUT_SECONDS):
+        self.key = key
+        self.failure_threshold = failure_threshold
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.probe_timeout = probe_timeout
+        self.state = CLOSED
+        self.failures = 0       # 연속 실패 수
+        self.open_count = 0     # 연속으로 열린 횟수 (백오프 계산용)
+        self.retry_at = 0.0
+        self.probe_started_at = None  # 반개방 시험 호출 시작 시각 (진행 중이 아니면 None)
+        self.last_error = ''
+        self.last_success_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def label(self):
+        tenant_id, subscription_id = self.key
+        if subscription_id == RESOURCE_GRAPH_SCOPE:
+            return f"테넌트 {tenant_id[:8]}... Resource Graph"
+        if subscription_id:
+            return f"구독 {subscription_id[:8]}..."
+        return f"테넌트 {tenant_id[:8]}..."
+
+    def backoff(self):
+        return min(self.max_backoff, self.base_backoff * 2 ** max(0, self.open_count - 1))
+
+    def retry_in(self):
+        return max(0.0, self.retry_at - time.time())
+
+    @property
+    def probing(self):
+        return self.probe_started_at is not None and time.time() - self.probe_started_at < self.probe_timeout
+
+    def allow(self):
+        """호출 가능 여부
+
+        열린 상태에서 백오프가 지났으면 반개방으로 전환하고 시험 호출 하나만 허용합니다.
+        시험 호출의 성공/실패가 기록될 때까지 다른 호출은 허용하지 않습니다.
+        """
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.time() < self.retry_at:
+                return False
+            if self.probing:
+                return False
+            self.state = HALF_OPEN
+            self.probe_started_at = time.time()
+            return True
+
+    def release_probe(self):
+        """시험 호출이 성공/실패 판정 없이 끝남 (다음 호출이 다시 시험 호출)"""
+        with self._lock:
+            self.probe_started_at = None
+
+    def record_success(self):
+        with self._lock:
+            self.state = CLOSED
+            self.failures = 0
+            self.open_count = 0
+            self.probe_started_at = None
+            self.last_success_at = time.time()
+
+    def record_failure(self, reason):
+        with self._lock:
+            self.failures += 1
+            self.last_error = reason
+            self.probe_started_at = None
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = OPEN
+                self.open_count += 1
+                self.retry_at = time.time() + self.backoff()
+
+
+class CircuitBreakerBoard:
+    """테넌트 / 구독 키별 회로 차단기 모음 (세션 상태에 보관)"""
+
+    def __init__(self, **options):
+        self.options = options
+        self.breakers = {}
+
+    def get(self, tenant_id, subscription_id=''):
+        key = (tenant_id, subscription_id or '')
+        if key not in self.breakers:
+            self.breakers[key] = CircuitBreaker(key, **self.options)
+        return self.breakers[key]
+
+    def keys(self, tenant_id, subscription_id=''):
+        return [(tenant_id, '')] + ([(tenant_id, subscription_id)] if subscription_id else [])
+
+    def blocking(self, tenant_id, subscription_id=''):
+        """호출을 막고 있는 차단기 (테넌트 → 구독 순으로 확인, 없으면 None)
+
+        호출 직전에 한 번만 사용합니다 (반개방이면 이 호출이 시험 호출이 됨).
+        """
+        for key in self.keys(tenant_id, subscription_id):
+            breaker = self.breakers.get(key)
+            if breaker and not breaker.allow():
+                return breaker
+        return None
+
+    def opened(self, tenant_id, subscription_id=''):
+        """열린 상태의 차단기 (호출 후 회로가 열렸는지 확인용, 시험 호출을 허용/소비하지 않음)"""
+        for key in self.keys(tenant_id, subscription_id):
+            breaker = self.breakers.get(key)
+            if breaker and breaker.state == OPEN:
+                return breaker
+        return None
+
+    def record_success(self, tenant_id, subscription_id=''):
+        """성공 기록 (토큰 발급도 성공했으므로 테넌트 차단기도 함께 닫음)"""
+        if subscription_id and (tenant_id, '') in self.breakers:
+            self.breakers[(tenant_id, '')].record_success()
+        self.get(tenant_id, subscription_id).record_success()
+
+    def record_failure(self, tenant_id, subscription_id, error):
+        """인증/권한 오류만 기록하고 해당 차단기 반환 (그 밖의 오류는 None)"""
+        scope = failure_scope(error)
+        breaker = None
+        if scope is not None:
+            breaker = self.get(tenant_id, '' if scope == 'tenant' else subscription_id)
+            breaker.record_failure(f"{type(error).__name__}: {str(error).strip().splitlines()[0][:150]}")
+        # 이 오류로 판정하지 않은 차단기(일시적 오류 / 다른 범위)의 시험 호출은 다음 호출에 넘김
+        for key in self.keys(tenant_id, subscription_id):
+            if key in self.breakers and self.breakers[key] is not breaker:
+                self.breakers[key].release_probe()
+        return breaker
+
+    def open_breakers(self):
+        return [breaker for breaker in self.breakers.values() if breaker.state != CLOSED]
+
+    def reset(self):
+        self.breakers.clear()
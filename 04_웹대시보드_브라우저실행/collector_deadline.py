@@ -0,0 +1,68 @@
+"""
+계정별 수집 마감 시간 (협조적 취소 + 부분 결과)
+
+수집 함수는 리소스/Vault 하나를 처리하기 전에 check() 로 마감 여부를 확인하고,
+Azure SDK 호출마다 call_options() 를 넘겨 진행 중인 요청도 남은 시간 안에서 끝나도록 합니다.
+마감 시간이 지나면 DeadlineExceeded 가 발생하고, 수집 함수는 그때까지 모은 결과를
+반환하며 deadline.partial 로 부분 결과임을 알립니다.
+"""
+import time
+
+# Azure SDK 연결 시도 제한(초) - 응답 대기(read)는 남은 시간 전체를 사용
+CONNECT_TIMEOUT_SECONDS = 10
+
+
+class DeadlineExceeded(Exception):
+    """계정 수집 마감 시간 초과"""
+
+
+class Deadline:
+    def __init__(self, seconds, call_timeout=30):
+        """
+        Args:
+            seconds: 계정 하나의 전체 수집 마감 시간(초)
+            call_timeout: API 호출 1회(재시도 포함) 제한 시간(초)
+        """
+        self.seconds = seconds
+        self.call_timeout = call_timeout
+        self.started = time.monotonic()
+        self.expires_at = self.started + seconds
+        self.partial = False
+        self.reason = ''
+
+    def remaining(self):
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def elapsed(self):
+        return time.monotonic() - self.started
+
+    @property
+    def expired(self):
+        return time.monotonic() >= self.expires_at
+
+    def mark_partial(self, reason):
+        """부분 결과로 표시 (처음 기록된 사유 유지)"""
+        self.partial = True
+        if not self.reason:
+            self.reason = reason
+
+    def check(self, stage=''):
+        """마감 시간이 지났으면 부분 결과로 표시하고 DeadlineExceeded 발생"""
+        if self.expired:
+            self.mark_partial(f"{stage} 단계에서 마감 시간({self.seconds}초) 초과" if stage
+                              else f"마감 시간({self.seconds}초) 초과")
+            raise DeadlineExceeded(self.reason)
+
+    def call_options(self, stage=''):
+        """Azure SDK 호출에 넘길 timeout 옵션 (남은 시간과 호출 제한 중 짧은 쪽)
+
+        timeout 은 재시도를 포함한 전체 시간(RetryPolicy), read_timeout 은 응답 대기 시간입니다.
+        페이지 목록(list) 호출은 같은 옵션이 페이지마다 적용되므로 항목을 순회하면서 check() 를 함께 사용합니다.
+        """
+        self.check(stage)
+        limit = max(1.0, min(self.call_timeout, self.remaining()))
+        return {
+            'timeout': limit,
+            'read_timeout': limit,
+            'connection_timeout': min(limit, CONNECT_TIMEOUT_SECONDS)
+        }
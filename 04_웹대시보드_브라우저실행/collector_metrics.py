@@ -0,0 +1,253 @@
+"""
+수집기 계측 (Prometheus 텍스트 형식 /metrics)
+
+AzureCredentialManager 가 만드는 모든 관리 클라이언트에 요청 단위 정책을 붙여
+API 계열(family) / 테넌트 / 구독별로 다음 값을 기록합니다.
+
+- azure_api_request_duration_seconds  요청 지연 히스토그램
+- azure_api_requests_total            요청 수 (HTTP 상태 코드별)
+- azure_api_retries_total             재시도 수
+- azure_api_throttled_total           429 응답 수
+- azure_api_response_bytes_total      응답 바이트 수
+- cache_requests_total / cache_hit_ratio      인증/클라이언트 캐시 적중
+- collection_cycle_duration_seconds   수집 함수 1회 실행 시간
+
+기록은 프로세스 전역 레지스트리에 쌓이고, start_metrics_server() 가 띄운
+로컬 HTTP 서버의 /metrics 경로로 노출됩니다 (외부 패키지 불필요).
+"""
+import functools
+import logging
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# 지연 히스토그램 구간(초)
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+CYCLE_BUCKETS = (1.0, 5.0, 15.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0)
+
+DEFAULT_METRICS_PORT = 9109
+
+logger = logging.getLogger(__name__)
+
+
+def escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def format_labels(names, values, extra=None):
+    pairs = list(zip(names, values)) + list(extra or [])
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{escape_label(value)}"' for name, value in pairs) + '}'
+
+
+def format_number(value):
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Counter:
+    def __init__(self, name, help_text, label_names=()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def inc(self, *label_values, amount=1):
+        with self.lock:
+            self.values[label_values] = self.values.get(label_values, 0) + amount
+
+    def get(self, *label_values):
+        return self.values.get(label_values, 0)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self.lock:
+            for label_values, value in sorted(self.values.items()):
+                lines.append(f"{self.name}{format_labels(self.label_names, label_values)} {format_number(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help_text, label_names=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets) + (float('inf'),)
+        self.series = {}  # label_values → [bucket counts..., sum, count]
+        self.lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        with self.lock:
+            series = self.series.setdefault(label_values, [0] * len(self.buckets) + [0.0, 0])
+            for i, upper in enumerate(self.buckets):
+                if value <= upper:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def count(self, *label_values):
+        series = self.series.get(label_values)
+        return series[-1] if series else 0
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self.lock:
+            for label_values, series in sorted(self.series.items()):
+                for i, upper in enumerate(self.buckets):
+                    labels = format_labels(self.label_names, label_values, [('le', format_number(upper))])
+                    lines.append(f"{self.name}_bucket{labels} {series[i]}")
+                labels = format_labels(self.label_names, label_values)
+                lines.append(f"{self.name}_sum{labels} {format_number(series[-2])}")
+                lines.append(f"{self.name}_count{labels} {series[-1]}")
+        return lines
+
+
+API_LABELS = ('family', 'tenant', 'subscription')
+
+API_DURATION = Histogram('azure_api_request_duration_seconds', 'Azure 관리 API 요청 지연(초)', API_LABELS)
+API_REQUESTS = Counter('azure_api_requests_total', 'Azure 관리 API 요청 수', API_LABELS + ('status',))
+API_RETRIES = Counter('azure_api_retries_total', 'Azure 관리 API 재시도 수', API_LABELS)
+API_THROTTLED = Counter('azure_api_throttled_total', 'Azure 관리 API 429 응답 수', API_LABELS)
+API_BYTES = Counter('azure_api_response_bytes_total', 'Azure 관리 API 응답 바이트 수', API_LABELS)
+CACHE_REQUESTS = Counter('cache_requests_total', '캐시 조회 수 (hit/miss)', ('cache', 'result'))
+CYCLE_DURATION = Histogram('collection_cycle_duration_seconds', '수집 함수 1회 실행 시간(초)',
+                           ('collector',), buckets=CYCLE_BUCKETS)
+CYCLE_ERRORS = Counter('collection_cycle_errors_total', '예외로 끝난 수집 함수 실행 수', ('collector',))
+
+REGISTRY = [API_DURATION, API_REQUESTS, API_RETRIES, API_THROTTLED, API_BYTES,
+            CACHE_REQUESTS, CYCLE_DURATION, CYCLE_ERRORS]
+
+
+def record_cache(cache, hit):
+    """캐시 조회 결과 기록 (cache: 'credential', 'client' 등)"""
+    CACHE_REQUESTS.inc(cache, 'hit' if hit else 'miss')
+
+
+def render_cache_hit_ratio():
+    """cache_requests_total 로부터 캐시별 적중률 게이지 계산"""
+    lines = ["# HELP cache_hit_ratio 캐시 적중률 (0~1)", "# TYPE cache_hit_ratio gauge"]
+    caches = sorted({labels[0] for labels in CACHE_REQUESTS.values})
+    for cache in caches:
+        hits = CACHE_REQUESTS.get(cache, 'hit')
+        total = hits + CACHE_REQUESTS.get(cache, 'miss')
+        ratio = hits / total if total else 0.0
+        lines.append(f'cache_hit_ratio{{cache="{escape_label(cache)}"}} {format_number(ratio)}')
+    return lines
+
+
+def render_metrics():
+    """Prometheus 텍스트 노출 형식(0.0.4)"""
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    lines.extend(render_cache_hit_ratio())
+    return '\n'.join(lines) + '\n'
+
+
+def timed_collection(collector):
+    """수집 함수 실행 시간을 collection_cycle_duration_seconds 에 기록하는 데코레이터"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            except Exception:
+                CYCLE_ERRORS.inc(collector)
+                raise
+            finally:
+                CYCLE_DURATION.observe(time.perf_counter() - started, collector)
+        return wrapper
+    return decorator
+
+
+_policy_class = None
+
+
+def metrics_policy(family, tenant_id, subscription_id=''):
+    """요청(재시도 포함) 단위 계측 정책 생성 - per_retry_policies 로 전달
+
+    azure-core 는 클라이언트를 만들 때만 import 하므로 정책 클래스도 처음 사용할 때 정의합니다.
+    """
+    global _policy_class
+    if _policy_class is None:
+        from azure.core.pipeline.policies import SansIOHTTPPolicy
+
+        class AzureCallMetricsPolicy(SansIOHTTPPolicy):
+            def __init__(self, labels):
+                self.labels = labels
+
+            def on_request(self, request):
+                context = request.context
+                attempt = context.get('metrics_attempt', 0) + 1
+                context['metrics_attempt'] = attempt
+                if attempt > 1:
+                    API_RETRIES.inc(*self.labels)
+                context['metrics_started'] = time.perf_counter()
+
+            def on_response(self, request, response):
+                elapsed = time.perf_counter() - request.context.get('metrics_started', time.perf_counter())
+                http_response = response.http_response
+                status = http_response.status_code
+                API_DURATION.observe(elapsed, *self.labels)
+                API_REQUESTS.inc(*self.labels, str(status))
+                if status == 429:
+                    API_THROTTLED.inc(*self.labels)
+                try:
+                    size = int(http_response.headers.get('Content-Length') or len(http_response.body() or b''))
+                except Exception:
+                    size = 0
+                API_BYTES.inc(*self.labels, amount=size)
+
+            def on_exception(self, request):
+                elapsed = time.perf_counter() - request.context.get('metrics_started', time.perf_counter())
+                API_DURATION.observe(elapsed, *self.labels)
+                API_REQUESTS.inc(*self.labels, 'error')
+
+        _policy_class = AzureCallMetricsPolicy
+    return _policy_class((family, tenant_id, subscription_id or ''))
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = render_metrics().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+_server = None
+_server_lock = threading.Lock()
+
+
+def start_metrics_server(port=DEFAULT_METRICS_PORT, host='127.0.0.1'):
+    """/metrics 서버를 백그라운드 스레드로 시작 (프로세스당 1회, 이미 실행 중이면 주소만 반환)
+
+    Returns:
+        서버 주소 문자열, 포트를 열 수 없으면 None
+    """
+    global _server
+    with _server_lock:
+        if _server is None:
+            try:
+                _server = ThreadingHTTPServer((host, port), MetricsHandler)
+            except OSError as e:
+                logger.warning(f"/metrics 서버 시작 실패 ({host}:{port}): {e}")
+                return None
+            _server.daemon_threads = True
+            threading.Thread(target=_server.serve_forever, daemon=True).start()
+        server_host, server_port = _server.server_address[:2]
+        return f"http://{server_host}:{server_port}/metrics"
@@ -0,0 +1,173 @@
+"""
+수집/렌더링 프로파일링 (샘플링 프로파일러 + tracemalloc)
+
+profile_run() 블록 안에서 실행된 코드를 대상으로
+- 호출 스택을 주기적으로 샘플링해 flame graph 용 collapsed stack 파일(.folded)로 저장하고
+  (flamegraph.pl, speedscope.app, inferno 등에서 바로 열 수 있음)
+- 블록 전후 tracemalloc 스냅샷을 비교해 메모리를 가장 많이 할당한 코드 위치를 보고합니다.
+
+외부 패키지 없이 표준 라이브러리만 사용하며, 블록을 실행한 스레드만 샘플링합니다.
+
+각 폴더가 단독으로 실행되도록 02 / 03 / 04 폴더에 같은 파일을 둡니다.
+원본은 04_웹대시보드_브라우저실행/collector_profiler.py 이며, 수정한 뒤 02 / 03 폴더로 그대로 복사합니다
+(04_웹대시보드_브라우저실행/tests/test_profiler_copies.py 가 세 파일이 같은지 확인).
+"""
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+
+PROFILE_ENV = 'BACKUP_MONITOR_PROFILE'
+DEFAULT_INTERVAL = 0.005  # 샘플링 간격(초)
+TRACEMALLOC_FRAMES = 10
+
+
+def profiling_enabled():
+    """환경변수로 프로파일링 모드 기본값 결정 (1 / true / yes / on)"""
+    return os.environ.get(PROFILE_ENV, '').strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def code_label(code):
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """대상 스레드의 호출 스택을 일정 간격으로 샘플링"""
+
+    def __init__(self, thread_id=None, interval=DEFAULT_INTERVAL):
+        self.thread_id = thread_id or threading.get_ident()
+        self.interval = interval
+        self.stacks = Counter()
+        self.sample_count = 0
+        self._labels = {}  # code 객체 → 표시 이름 (샘플마다 문자열을 새로 만들지 않도록)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                label = self._labels.get(code)
+                if label is None:
+                    label = self._labels[code] = code_label(code)
+                stack.append(label)
+                frame = frame.f_back
+            self.stacks[tuple(reversed(stack))] += 1
+            self.sample_count += 1
+
+    def start(self):
+        self._thread = threading.Thread(target=self._sample, name='sampling-profiler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def folded_lines(self):
+        """collapsed stack 형식: 'root;child;leaf 샘플수'"""
+        return [f"{';'.join(stack)} {count}" for stack, count in self.stacks.most_common()]
+
+    def top_functions(self, limit=15):
+        """자기 시간(스택 최상단에 있었던 샘플 수) 기준 상위 함수"""
+        leaves = Counter()
+        for stack, count in self.stacks.items():
+            if stack:
+                leaves[stack[-1]] += count
+        return leaves.most_common(limit)
+
+
+def top_allocations(before, after, limit=15):
+    """두 tracemalloc 스냅샷의 할당 차이 상위 목록 (코드 위치 기준, 프로파일러 자체 할당 제외)"""
+    own = [tracemalloc.Filter(False, __file__), tracemalloc.Filter(False, tracemalloc.__file__)]
+    stats = after.filter_traces(own).compare_to(before.filter_traces(own), 'lineno')
+    allocations = []
+    for stat in stats[:limit]:
+        frame = stat.traceback[0]
+        allocations.append({
+            'location': f"{frame.filename}:{frame.lineno}",
+            'size_kb': stat.size_diff / 1024,
+            'count': stat.count_diff
+        })
+    return allocations
+
+
+def write_report(report, path):
+    """상위 함수 / 상위 할당 위치 텍스트 보고서 저장"""
+    lines = [
+        f"# {report['name']} 프로파일 ({report['started']})",
+        f"소요 시간: {report['seconds']:.2f}초, 샘플: {report['samples']}개 ({report['interval'] * 1000:.0f}ms 간격)",
+        "",
+        "## 자기 시간 상위 함수 (샘플 수)"
+    ]
+    lines += [f"{count:>8}  {label}" for label, count in report['top_functions']]
+    lines += ["", "## 메모리 할당 상위 위치 (블록 전후 차이)"]
+    lines += [f"{item['size_kb']:>10.1f} KB {item['count']:>8}개  {item['location']}" for item in report['top_allocations']]
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(lines) + '\n')
+
+
+@contextmanager
+def profile_run(name, output_dir='profiles', interval=DEFAULT_INTERVAL, top=15):
+    """블록 실행을 프로파일링하고 결과 파일을 저장
+
+    yield 되는 dict 는 블록이 끝난 뒤 채워집니다:
+        folded_path, report_path, seconds, samples, top_functions, top_allocations
+
+    예외가 나도(Streamlit 의 rerun 포함) 그때까지의 결과를 저장합니다.
+    """
+    report = {'name': name, 'interval': interval}
+    started_tracemalloc = not tracemalloc.is_tracing()
+    if started_tracemalloc:
+        tracemalloc.start(TRACEMALLOC_FRAMES)
+    before = tracemalloc.take_snapshot()
+    profiler = SamplingProfiler(interval=interval)
+    started_at = datetime.now()
+    started = time.perf_counter()
+    profiler.start()
+    try:
+        yield report
+    finally:
+        profiler.stop()
+        seconds = time.perf_counter() - started
+        after = tracemalloc.take_snapshot()
+        if started_tracemalloc:
+            tracemalloc.stop()
+
+        os.makedirs(output_dir, exist_ok=True)
+        base = os.path.join(output_dir, f"{name}_{started_at.strftime('%Y%m%d_%H%M%S_%f')[:-3]}")
+        report.update({
+            'started': started_at.strftime('%Y-%m-%d %H:%M:%S'),
+            'seconds': seconds,
+            'samples': profiler.sample_count,
+            'top_functions': profiler.top_functions(top),
+            'top_allocations': top_allocations(before, after, top),
+            'folded_path': base + '.folded',
+            'report_path': base + '_report.txt'
+        })
+        with open(report['folded_path'], 'w', encoding='utf-8') as f:
+            f.write('\n'.join(profiler.folded_lines()) + '\n')
+        write_report(report, report['report_path'])
+
+
+def print_report(report):
+    """콘솔용 요약 출력 (CLI --profile)"""
+    print("\n" + "=" * 60)
+    print(f"🧪 프로파일 결과 ({report['seconds']:.2f}초, 샘플 {report['samples']}개)")
+    print("=" * 60)
+    print(f"🔥 Flame graph (collapsed stack): {report['folded_path']}")
+    print(f"📄 보고서: {report['report_path']}")
+    print("\n⏱️ 자기 시간 상위 함수:")
+    for label, count in report['top_functions'][:10]:
+        print(f"  {count:>6}  {label}")
+    print("\n💾 메모리 할당 상위 위치:")
+    for item in report['top_allocations'][:10]:
+        print(f"  {item['size_kb']:>9.1f} KB  {item['location']}")
@@ -0,0 +1,138 @@
+"""
+스냅샷용 "최신 값" 메트릭 조회 (리소스당 호출 1회 + 구간 캐시)
+
+최근 5분을 1분 간격으로 받아 마지막 포인트(data[-1])만 쓰면, 마지막 1분 구간은 아직 집계 전이라
+비어 있는 경우가 많아 N/A 가 자주 표시됩니다. 여기서는
+- 스냅샷에 필요한 메트릭(CPU / 메모리 / 디스크)을 metricnames 하나로 묶어 한 번에 조회하고
+- 구간 전체를 하나로 집계한 포인트(interval=SNAPSHOT_INTERVAL)를 요청하며
+  (구간 경계에 걸리면 포인트가 2개 올 수 있음) 값이 있는 마지막 포인트를 사용합니다.
+- 조회 결과는 리소스별로 구간 길이(SNAPSHOT_SECONDS) 동안 캐시해 새로고침마다 다시 조회하지 않습니다.
+
+VMSS 처럼 인스턴스가 여러 개인 리소스는 차원 필터(예: "VMName eq '*'")로 분할 조회하면
+호출 1회로 인스턴스마다 시계열을 받을 수 있습니다 (latest_metric_values_by_dimension).
+
+Azure 플랫폼 메트릭은 1분 단위로 수집되므로 Average 집계는 '1분당 값의 평균'입니다
+(Disk Read Bytes 의 Average = 분당 읽은 바이트 평균).
+"""
+import threading
+import time
+from datetime import datetime, timedelta
+
+SNAPSHOT_INTERVAL = 'PT5M'
+SNAPSHOT_SECONDS = 300
+MAX_CACHE_ENTRIES = 20000
+MAX_DIMENSION_SERIES = 1000  # 차원 분할 시 메트릭당 시계열 수 상한 (API 기본값 10, VMSS 최대 인스턴스 수 1000)
+
+_cache = {}  # (리소스 ID 소문자, 메트릭 이름들, 차원) → (만료 시각 monotonic, 조회 결과)
+_lock = threading.Lock()
+
+
+def reset_snapshot_cache():
+    with _lock:
+        _cache.clear()
+
+
+def _prune(now):
+    """캐시가 커지면 만료된 항목 정리"""
+    if len(_cache) > MAX_CACHE_ENTRIES:
+        for key in [key for key, (expires_at, _) in _cache.items() if expires_at <= now]:
+            del _cache[key]
+
+
+def _cached(key, now):
+    with _lock:
+        cached = _cache.get(key)
+        if cached and cached[0] > now:
+            return cached[1]
+    return None
+
+
+def _store(key, now, result):
+    with _lock:
+        _prune(now)
+        _cache[key] = (now + SNAPSHOT_SECONDS, result)
+
+
+def _query(monitor_client, resource_id, metric_names, call_options, **options):
+    """최근 SNAPSHOT_SECONDS 구간을 하나로 집계한 메트릭 조회 (메트릭들을 한 번에)"""
+    end_time = datetime.utcnow()
+    start_time = end_time - timedelta(seconds=SNAPSHOT_SECONDS)
+    return monitor_client.metrics.list(
+        resource_uri=resource_id,
+        timespan=f"{start_time.isoformat()}/{end_time.isoformat()}",
+        interval=SNAPSHOT_INTERVAL,
+        metricnames=','.join(metric_names),
+        aggregation='Average',
+        **options,
+        **(call_options or {})
+    )
+
+
+def _latest_average(series):
+    """값이 있는 마지막 포인트의 평균 (구간 경계의 빈 포인트 건너뜀, 없으면 None)"""
+    for point in reversed(series.data or []):
+        if point.average is not None:
+            return float(point.average)
+    return None
+
+
+def latest_metric_values(monitor_client, resource_id, metric_names, call_options=None):
+    """리소스의 메트릭별 최신 집계 값 {메트릭 이름: 값 또는 None}
+
+    call_options: API 호출에 넘길 Azure SDK 옵션 (예: Deadline.call_options() 의 timeout)
+    값이 하나도 없으면 캐시하지 않아 다음 조회에서 다시 시도합니다.
+    """
+    key = (resource_id.lower(), tuple(metric_names), None)
+    now = time.monotonic()
+    cached = _cached(key, now)
+    if cached is not None:
+        return dict(cached)
+
+    response = _query(monitor_client, resource_id, metric_names, call_options)
+
+    by_name = {name.lower(): name for name in metric_names}
+    values = {name: None for name in metric_names}
+    for metric in response.value or []:
+        name = by_name.get((metric.name.value or '').lower())
+        if name is None or not metric.timeseries:
+            continue
+        values[name] = _latest_average(metric.timeseries[0])
+
+    if any(value is not None for value in values.values()):
+        _store(key, now, values)
+    return dict(values)
+
+
+def latest_metric_values_by_dimension(monitor_client, resource_id, metric_names, dimension, call_options=None):
+    """차원 값별 메트릭 최신 집계 값 {차원 값: {메트릭 이름: 값 또는 None}}
+
+    "<dimension> eq '*'" 필터로 한 번에 분할 조회합니다 (예: VMSS 의 VMName → 인스턴스별).
+    응답에 시계열이 없는 차원 값(데이터가 아직 없는 인스턴스)은 결과에 포함되지 않습니다.
+    """
+    key = (resource_id.lower(), tuple(metric_names), dimension)
+    now = time.monotonic()
+    cached = _cached(key, now)
+    if cached is not None:
+        return {member: dict(values) for member, values in cached.items()}
+
+    response = _query(monitor_client, resource_id, metric_names, call_options,
+                      filter=f"{dimension} eq '*'", top=MAX_DIMENSION_SERIES)
+
+    by_name = {name.lower(): name for name in metric_names}
+    dimension_key = dimension.lower()
+    members = {}
+    for metric in response.value or []:
+        name = by_name.get((metric.name.value or '').lower())
+        if name is None:
+            continue
+        for series in metric.timeseries or []:
+            member = next((item.value for item in series.metadatavalues or []
+                           if (item.name.value or '').lower() == dimension_key), None)
+            if member is None:
+                continue
+            values = members.setdefault(member, {metric_name: None for metric_name in metric_names})
+            values[name] = _latest_average(series)
+
+    if any(value is not None for values in members.values() for value in values.values()):
+        _store(key, now, members)
+    return {member: dict(values) for member, values in members.items()}
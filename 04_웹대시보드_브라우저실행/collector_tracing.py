@@ -0,0 +1,216 @@
+"""
+수집 실행 추적 (span 트리 + waterfall 데이터 + 선택적 OTLP 내보내기)
+
+조회 버튼 1회 = 실행(run) 1개. trace_run() 안에서 호출되는 수집 함수들이
+span() 으로 계정 → 리소스 → 단계(auth / list / detail / metrics / store / render) 를 중첩 기록합니다.
+실행 중이 아닐 때(벤치마크, CLI 등) span() 은 아무것도 기록하지 않습니다.
+
+OTEL_EXPORTER_OTLP_ENDPOINT 환경변수(예: http://localhost:4318)가 있으면 실행이 끝날 때
+OTLP/HTTP JSON 형식으로 {endpoint}/v1/traces 에 전송합니다 (외부 패키지 불필요).
+"""
+import contextvars
+import json
+import logging
+import os
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+_current_span = contextvars.ContextVar('collector_current_span', default=None)
+
+
+class Span:
+    def __init__(self, name, stage, attrs=None, parent=None):
+        self.name = name
+        self.stage = stage
+        self.attrs = dict(attrs or {})
+        self.parent = parent
+        self.children = []
+        self.span_id = secrets.token_hex(8)
+        self.trace_id = parent.trace_id if parent else secrets.token_hex(16)
+        self.wall_ns = time.time_ns()
+        self.start = time.perf_counter()
+        self.end = None
+        self.error = None
+        self.rendered = False
+
+    def finish(self):
+        self.end = time.perf_counter()
+
+    @property
+    def duration(self):
+        return (self.end if self.end is not None else time.perf_counter()) - self.start
+
+
+@contextmanager
+def span(name, stage, **attrs):
+    """현재 span 아래에 자식 span 기록 (실행 중이 아니면 기록하지 않음)"""
+    parent = _current_span.get()
+    if parent is None:
+        yield None
+        return
+    child = Span(name, stage, attrs, parent)
+    parent.children.append(child)
+    token = _current_span.set(child)
+    try:
+        yield child
+    except BaseException as e:
+        child.error = f"{type(e).__name__}: {str(e)[:200]}"
+        raise
+    finally:
+        child.finish()
+        _current_span.reset(token)
+
+
+@contextmanager
+def trace_run(run_name, expect_render=False, **attrs):
+    """수집 실행 1회의 root span
+
+    yield 된 root 는 호출 측에서 보관합니다 (대시보드는 세션 상태에 저장).
+    expect_render=True 면 이어지는 start_render() / finish_render() 까지 포함한 뒤 내보냅니다.
+    """
+    root = Span(run_name, 'run', attrs)
+    token = _current_span.set(root)
+    try:
+        yield root
+    except BaseException as e:
+        root.error = f"{type(e).__name__}: {str(e)[:200]}"
+        raise
+    finally:
+        root.finish()
+        _current_span.reset(token)
+        if not expect_render or root.error:
+            root.rendered = True
+            export_run(root)
+
+
+def start_render(root):
+    """실행 직후 첫 화면 렌더링을 해당 실행의 render span 으로 기록 시작 (이후 렌더링은 기록하지 않음)
+
+    화면 코드는 길게 이어지므로 with 블록 대신 finish_render() 와 짝으로 호출합니다.
+    """
+    if root is None or root.rendered:
+        return None
+    root.rendered = True
+    child = Span('render', 'render', parent=root)
+    root.children.append(child)
+    return child
+
+
+def finish_render(render):
+    """start_render() 로 시작한 render span 종료 후 실행 내보내기"""
+    if render is None:
+        return
+    render.finish()
+    root = render.parent
+    root.end = max(root.end or 0, render.end)
+    export_run(root)
+
+
+def critical_path(root):
+    """각 단계에서 가장 오래 걸린 자식을 따라간 경로 (순차 수집에서 전체 시간을 좌우한 구간)"""
+    path = [root]
+    node = root
+    while node.children:
+        node = max(node.children, key=lambda child: child.duration)
+        path.append(node)
+    return path
+
+
+def iter_spans(root, depth=0):
+    yield root, depth
+    for child in root.children:
+        yield from iter_spans(child, depth + 1)
+
+
+def waterfall_rows(root, max_rows=300):
+    """waterfall 차트용 행 목록 (트리 순서)
+
+    span 이 max_rows 보다 많으면 임계 경로와 계정/테넌트 단계는 남기고
+    나머지는 오래 걸린 순으로 잘라냅니다.
+
+    Returns:
+        (rows, hidden_count) - row: name, stage, depth, offset, duration, critical, error
+    """
+    on_path = {id(node) for node in critical_path(root)}
+    spans = list(iter_spans(root))
+    keep = set(range(len(spans)))
+    if len(spans) > max_rows:
+        required = {i for i, (node, depth) in enumerate(spans) if id(node) in on_path or depth <= 1}
+        others = sorted(
+            (i for i in range(len(spans)) if i not in required),
+            key=lambda i: spans[i][0].duration, reverse=True
+        )
+        keep = required | set(others[:max(0, max_rows - len(required))])
+    rows = []
+    for i, (node, depth) in enumerate(spans):
+        if i not in keep:
+            continue
+        rows.append({
+            'name': node.name,
+            'stage': node.stage,
+            'depth': depth,
+            'offset': node.start - root.start,
+            'duration': node.duration,
+            'critical': id(node) in on_path,
+            'error': node.error or ''
+        })
+    return rows, len(spans) - len(rows)
+
+
+def stage_totals(root):
+    """단계별 합계 시간 (자식 단계와 겹치는 시간 포함)"""
+    totals = {}
+    for node, depth in iter_spans(root):
+        if depth == 0:
+            continue
+        totals[node.stage] = totals.get(node.stage, 0.0) + node.duration
+    return totals
+
+
+def otlp_payload(root, service_name='backup-monitor-web'):
+    """OTLP/HTTP JSON (ExportTraceServiceRequest) 본문"""
+    spans = []
+    for node, depth in iter_spans(root):
+        start_ns = root.wall_ns + int((node.start - root.start) * 1e9)
+        attributes = [{'key': 'collector.stage', 'value': {'stringValue': node.stage}}]
+        attributes += [{'key': key, 'value': {'stringValue': str(value)}} for key, value in node.attrs.items()]
+        spans.append({
+            'traceId': node.trace_id,
+            'spanId': node.span_id,
+            'parentSpanId': node.parent.span_id if node.parent else '',
+            'name': node.name,
+            'kind': 1,
+            'startTimeUnixNano': str(start_ns),
+            'endTimeUnixNano': str(start_ns + int(node.duration * 1e9)),
+            'attributes': attributes,
+            'status': {'code': 2, 'message': node.error} if node.error else {}
+        })
+    return {
+        'resourceSpans': [{
+            'resource': {'attributes': [{'key': 'service.name', 'value': {'stringValue': service_name}}]},
+            'scopeSpans': [{'scope': {'name': 'collector_tracing'}, 'spans': spans}]
+        }]
+    }
+
+
+def export_run(root):
+    """OTEL_EXPORTER_OTLP_ENDPOINT 가 설정되어 있으면 백그라운드로 전송 (실패는 로그만 남김)"""
+    endpoint = os.environ.get('OTEL_EXPORTER_OTLP_ENDPOINT')
+    if not endpoint:
+        return
+    url = endpoint.rstrip('/') + '/v1/traces'
+    body = json.dumps(otlp_payload(root)).encode('utf-8')
+
+    def send():
+        import urllib.request
+        try:
+            request = urllib.request.Request(url, data=body, headers={'Content-Type': 'application/json'})
+            urllib.request.urlopen(request, timeout=5).close()
+        except Exception as e:
+            logger.warning(f"OTLP 추적 전송 실패 ({url}): {e}")
+
+    threading.Thread(target=send, daemon=True).start()
@@ -0,0 +1,68 @@
+"""
+공용 HTTP 전송 계층 (프로세스당 keep-alive 연결 풀 1개)
+
+AzureCredentialManager 가 만드는 모든 관리 클라이언트(Compute / Monitor / RecoveryServices /
+Backup / Resource Graph)와 인증 객체가 같은 requests.Session 을 공유하므로
+management.azure.com 에 대한 TLS 연결을 클라이언트·구독·브라우저 세션마다 새로 맺지 않고 재사용합니다.
+
+- 재시도는 azure-core RetryPolicy 가 담당하므로 urllib3 재시도는 끕니다 (azure-core 기본 어댑터와 동일)
+- 여러 테넌트/브라우저 세션이 공유하므로 쿠키는 저장하지 않습니다 (인증은 요청마다 Authorization 헤더)
+"""
+import os
+import threading
+
+# 호스트별 연결 풀 수 (management.azure.com, login.microsoftonline.com 등)
+HTTP_POOL_CONNECTIONS = 4
+# 호스트당 유지할 keep-alive 연결 수 - 동시에 수집하는 브라우저 세션 수에 맞춤
+DEFAULT_HTTP_POOL_SIZE = 10
+
+_session = None
+_transport = None
+_lock = threading.Lock()
+
+
+def http_pool_size():
+    """호스트당 연결 수 (BACKUP_MONITOR_HTTP_POOL_SIZE 로 조정)"""
+    try:
+        return max(1, int(os.environ.get('BACKUP_MONITOR_HTTP_POOL_SIZE', DEFAULT_HTTP_POOL_SIZE)))
+    except ValueError:
+        return DEFAULT_HTTP_POOL_SIZE
+
+
+def shared_session():
+    """프로세스 공용 requests.Session (처음 호출할 때 생성)"""
+    global _session
+    with _lock:
+        if _session is None:
+            import requests
+            from http.cookiejar import DefaultCookiePolicy
+            from requests.adapters import HTTPAdapter
+            from urllib3.util.retry import Retry
+
+            pool_size = http_pool_size()
+            adapter = HTTPAdapter(
+                pool_connections=HTTP_POOL_CONNECTIONS,
+                pool_maxsize=pool_size,
+                max_retries=Retry(total=False, redirect=False, raise_on_status=False)
+            )
+            session = requests.Session()
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+            _session = session
+        return _session
+
+
+def shared_transport():
+    """모든 SDK 클라이언트에 넘길 공용 RequestsTransport
+
+    session_owner=False 이므로 클라이언트를 닫아도 공용 세션(연결 풀)은 닫히지 않습니다.
+    """
+    global _transport
+    session = shared_session()
+    with _lock:
+        if _transport is None:
+            from azure.core.pipeline.transport import RequestsTransport
+            _transport = RequestsTransport(session=session, session_owner=False)
+        return _transport
+
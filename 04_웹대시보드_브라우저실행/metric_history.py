@@ -0,0 +1,400 @@
+"""
+로컬 메트릭 이력 저장소 (원본 → 5분 → 1시간 단계별 보존과 압축)
+
+추이 수집(get_vm_24h_metrics)으로 받은 포인트를 리소스·메트릭 시계열별로 디스크에 쌓습니다.
+원본 1분 포인트를 몇 달씩 그대로 보관하면 끝없이 커지므로 compact() 가
+- 원본(raw) 포인트를 5분 구간으로, 5분 구간을 다시 1시간 구간으로 묶어 min / max / 평균 / count 로 보관하고
+  (평균은 합계(sum)와 count 로 저장하므로 상위 단계로 다시 묶어도 정확합니다)
+- 단계마다 보존 기간(horizon)이 지난 일 파일을 지웁니다 (기본: 원본 3일, 5분 30일, 1시간 400일)
+  아직 상위 단계로 묶이지 않은 구간이 남은 파일은 지우지 않습니다.
+
+조회(query)는 요청한 기간과 간격을 만족하는 가장 거친 단계를 고릅니다
+(구간 길이 ≤ 요청 간격이고 보존 기간이 조회 시작 시각을 포함하는 단계 중 구간이 가장 긴 단계).
+그 단계로 아직 묶이지 않은 최근 구간은 더 촘촘한 단계에서 읽어 이어 붙이고, 결과는 요청 간격으로 다시 묶습니다.
+수집 기록(spans: 수집한 시간 범위와 간격)이 조회 기간 전체를 요청 간격 이하로 덮을 때만 답하므로
+15분 간격으로만 수집한 시계열에 1분 간격 조회가 오면 None 을 돌려주고, 호출 측이 Azure 에서 조회합니다.
+
+파일: <directory>/<단계>/<YYYYMMDD>.json (UTC 일 단위) + state.json (워터마크 / 압축 위치 / 수집 기록)
+"""
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+DEFAULT_HISTORY_DIR = 'history'
+RAW = 'raw'
+TIERS = ((RAW, 0), ('5m', 300), ('1h', 3600))  # (단계 이름, 구간 초) - 원본은 수집 간격 그대로
+DEFAULT_HORIZONS = {RAW: 3 * 86400, '5m': 30 * 86400, '1h': 400 * 86400}  # 단계별 보존 기간(초)
+DAY_SECONDS = 86400
+LATE_POINT_SECONDS = 2 * 86400  # 추이 조회 최대 기간(48시간) - 이보다 오래된 구간에는 새 포인트가 오지 않음
+AGGREGATE_FIELDS = ('t', 'min', 'max', 'sum', 'count')
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()  # 같은 프로세스의 세션들이 동시에 flush / compact 할 때 파일 병합 직렬화
+
+
+def series_key(resource_id, metric):
+    """'리소스 ID(소문자)|메트릭' 형식 키"""
+    return f"{resource_id.lower()}|{metric}"
+
+
+def day_name(epoch):
+    return datetime.fromtimestamp(epoch, timezone.utc).strftime('%Y%m%d')
+
+
+def day_start(name):
+    return int(datetime.strptime(name, '%Y%m%d').replace(tzinfo=timezone.utc).timestamp())
+
+
+def empty_series():
+    return {field: np.array([], dtype=np.int64 if field == 't' else float) for field in AGGREGATE_FIELDS}
+
+
+def as_series(data, tier):
+    """저장된 JSON 시계열 → numpy 구간 배열 (원본 포인트는 포인트 하나짜리 구간)"""
+    if tier == RAW:
+        values = np.asarray(data['v'], dtype=float)
+        return {'t': np.asarray(data['t'], dtype=np.int64), 'min': values, 'max': values,
+                'sum': values, 'count': np.ones(len(values))}
+    return {field: np.asarray(data[field], dtype=np.int64 if field == 't' else float) for field in AGGREGATE_FIELDS}
+
+
+def concat_series(parts):
+    parts = [part for part in parts if len(part['t'])]
+    if not parts:
+        return empty_series()
+    merged = {field: np.concatenate([part[field] for part in parts]) for field in AGGREGATE_FIELDS}
+    order = np.argsort(merged['t'], kind='stable')
+    return {field: values[order] for field, values in merged.items()}
+
+
+def slice_series(series, start, end):
+    mask = (series['t'] >= start) & (series['t'] < end)
+    return {field: values[mask] for field, values in series.items()}
+
+
+def rollup(series, bucket_seconds):
+    """시간순 구간들을 bucket_seconds 구간으로 묶음 (min / max / sum / count 병합)"""
+    if not len(series['t']):
+        return empty_series()
+    starts, index = np.unique(series['t'] // bucket_seconds * bucket_seconds, return_index=True)
+    return {
+        't': starts,
+        'min': np.minimum.reduceat(series['min'], index),
+        'max': np.maximum.reduceat(series['max'], index),
+        'sum': np.add.reduceat(series['sum'], index),
+        'count': np.add.reduceat(series['count'], index)
+    }
+
+
+def merge_spans(spans, start, end, resolution):
+    """수집 기록에 [start, end) 범위 추가 (간격이 같은 범위끼리 겹치거나 맞닿으면 합침)"""
+    merged = []
+    for span in sorted(spans + [[start, end, resolution]]):
+        if merged and merged[-1][2] == span[2] and span[0] <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], span[1])
+        else:
+            merged.append(list(span))
+    return merged
+
+
+def covers(spans, start, end, resolution):
+    """수집 기록이 [start, end) 를 resolution(초) 이하 간격으로 빈틈없이 덮는지"""
+    position = start
+    for span_start, span_end, span_resolution in sorted(spans):
+        if position >= end:
+            break
+        if span_resolution > resolution or span_end <= position:
+            continue
+        if span_start > position:
+            return False
+        position = span_end
+    return position >= end
+
+
+class MetricHistory:
+    """단계별 메트릭 이력 저장소
+
+    수집기는 add() 로 메모리에 쌓고 flush() 로 원본 일 파일에 병합한 뒤 compact() 로 압축합니다.
+    """
+
+    def __init__(self, directory=DEFAULT_HISTORY_DIR, horizons=None):
+        self.directory = directory
+        self.horizons = {**DEFAULT_HORIZONS, **(horizons or {})}
+        self.pending = {}  # 키 → [(epochs, values, [수집 시작, 수집 끝, 간격 초])]
+
+    def tier_path(self, tier, day):
+        return os.path.join(self.directory, tier, f"{day}.json")
+
+    def _read_json(self, path, default):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return default
+
+    def _write_json(self, path, data):
+        """임시 파일에 쓴 뒤 교체 (읽는 쪽이 반쯤 쓰인 파일을 보지 않도록)"""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(temp_path, path)
+
+    def _state(self):
+        state = self._read_json(os.path.join(self.directory, 'state.json'), {})
+        for name in ('watermarks', 'compacted', 'spans'):
+            state.setdefault(name, {})
+        return state
+
+    def days(self, tier):
+        """단계에 저장된 일 파일 이름 목록 (YYYYMMDD, 오름차순)"""
+        try:
+            names = os.listdir(os.path.join(self.directory, tier))
+        except OSError:
+            return []
+        return sorted(stem for stem, ext in map(os.path.splitext, names)
+                      if ext == '.json' and len(stem) == 8 and stem.isdigit())
+
+    def add(self, resource_id, metric, epochs, values, resolution_seconds, span):
+        """시계열 하나의 수집 결과 추가 (flush 전까지 메모리)
+
+        Args:
+            resolution_seconds: 수집 간격(초)
+            span: 수집한 시간 범위 (시작 epoch, 끝 epoch) - 포인트가 없는 구간도 '수집함'으로 기록
+        """
+        epochs = np.asarray(epochs, dtype=np.int64)
+        values = np.asarray(values, dtype=float)
+        valid = ~np.isnan(values)
+        self.pending.setdefault(series_key(resource_id, metric), []).append(
+            (epochs[valid], values[valid], [int(span[0]), int(span[1]), int(resolution_seconds)])
+        )
+
+    def flush(self):
+        """쌓인 포인트 중 워터마크 이후만 원본 일 파일에 병합하고 수집 기록 갱신"""
+        if not self.pending:
+            return
+        try:
+            with _lock:
+                state = self._state()
+                by_day = {}  # 일 이름 → {키: [(epochs, values)]}
+                for key, chunks in self.pending.items():
+                    for epochs, values, (start, end, resolution) in chunks:
+                        watermark = state['watermarks'].get(key, 0)
+                        # 워터마크 이전 포인트는 저장하지 않으므로 수집 기록도 워터마크 이후만
+                        if end > max(start, watermark):
+                            state['spans'][key] = merge_spans(state['spans'].get(key, []),
+                                                              max(start, watermark), end, resolution)
+                        fresh = epochs > watermark
+                        epochs, index = np.unique(epochs[fresh], return_index=True)
+                        values = values[fresh][index]
+                        if not len(epochs):
+                            continue
+                        days = epochs // DAY_SECONDS * DAY_SECONDS
+                        for day_epoch in np.unique(days).tolist():
+                            in_day = days == day_epoch
+                            by_day.setdefault(day_name(day_epoch), {}).setdefault(key, []).append(
+                                (epochs[in_day], values[in_day]))
+                        state['watermarks'][key] = int(epochs.max())
+
+                for day, series in by_day.items():
+                    path = self.tier_path(RAW, day)
+                    stored = self._read_json(path, {}).get('series', {})
+                    for key, chunks in series.items():
+                        data = stored.setdefault(key, {'t': [], 'v': []})
+                        for epochs, values in chunks:
+                            data['t'].extend(epochs.tolist())
+                            data['v'].extend(values.tolist())
+                    self._write_json(path, {'tier': RAW, 'day': day, 'series': stored})
+                self._write_json(os.path.join(self.directory, 'state.json'), state)
+        except OSError as e:
+            logger.warning(f"메트릭 이력 저장 실패: {e}")
+        self.pending = {}
+
+    def _load(self, tier, ranges):
+        """단계의 일 파일을 한 번씩만 읽어 키별 [시작, 끝) 구간 배열 {키: 시계열}"""
+        parts = {key: [] for key in ranges}
+        if not ranges:
+            return {}
+        low = min(start for start, _ in ranges.values())
+        high = max(end for _, end in ranges.values())
+        for day in self.days(tier):
+            day_epoch = day_start(day)
+            if day_epoch + DAY_SECONDS <= low or day_epoch >= high:
+                continue
+            stored = self._read_json(self.tier_path(tier, day), {}).get('series', {})
+            for key, (start, end) in ranges.items():
+                if key in stored and start < day_epoch + DAY_SECONDS and end > day_epoch:
+                    parts[key].append(slice_series(as_series(stored[key], tier), start, end))
+        return {key: concat_series(chunks) for key, chunks in parts.items()}
+
+    def _roll(self, state, source, target, bucket_seconds, now):
+        """source 단계의 완료된 구간을 target 단계로 묶음 → 새로 만든 구간 수
+
+        source 에 [.., ready) 까지 빠짐없이 들어 있으면 ready 가 속한(아직 채워지는 중일 수 있는) 구간 앞까지 묶고,
+        ready 가 LATE_POINT_SECONDS 보다 오래되었으면 더 올 포인트가 없으므로 마지막 구간까지 묶습니다.
+        """
+        compacted = state['compacted'].setdefault(target, {})
+        if source == RAW:
+            ready_marks = {key: epoch + 1 for key, epoch in state['watermarks'].items()}
+        else:
+            ready_marks = state['compacted'].get(source, {})
+        ranges = {}
+        for key, ready in ready_marks.items():
+            if ready <= now - LATE_POINT_SECONDS:
+                limit = -(-ready // bucket_seconds) * bucket_seconds
+            else:
+                limit = ready // bucket_seconds * bucket_seconds
+            start = compacted.get(key, 0)
+            if limit > start:
+                ranges[key] = (start, limit)
+
+        by_day = {}  # 일 이름 → {키: 시계열}
+        for key, series in self._load(source, ranges).items():
+            buckets = rollup(series, bucket_seconds)
+            days = buckets['t'] // DAY_SECONDS * DAY_SECONDS
+            for day_epoch in np.unique(days).tolist():
+                by_day.setdefault(day_name(day_epoch), {})[key] = slice_series(buckets, day_epoch,
+                                                                               day_epoch + DAY_SECONDS)
+
+        rolled = 0
+        for day, series in by_day.items():
+            path = self.tier_path(target, day)
+            stored = self._read_json(path, {}).get('series', {})
+            for key, buckets in series.items():
+                data = stored.setdefault(key, {field: [] for field in AGGREGATE_FIELDS})
+                fresh = buckets['t'] > (data['t'][-1] if data['t'] else -1)  # 다른 프로세스가 먼저 묶은 구간 제외
+                for field in AGGREGATE_FIELDS:
+                    data[field].extend(buckets[field][fresh].tolist())
+                rolled += int(fresh.sum())
+            self._write_json(path, {'tier': target, 'day': day, 'series': stored})
+        for key, (_, limit) in ranges.items():
+            compacted[key] = limit
+        return rolled
+
+    def _prune(self, state, now):
+        """보존 기간이 지난 일 파일 삭제 (상위 단계로 아직 묶이지 않은 구간이 있는 파일은 유지)
+
+        파일 안 시계열마다 마지막 구간이 상위 단계의 묶은 위치보다 앞이면 묶인 것으로 봅니다
+        (수집이 끊긴 VM은 묶은 위치가 일 끝까지 가지 않으므로 일 끝이 아닌 마지막 구간과 비교).
+        """
+        removed = 0
+        for index, (tier, _) in enumerate(TIERS):
+            cutoff = now - self.horizons[tier]
+            next_marks = state['compacted'].get(TIERS[index + 1][0], {}) if index + 1 < len(TIERS) else None
+            for day in self.days(tier):
+                day_end = day_start(day) + DAY_SECONDS
+                if day_end > cutoff:
+                    break
+                path = self.tier_path(tier, day)
+                if next_marks is not None:
+                    series = self._read_json(path, {}).get('series', {})
+                    if any(data['t'] and next_marks.get(key, 0) <= max(data['t']) for key, data in series.items()):
+                        continue
+                os.remove(path)
+                removed += 1
+
+        oldest = now - max(self.horizons.values())
+        for key in list(state['spans']):
+            spans = [span for span in state['spans'][key] if span[1] > oldest]
+            if spans:
+                state['spans'][key] = spans
+            else:
+                del state['spans'][key]
+        return removed
+
+    def compact(self, now=None):
+        """원본 → 5분 → 1시간 순서로 완료된 구간을 묶고 보존 기간이 지난 파일 삭제
+
+        이미 묶은 위치(state.json 의 compacted)부터 이어서 처리하므로 자주 호출해도 새 구간만 계산합니다.
+
+        Returns:
+            {'5m': 새 구간 수, '1h': 새 구간 수, 'removed_files': 삭제한 파일 수}
+        """
+        now = now or time.time()
+        result = {}
+        try:
+            with _lock:
+                state = self._state()
+                for (source, _), (target, bucket_seconds) in zip(TIERS, TIERS[1:]):
+                    result[target] = self._roll(state, source, target, bucket_seconds, now)
+                result['removed_files'] = self._prune(state, now)
+                self._write_json(os.path.join(self.directory, 'state.json'), state)
+        except OSError as e:
+            logger.warning(f"메트릭 이력 압축 실패: {e}")
+        return result
+
+    def pick_tier(self, start, interval_seconds, now=None):
+        """[start, 현재] 를 interval_seconds 간격으로 답할 수 있는 가장 거친 단계 (없으면 None)"""
+        now = now or time.time()
+        candidates = [tier for tier, bucket_seconds in TIERS
+                      if bucket_seconds <= interval_seconds and now - self.horizons[tier] <= start]
+        return candidates[-1] if candidates else None
+
+    def query(self, series_ids, start, end, interval_seconds, now=None):
+        """시계열들의 [start, end) 를 interval_seconds 간격으로 다시 묶어 조회
+
+        여러 시계열을 한 번에 조회해 단계별 일 파일을 한 번씩만 읽습니다.
+
+        Args:
+            series_ids: [(리소스 ID, 메트릭)]
+        Returns:
+            {(리소스 ID, 메트릭): ({'t', 'min', 'max', 'mean', 'count'} numpy 배열, 사용한 단계 이름)
+             - 수집 기록이 기간을 덮지 않거나 보존 기간이 지나 답할 수 없으면 None}
+        """
+        results = {series_id: None for series_id in series_ids}
+        tier = self.pick_tier(start, interval_seconds, now)
+        if tier is None:
+            return results
+        state = self._state()
+        # 마지막 간격 하나는 수집 이후 아직 채워지는 중일 수 있으므로 기록이 없어도 허용
+        keys = {series_key(*series_id): series_id for series_id in series_ids
+                if covers(state['spans'].get(series_key(*series_id), []), start, end - interval_seconds,
+                          interval_seconds)}
+
+        # 고른 단계에서 묶인 위치까지 읽고, 그 이후는 더 촘촘한 단계에서 이어서 읽음
+        # (시작 시각을 요청 간격 경계로 내려 첫 구간도 온전한 구간으로 묶음)
+        names = [name for name, _ in TIERS]
+        parts = {key: [] for key in keys}
+        positions = {key: start // interval_seconds * interval_seconds for key in keys}
+        for name in reversed(names[:names.index(tier) + 1]):
+            ranges = {}
+            for key, position in positions.items():
+                until = end if name == RAW else min(end, state['compacted'].get(name, {}).get(key, 0))
+                if until > position:
+                    ranges[key] = (position, until)
+                    positions[key] = until
+            for key, series in self._load(name, ranges).items():
+                parts[key].append(series)
+
+        for key, series_id in keys.items():
+            series = rollup(concat_series(parts[key]), interval_seconds)
+            results[series_id] = {
+                't': series['t'],
+                'min': series['min'],
+                'max': series['max'],
+                'mean': series['sum'] / np.maximum(series['count'], 1),
+                'count': series['count']
+            }, tier
+        return results
+
+    def summary(self):
+        """단계별 저장 현황 [{'tier', 'files', 'size_mb', 'oldest', 'newest', 'horizon_days'}]"""
+        rows = []
+        for tier, _ in TIERS:
+            days = self.days(tier)
+            size = sum(os.path.getsize(self.tier_path(tier, day)) for day in days)
+            rows.append({
+                'tier': tier,
+                'files': len(days),
+                'size_mb': size / (1024 ** 2),
+                'oldest': days[0] if days else None,
+                'newest': days[-1] if days else None,
+                'horizon_days': self.horizons[tier] / 86400
+            })
+        return rows
@@ -0,0 +1,382 @@
+"""
+병합 가능한 분위수 스케치 (DDSketch) 와 시간 구간별 스케치 저장소
+
+원본 포인트를 보관하지 않고 CPU/메모리 사용률의 분포만 로그 간격 버킷으로 요약합니다.
+상대 오차(기본 1%) 안에서 p50/p95/p99 를 답할 수 있고, 스케치끼리 더하기만 하면 병합되므로
+계정 / 리전 / VM 크기 / 기간 어떤 조합의 전체 VM 백분위도 원본을 다시 읽지 않고 계산합니다.
+
+저장소는 시간 구간(기본 1시간)마다 JSON 파일 하나에 (계정, 리전, VM 크기, 메트릭)별 스케치를 보관합니다.
+- 수집기는 데이터가 도착할 때마다 add() 로 메모리에 쌓고 flush() 로 한 번에 디스크에 병합합니다
+- 리소스·메트릭별 마지막 반영 시각(워터마크)을 기록해 같은 기간을 다시 수집해도 중복 반영하지 않습니다
+- 포인트 가중치는 수집 간격(분)이므로 1분 / 15분 간격 데이터가 섞여도 시간 가중 백분위가 됩니다
+- HOURLY_HORIZON_SECONDS 가 지난 1시간 구간은 compact() 로 하루 파일(<YYYYMMDD>.json)에 합치고,
+  하루 파일은 DAILY_HORIZON_SECONDS 가 지나면 삭제합니다 (저장된 전체 기간 조회가 끝없이 느려지지 않도록)
+- 병합 결과는 메트릭들을 한 번에 계산해 대상 파일의 (수정 시각, 크기)와 함께 캐시하므로,
+  새로 저장된 파일이 없으면 화면을 다시 그려도 구간 파일을 다시 읽지 않습니다
+"""
+import json
+import logging
+import math
+import os
+import threading
+import time
+
+import numpy as np
+
+DEFAULT_RELATIVE_ACCURACY = 0.01
+DEFAULT_MAX_BINS = 2048
+MIN_INDEXABLE_VALUE = 1e-3  # 이 값 이하는 0 버킷 (유휴 VM의 CPU 0% 등)
+
+DEFAULT_SKETCH_DIR = 'sketches'
+BUCKET_SECONDS = 3600
+DAY_SECONDS = 86400
+HOURLY_HORIZON_SECONDS = 35 * DAY_SECONDS  # 이보다 오래된 1시간 구간은 하루 파일로 합침
+DAILY_HORIZON_SECONDS = 400 * DAY_SECONDS  # 하루 파일 보존 기간
+MERGED_CACHE_ENTRIES = 16
+DIMENSIONS = ('account', 'region', 'vm_size')
+QUANTILES = (0.5, 0.95, 0.99)
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()  # 같은 프로세스의 세션들이 동시에 flush 할 때 파일 병합 직렬화
+_merged_cache = {}  # (디렉터리, 메트릭들, group_by, 대상 파일 서명) → {메트릭: {그룹: DDSketch}}
+_cache_lock = threading.Lock()
+
+
+def _forget_merged(directory):
+    """디렉터리의 병합 결과 캐시 비우기 (flush / compact 후)"""
+    directory = os.path.abspath(directory)
+    with _cache_lock:
+        for key in [key for key in _merged_cache if key[0] == directory]:
+            del _merged_cache[key]
+
+
+class DDSketch:
+    """상대 오차 보장 분위수 스케치 (값 x 는 인덱스 ceil(log_gamma(x)) 버킷에 가중치로 누적)"""
+
+    def __init__(self, relative_accuracy=DEFAULT_RELATIVE_ACCURACY, max_bins=DEFAULT_MAX_BINS):
+        self.relative_accuracy = relative_accuracy
+        self.max_bins = max_bins
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.bins = {}  # 버킷 인덱스 → 가중치 합
+        self.zero_count = 0.0
+        self.count = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, values, weight=1.0):
+        """값 배열을 한 번에 추가 (NaN 무시, 음수는 0 버킷)"""
+        values = np.asarray(values, dtype=float).ravel()
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return
+        positive = values[values > MIN_INDEXABLE_VALUE]
+        self.zero_count += (len(values) - len(positive)) * weight
+        if len(positive):
+            keys, counts = np.unique(np.ceil(np.log(positive) / self._log_gamma).astype(np.int64), return_counts=True)
+            for key, count in zip(keys.tolist(), counts.tolist()):
+                self.bins[key] = self.bins.get(key, 0.0) + count * weight
+            self._collapse()
+        self.count += len(values) * weight
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+
+    def merge(self, other):
+        if other.gamma != self.gamma:
+            raise ValueError("상대 오차가 다른 스케치는 병합할 수 없습니다")
+        for key, count in other.bins.items():
+            self.bins[key] = self.bins.get(key, 0.0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._collapse()
+        return self
+
+    def _collapse(self):
+        """버킷 수가 max_bins 를 넘으면 가장 낮은 버킷들을 합침 (높은 백분위 정확도 유지)"""
+        if len(self.bins) <= self.max_bins:
+            return
+        keys = sorted(self.bins)
+        target = keys[len(keys) - self.max_bins]
+        self.bins[target] += sum(self.bins.pop(key) for key in keys[:len(keys) - self.max_bins])
+
+    def quantile(self, q):
+        """q 분위수 (0~1, 데이터가 없으면 None)"""
+        if self.count <= 0:
+            return None
+        rank = q * (self.count - 1)
+        if rank < self.zero_count:
+            return 0.0
+        cumulative = self.zero_count
+        for key in sorted(self.bins):
+            cumulative += self.bins[key]
+            if cumulative > rank:
+                value = 2 * self.gamma ** key / (self.gamma + 1)
+                return min(self.max, max(self.min, value))
+        return self.max
+
+    def to_dict(self):
+        keys = sorted(self.bins)
+        return {
+            'relative_accuracy': self.relative_accuracy,
+            'zero_count': self.zero_count,
+            'count': self.count,
+            'min': self.min,
+            'max': self.max,
+            'keys': keys,
+            'counts': [self.bins[key] for key in keys]
+        }
+
+    def copy(self):
+        return DDSketch.from_dict(self.to_dict(), self.max_bins)
+
+    @classmethod
+    def from_dict(cls, data, max_bins=DEFAULT_MAX_BINS):
+        sketch = cls(data['relative_accuracy'], max_bins)
+        sketch.bins = dict(zip(data['keys'], data['counts']))
+        sketch.zero_count = data['zero_count']
+        sketch.count = data['count']
+        sketch.min = data['min']
+        sketch.max = data['max']
+        return sketch
+
+
+def sketch_key(dimensions, metric):
+    """'계정|리전|VM 크기|메트릭' 형식 키"""
+    return '|'.join([str(dimensions.get(name) or 'N/A') for name in DIMENSIONS] + [metric])
+
+
+def parse_sketch_key(key):
+    *values, metric = key.split('|')
+    return dict(zip(DIMENSIONS, values)), metric
+
+
+class SketchStore:
+    """시간 구간별 스케치 파일 저장소 (<directory>/<YYYYMMDDHH>.json, 오래된 구간은 <YYYYMMDD>.json + watermarks.json)"""
+
+    def __init__(self, directory=DEFAULT_SKETCH_DIR, bucket_seconds=BUCKET_SECONDS,
+                 hourly_horizon=HOURLY_HORIZON_SECONDS, daily_horizon=DAILY_HORIZON_SECONDS):
+        self.directory = directory
+        self.bucket_seconds = bucket_seconds
+        self.hourly_horizon = hourly_horizon
+        self.daily_horizon = daily_horizon
+        self.pending = {}        # 구간 시작 epoch → {키: DDSketch} (아직 디스크에 병합하지 않은 증분)
+        self.pending_marks = {}  # 워터마크 키 → epoch
+        self._watermarks = None
+
+    def bucket_path(self, bucket_start):
+        from datetime import datetime, timezone
+        name = datetime.fromtimestamp(bucket_start, timezone.utc).strftime('%Y%m%d%H')
+        return os.path.join(self.directory, f"{name}.json")
+
+    def day_path(self, day_start):
+        from datetime import datetime, timezone
+        name = datetime.fromtimestamp(day_start, timezone.utc).strftime('%Y%m%d')
+        return os.path.join(self.directory, f"{name}.json")
+
+    def rollup_cutoff(self, now):
+        """이 시각 이전에 시작한 1시간 구간은 하루 파일에 보관 (하루 경계로 내림)"""
+        return int(now - self.hourly_horizon) // DAY_SECONDS * DAY_SECONDS
+
+    def _read_json(self, path, default):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return default
+
+    def _write_json(self, path, data):
+        """임시 파일에 쓴 뒤 교체 (읽는 쪽이 반쯤 쓰인 파일을 보지 않도록)"""
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(temp_path, path)
+
+    def watermarks(self):
+        if self._watermarks is None:
+            self._watermarks = self._read_json(os.path.join(self.directory, 'watermarks.json'), {})
+        return self._watermarks
+
+    def add(self, resource_id, dimensions, metric, epochs, values, weight=1.0):
+        """리소스 하나의 메트릭 포인트 추가 (워터마크 이후 포인트만, 구간별로 나눠 누적)
+
+        Returns:
+            새로 반영한 포인트 수
+        """
+        epochs = np.asarray(epochs, dtype=np.int64)
+        values = np.asarray(values, dtype=float)
+        mark_key = f"{resource_id.lower()}|{metric}"
+        watermark = max(self.watermarks().get(mark_key, 0), self.pending_marks.get(mark_key, 0))
+        fresh = epochs > watermark
+        epochs, values = epochs[fresh], values[fresh]
+        if len(epochs) == 0:
+            return 0
+
+        key = sketch_key(dimensions, metric)
+        buckets = epochs // self.bucket_seconds * self.bucket_seconds
+        for bucket_start in np.unique(buckets).tolist():
+            sketch = self.pending.setdefault(bucket_start, {}).get(key)
+            if sketch is None:
+                sketch = self.pending[bucket_start][key] = DDSketch()
+            sketch.add(values[buckets == bucket_start], weight)
+        self.pending_marks[mark_key] = int(epochs.max())
+        return len(epochs)
+
+    def _merge_file(self, path, bucket_start, sketches, rolled_hours=()):
+        """구간 파일에 스케치 병합 (rolled_hours: 하루 파일에 합친 1시간 구간 시작 epoch)"""
+        data = self._read_json(path, {})
+        stored = data.get('sketches', {})
+        for key, sketch in sketches.items():
+            if key in stored:
+                sketch = DDSketch.from_dict(stored[key]).merge(sketch)
+            stored[key] = sketch.to_dict()
+        record = {'bucket_start': bucket_start, 'sketches': stored}
+        hours = sorted(set(data.get('rolled_hours', [])) | set(rolled_hours))
+        if hours:
+            record['rolled_hours'] = hours
+        self._write_json(path, record)
+
+    def flush(self):
+        """쌓인 증분을 구간 파일에 병합 (파일을 다시 읽어 다른 세션의 반영분과 합침)
+
+        이미 하루 파일로 합쳐진 기간의 증분은 바로 하루 파일에 병합합니다.
+        """
+        if not self.pending and not self.pending_marks:
+            return
+        cutoff = self.rollup_cutoff(time.time())
+        try:
+            with _lock:
+                os.makedirs(self.directory, exist_ok=True)
+                for bucket_start, sketches in self.pending.items():
+                    if bucket_start < cutoff:
+                        day_start = bucket_start // DAY_SECONDS * DAY_SECONDS
+                        self._merge_file(self.day_path(day_start), day_start, sketches)
+                    else:
+                        self._merge_file(self.bucket_path(bucket_start), bucket_start, sketches)
+
+                marks_path = os.path.join(self.directory, 'watermarks.json')
+                marks = self._read_json(marks_path, {})
+                for mark_key, epoch in self.pending_marks.items():
+                    marks[mark_key] = max(marks.get(mark_key, 0), epoch)
+                self._write_json(marks_path, marks)
+                self._watermarks = marks
+        except OSError as e:
+            logger.warning(f"분위수 스케치 저장 실패: {e}")
+        self.pending = {}
+        self.pending_marks = {}
+        _forget_merged(self.directory)
+
+    def compact(self, now=None):
+        """보존 기간이 지난 1시간 구간을 하루 파일로 합치고, 보존 기간이 지난 하루 파일 삭제
+
+        하루 파일에 합친 구간을 rolled_hours 로 기록하므로 합친 뒤 삭제 전에 중단되어도 두 번 더하지 않습니다.
+
+        Returns:
+            {'rolled': 하루 파일로 합친 1시간 파일 수, 'removed': 삭제한 파일 수}
+        """
+        now = now or time.time()
+        cutoff = self.rollup_cutoff(now)
+        expire_before = now - self.daily_horizon
+        result = {'rolled': 0, 'removed': 0}
+        try:
+            with _lock:
+                by_day = {}
+                for start, seconds, path in self.files():
+                    if start + seconds <= expire_before:
+                        os.remove(path)
+                        result['removed'] += 1
+                    elif seconds != DAY_SECONDS and start < cutoff:
+                        by_day.setdefault(start // DAY_SECONDS * DAY_SECONDS, []).append((start, path))
+
+                for day_start, hours in by_day.items():
+                    day_path = self.day_path(day_start)
+                    done = set(self._read_json(day_path, {}).get('rolled_hours', []))
+                    sketches = {}
+                    for start, path in hours:
+                        if start in done:
+                            continue
+                        for key, data in self._read_json(path, {}).get('sketches', {}).items():
+                            sketch = DDSketch.from_dict(data)
+                            if key in sketches:
+                                sketches[key].merge(sketch)
+                            else:
+                                sketches[key] = sketch
+                    self._merge_file(day_path, day_start, sketches, [start for start, _ in hours])
+                    for _, path in hours:
+                        os.remove(path)
+                    result['rolled'] += len(hours)
+        except OSError as e:
+            logger.warning(f"분위수 스케치 압축 실패: {e}")
+        _forget_merged(self.directory)
+        return result
+
+    def files(self):
+        """저장된 구간 파일 [(시작 epoch, 구간 길이(초), 경로)] (시작 시각 오름차순)"""
+        from datetime import datetime, timezone
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return []
+        files = []
+        for name in names:
+            stem, ext = os.path.splitext(name)
+            if ext != '.json' or not stem.isdigit() or len(stem) not in (8, 10):
+                continue
+            fmt, seconds = ('%Y%m%d%H', self.bucket_seconds) if len(stem) == 10 else ('%Y%m%d', DAY_SECONDS)
+            start = int(datetime.strptime(stem, fmt).replace(tzinfo=timezone.utc).timestamp())
+            files.append((start, seconds, os.path.join(self.directory, name)))
+        return sorted(files)
+
+    def bucket_starts(self):
+        """저장된 구간(1시간 / 하루) 시작 epoch 목록 (오름차순)"""
+        return [start for start, _, _ in self.files()]
+
+    def merged(self, metric, group_by=DIMENSIONS, since=None, until=None):
+        """기간 안의 구간 스케치를 group_by 차원별로 병합
+
+        Returns:
+            {(차원 값, ...): DDSketch} - group_by 가 비어 있으면 키는 () (전체 VM)
+        """
+        return self.merged_metrics((metric,), group_by, since, until)[metric]
+
+    def merged_metrics(self, metrics, group_by=DIMENSIONS, since=None, until=None):
+        """여러 메트릭을 구간 파일 한 번 순회로 병합 (대상 파일이 그대로면 캐시된 결과의 복사본)
+
+        Returns:
+            {메트릭: {(차원 값, ...): DDSketch}}
+        """
+        metrics, group_by = tuple(metrics), tuple(group_by)
+        targets = []
+        for start, seconds, path in self.files():
+            if (since is not None and start + seconds <= since) or (until is not None and start >= until):
+                continue
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            targets.append((path, stat.st_mtime_ns, stat.st_size))
+        cache_key = (os.path.abspath(self.directory), metrics, group_by, tuple(targets))
+        with _cache_lock:
+            merged = _merged_cache.get(cache_key)
+
+        if merged is None:
+            merged = {metric: {} for metric in metrics}
+            for path, _, _ in targets:
+                for key, data in self._read_json(path, {}).get('sketches', {}).items():
+                    dimensions, metric = parse_sketch_key(key)
+                    if metric not in merged:
+                        continue
+                    groups = merged[metric]
+                    group = tuple(dimensions[name] for name in group_by)
+                    sketch = DDSketch.from_dict(data)
+                    if group in groups:
+                        groups[group].merge(sketch)
+                    else:
+                        groups[group] = sketch
+            with _cache_lock:
+                _merged_cache[cache_key] = merged
+                while len(_merged_cache) > MERGED_CACHE_ENTRIES:
+                    del _merged_cache[next(iter(_merged_cache))]
+        return {metric: {group: sketch.copy() for group, sketch in groups.items()} for metric, groups in merged.items()}
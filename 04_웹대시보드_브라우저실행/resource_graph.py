@@ -0,0 +1,263 @@
+"""
+Azure Resource Graph 인벤토리 조회
+
+구독별 Compute API 순회 + 리소스별 상세 조회 대신, 테넌트의 모든 구독을 대상으로
+페이지 단위 KQL 쿼리 한 번으로 VM / VMSS 인벤토리와 백업 작업을 가져옵니다.
+결과는 get_azure_vms / get_azure_vmss / get_backup_jobs 와 같은 딕셔너리 형태로 변환됩니다.
+
+녹화된 응답(JSON)을 재생하는 RecordedResourceGraphClient 로 Azure 없이 검증할 수 있습니다.
+"""
+import json
+import re
+from datetime import datetime, timezone
+
+# 쿼리 이름은 첫 줄 주석으로 표시 (녹화 재생 시 응답 선택에 사용)
+VM_INVENTORY_QUERY = """// query: vms
+Resources
+| where type =~ 'microsoft.compute/virtualmachines'
+| project id, name, resourceGroup, location, subscriptionId,
+    vmSize = tostring(properties.hardwareProfile.vmSize),
+    osType = tostring(properties.storageProfile.osDisk.osType),
+    powerState = tostring(properties.extended.instanceView.powerState.displayStatus),
+    powerStateCode = tostring(properties.extended.instanceView.powerState.code),
+    provisioningState = tostring(properties.provisioningState)
+| order by id asc"""
+
+VMSS_INVENTORY_QUERY = """// query: vmss
+Resources
+| where type =~ 'microsoft.compute/virtualmachinescalesets'
+| project id, name, resourceGroup, location, subscriptionId,
+    vmSize = tostring(sku.name),
+    capacity = toint(sku.capacity),
+    upgradePolicy = tostring(properties.upgradePolicy.mode),
+    provisioningState = tostring(properties.provisioningState),
+    osType = tostring(properties.virtualMachineProfile.storageProfile.osDisk.osType)
+| order by id asc"""
+
+VMSS_INSTANCE_QUERY = """// query: vmss_instances
+ComputeResources
+| where type =~ 'microsoft.compute/virtualmachinescalesets/virtualmachines'
+| extend vmssId = tolower(tostring(split(id, '/virtualMachines/')[0]))
+| project vmssId, subscriptionId,
+    instanceId = tostring(properties.instanceId),
+    powerState = tostring(properties.extended.instanceView.powerState.displayStatus),
+    powerStateCode = tostring(properties.extended.instanceView.powerState.code)
+| order by vmssId asc"""
+
+# 백업 작업 (RecoveryServicesResources) - {hours}, {status_filter} 치환
+BACKUP_JOB_QUERY_TEMPLATE = """// query: backup_jobs
+RecoveryServicesResources
+| where type =~ 'microsoft.recoveryservices/vaults/backupjobs'
+| extend status = tostring(properties.status),
+    startTime = todatetime(properties.startTime),
+    endTime = todatetime(properties.endTime)
+| where startTime >= ago({hours}h){status_filter}
+| project id, name, subscriptionId, resourceGroup,
+    vaultName = tostring(split(id, '/')[8]),
+    entityFriendlyName = tostring(properties.entityFriendlyName),
+    operation = tostring(properties.operation),
+    status, startTime, endTime
+| order by startTime desc"""
+
+QUERY_NAME_PATTERN = re.compile(r'^//\s*query:\s*(\S+)')
+
+# 전원 상태 코드 → Compute API display_status 형식
+POWER_STATE_DISPLAY = {
+    'PowerState/running': 'VM running',
+    'PowerState/stopped': 'VM stopped',
+    'PowerState/deallocated': 'VM deallocated',
+    'PowerState/starting': 'VM starting',
+    'PowerState/stopping': 'VM stopping',
+    'PowerState/deallocating': 'VM deallocating',
+}
+
+
+def query_name(query):
+    """KQL 첫 줄의 '// query: 이름' 주석에서 쿼리 이름 추출"""
+    match = QUERY_NAME_PATTERN.match(query.strip())
+    return match.group(1) if match else None
+
+
+def query_resource_graph(client, subscriptions, query, page_size=1000, deadline=None):
+    """Resource Graph 쿼리를 skip_token 페이지 순서대로 모두 조회
+
+    deadline: collector_deadline.Deadline - 페이지마다 마감 시간을 확인하고 남은 시간을 호출 timeout 으로 전달
+              (마감 시간이 지나면 DeadlineExceeded)
+
+    Returns:
+        (rows, page_count) - rows는 objectArray 형식의 딕셔너리 목록
+    """
+    from azure.mgmt.resourcegraph.models import QueryRequest, QueryRequestOptions
+
+    rows = []
+    page_count = 0
+    skip_token = None
+    while True:
+        request = QueryRequest(
+            subscriptions=list(subscriptions),
+            query=query,
+            options=QueryRequestOptions(
+                top=page_size,
+                skip_token=skip_token,
+                result_format='objectArray'
+            )
+        )
+        options = deadline.call_options(f"{query_name(query)} 페이지 {page_count + 1}") if deadline else {}
+        response = client.resources(request, **options)
+        rows.extend(response.data or [])
+        page_count += 1
+        skip_token = response.skip_token
+        if not skip_token:
+            return rows, page_count
+
+
+def backup_job_query(hours=24, statuses=None):
+    """시간 범위(최근 N시간)와 상태 필터를 적용한 백업 작업 KQL 생성"""
+    status_filter = ''
+    if statuses:
+        quoted = ', '.join("'" + status.replace("'", "") + "'" for status in statuses)
+        status_filter = f"\n| where status in~ ({quoted})"
+    return BACKUP_JOB_QUERY_TEMPLATE.format(hours=int(hours), status_filter=status_filter)
+
+
+def parse_epoch(value):
+    """Resource Graph 날짜 값(ISO 8601 문자열) → epoch 초"""
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        return int(value.timestamp())
+    text = str(value).replace('Z', '+00:00')
+    # 소수점 이하 자릿수가 7자리인 경우 fromisoformat 이 처리하지 못하므로 초 단위로 자름
+    text = re.sub(r'(\.\d+)(?=[+-]\d\d:\d\d$|$)', '', text)
+    parsed = datetime.fromisoformat(text)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return int(parsed.timestamp())
+
+
+def backup_job_from_row(row, account_name):
+    """Resource Graph 백업 작업 행 → get_backup_jobs 의 job_info 형식"""
+    start_epoch = parse_epoch(row.get('startTime'))
+    end_epoch = parse_epoch(row.get('endTime'))
+    return {
+        'account_name': account_name,
+        'vault_name': row['vaultName'],
+        'entity_name': row.get('entityFriendlyName') or None,
+        'operation': row.get('operation') or None,
+        'job_id': row['name'],
+        'status': row['status'],
+        'start_epoch': start_epoch,
+        'end_epoch': end_epoch,
+        'duration_seconds': end_epoch - start_epoch if start_epoch is not None and end_epoch is not None else None,
+        'resource_group': row['resourceGroup']
+    }
+
+
+def power_state_display(row):
+    """Resource Graph 행의 전원 상태를 Compute API 표시 형식으로 변환"""
+    if row.get('powerState'):
+        return row['powerState']
+    return POWER_STATE_DISPLAY.get(row.get('powerStateCode') or '', 'Unknown')
+
+
+def vm_info_from_row(row, account_name):
+    """Resource Graph VM 행 → get_azure_vms 의 vm_info 형식"""
+    provisioning_state = row.get('provisioningState')
+    return {
+        'account_name': account_name,
+        'vm_name': row['name'],
+        'resource_group': row['resourceGroup'],
+        'location': row['location'],
+        'vm_size': row.get('vmSize') or 'N/A',
+        'power_state': power_state_display(row),
+        'provisioning_state': f"Provisioning {provisioning_state.lower()}" if provisioning_state else 'Unknown',
+        'private_ip': 'N/A',
+        'os_type': row.get('osType') or 'N/A',
+        'vcpus': None,
+        'memory_gb': None,
+        'cpu_percent': None,
+        'available_memory_gb': None,
+        'memory_percent': None,
+        'disk_read_mb_per_min': None,
+        'metric_note': ''
+    }
+
+
+def vmss_info_from_row(row, account_name, instance_rows):
+    """Resource Graph VMSS 행 + 인스턴스 행 → get_azure_vmss 의 vmss_info 형식"""
+    instance_states = {
+        instance['instanceId']: power_state_display(instance)
+        for instance in instance_rows
+    }
+    total_instances = len(instance_states)
+    running_instances = sum(1 for state in instance_states.values() if state == 'VM running')
+    return {
+        'account_name': account_name,
+        'vmss_name': row['name'],
+        'resource_group': row['resourceGroup'],
+        'location': row['location'],
+        'vm_size': row.get('vmSize') or 'N/A',
+        'capacity': row.get('capacity') or 0,
+        'total_instances': total_instances,
+        'running_instances': running_instances,
+        'stopped_instances': total_instances - running_instances,
+        'upgrade_policy': row.get('upgradePolicy') or 'N/A',
+        'provisioning_state': row.get('provisioningState') or 'Unknown',
+        'os_type': row.get('osType') or 'N/A',
+        'vcpus': None,
+        'memory_gb': None,
+        'avg_cpu_percent': None,
+        'max_cpu_percent': None,
+        'hottest_instance': None,
+        'avg_available_memory_gb': None,
+        'avg_memory_percent': None,
+        'avg_disk_read_mb_per_min': None,
+        'metric_note': '',
+        'instance_states': instance_states,
+        'instance_metrics': []
+    }
+
+
+class RecordedResponse:
+    """QueryResponse 대용 (data / skip_token / total_records)"""
+
+    def __init__(self, data, skip_token, total_records):
+        self.data = data
+        self.skip_token = skip_token
+        self.total_records = total_records
+        self.count = len(data)
+
+
+class RecordedResourceGraphClient:
+    """녹화된 Resource Graph 응답을 재생하는 ResourceGraphClient 대용
+
+    녹화 파일 형식 (쿼리 이름별 행 목록):
+        {"vms": [{...}, ...], "vmss": [...], "vmss_instances": [...], "backup_jobs": [...]}
+
+    요청의 subscriptions 로 행을 거르고 options.top 단위로 페이지를 나누므로
+    실제 API와 같은 페이지 순회 경로를 검증할 수 있습니다.
+    """
+
+    def __init__(self, recording):
+        if isinstance(recording, str):
+            with open(recording, 'r', encoding='utf-8') as f:
+                recording = json.load(f)
+        self.recording = recording
+        self.requests = []
+
+    def resources(self, query_request, **options):
+        self.requests.append(query_request)
+        name = query_name(query_request.query)
+        subscriptions = {s.lower() for s in (query_request.subscriptions or [])}
+        rows = [
+            row for row in self.recording.get(name, [])
+            if not subscriptions or str(row.get('subscriptionId', '')).lower() in subscriptions
+        ]
+
+        options = query_request.options
+        page_size = (options.top if options and options.top else 1000)
+        offset = int(options.skip_token) if options and options.skip_token else 0
+        page = rows[offset:offset + page_size]
+        next_offset = offset + page_size
+        skip_token = str(next_offset) if next_offset < len(rows) else None
+        return RecordedResponse(page, skip_token, len(rows))
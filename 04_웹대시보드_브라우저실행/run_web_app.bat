@@ -8,14 +8,14 @@ echo.
 cd /d "%~dp0"
 
 echo 📦 필요한 패키지 설치 확인 중...
-python -c "import streamlit, plotly, pandas" 2>nul
+python -c "import streamlit, plotly, pandas, yaml, azure.identity" 2>nul
 if errorlevel 1 (
     echo ❌ 필요한 패키지가 설치되지 않았습니다.
     echo 📦 패키지 설치 중...
-    pip install streamlit plotly pandas
+    pip install -r requirements_web.txt
     if errorlevel 1 (
         echo ❌ 패키지 설치 실패. 수동으로 설치해주세요:
-        echo    pip install streamlit plotly pandas
+        echo    pip install -r requirements_web.txt
         pause
         exit /b 1
     )
@@ -0,0 +1,41 @@
+"""테스트 공통 설정 - 대시보드 디렉터리의 모듈을 import 경로에 추가"""
+import logging
+import os
+import sys
+
+import pytest
+
+DASHBOARD_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.path.join(DASHBOARD_DIR, 'benchmarks')
+for path in (BENCH_DIR, DASHBOARD_DIR):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+
+@pytest.fixture(scope='session')
+def web():
+    """대시보드 모듈 (streamlit 런타임 없이 bare 모드로 import)"""
+    logging.getLogger('streamlit').setLevel(logging.ERROR)
+    import backup_monitor_web
+    return backup_monitor_web
+
+
+@pytest.fixture
+def fake_azure(web, monkeypatch, tmp_path):
+    """FakeARM 서버를 띄우고 대시보드 인증 관리자를 연결하는 함수 (작업 디렉터리는 임시 디렉터리)"""
+    from collectors import make_credential_manager
+    from fake_arm import FakeArmServer, FakeFleet
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(web.time, 'sleep', lambda seconds: None)
+    servers = []
+
+    def start(**fleet):
+        server = FakeArmServer(FakeFleet(**fleet)).start()
+        servers.append(server)
+        web.st.session_state.credential_manager = make_credential_manager(web, server.url)
+        return server
+
+    yield start
+    for server in servers:
+        server.stop()
@@ -0,0 +1,68 @@
+"""VM 백업 커버리지 (backup_coverage 조인 / get_protected_items 부분 결과)"""
+import time
+
+from backup_coverage import (PROTECTED, STALE, STOPPED, UNKNOWN, UNPROTECTED, build_protection_index,
+                             cached_protected_items, join_coverage, reset_protected_items_cache, vm_resource_id)
+from collector_deadline import Deadline
+from collectors import ACCOUNT
+
+SUBSCRIPTION = '11111111-1111-1111-1111-111111111111'
+NOW = 1_800_000_000
+
+
+def record(vm_name, vault_name='vault-a', state='Protected', hours_ago=2):
+    return {
+        'vm_id': vm_resource_id(SUBSCRIPTION, 'rg', vm_name),
+        'friendly_name': vm_name,
+        'vault_name': vault_name,
+        'protection_state': state,
+        'last_backup_status': 'Healthy',
+        'last_recovery_epoch': NOW - hours_ago * 3600 if hours_ago is not None else None
+    }
+
+
+def vm(vm_name, account_name='A'):
+    return {'account_name': account_name, 'vm_name': vm_name, 'resource_group': 'RG', 'power_state': 'VM running'}
+
+
+def test_protection_index_keeps_latest_recovery_point():
+    index = build_protection_index([record('vm-1', 'old', hours_ago=50), record('vm-1', 'new', hours_ago=1)])
+    assert index[vm_resource_id(SUBSCRIPTION, 'rg', 'vm-1')]['vault_name'] == 'new'
+
+
+def test_join_coverage_statuses():
+    index = build_protection_index([
+        record('ok'), record('old', hours_ago=72), record('none', hours_ago=None), record('paused', state='ProtectionPaused')
+    ])
+    vms = [vm(name) for name in ('ok', 'old', 'none', 'paused', 'missing')]
+    rows = join_coverage(vms, index, {'A': SUBSCRIPTION}, now=NOW)
+    assert [row['coverage'] for row in rows] == [PROTECTED, STALE, STALE, STOPPED, UNPROTECTED]
+    assert rows[0]['recovery_age_hours'] == 2
+
+
+def test_join_coverage_incomplete_account_is_unknown_not_unprotected():
+    index = build_protection_index([record('ok')])
+    vms = [vm('ok'), vm('missing'), vm('other', account_name='B')]
+    rows = join_coverage(vms, index, {'A': SUBSCRIPTION, 'B': SUBSCRIPTION}, now=NOW, incomplete_accounts=['A'])
+    assert [row['coverage'] for row in rows] == [PROTECTED, UNKNOWN, UNPROTECTED]
+
+
+class VaultDeadline(Deadline):
+    """Vault 목록 조회 후 첫 Vault 에서 마감 시간이 지나는 Deadline"""
+
+    def check(self, stage=''):
+        if stage.startswith("Vault '"):
+            self.expires_at = time.monotonic()
+        super().check(stage)
+
+
+def test_protected_items_deadline_returns_incomplete_and_is_not_cached(web, fake_azure):
+    reset_protected_items_cache()
+    fake_azure(vms=10, vaults=2)
+    records, fetched_at, complete = web.get_protected_items(ACCOUNT, force_refresh=True, deadline=VaultDeadline(60))
+    assert records == [] and fetched_at is not None and not complete
+    assert cached_protected_items(ACCOUNT['subscription_id']) == (None, None)
+
+    records, _, complete = web.get_protected_items(ACCOUNT, force_refresh=True)
+    assert complete and records
+    assert cached_protected_items(ACCOUNT['subscription_id'])[0] == records
@@ -0,0 +1,81 @@
+"""백업 소요 시간 기준선 (backup_duration_baseline: 판정 / 반영 / 저장)"""
+import json
+
+from backup_duration_baseline import (MIN_RUNS, DurationBaselines, baseline_duration, judge,
+                                      window_stats)
+
+NOW = 1_800_000_000
+
+
+def job(index, duration, entity='vm-1', status='Completed', operation='Backup'):
+    return {
+        'account_name': 'A', 'vault_name': 'vault-a', 'entity_name': entity,
+        'job_id': f"job-{entity}-{index}", 'status': status, 'operation': operation,
+        'duration_seconds': duration, 'end_epoch': NOW + index * 86400
+    }
+
+
+def test_baseline_duration_only_completed_backups():
+    assert baseline_duration(job(0, 1200)) == 1200.0
+    assert baseline_duration(job(0, 1200, status='CompletedWithWarnings')) == 1200.0
+    assert baseline_duration(job(0, 1200, status='Failed')) is None
+    assert baseline_duration(job(0, 1200, operation='Restore')) is None
+    assert baseline_duration(job(0, float('nan'))) is None
+    assert baseline_duration(job(0, 0)) is None
+
+
+def test_window_stats_growth_needs_enough_runs():
+    assert window_stats([])['median'] is None
+    assert window_stats([100.0] * 9)['growth'] is None
+    stats = window_stats([100.0] * 5 + [150.0] * 5)
+    assert stats['runs'] == 10 and stats['growth'] == 1.5
+
+
+def test_judge_regression_rules():
+    stats = window_stats([1000.0] * MIN_RUNS)
+    assert judge(stats, 2000.0) == {'median': 1000.0, 'p90': 1000.0, 'ratio': 2.0, 'regressed': True}
+    assert not judge(stats, 1400.0)['regressed']                              # 배수 부족
+    assert not judge(window_stats([1000.0] * (MIN_RUNS - 1)), 5000.0)['regressed']  # 실행 수 부족
+    assert not judge(window_stats([100.0] * MIN_RUNS), 300.0)['regressed']     # 짧은 작업의 작은 흔들림
+    assert judge(window_stats([]), 100.0) == {'median': None, 'p90': None, 'ratio': None, 'regressed': False}
+
+
+def test_observe_judges_against_baseline_before_absorbing(tmp_path):
+    baselines = DurationBaselines(str(tmp_path / 'durations.json'))
+    jobs = [job(index, 1000.0) for index in range(MIN_RUNS)] + [job(MIN_RUNS, 2000.0)]
+    assert baselines.observe(reversed(jobs)) == MIN_RUNS + 1  # 종료 시각 순으로 반영
+    verdict = baselines.verdict('A', 'vault-a', 'vm-1', f"job-vm-1-{MIN_RUNS}")
+    assert verdict['regressed'] and verdict['median'] == 1000.0
+    assert baselines.verdict('A', 'vault-a', 'vm-1', 'job-vm-1-0')['ratio'] is None
+
+
+def test_observe_skips_seen_and_older_jobs(tmp_path):
+    baselines = DurationBaselines(str(tmp_path / 'durations.json'))
+    baselines.observe([job(1, 1000.0), job(2, 1100.0)])
+    assert baselines.observe([job(2, 1100.0), job(0, 900.0)]) == 0
+    assert baselines.observe([job(3, 1200.0)]) == 1
+    (row,) = baselines.summary()
+    assert row['runs'] == 3 and row['last'] == 1200.0 and row['entity_name'] == 'vm-1'
+
+
+def test_observe_keeps_window(tmp_path):
+    baselines = DurationBaselines(str(tmp_path / 'durations.json'), window=4)
+    baselines.observe([job(index, 1000.0 + index) for index in range(10)])
+    entry = baselines.entries['A|vault-a|vm-1']
+    assert entry['durations'] == [1006.0, 1007.0, 1008.0, 1009.0]
+    assert list(entry['verdicts']) == [f"job-vm-1-{index}" for index in range(6, 10)]
+
+
+def test_save_merges_newer_entries_from_other_sessions(tmp_path):
+    path = str(tmp_path / 'cache' / 'durations.json')
+    first, second = DurationBaselines(path), DurationBaselines(path)
+    first.observe([job(5, 1000.0), job(0, 500.0, entity='vm-2')])
+    second.observe([job(1, 700.0), job(3, 600.0, entity='vm-2')])
+    first.save()
+    second.save()  # vm-1 은 first 쪽이 더 최근, vm-2 는 second 쪽이 더 최근
+
+    with open(path, encoding='utf-8') as f:
+        stored = json.load(f)['entries']
+    assert stored['A|vault-a|vm-1']['durations'] == [1000.0]
+    assert stored['A|vault-a|vm-2']['durations'] == [600.0]
+    assert DurationBaselines(path).verdict('A', 'vault-a', 'vm-2', 'job-vm-2-3') is not None
@@ -0,0 +1,140 @@
+"""진행 중 백업 작업 라이브 테일 (backup_live_tail 상태 / live_tail_tick 실패 처리)"""
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from azure.core.exceptions import HttpResponseError
+
+from backup_live_tail import (BACKOFF_FACTOR, DISCOVERY_OVERLAP_SECONDS, DISCOVERY_SECONDS, IN_PROGRESS,
+                              MAX_POLL_SECONDS, MAX_RETRY_SECONDS, MIN_POLL_SECONDS, SEED_HOURS, LiveTail,
+                              TrackedJob, job_time_filter)
+from collector_breaker import CircuitBreakerBoard
+
+NOW = 1_800_000_000
+ACCOUNT = {'name': 'A', 'tenant_id': 'tenant-a', 'subscription_id': 'sub-a'}
+
+
+def job_info(job_id, status=IN_PROGRESS, vault_name='vault-a'):
+    return {'account_name': 'A', 'vault_name': vault_name, 'job_id': job_id, 'status': status,
+            'resource_group': 'rg', 'end_epoch': None}
+
+
+def test_poll_interval_backs_off_and_resets():
+    tracked = TrackedJob(ACCOUNT, job_info('job-1'), progress=10, now=NOW)
+    assert tracked.next_poll_at == NOW + MIN_POLL_SECONDS
+
+    assert not tracked.update(job_info('job-1'), 10, now=NOW)
+    assert tracked.interval == MIN_POLL_SECONDS * BACKOFF_FACTOR
+    for _ in range(20):
+        tracked.update(job_info('job-1'), 10, now=NOW)
+    assert tracked.interval == MAX_POLL_SECONDS
+
+    assert tracked.update(job_info('job-1'), 20, now=NOW)  # 진행률이 바뀌면 간격 초기화
+    assert tracked.interval == MIN_POLL_SECONDS and tracked.next_poll_at == NOW + MIN_POLL_SECONDS
+
+    tracked.defer(now=NOW)
+    assert tracked.interval == MIN_POLL_SECONDS * BACKOFF_FACTOR and tracked.polls == 22
+
+
+def test_discovery_filter_seed_then_overlap():
+    tail = LiveTail(['A'])
+    seed, until = tail.discovery_filter('A', 'vault-a', now=NOW)
+    assert until == NOW
+    assert seed == job_time_filter(NOW - SEED_HOURS * 3600, NOW, IN_PROGRESS)
+    assert seed.startswith("status eq 'InProgress' and ")
+
+    tail.mark_discovered('A', 'vault-a', until, now=NOW)
+    assert tail.due_vaults('A', now=NOW) == []
+    later, _ = tail.discovery_filter('A', 'vault-a', now=NOW + 60)
+    assert later == job_time_filter(NOW - DISCOVERY_OVERLAP_SECONDS, NOW + 60)
+
+
+def test_finished_job_recorded_once():
+    tail = LiveTail(['A'])
+    assert tail.observe(ACCOUNT, job_info('job-1', 'Completed'))
+    assert not tail.observe(ACCOUNT, job_info('job-1', 'Completed'))  # 겹친 발견 범위에서 다시 보임
+    assert tail.observe(ACCOUNT, job_info('job-2'))
+    assert tail.observe(ACCOUNT, job_info('job-2', 'Failed'))
+    assert tail.jobs == {} and [done['job_id'] for done in tail.finished] == ['job-2', 'job-1']
+    assert [change['status'] for change in tail.take_changes()] == ['Completed', IN_PROGRESS, 'Failed']
+    assert tail.take_changes() == []
+
+
+def test_drop_forgets_job():
+    tail = LiveTail(['A'])
+    tail.observe(ACCOUNT, job_info('job-1'))
+    tail.drop(('A', 'vault-a', 'job-1'))
+    tail.drop(('A', 'vault-a', 'missing'))
+    assert tail.jobs == {} and tail.finished == []
+
+
+def test_failed_discovery_backs_off_only_that_vault():
+    tail = LiveTail(['A'])
+    tail.set_vaults('A', [('vault-a', 'rg'), ('vault-b', 'rg')])
+    tail.defer_discovery('A', 'vault-a', now=NOW)
+    assert tail.due_vaults('A', now=NOW) == [('vault-b', 'rg')]
+    assert tail.next_discovery_at[('A', 'vault-a')] == NOW + DISCOVERY_SECONDS
+
+    for _ in range(20):
+        tail.defer_discovery('A', 'vault-a', now=NOW)
+    assert tail.next_discovery_at[('A', 'vault-a')] == NOW + MAX_RETRY_SECONDS
+    assert tail.discovery_filter('A', 'vault-a', now=NOW)[0].startswith("status eq")  # 범위는 그대로
+
+    tail.mark_discovered('A', 'vault-a', NOW, now=NOW)
+    tail.defer_discovery('A', 'vault-a', now=NOW)  # 성공 후에는 간격이 다시 처음부터
+    assert tail.next_discovery_at[('A', 'vault-a')] == NOW + DISCOVERY_SECONDS
+
+
+def test_failed_vault_listing_retried_later():
+    tail = LiveTail(['A'])
+    assert tail.listing_due('A', now=NOW)
+    tail.defer_listing('A', now=NOW)
+    tail.defer_listing('A', now=NOW)
+    assert not tail.listing_due('A', now=NOW + DISCOVERY_SECONDS)
+    assert tail.next_event_in(now=NOW) == DISCOVERY_SECONDS * BACKOFF_FACTOR
+    tail.set_vaults('A', [('vault-a', 'rg')])
+    assert not tail.listing_due('A') and tail.next_listing_at == {}
+
+
+def azure_job(job_id, status=IN_PROGRESS, progress=40):
+    return SimpleNamespace(name=job_id, properties=SimpleNamespace(
+        start_time=datetime.fromtimestamp(NOW, timezone.utc), end_time=None, entity_friendly_name='vm-1',
+        operation='Backup', status=status, extended_info=SimpleNamespace(progress_percentage=progress)
+    ))
+
+
+class FakeBackupClient:
+    """vault-a 발견 조회는 항상 실패하고 vault-b 는 빈 결과인 Backup 클라이언트 대역"""
+
+    def __init__(self):
+        self.calls = []
+        self.backup_jobs = SimpleNamespace(list=self.list_jobs)
+        self.job_details = SimpleNamespace(get=self.get_job)
+
+    def list_jobs(self, vault_name, resource_group, filter=None, **options):
+        self.calls.append(('list', vault_name))
+        if vault_name == 'vault-a':
+            raise HttpResponseError(message='Vault not found')
+        return []
+
+    def get_job(self, vault_name, resource_group, job_id, **options):
+        self.calls.append(('get', job_id))
+        return azure_job(job_id, progress=60)
+
+
+def test_tick_keeps_polling_jobs_when_discovery_fails(web):
+    client = FakeBackupClient()
+    web.st.session_state.credential_manager = SimpleNamespace(get_backup_client=lambda *args: client)
+    web.st.session_state.circuit_breakers = CircuitBreakerBoard()
+    tail = LiveTail(['A'])
+    tail.set_vaults('A', [('vault-a', 'rg'), ('vault-b', 'rg')])
+    tail.observe(ACCOUNT, job_info('job-1', vault_name='vault-b'), progress=40)
+    tail.jobs[('A', 'vault-b', 'job-1')].next_poll_at = 0
+
+    web.live_tail_tick(tail, [ACCOUNT])
+    assert client.calls == [('list', 'vault-a'), ('list', 'vault-b'), ('get', 'job-1')]
+    assert tail.jobs[('A', 'vault-b', 'job-1')].progress == 60
+    assert ('A', 'vault-a') not in tail.discovered_until and ('A', 'vault-b') in tail.discovered_until
+
+    client.calls.clear()
+    web.live_tail_tick(tail, [ACCOUNT])  # 다음 갱신에서 실패한 Vault 를 바로 다시 부르지 않음
+    assert client.calls == []
@@ -0,0 +1,98 @@
+"""테넌트 / 구독별 회로 차단기 (collector_breaker)"""
+import threading
+
+import pytest
+from azure.core.exceptions import ClientAuthenticationError, HttpResponseError
+
+from collector_breaker import (CLOSED, HALF_OPEN, OPEN, RESOURCE_GRAPH_SCOPE, CircuitBreaker, CircuitBreakerBoard,
+                               failure_scope)
+
+TENANT = '00000000-0000-0000-0000-000000000000'
+SUBSCRIPTION = '11111111-1111-1111-1111-111111111111'
+
+
+class FakeClock:
+    def __init__(self, monkeypatch):
+        self.now = 1_000_000.0
+        monkeypatch.setattr('collector_breaker.time.time', lambda: self.now)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    return FakeClock(monkeypatch)
+
+
+def http_error(status):
+    error = HttpResponseError(message=f"status {status}")
+    error.status_code = status
+    return error
+
+
+def test_failure_scope():
+    assert failure_scope(ClientAuthenticationError("token")) == 'tenant'
+    assert failure_scope(http_error(403)) == 'subscription'
+    assert failure_scope(HttpResponseError(message="(SubscriptionNotFound) not found")) == 'subscription'
+    assert failure_scope(http_error(500)) is None
+
+
+def test_opens_after_threshold_and_backs_off(clock):
+    breaker = CircuitBreaker((TENANT, SUBSCRIPTION), failure_threshold=2, base_backoff=60)
+    breaker.record_failure('403')
+    assert breaker.state == CLOSED and breaker.allow()
+    breaker.record_failure('403')
+    assert breaker.state == OPEN and not breaker.allow()
+
+    clock.now += 60
+    assert breaker.allow() and breaker.state == HALF_OPEN
+    breaker.record_failure('403')
+    assert breaker.state == OPEN and breaker.retry_in() == 120
+
+    clock.now += 120
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CLOSED and breaker.open_count == 0 and breaker.allow()
+
+
+def test_half_open_lets_through_a_single_probe(clock):
+    breaker = CircuitBreaker((TENANT, ''), failure_threshold=1, base_backoff=60, probe_timeout=300)
+    breaker.record_failure('token')
+    clock.now += 60
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(breaker.allow())) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results.count(True) == 1
+    assert not breaker.allow()
+
+    # 결과 없이 끝난 시험 호출은 제한 시간 뒤 다음 호출이 이어받음
+    clock.now += 300
+    assert breaker.allow() and not breaker.allow()
+    breaker.release_probe()
+    assert breaker.allow()
+
+
+def test_board_blocking_and_opened(clock):
+    board = CircuitBreakerBoard(failure_threshold=1, base_backoff=60)
+    assert board.record_failure(TENANT, SUBSCRIPTION, http_error(403)).key == (TENANT, SUBSCRIPTION)
+    assert board.blocking(TENANT, SUBSCRIPTION) is board.opened(TENANT, SUBSCRIPTION)
+
+    clock.now += 60
+    assert board.blocking(TENANT, SUBSCRIPTION) is None      # 시험 호출
+    assert board.opened(TENANT, SUBSCRIPTION) is None        # 호출 후 확인은 시험 호출을 소비하지 않음
+    assert board.blocking(TENANT, SUBSCRIPTION) is not None  # 다른 호출은 결과가 나올 때까지 차단
+
+    # 일시적 오류로 끝난 시험 호출은 판정 없이 다음 호출에 넘김
+    assert board.record_failure(TENANT, SUBSCRIPTION, http_error(500)) is None
+    assert board.blocking(TENANT, SUBSCRIPTION) is None
+    board.record_success(TENANT, SUBSCRIPTION)
+    assert board.open_breakers() == []
+
+
+def test_board_tenant_failure_blocks_all_subscriptions(clock):
+    board = CircuitBreakerBoard(failure_threshold=1)
+    board.record_failure(TENANT, SUBSCRIPTION, ClientAuthenticationError("token"))
+    assert board.blocking(TENANT, 'other-subscription').key == (TENANT, '')
+    assert board.blocking(TENANT, RESOURCE_GRAPH_SCOPE).key == (TENANT, '')
@@ -0,0 +1,91 @@
+"""스냅샷 최신 값 조회 (collector_snapshot: 집계 포인트 선택 / 차원 분할 / 구간 캐시)"""
+from types import SimpleNamespace
+
+import pytest
+
+import collector_snapshot
+from collector_snapshot import (SNAPSHOT_SECONDS, latest_metric_values, latest_metric_values_by_dimension,
+                                reset_snapshot_cache)
+
+METRICS = ['Percentage CPU', 'Available Memory Bytes']
+VM = '/subscriptions/s/resourceGroups/RG/providers/Microsoft.Compute/virtualMachines/VM-1'
+
+
+def series(averages, **dimensions):
+    return SimpleNamespace(
+        data=[SimpleNamespace(average=value) for value in averages],
+        metadatavalues=[SimpleNamespace(name=SimpleNamespace(value=name), value=value)
+                        for name, value in dimensions.items()]
+    )
+
+
+def metric(name, *timeseries):
+    return SimpleNamespace(name=SimpleNamespace(value=name), timeseries=list(timeseries))
+
+
+class FakeMonitor:
+    """metrics.list 호출을 기록하고 정해 둔 응답을 돌려주는 MonitorManagementClient 대역"""
+
+    def __init__(self, *metrics):
+        self.calls = []
+        self.response = SimpleNamespace(value=list(metrics))
+        self.metrics = self
+
+    def list(self, **kwargs):
+        self.calls.append(kwargs)
+        return self.response
+
+
+@pytest.fixture(autouse=True)
+def clock(monkeypatch):
+    reset_snapshot_cache()
+    now = [1000.0]
+    monkeypatch.setattr(collector_snapshot.time, 'monotonic', lambda: now[0])
+    yield now
+    reset_snapshot_cache()
+
+
+def test_latest_value_skips_empty_trailing_point():
+    monitor = FakeMonitor(metric('percentage cpu', series([12.5, None])), metric('Available Memory Bytes'))
+    values = latest_metric_values(monitor, VM, METRICS, call_options={'timeout': 30})
+    assert values == {'Percentage CPU': 12.5, 'Available Memory Bytes': None}
+    (call,) = monitor.calls
+    assert call['metricnames'] == 'Percentage CPU,Available Memory Bytes'
+    assert call['interval'] == 'PT5M' and call['timeout'] == 30
+
+
+def test_cache_reuses_result_until_interval_ends(clock):
+    monitor = FakeMonitor(metric('Percentage CPU', series([40.0])))
+    first = latest_metric_values(monitor, VM, METRICS)
+    first['Percentage CPU'] = -1  # 돌려준 dict 를 고쳐도 캐시에는 영향 없음
+    assert latest_metric_values(monitor, VM.upper(), METRICS)['Percentage CPU'] == 40.0
+    assert len(monitor.calls) == 1
+
+    clock[0] += SNAPSHOT_SECONDS
+    latest_metric_values(monitor, VM, METRICS)
+    assert len(monitor.calls) == 2
+
+
+def test_empty_result_is_not_cached():
+    monitor = FakeMonitor(metric('Percentage CPU', series([None])))
+    assert latest_metric_values(monitor, VM, METRICS)['Percentage CPU'] is None
+    latest_metric_values(monitor, VM, METRICS)
+    assert len(monitor.calls) == 2
+
+
+def test_by_dimension_splits_series_per_member():
+    monitor = FakeMonitor(
+        metric('Percentage CPU', series([10.0], VMName='vmss_0'), series([20.0], vmname='vmss_1'), series([99.0])),
+        metric('Available Memory Bytes', series([None, 512.0], VMName='vmss_0'))
+    )
+    members = latest_metric_values_by_dimension(monitor, VM, METRICS, 'VMName')
+    assert members == {
+        'vmss_0': {'Percentage CPU': 10.0, 'Available Memory Bytes': 512.0},
+        'vmss_1': {'Percentage CPU': 20.0, 'Available Memory Bytes': None}
+    }
+    assert monitor.calls[0]['filter'] == "VMName eq '*'" and monitor.calls[0]['top'] == 1000
+
+    # 차원 분할 결과는 단일 조회와 다른 캐시 항목
+    latest_metric_values_by_dimension(monitor, VM, METRICS, 'VMName')
+    latest_metric_values(monitor, VM, METRICS)
+    assert len(monitor.calls) == 2
@@ -0,0 +1,114 @@
+"""로컬 메트릭 이력 (metric_history: 저장 / 압축 / 보존 / 조회)"""
+import os
+
+import numpy as np
+
+from metric_history import RAW, DAY_SECONDS, MetricHistory, covers, merge_spans, rollup
+
+DAY = 1_800_000_000 // DAY_SECONDS * DAY_SECONDS
+HOUR = 3600
+VM = '/subscriptions/s/resourceGroups/rg/providers/Microsoft.Compute/virtualMachines/VM-1'
+
+
+def minute_points(start, hours, value=lambda i: i % 10):
+    epochs = start + np.arange(0, hours * HOUR, 60)
+    return epochs, np.array([float(value(i)) for i in range(len(epochs))])
+
+
+def filled(tmp_path, hours=6, metric='cpu'):
+    history = MetricHistory(str(tmp_path))
+    epochs, values = minute_points(DAY, hours)
+    history.add(VM, metric, epochs, values, 60, (DAY, DAY + hours * HOUR))
+    history.flush()
+    return history, epochs, values
+
+
+def test_rollup_merges_min_max_sum_count():
+    series = {'t': np.array([0, 60, 300, 360]), 'min': np.array([1.0, 5.0, 2.0, 8.0]),
+              'max': np.array([1.0, 5.0, 2.0, 8.0]), 'sum': np.array([1.0, 5.0, 2.0, 8.0]),
+              'count': np.ones(4)}
+    buckets = rollup(series, 300)
+    assert buckets['t'].tolist() == [0, 300]
+    assert buckets['min'].tolist() == [1.0, 2.0] and buckets['max'].tolist() == [5.0, 8.0]
+    assert buckets['sum'].tolist() == [6.0, 10.0] and buckets['count'].tolist() == [2, 2]
+
+
+def test_spans_merge_and_cover():
+    spans = merge_spans([[0, 100, 60]], 100, 200, 60)
+    assert spans == [[0, 200, 60]]
+    spans = merge_spans(spans, 300, 400, 900)
+    assert covers(spans, 0, 200, 60)
+    assert not covers(spans, 0, 400, 60)       # 200~300 수집 기록 없음
+    assert not covers(spans, 300, 400, 60)     # 15분 간격 기록으로 1분 간격 조회 불가
+    assert covers(spans, 300, 400, 900)
+
+
+def test_flush_skips_points_before_watermark(tmp_path):
+    history, epochs, values = filled(tmp_path)
+    history.add(VM, 'cpu', epochs, values, 60, (DAY, DAY + 6 * HOUR))
+    history.add(VM, 'cpu', [epochs[-1] + 60, epochs[-1] + 120], [1.0, np.nan], 60, (DAY, DAY + 7 * HOUR))
+    history.flush()
+    query = history.query([(VM, 'cpu')], DAY, DAY + 6 * HOUR + 120, 60, now=DAY + 7 * HOUR)
+    series, tier = query[(VM, 'cpu')]
+    assert tier == RAW and len(series['t']) == len(epochs) + 1
+
+
+def test_compact_rolls_only_finished_buckets(tmp_path):
+    history, _, _ = filled(tmp_path)
+    assert history.compact(now=DAY + 6 * HOUR) == {'5m': 71, '1h': 5, 'removed_files': 0}
+    # 다시 압축해도 새 구간만 계산
+    assert history.compact(now=DAY + 6 * HOUR) == {'5m': 0, '1h': 0, 'removed_files': 0}
+    # 늦게 올 포인트가 없을 만큼 지나면 마지막 구간까지 묶음
+    assert history.compact(now=DAY + 3 * DAY_SECONDS) == {'5m': 1, '1h': 1, 'removed_files': 0}
+
+
+def test_prune_removes_expired_files_of_stopped_series(tmp_path):
+    history, _, _ = filled(tmp_path)
+    history.compact(now=DAY + 6 * HOUR)
+    result = history.compact(now=DAY + 40 * DAY_SECONDS)
+    # 원본(3일) / 5분(30일) 파일은 1시간 단계로 묶인 뒤 삭제, 1시간 파일은 400일 보존
+    assert result['removed_files'] == 2
+    assert history.days(RAW) == [] and history.days('5m') == [] and len(history.days('1h')) == 1
+
+
+def test_prune_keeps_files_not_yet_rolled(tmp_path):
+    history, _, _ = filled(tmp_path)
+    # 압축하지 않은 원본은 보존 기간이 지나도 삭제하지 않음 (한 번에 묶은 뒤 삭제)
+    history._prune(history._state(), DAY + 40 * DAY_SECONDS)
+    assert len(history.days(RAW)) == 1
+
+
+def test_query_picks_coarsest_tier_and_realigns(tmp_path):
+    history, _, values = filled(tmp_path)
+    history.compact(now=DAY + 3 * DAY_SECONDS)
+    now = DAY + 2 * DAY_SECONDS
+    (series, tier), = history.query([(VM, 'cpu')], DAY, DAY + 6 * HOUR, HOUR, now=now).values()
+    assert tier == '1h'
+    assert series['t'].tolist() == [DAY + h * HOUR for h in range(6)]
+    assert series['count'].tolist() == [60] * 6
+    assert np.allclose(series['mean'], values.reshape(6, 60).mean(axis=1))
+    assert series['min'].tolist() == [0.0] * 6 and series['max'].tolist() == [9.0] * 6
+
+    (series, tier), = history.query([(VM, 'cpu')], DAY + 7 * 60, DAY + HOUR, 900, now=now).values()
+    assert tier == '5m' and series['t'][0] == DAY  # 시작 시각을 요청 간격 경계로 내림
+
+
+def test_query_combines_rolled_and_recent_points(tmp_path):
+    history, _, _ = filled(tmp_path)
+    history.compact(now=DAY + 6 * HOUR)
+    (series, tier), = history.query([(VM, 'cpu')], DAY, DAY + 6 * HOUR, 900, now=DAY + 6 * HOUR).values()
+    assert tier == '5m' and len(series['t']) == 24 and series['count'].sum() == 360
+
+
+def test_query_returns_none_without_coverage(tmp_path):
+    history, _, _ = filled(tmp_path)
+    results = history.query([(VM, 'cpu'), (VM, 'memory')], DAY, DAY + 12 * HOUR, 60, now=DAY + 12 * HOUR)
+    assert results == {(VM, 'cpu'): None, (VM, 'memory'): None}
+    assert history.query([(VM, 'cpu')], DAY, DAY + HOUR, 60, now=DAY + 10 * DAY_SECONDS) == {(VM, 'cpu'): None}
+
+
+def test_summary_lists_every_tier(tmp_path):
+    history, _, _ = filled(tmp_path)
+    rows = {row['tier']: row for row in history.summary()}
+    assert rows[RAW]['files'] == 1 and rows['5m']['files'] == 0 and rows['1h']['horizon_days'] == 400
+    assert os.path.exists(tmp_path / 'state.json')
@@ -0,0 +1,22 @@
+"""02 / 03 폴더의 collector_profiler.py 복사본이 04 폴더의 원본과 같은지 확인"""
+import glob
+import os
+
+import pytest
+
+DASHBOARD_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SOURCE = os.path.join(DASHBOARD_DIR, 'collector_profiler.py')
+COPIES = sorted(
+    path for path in glob.glob(os.path.join(os.path.dirname(DASHBOARD_DIR), '*', 'collector_profiler.py'))
+    if os.path.dirname(path) != DASHBOARD_DIR
+)
+
+
+@pytest.mark.parametrize('copy', COPIES, ids=lambda path: os.path.basename(os.path.dirname(path)))
+def test_profiler_copy_matches_source(copy):
+    with open(SOURCE, 'rb') as source, open(copy, 'rb') as copied:
+        assert copied.read() == source.read(), f"{copy} 를 {SOURCE} 로 다시 복사하세요"
+
+
+def test_profiler_copies_found():
+    assert len(COPIES) == 2
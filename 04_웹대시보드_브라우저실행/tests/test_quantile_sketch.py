@@ -0,0 +1,164 @@
+"""분위수 스케치 (DDSketch / SketchStore)"""
+import os
+import time
+
+import numpy as np
+import pytest
+
+from quantile_sketch import DAY_SECONDS, DDSketch, SketchStore
+
+HOUR = 3600
+T0 = 1_800_000_000 // DAY_SECONDS * DAY_SECONDS
+DIMS = {'account': 'A', 'region': 'koreacentral', 'vm_size': 'Standard_D2s_v3'}
+
+
+def assert_relative(actual, expected, accuracy=0.01):
+    assert abs(actual - expected) <= expected * accuracy * 1.01
+
+
+@pytest.mark.parametrize('q', [0.5, 0.95, 0.99])
+def test_quantile_within_relative_accuracy(q):
+    values = np.random.default_rng(7).lognormal(3.0, 1.0, 20_000)
+    sketch = DDSketch()
+    sketch.add(values)
+    assert_relative(sketch.quantile(q), np.quantile(values, q, method='lower'))
+
+
+def test_merge_equals_single_sketch():
+    values = np.random.default_rng(1).uniform(0, 100, 5_000)
+    whole, left, right = DDSketch(), DDSketch(), DDSketch()
+    whole.add(values)
+    left.add(values[:1_234])
+    right.add(values[1_234:])
+    merged = left.merge(right)
+    assert merged.count == whole.count and merged.min == whole.min and merged.max == whole.max
+    for q in (0.5, 0.95, 0.99):
+        assert merged.quantile(q) == whole.quantile(q)
+
+
+def test_merge_rejects_different_accuracy():
+    with pytest.raises(ValueError):
+        DDSketch(0.01).merge(DDSketch(0.02))
+
+
+def test_zero_nan_weight_and_empty():
+    sketch = DDSketch()
+    assert sketch.quantile(0.5) is None
+    sketch.add([0.0, np.nan, 0.0, -1.0])
+    sketch.add([50.0], weight=3.0)
+    assert sketch.count == 6
+    assert sketch.quantile(0.4) == 0.0
+    assert_relative(sketch.quantile(0.99), 50.0)
+
+
+def test_collapse_keeps_high_quantiles():
+    values = np.geomspace(0.01, 1e6, 10_000)
+    sketch = DDSketch(max_bins=64)
+    sketch.add(values)
+    assert len(sketch.bins) <= 64
+    assert_relative(sketch.quantile(0.99), np.quantile(values, 0.99, method='lower'))
+
+
+def test_round_trip_dict():
+    sketch = DDSketch()
+    sketch.add([1.0, 2.0, 3.0, 40.0])
+    restored = DDSketch.from_dict(sketch.to_dict())
+    assert restored.quantile(0.5) == sketch.quantile(0.5) and restored.count == sketch.count
+
+
+def test_store_watermark_skips_already_added_points(tmp_path):
+    store = SketchStore(str(tmp_path))
+    dims = {'account': 'A', 'region': 'koreacentral', 'vm_size': 'Standard_D2s_v3'}
+    epochs = T0 + np.arange(0, 2 * HOUR, 600)
+    assert store.add('/VM/1', dims, 'cpu', epochs, np.full(len(epochs), 10.0)) == 12
+    store.flush()
+
+    reopened = SketchStore(str(tmp_path))
+    later = epochs + HOUR
+    assert reopened.add('/vm/1', dims, 'cpu', later, np.full(len(later), 90.0)) == 6
+    reopened.flush()
+    assert reopened.bucket_starts() == [T0, T0 + HOUR, T0 + 2 * HOUR]
+
+
+def test_store_merged_groups_and_time_range(tmp_path):
+    store = SketchStore(str(tmp_path))
+    for index, (account, value) in enumerate([('A', 10.0), ('A', 20.0), ('B', 80.0)]):
+        dims = {'account': account, 'region': 'koreacentral', 'vm_size': 'Standard_D2s_v3'}
+        store.add(f"/vm/{index}", dims, 'cpu', [T0, T0 + HOUR], [value, value])
+    store.add('/vm/0', {'account': 'A'}, 'memory', [T0], [99.0])
+    store.flush()
+
+    by_account = store.merged('cpu', group_by=('account',))
+    assert by_account[('A',)].count == 4 and by_account[('B',)].count == 2
+    fleet = store.merged('cpu', group_by=())
+    assert_relative(fleet[()].quantile(0.99), 80.0)
+    assert store.merged('cpu', group_by=(), since=T0 + HOUR)[()].count == 3
+    assert store.merged('cpu', group_by=(), until=T0 + HOUR)[()].count == 3
+
+
+def filled_store(tmp_path, hours, **options):
+    store = SketchStore(str(tmp_path), **options)
+    epochs = T0 + np.arange(0, hours * HOUR, 600)
+    store.add('/vm/0', DIMS, 'cpu', epochs, np.arange(len(epochs), dtype=float))
+    store.add('/vm/0', DIMS, 'memory', epochs, np.full(len(epochs), 50.0))
+    store.flush()
+    return store
+
+
+def test_merged_metrics_single_pass_and_cache(tmp_path, monkeypatch):
+    store = filled_store(tmp_path, 3)
+    reads = []
+    read_json = SketchStore._read_json
+    monkeypatch.setattr(SketchStore, '_read_json', lambda self, path, default: reads.append(path) or
+                        read_json(self, path, default))
+
+    merged = store.merged_metrics(('cpu', 'memory'), group_by=())
+    assert len(reads) == 3
+    assert merged['cpu'][()].count == 18 and merged['memory'][()].quantile(0.5) == pytest.approx(50.0, rel=0.01)
+    merged['cpu'][()].add([1000.0])  # 돌려준 스케치를 고쳐도 캐시에는 영향 없음
+
+    assert store.merged_metrics(('cpu', 'memory'), group_by=())['cpu'][()].count == 18
+    assert len(reads) == 3  # 파일이 그대로면 다시 읽지 않음
+
+    store.add('/vm/1', DIMS, 'cpu', [T0 + 5 * HOUR], [10.0])
+    store.flush()
+    reads.clear()
+    assert store.merged_metrics(('cpu', 'memory'), group_by=())['cpu'][()].count == 19 and len(reads) == 4
+
+
+def test_compact_rolls_old_hours_into_day_files(tmp_path):
+    store = filled_store(tmp_path, 30)
+    before = store.merged_metrics(('cpu', 'memory'), group_by=())
+    now = T0 + store.hourly_horizon + 2 * DAY_SECONDS
+    assert store.compact(now=now) == {'rolled': 30, 'removed': 0}
+    assert store.bucket_starts() == [T0, T0 + DAY_SECONDS]
+    after = store.merged_metrics(('cpu', 'memory'), group_by=())
+    for metric in ('cpu', 'memory'):
+        assert after[metric][()].count == before[metric][()].count
+        assert after[metric][()].quantile(0.95) == before[metric][()].quantile(0.95)
+    assert store.merged('cpu', group_by=(), since=T0 + DAY_SECONDS)[()].count == 36  # 하루 단위로 조회
+
+    assert store.compact(now=T0 + store.daily_horizon + 2 * DAY_SECONDS) == {'rolled': 0, 'removed': 2}
+    assert store.bucket_starts() == []
+
+
+def test_compact_skips_hours_already_rolled(tmp_path):
+    store = filled_store(tmp_path, 2)
+    leftover = store.bucket_path(T0)
+    with open(leftover, 'rb') as f:
+        content = f.read()
+    store.compact(now=T0 + store.hourly_horizon + 2 * DAY_SECONDS)
+    with open(leftover, 'wb') as f:  # 하루 파일에 합친 뒤 삭제 전에 중단된 경우
+        f.write(content)
+    store.compact(now=T0 + store.hourly_horizon + 2 * DAY_SECONDS)
+    assert not os.path.exists(leftover)
+    assert store.merged('cpu', group_by=())[()].count == 12
+
+
+def test_flush_writes_rolled_period_into_day_file(tmp_path):
+    day = int(time.time()) // DAY_SECONDS * DAY_SECONDS - 3 * DAY_SECONDS
+    store = SketchStore(str(tmp_path), hourly_horizon=DAY_SECONDS)
+    store.add('/vm/0', DIMS, 'cpu', [day + HOUR, day + 2 * HOUR], [1.0, 2.0])
+    store.flush()
+    assert sorted(os.listdir(tmp_path)) == [os.path.basename(store.day_path(day)), 'watermarks.json']
+    assert store.merged('cpu', group_by=())[()].count == 2
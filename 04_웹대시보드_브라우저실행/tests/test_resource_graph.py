@@ -0,0 +1,160 @@
+"""Resource Graph 인벤토리 (resource_graph: 쿼리 생성 / 행 변환 / 페이지 순회 / 마감 시간)"""
+import time
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from collector_breaker import CircuitBreakerBoard
+from collector_deadline import Deadline, DeadlineExceeded
+from collectors import NullProgress
+from resource_graph import (VM_INVENTORY_QUERY, RecordedResourceGraphClient, backup_job_from_row, backup_job_query,
+                            parse_epoch, query_name, query_resource_graph, vm_info_from_row, vmss_info_from_row)
+
+EPOCH = int(datetime(2026, 3, 1, 2, 0, tzinfo=timezone.utc).timestamp())
+
+
+def test_parse_epoch_formats():
+    assert parse_epoch('2026-03-01T02:00:00Z') == EPOCH
+    assert parse_epoch('2026-03-01T02:00:00.1234567Z') == EPOCH         # 7자리 소수점
+    assert parse_epoch('2026-03-01T11:00:00.5+09:00') == EPOCH
+    assert parse_epoch('2026-03-01T02:00:00') == EPOCH                   # 시간대 없으면 UTC
+    assert parse_epoch(datetime(2026, 3, 1, 2, 0, tzinfo=timezone.utc)) == EPOCH
+    assert parse_epoch('') is None and parse_epoch(None) is None
+
+
+def test_backup_job_query_filters():
+    query = backup_job_query(hours=48.9, statuses=['Failed', "In'Progress"])
+    assert query_name(query) == 'backup_jobs'
+    assert 'ago(48h)' in query and "status in~ ('Failed', 'InProgress')" in query
+    assert 'status in~' not in backup_job_query()
+
+
+def test_backup_job_from_row():
+    row = {'name': 'job-1', 'vaultName': 'vault-a', 'resourceGroup': 'rg', 'status': 'Completed',
+           'entityFriendlyName': '', 'operation': 'Backup',
+           'startTime': '2026-03-01T02:00:00Z', 'endTime': '2026-03-01T02:30:00.0000001Z'}
+    job = backup_job_from_row(row, 'A')
+    assert job['duration_seconds'] == 1800 and job['start_epoch'] == EPOCH and job['entity_name'] is None
+    assert backup_job_from_row({**row, 'endTime': None}, 'A')['duration_seconds'] is None
+
+
+def test_vm_info_power_state_fallbacks():
+    row = {'name': 'vm-1', 'resourceGroup': 'rg', 'location': 'koreacentral', 'provisioningState': 'Succeeded',
+           'powerState': '', 'powerStateCode': 'PowerState/deallocated'}
+    info = vm_info_from_row(row, 'A')
+    assert info['power_state'] == 'VM deallocated' and info['provisioning_state'] == 'Provisioning succeeded'
+    assert info['vm_size'] == 'N/A' and info['os_type'] == 'N/A'
+    bare = vm_info_from_row({'name': 'vm-2', 'resourceGroup': 'rg', 'location': 'koreacentral'}, 'A')
+    assert bare['power_state'] == 'Unknown' and bare['provisioning_state'] == 'Unknown'
+
+
+def test_vmss_info_counts_instances():
+    instances = [{'instanceId': '0', 'powerState': 'VM running'},
+                 {'instanceId': '1', 'powerStateCode': 'PowerState/running'},
+                 {'instanceId': '2', 'powerStateCode': 'PowerState/stopped'}]
+    row = {'name': 'vmss-1', 'resourceGroup': 'rg', 'location': 'koreacentral', 'capacity': 3}
+    info = vmss_info_from_row(row, 'A', instances)
+    assert (info['total_instances'], info['running_instances'], info['stopped_instances']) == (3, 2, 1)
+    assert info['instance_states']['2'] == 'VM stopped' and info['capacity'] == 3
+
+
+def test_paging_follows_skip_token_and_filters_subscriptions():
+    rows = [{'id': f"/vm/{index}", 'subscriptionId': 'SUB-A' if index % 2 else 'sub-b'} for index in range(7)]
+    client = RecordedResourceGraphClient({'vms': rows})
+    found, pages = query_resource_graph(client, ['sub-a'], VM_INVENTORY_QUERY, page_size=2)
+    assert [row['id'] for row in found] == ['/vm/1', '/vm/3', '/vm/5'] and pages == 2
+    assert [request.options.skip_token for request in client.requests] == [None, '2']
+
+    found, pages = query_resource_graph(client, ['sub-c'], VM_INVENTORY_QUERY)
+    assert found == [] and pages == 1
+
+
+class PagedDeadline(Deadline):
+    """페이지를 expire_after 번 조회한 뒤 마감 시간이 지나는 Deadline"""
+
+    def __init__(self, expire_after):
+        super().__init__(60, call_timeout=7)
+        self.expire_after = expire_after
+        self.pages = 0
+
+    def call_options(self, stage=''):
+        if ' 페이지 ' in stage:
+            self.pages += 1
+            if self.pages > self.expire_after:
+                self.expires_at = time.monotonic()
+        return super().call_options(stage)
+
+
+class TimeoutRecordingClient(RecordedResourceGraphClient):
+    """호출마다 넘긴 SDK 옵션도 기록"""
+
+    def __init__(self, recording):
+        super().__init__(recording)
+        self.options = []
+
+    def resources(self, query_request, **options):
+        self.options.append(options)
+        return super().resources(query_request, **options)
+
+
+def test_paging_passes_deadline_timeout_and_stops_when_expired():
+    rows = [{'id': f"/vm/{index}", 'subscriptionId': 'sub-a'} for index in range(5)]
+    client = TimeoutRecordingClient({'vms': rows})
+    deadline = PagedDeadline(expire_after=2)
+    with pytest.raises(DeadlineExceeded):
+        query_resource_graph(client, ['sub-a'], VM_INVENTORY_QUERY, page_size=2, deadline=deadline)
+    assert len(client.requests) == 2 and [options['timeout'] for options in client.options] == [7, 7]
+    assert deadline.partial and deadline.reason.startswith('vms 페이지 3')
+
+
+def vm_row(index, subscription):
+    return {'id': f"/subscriptions/{subscription}/resourceGroups/rg/providers/Microsoft.Compute/virtualMachines/vm-{index}",
+            'name': f"vm-{index}", 'resourceGroup': 'rg', 'location': 'koreacentral', 'subscriptionId': subscription,
+            'powerStateCode': 'PowerState/running'}
+
+
+def test_inventory_returns_finished_tenants_when_deadline_expires(web, monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    client = RecordedResourceGraphClient({'vms': [vm_row(0, 'sub-a'), vm_row(1, 'sub-a'), vm_row(2, 'sub-b')]})
+    web.st.session_state.credential_manager = web.AzureCredentialManager(client_factories={
+        'resourcegraph': lambda *args: client, 'compute': lambda *args: None
+    })
+    web.st.session_state.circuit_breakers = CircuitBreakerBoard()
+    accounts = [{'name': 'A', 'tenant_id': 'tenant-a', 'subscription_id': 'sub-a'},
+                {'name': 'B', 'tenant_id': 'tenant-b', 'subscription_id': 'sub-b'}]
+    deadline, partial_accounts = PagedDeadline(expire_after=1), {}
+    vms = web.get_inventory_resource_graph(accounts, 'vm', NullProgress(), NullProgress(), collect_metrics=False,
+                                           deadline=deadline, partial_accounts=partial_accounts)
+    assert [vm['vm_name'] for vm in vms] == ['vm-0', 'vm-1']
+    assert deadline.partial and list(partial_accounts) == ['B']
+    assert web.last_good_records('azure_vms', 'B') == []
+
+
+class RecordedMonitor:
+    """metrics.list 호출을 기록하고 CPU 값만 돌려주는 Monitor 클라이언트 대역"""
+
+    def __init__(self):
+        self.calls = []
+        self.metrics = self
+
+    def list(self, resource_uri, **kwargs):
+        self.calls.append(resource_uri)
+        value = SimpleNamespace(name=SimpleNamespace(value='Percentage CPU'),
+                                timeseries=[SimpleNamespace(data=[SimpleNamespace(average=42.0)], metadatavalues=[])])
+        return SimpleNamespace(value=[value])
+
+
+def test_replay_clients_injected_through_credential_manager(web, monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    client, monitor = RecordedResourceGraphClient({'vms': [vm_row(0, 'sub-a')]}), RecordedMonitor()
+    manager = web.AzureCredentialManager(client_factories={
+        'resourcegraph': lambda *args: client, 'compute': lambda *args: None, 'monitor': lambda *args: monitor
+    })
+    manager.get_credential = lambda tenant_id: pytest.fail('녹화 재생 중에는 자격 증명을 만들지 않음')
+    web.st.session_state.credential_manager = manager
+    web.st.session_state.circuit_breakers = CircuitBreakerBoard()
+    accounts = [{'name': 'A', 'tenant_id': 'tenant-a', 'subscription_id': 'sub-a'}]
+    (vm,) = web.get_inventory_resource_graph(accounts, 'vm', NullProgress(), NullProgress())
+    assert vm['cpu_percent'] == 42.0 and monitor.calls == [vm_row(0, 'sub-a')['id']]
+    assert manager.get_resource_graph_client('tenant-a') is client
@@ -0,0 +1,56 @@
+"""전체 VM 추이 이상 탐지 (trend_anomaly / detect_fleet_anomalies)"""
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from trend_anomaly import SPIKE, SUSTAINED, detect_anomalies
+
+START = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def flat_points(base, count=96, spike_at=None, spike=0.0, minutes=15):
+    """base 주변에서 조금 흔들리는 추이 (spike_at 구간에만 spike 더함)"""
+    return [
+        {'timestamp': START + timedelta(minutes=minutes * i),
+         'value': base + (i % 3) * 0.1 + (spike if i == spike_at else 0.0)}
+        for i in range(count)
+    ]
+
+
+def test_detect_anomalies_finds_spike_and_sustained_level():
+    matrix = np.full((2, 40), 10.0) + np.tile([0.0, 0.5], 20)
+    matrix[0, 30] = 80.0           # 급증
+    matrix[1, 20:26] = 95.0        # 임계값 지속
+    found = detect_anomalies(matrix, window=16, z_threshold=3.0, level=90.0, sustain=3, min_std=2.0)
+    kinds = dict(zip(found['rows'].tolist(), found['kinds'].tolist()))
+    assert kinds[0] == SPIKE
+    assert SUSTAINED in found['kinds'][found['rows'] == 1].tolist()
+
+
+def test_detect_anomalies_nan_breaks_runs():
+    matrix = np.full((1, 30), 95.0)
+    matrix[0, 1::2] = np.nan
+    found = detect_anomalies(matrix, window=16, z_threshold=3.0, level=90.0, sustain=3, min_std=2.0)
+    assert len(found['rows']) == 0
+
+
+def test_fleet_anomalies_disk_spike_without_level(web):
+    """임계값이 없는 디스크 메트릭의 급증도 라벨을 만들 수 있어야 함"""
+    trends = {
+        f"vm-{i}": {
+            'cpu_trend': flat_points(20.0),
+            'memory_trend': flat_points(40.0),
+            'disk_trend': flat_points(1.0, spike_at=60, spike=500.0)
+        }
+        for i in range(3)
+    }
+    events, ranking = web.detect_fleet_anomalies(web.flatten_trends(trends))
+    disk_events = events[events['metric'] == web.TREND_METRIC_LABELS['disk_trend']]
+    assert len(disk_events) == 3
+    assert set(disk_events['kind']) == {'급증 (z-score)'}
+    assert list(ranking['rank']) == [1, 2, 3]
+
+
+def test_fleet_anomalies_empty_trends(web):
+    events, ranking = web.detect_fleet_anomalies(web.flatten_trends({}))
+    assert events.empty and ranking.empty
@@ -0,0 +1,51 @@
+"""VM 추이 차트 (다운샘플링 / 전체 VM 오버레이 / 전체 VM 히트맵)"""
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+START = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def points(values, minutes=5):
+    return [{'timestamp': START + timedelta(minutes=minutes * i), 'value': value} for i, value in enumerate(values)]
+
+
+@pytest.fixture
+def trend_session(web):
+    """세션에 평탄화 추이 배열을 넣고 테스트 후 제거"""
+    def load(trends):
+        web.st.session_state['vm_trend_arrays'] = web.flatten_trends(trends)
+
+    yield load
+    del web.st.session_state['vm_trend_arrays']
+
+
+@pytest.mark.parametrize('vm_count', [1, 3])
+def test_fleet_heatmap_renders_for_any_vm_count(web, trend_session, vm_count):
+    """VM이 1대일 때도 슬라이더 범위 오류 없이 히트맵 표시"""
+    trend_session({
+        f"vm-{i}": {'cpu_trend': points([10.0 + i] * 24), 'memory_trend': [], 'disk_trend': []}
+        for i in range(vm_count)
+    })
+    web.display_fleet_trend_heatmap({'period': '2시간'})
+
+
+def test_downsample_keeps_min_max_and_all_nan_gap(web):
+    values = np.concatenate([np.arange(10.0), np.full(10, np.nan), [5.0, np.nan, 50.0, 1.0] * 5])
+    timestamps = np.arange(len(values))
+    kept_times, kept = web.downsample_min_max(timestamps, values, max_points=8)
+    assert len(kept) <= 8
+    assert {0.0, 9.0, 50.0, 1.0} <= set(kept[~np.isnan(kept)])
+    # 값이 모두 NaN인 구간은 NaN 포인트 1개로 남아 차트가 끊어짐
+    assert np.isnan(kept).sum() == 1 and 10 <= kept_times[np.isnan(kept)][0] < 20
+
+
+@pytest.mark.filterwarnings('error::RuntimeWarning')
+def test_fleet_overlay_skips_all_nan_vm(web):
+    vm_trends = {
+        'busy': {'cpu_trend': points([10.0, 90.0] * 400)},
+        'missing': {'cpu_trend': points([None] * 800)},
+    }
+    fig = web.create_fleet_overlay_chart(vm_trends, '24시간', '1분', max_points_per_vm=100)
+    assert [trace.name for trace in fig.data] == ['busy']
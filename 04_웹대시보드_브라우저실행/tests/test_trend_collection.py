@@ -0,0 +1,83 @@
+"""24시간 추이 수집 (get_vm_24h_metrics) 의 저장소 주입 / 마감 시간 / 메모리 조회 생략"""
+import os
+import time
+
+from collector_deadline import Deadline
+from collectors import ACCOUNT, NullProgress
+from fake_arm import LOCATION, VM_SIZES
+
+
+def vm_list(count):
+    return [{
+        'account_name': ACCOUNT['name'],
+        'vm_name': f"vm-{i:05d}",
+        'resource_group': f"rg-{i % 10:02d}",
+        'location': LOCATION,
+        'vm_size': VM_SIZES[i % len(VM_SIZES)],
+        'power_state': 'VM running'
+    } for i in range(count)]
+
+
+def collect(web, **stores):
+    return web.get_vm_24h_metrics(ACCOUNT, vm_list(3), NullProgress(), NullProgress(),
+                                  interval='PT15M', hours=6, **stores)
+
+
+def test_trends_without_stores_persist_nothing(web, fake_azure, tmp_path):
+    fake_azure(vms=3)
+    trends = collect(web)
+    assert len(trends) == 3
+    assert all(trend['cpu_trend'] for trend in trends.values())
+    assert not os.path.exists(tmp_path / 'sketches')
+    assert not os.path.exists(tmp_path / 'history')
+
+
+def test_trends_with_stores_persist_into_them(web, fake_azure, tmp_path):
+    from metric_history import MetricHistory
+    from quantile_sketch import SketchStore
+
+    fake_azure(vms=3)
+    sketch_store = SketchStore(str(tmp_path / 'sk'))
+    history = MetricHistory(str(tmp_path / 'hist'))
+    collect(web, sketch_store=sketch_store, history=history)
+    assert sketch_store.bucket_starts()
+    assert history.days('raw')
+
+
+class ExpiringDeadline(Deadline):
+    """VM expire_at 번째부터 마감 시간이 지난 Deadline"""
+
+    def __init__(self, expire_at):
+        super().__init__(60)
+        self.vm_checks = 0
+        self.expire_at = expire_at
+
+    def check(self, stage=''):
+        if stage.startswith("VM '"):
+            self.vm_checks += 1
+            if self.vm_checks > self.expire_at:
+                self.expires_at = time.monotonic()
+        super().check(stage)
+
+
+def test_trends_deadline_returns_collected_vms_as_partial(web, fake_azure, tmp_path):
+    from metric_history import MetricHistory
+
+    fake_azure(vms=3)
+    deadline = ExpiringDeadline(expire_at=2)
+    history = MetricHistory(str(tmp_path / 'hist'))
+    trends = collect(web, history=history, deadline=deadline)
+    assert sorted(trends) == ['vm-00000', 'vm-00001']
+    assert deadline.partial and "vm-00002" in deadline.reason
+    # 마감 전에 수집한 VM은 이력에도 저장됨
+    assert history.days('raw')
+
+
+def test_unknown_vm_size_skips_memory_query(web, fake_azure):
+    server = fake_azure(vms=3)
+    vms = vm_list(3)
+    vms[1]['vm_size'] = 'Standard_Unlisted'
+    trends = web.get_vm_24h_metrics(ACCOUNT, vms, NullProgress(), NullProgress(), interval='PT15M', hours=6)
+    assert trends['vm-00001']['memory_trend'] == [] and trends['vm-00000']['memory_trend']
+    # CPU / 디스크는 VM마다, 메모리는 크기를 아는 VM만
+    assert server.state.snapshot()['by_family']['monitor'] == 3 * 2 + 2
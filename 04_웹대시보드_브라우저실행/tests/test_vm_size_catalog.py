@@ -0,0 +1,84 @@
+"""VM 크기 카탈로그 (vm_size_catalog: 캐시 / 리전별 조회 직렬화)"""
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from vm_size_catalog import region_sizes, reset_catalog_cache, vm_size_spec
+
+
+def sku(name, vcpus, memory_gb):
+    return SimpleNamespace(resource_type='virtualMachines', name=name, capabilities=[
+        SimpleNamespace(name='vCPUs', value=str(vcpus)), SimpleNamespace(name='MemoryGB', value=str(memory_gb))
+    ])
+
+
+class SlowComputeClient:
+    """release 될 때까지 지정한 리전의 SKU 조회가 멈추는 Compute 클라이언트 대역"""
+
+    def __init__(self, slow_region=None):
+        self.slow_region = slow_region
+        self.release = threading.Event()
+        self.started = threading.Event()
+        self.calls = []
+        self.resource_skus = SimpleNamespace(list=self.list_skus)
+
+    def list_skus(self, filter=None, **options):
+        self.calls.append(filter)
+        if self.slow_region and self.slow_region in filter:
+            self.started.set()
+            self.release.wait(5)
+        return [sku('Standard_D2s_v3', 2, 8)]
+
+
+@pytest.fixture(autouse=True)
+def empty_catalog():
+    reset_catalog_cache()
+    yield
+    reset_catalog_cache()
+
+
+def test_catalog_cached_in_memory_and_on_disk(tmp_path):
+    client = SlowComputeClient()
+    assert vm_size_spec(client, 'Korea Central', 'standard_d2s_v3', cache_dir=str(tmp_path)) == \
+        {'memory_gb': 8.0, 'vcpus': 2}
+    vm_size_spec(client, 'koreacentral', 'Standard_D2s_v3', cache_dir=str(tmp_path))
+    assert len(client.calls) == 1
+
+    reset_catalog_cache()
+    assert region_sizes(None, 'koreacentral', cache_dir=str(tmp_path))  # 디스크 캐시만 사용
+    assert region_sizes(None, 'japaneast', cache_dir=str(tmp_path)) == {}
+
+
+def test_slow_region_does_not_block_other_regions(tmp_path):
+    client = SlowComputeClient(slow_region='koreacentral')
+    slow = threading.Thread(target=region_sizes, args=(client, 'koreacentral', str(tmp_path)))
+    slow.start()
+    try:
+        assert client.started.wait(5)
+        started = time.monotonic()
+        assert 'standard_d2s_v3' in region_sizes(client, 'japaneast', str(tmp_path))
+        assert time.monotonic() - started < 1
+
+        # 같은 리전은 자기 timeout 까지만 기다리고 (캐시가 없으므로) 빈 인덱스
+        started = time.monotonic()
+        assert region_sizes(client, 'koreacentral', str(tmp_path), call_options={'timeout': 0.2}) == {}
+        assert time.monotonic() - started < 1
+    finally:
+        client.release.set()
+        slow.join(5)
+
+
+def test_concurrent_lookups_fetch_region_once(tmp_path):
+    client = SlowComputeClient(slow_region='koreacentral')
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(region_sizes(client, 'koreacentral', str(tmp_path))))
+               for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    assert client.started.wait(5)
+    client.release.set()
+    for thread in threads:
+        thread.join(5)
+    assert len(client.calls) == 1 and len(results) == 4 and all(results)
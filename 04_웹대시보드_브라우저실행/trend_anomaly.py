@@ -0,0 +1,127 @@
+"""
+전체 VM 추이 이상 탐지 (VM × 시간 행렬 벡터 연산)
+
+build_trend_matrix() 가 만든 밀집 행렬(VM × 시간 구간)을 VM별 루프 없이 한 번에 분석합니다.
+
+- 이동 기준선: 직전 window 개 구간(현재 구간 제외)의 평균 / 표준편차 (누적합으로 계산)
+- 급증(z-score): (값 - 기준선 평균) / 기준선 표준편차 가 z_threshold 이상인 연속 구간
+- 임계값 지속: 값이 level 이상인 상태가 sustain 개 구간 이상 이어진 연속 구간
+
+표준편차가 거의 0인 평탄한 VM이 작은 흔들림에도 급증으로 잡히지 않도록
+메트릭별 최소 표준편차(min_std)를 둡니다. 데이터가 없는 구간(NaN)은 연속 구간을 끊습니다.
+"""
+import numpy as np
+
+DEFAULT_WINDOW_BUCKETS = 16   # 기준선 구간 수 (15분 구간이면 4시간)
+DEFAULT_MIN_PERIODS = 4       # 기준선 계산에 필요한 최소 데이터 구간 수
+DEFAULT_Z_THRESHOLD = 3.0
+DEFAULT_SUSTAIN_BUCKETS = 3
+
+SPIKE, SUSTAINED = 'spike', 'sustained'
+
+# 메트릭별 임계값(level, None 이면 임계값 지속 판정 안 함)과 최소 표준편차
+METRIC_RULES = {
+    'cpu_trend': {'level': 90.0, 'min_std': 2.0},
+    'memory_trend': {'level': 90.0, 'min_std': 2.0},
+    'disk_trend': {'level': None, 'min_std': 1.0},
+}
+
+
+def rolling_baseline(matrix, window=DEFAULT_WINDOW_BUCKETS, min_periods=DEFAULT_MIN_PERIODS):
+    """행마다 직전 window 개 구간(현재 제외)의 평균 / 표준편차 (데이터 부족 구간은 NaN)"""
+    n_rows, n_cols = matrix.shape
+    valid = ~np.isnan(matrix)
+    filled = np.where(valid, matrix, 0.0)
+
+    # 앞에 0 열을 붙인 누적합: sums[:, t] = t 이전 구간들의 합
+    sums = np.zeros((n_rows, n_cols + 1))
+    squares = np.zeros((n_rows, n_cols + 1))
+    counts = np.zeros((n_rows, n_cols + 1))
+    np.cumsum(filled, axis=1, out=sums[:, 1:])
+    np.cumsum(filled * filled, axis=1, out=squares[:, 1:])
+    np.cumsum(valid, axis=1, out=counts[:, 1:])
+
+    end = np.arange(n_cols)
+    start = np.maximum(0, end - window)
+    window_sums = sums[:, end] - sums[:, start]
+    window_squares = squares[:, end] - squares[:, start]
+    window_counts = counts[:, end] - counts[:, start]
+
+    enough = window_counts >= max(1, min_periods)
+    mean = np.full(matrix.shape, np.nan)
+    std = np.full(matrix.shape, np.nan)
+    np.divide(window_sums, window_counts, out=mean, where=enough)
+    np.divide(window_squares, window_counts, out=std, where=enough)
+    with np.errstate(invalid='ignore'):
+        std = np.sqrt(np.maximum(std - mean * mean, 0.0))
+    return mean, std
+
+
+def zscores(matrix, mean, std, min_std=0.0):
+    """기준선 대비 z-score (기준선이 없는 구간은 NaN)"""
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return (matrix - mean) / np.maximum(std, max(min_std, 1e-9))
+
+
+def find_runs(mask, min_length=1):
+    """행마다 True 가 연속된 구간 (rows, starts, ends) - ends 는 끝 다음 구간 인덱스"""
+    n_rows, n_cols = mask.shape
+    padded = np.zeros((n_rows, n_cols + 2), dtype=np.int8)
+    padded[:, 1:-1] = mask
+    edges = np.diff(padded, axis=1)
+    # argwhere 는 행 우선 순서이므로 시작/끝이 같은 순서로 짝지어짐
+    run_starts = np.argwhere(edges == 1)
+    run_ends = np.argwhere(edges == -1)
+    rows, starts, ends = run_starts[:, 0], run_starts[:, 1], run_ends[:, 1]
+    keep = ends - starts >= max(1, min_length)
+    return rows[keep], starts[keep], ends[keep]
+
+
+def run_max(matrix, rows, starts, ends):
+    """연속 구간마다 최대값 (NaN 무시) - 평탄 인덱스에 대한 fmax.reduceat"""
+    if len(rows) == 0:
+        return np.array([], dtype=float)
+    n_cols = matrix.shape[1]
+    # 행 끝에 NaN 열을 붙여 구간 끝 인덱스가 배열 범위를 벗어나지 않도록 함
+    flat = np.hstack([matrix, np.full((matrix.shape[0], 1), np.nan)]).ravel()
+    bounds = np.empty(2 * len(rows), dtype=np.int64)
+    bounds[0::2] = rows * (n_cols + 1) + starts
+    bounds[1::2] = rows * (n_cols + 1) + ends
+    return np.fmax.reduceat(flat, bounds)[0::2]
+
+
+def detect_anomalies(matrix, window=DEFAULT_WINDOW_BUCKETS, min_periods=DEFAULT_MIN_PERIODS,
+                     z_threshold=DEFAULT_Z_THRESHOLD, level=None, sustain=DEFAULT_SUSTAIN_BUCKETS, min_std=0.0):
+    """VM × 시간 행렬에서 급증 / 임계값 지속 구간 탐지
+
+    Returns:
+        {'rows', 'starts', 'ends', 'kinds', 'peaks', 'max_z', 'baselines'} - 구간마다 한 원소인 배열
+    """
+    if matrix.size == 0:
+        empty_int = np.array([], dtype=np.int64)
+        empty_float = np.array([], dtype=float)
+        return {'rows': empty_int, 'starts': empty_int, 'ends': empty_int, 'kinds': np.array([], dtype=object),
+                'peaks': empty_float, 'max_z': empty_float, 'baselines': empty_float}
+
+    mean, std = rolling_baseline(matrix, window, min_periods)
+    z = zscores(matrix, mean, std, min_std)
+
+    with np.errstate(invalid='ignore'):
+        spike_runs = find_runs(z >= z_threshold, 1)
+        sustained_runs = (find_runs(matrix >= level, sustain) if level is not None
+                          else (np.array([], dtype=np.int64),) * 3)
+
+    rows = np.concatenate([spike_runs[0], sustained_runs[0]])
+    starts = np.concatenate([spike_runs[1], sustained_runs[1]])
+    ends = np.concatenate([spike_runs[2], sustained_runs[2]])
+    kinds = np.array([SPIKE] * len(spike_runs[0]) + [SUSTAINED] * len(sustained_runs[0]), dtype=object)
+    return {
+        'rows': rows,
+        'starts': starts,
+        'ends': ends,
+        'kinds': kinds,
+        'peaks': run_max(matrix, rows, starts, ends),
+        'max_z': run_max(z, rows, starts, ends),
+        # 구간 시작 시점의 기준선 평균 (급증 전 정상 수준)
+        'baselines': mean[rows, starts] if len(rows) else np.array([], dtype=float)
+    }
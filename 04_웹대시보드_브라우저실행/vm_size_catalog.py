@@ -0,0 +1,153 @@
+"""
+VM 크기 카탈로그 (vm_size → 메모리 GB / vCPU 수)
+
+Resource SKUs API(Microsoft.Compute/skus)를 리전당 한 번만 조회해 메모리 인덱스로 보관하고
+디스크(JSON)에도 캐시합니다. VM 크기 사양은 거의 바뀌지 않으므로 기본 7일 동안 재사용하며,
+메트릭 변환(Available Memory Bytes → 사용률 %)은 VM마다 추가 호출 없이 이 인덱스에서 찾습니다.
+
+조회에 실패한 리전은 FAILED_TTL_SECONDS 동안 다시 조회하지 않고 (VM마다 실패 호출 반복 방지),
+만료된 디스크 캐시가 있으면 그것을 계속 사용합니다.
+
+API 조회는 리전별 Lock 안에서만 하므로 한 리전의 느린 조회가 다른 리전 / 다른 세션의 조회를 막지 않고,
+같은 리전을 기다리는 호출은 자기 call_options 의 timeout 까지만 기다린 뒤 (만료된 것 포함) 캐시를 사용합니다.
+"""
+import json
+import logging
+import os
+import threading
+import time
+
+DEFAULT_CACHE_DIR = 'cache'
+CACHE_TTL_SECONDS = 7 * 24 * 3600
+FAILED_TTL_SECONDS = 600
+
+logger = logging.getLogger(__name__)
+
+_regions = {}  # 리전 → {'fetched_at': epoch, 'sizes': {vm_size(소문자): {'memory_gb', 'vcpus'}}}
+_region_locks = {}  # 리전 → 같은 리전 중복 조회 방지 Lock
+_lock = threading.Lock()  # _regions / _region_locks 접근만 보호 (API 호출 중에는 잡지 않음)
+
+
+def normalize_region(location):
+    """'Korea Central' / 'koreacentral' → 'koreacentral'"""
+    return (location or '').replace(' ', '').lower()
+
+
+def cache_path(region, cache_dir=DEFAULT_CACHE_DIR):
+    return os.path.join(cache_dir, f"vm_sizes_{region}.json")
+
+
+def sizes_from_skus(skus):
+    """Resource SKU 목록 → {vm_size(소문자): {'memory_gb', 'vcpus'}} (virtualMachines 만)"""
+    sizes = {}
+    for sku in skus:
+        if (sku.resource_type or '').lower() != 'virtualmachines' or not sku.name:
+            continue
+        capabilities = {capability.name: capability.value for capability in (sku.capabilities or [])}
+        try:
+            sizes[sku.name.lower()] = {
+                'memory_gb': float(capabilities['MemoryGB']),
+                'vcpus': int(capabilities['vCPUs'])
+            }
+        except (KeyError, TypeError, ValueError):
+            continue
+    return sizes
+
+
+def read_cache(region, cache_dir):
+    try:
+        with open(cache_path(region, cache_dir), 'r', encoding='utf-8') as f:
+            entry = json.load(f)
+        return {'fetched_at': float(entry['fetched_at']), 'sizes': entry['sizes']}
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def write_cache(region, entry, cache_dir):
+    """임시 파일에 쓴 뒤 교체 (동시에 읽는 세션이 반쯤 쓰인 파일을 보지 않도록)"""
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        path = cache_path(region, cache_dir)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'region': region, **entry}, f, ensure_ascii=False)
+        os.replace(temp_path, path)
+    except OSError as e:
+        logger.warning(f"VM 크기 카탈로그 캐시 저장 실패 ({region}): {e}")
+
+
+def reset_catalog_cache():
+    """메모리 캐시 비우기 (디스크 캐시는 유지)"""
+    with _lock:
+        _regions.clear()
+
+
+def _fresh_sizes(region, now, ttl):
+    """메모리 캐시에 유효한 항목이 있으면 그 인덱스 (없으면 None)"""
+    with _lock:
+        entry = _regions.get(region)
+    if entry and now - entry['fetched_at'] < entry.get('ttl', ttl):
+        return entry['sizes']
+    return None
+
+
+def region_sizes(compute_client, location, cache_dir=DEFAULT_CACHE_DIR, ttl=CACHE_TTL_SECONDS, call_options=None):
+    """리전의 VM 크기 인덱스 (메모리 → 디스크 캐시 → Resource SKUs API 순)
+
+    compute_client 가 None 이면 API 는 호출하지 않고 (만료된 것 포함) 캐시만 사용합니다.
+    call_options: API 호출에 넘길 Azure SDK 옵션 (예: Deadline.call_options() 의 timeout)
+                  같은 리전을 다른 호출이 조회 중이면 이 timeout 까지만 기다립니다.
+    """
+    region = normalize_region(location)
+    if not region:
+        return {}
+    now = time.time()
+    sizes = _fresh_sizes(region, now, ttl)
+    if sizes is not None:
+        return sizes
+
+    with _lock:
+        region_lock = _region_locks.setdefault(region, threading.Lock())
+    if not region_lock.acquire(timeout=(call_options or {}).get('timeout') or -1):
+        # 다른 호출이 조회 중 - 기다리지 않고 (만료된 것 포함) 캐시 사용
+        with _lock:
+            entry = _regions.get(region)
+        cached = entry or read_cache(region, cache_dir)
+        return cached['sizes'] if cached else {}
+    try:
+        sizes = _fresh_sizes(region, now, ttl)  # 기다리는 동안 다른 호출이 조회를 마쳤으면 그 결과
+        if sizes is not None:
+            return sizes
+
+        cached = read_cache(region, cache_dir)
+        if cached and (now - cached['fetched_at'] < ttl or compute_client is None):
+            entry = cached
+        elif compute_client is None:
+            return {}
+        else:
+            try:
+                skus = compute_client.resource_skus.list(filter=f"location eq '{region}'", **(call_options or {}))
+                entry = {'fetched_at': now, 'sizes': sizes_from_skus(skus)}
+                write_cache(region, entry, cache_dir)
+            except Exception as e:
+                logger.warning(f"VM 크기 카탈로그 조회 실패 ({region}): {e}")
+                stale_sizes = cached['sizes'] if cached else {}
+                entry = {'fetched_at': now, 'sizes': stale_sizes, 'ttl': FAILED_TTL_SECONDS}
+        with _lock:
+            _regions[region] = entry
+        return entry['sizes']
+    finally:
+        region_lock.release()
+
+
+def vm_size_spec(compute_client, location, vm_size, **options):
+    """VM 크기 사양 {'memory_gb', 'vcpus'} (카탈로그에 없으면 None)"""
+    if not vm_size or vm_size == 'N/A':
+        return None
+    return region_sizes(compute_client, location, **options).get(vm_size.lower())
+
+
+def memory_used_percent(available_bytes, memory_gb):
+    """Available Memory Bytes → 메모리 사용률(%) (0~100 범위)"""
+    total_bytes = memory_gb * 1024**3
+    return max(0.0, min(100.0, (total_bytes - available_bytes) / total_bytes * 100))